@@ -95,6 +95,8 @@ class ClamUIApp(Adw.Application):
 
         # Tray indicator (initialized in do_startup if available)
         self._tray_indicator = None
+        # Last scan percentage sent to the tray
+        self._tray_scan_percentage = 0
 
         # Track first activation for start-minimized functionality
         self._first_activation = True
@@ -106,6 +108,12 @@ class ClamUIApp(Adw.Application):
         # VirusTotal client (lazy-initialized)
         self._vt_client = None
 
+        # Watch folder service (started in do_startup if enabled)
+        self._watch_folder_service = None
+
+        # org.clamui.Scanner D-Bus service (registered in do_startup)
+        self._scan_dbus_service = None
+
     @property
     def app_name(self) -> str:
         """Get the application name."""
@@ -155,6 +163,8 @@ class ClamUIApp(Adw.Application):
             self._scan_view = ScanView(settings_manager=self._settings_manager)
             # Connect scan state callback for tray integration
             self._scan_view.set_scan_state_changed_callback(self._on_scan_state_changed)
+            self._scan_view.set_on_scan_progress(self._on_scan_progress)
+            self._scan_view.set_on_scan_paused_changed(self._on_scan_paused_changed)
         return self._scan_view
 
     @property
@@ -307,6 +317,19 @@ class ClamUIApp(Adw.Application):
         # Install Nemo context menu actions if running in Flatpak
         self._install_nemo_actions()
 
+        # Load the private clamd's database before the first scan needs it
+        if self._settings_manager.get("scan_backend", "auto") == "managed":
+            from .core.managed_clamd import get_managed_clamd
+
+            get_managed_clamd().start_in_background()
+
+        # Let other tools submit scans to this process over D-Bus
+        self._setup_scan_dbus_service()
+
+        # Scan new files in the watch folders as they land
+        if self._settings_manager.get("watch_folders_enabled", False):
+            self._start_watch_folders()
+
     def _install_nemo_actions(self):
         """
         Install Nemo context menu actions if running in Flatpak.
@@ -442,6 +465,11 @@ class ClamUIApp(Adw.Application):
             # Set profile selection callback
             self._tray_indicator.set_profile_select_callback(on_select=self._on_tray_profile_select)
 
+            # Set scan pause/resume callbacks
+            self._tray_indicator.set_scan_pause_callbacks(
+                on_pause=self._on_tray_pause_scan, on_resume=self._on_tray_resume_scan
+            )
+
             # Start the tray subprocess
             if self._tray_indicator.start():
                 logger.info("Tray indicator subprocess started")
@@ -846,6 +874,24 @@ class ClamUIApp(Adw.Application):
 
         return False  # Don't repeat
 
+    def _on_tray_pause_scan(self) -> None:
+        """
+        Handle Pause Scan action from tray menu.
+
+        Pauses the scan running in the scan view.
+        """
+        if self._scan_view is not None:
+            self._scan_view.pause_scan()
+
+    def _on_tray_resume_scan(self) -> None:
+        """
+        Handle Resume Scan action from tray menu.
+
+        Resumes the scan running in the scan view.
+        """
+        if self._scan_view is not None:
+            self._scan_view.resume_scan()
+
     # Scan state change handler (for tray integration)
 
     def _on_scan_state_changed(self, is_scanning: bool, result=None) -> None:
@@ -861,11 +907,11 @@ class ClamUIApp(Adw.Application):
         if self._tray_indicator is None:
             return
 
+        self._tray_scan_percentage = 0
         if is_scanning:
             # Update tray to scanning state
             self._tray_indicator.update_status("scanning")
-            # Show indeterminate progress (tray doesn't get real-time %)
-            # Clear any previous label, icon change indicates scanning
+            # Clear any previous label until the scan reports its progress
             self._tray_indicator.update_scan_progress(0)
             logger.debug("Tray updated to scanning state")
         else:
@@ -891,6 +937,91 @@ class ClamUIApp(Adw.Application):
                 self._tray_indicator.update_status("protected")
                 logger.debug("Tray updated to protected state (no result)")
 
+    def _on_scan_progress(self, progress) -> None:
+        """
+        Show the scan percentage in the tray.
+
+        Called by ScanView with coalesced progress snapshots. The tray only
+        gets a command when the whole percentage changes.
+
+        Args:
+            progress: ScanProgress of the running scan
+        """
+        if self._tray_indicator is None or progress.fraction is None:
+            return
+
+        percentage = int(progress.fraction * 100)
+        if percentage != self._tray_scan_percentage:
+            self._tray_scan_percentage = percentage
+            self._tray_indicator.update_scan_progress(percentage)
+
+    def _on_scan_paused_changed(self, paused: bool) -> None:
+        """
+        Offer Resume Scan or Pause Scan in the tray menu.
+
+        Called by ScanView when the scan is paused or resumed, by the user
+        or by the scan governor.
+
+        Args:
+            paused: Whether the running scan is paused
+        """
+        if self._tray_indicator is not None:
+            self._tray_indicator.update_scan_paused(paused)
+
+    def _setup_scan_dbus_service(self):
+        """Export the org.clamui.Scanner D-Bus interface with its job queue."""
+        connection = self.get_dbus_connection()
+        if connection is None:
+            return
+
+        from .core.scan_cache import ScanCache
+        from .core.scan_dbus import ScanDBusService
+        from .core.scanner import Scanner
+
+        settings_manager = self._settings_manager
+
+        def create_scanner():
+            scan_cache = ScanCache() if settings_manager.get("scan_cache_enabled", True) else None
+            return Scanner(settings_manager=settings_manager, scan_cache=scan_cache)
+
+        service = ScanDBusService(
+            create_scanner, max_concurrent=settings_manager.get("scan_service_max_jobs", 2)
+        )
+        if service.register(connection):
+            self._scan_dbus_service = service
+
+    def _start_watch_folders(self):
+        """Start the service scanning new files in the watch folders."""
+        from .core.watch_folders import WatchFolderService
+
+        self._watch_folder_service = WatchFolderService(
+            self._settings_manager, on_batch_scanned=self._on_watch_batch_scanned
+        )
+        if not self._watch_folder_service.start():
+            self._watch_folder_service = None
+
+    def _on_watch_batch_scanned(self, files, results):
+        """
+        Notify about threats found in the watch folders.
+
+        Called from the watch folder service's scanning thread.
+
+        Args:
+            files: The scanned files
+            results: Their ScanResults
+        """
+        infected_count = sum(result.infected_count for result in results)
+        if not infected_count:
+            return
+
+        def notify():
+            self._notification_manager.notify_scan_complete(
+                is_clean=False, infected_count=infected_count, scanned_count=len(files)
+            )
+            return False
+
+        GLib.idle_add(notify)
+
     def do_shutdown(self):
         """
         Handle application shutdown.
@@ -899,6 +1030,9 @@ class ClamUIApp(Adw.Application):
         It performs cleanup of resources including:
         - Tray indicator
         - Active scans
+        - Watch folders
+        - D-Bus scan service
+        - Private clamd
         - Database connections
         """
         logger.info("Application shutdown initiated")
@@ -913,6 +1047,30 @@ class ClamUIApp(Adw.Application):
             except Exception as e:
                 logger.warning(f"Error cancelling scan during shutdown: {e}")
 
+        # Stop watching folders
+        if self._watch_folder_service is not None:
+            try:
+                self._watch_folder_service.stop()
+                self._watch_folder_service = None
+            except Exception as e:
+                logger.warning(f"Error stopping watch folders during shutdown: {e}")
+
+        # Cancel jobs submitted over D-Bus
+        if self._scan_dbus_service is not None:
+            try:
+                self._scan_dbus_service.unregister()
+                self._scan_dbus_service = None
+            except Exception as e:
+                logger.warning(f"Error stopping D-Bus scan service during shutdown: {e}")
+
+        # Stop the private clamd if this process started it
+        try:
+            from .core.managed_clamd import shutdown_managed_clamd
+
+            shutdown_managed_clamd()
+        except Exception as e:
+            logger.warning(f"Error stopping private clamd during shutdown: {e}")
+
         # Clean up tray indicator to prevent ghost icons
         if self._tray_indicator is not None:
             try:
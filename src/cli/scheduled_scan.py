@@ -16,6 +16,7 @@ Options:
     --skip-on-battery     Skip scan if running on battery power
     --auto-quarantine     Automatically quarantine detected threats
     --target PATH         Path to scan (can be specified multiple times)
+    --resume              Continue an interrupted scan of the same targets
     --dry-run             Show what would be done without executing
     --verbose             Enable verbose output
     --help                Show this help message
@@ -29,6 +30,9 @@ Examples:
 
     # Scan with auto-quarantine enabled
     clamui-scheduled-scan --auto-quarantine --target /home/user/Downloads
+
+    # Continue where a scan that was killed or suspended stopped
+    clamui-scheduled-scan --resume --target /home/user
 """
 
 import argparse
@@ -36,13 +40,17 @@ import os
 import subprocess
 import sys
 import time
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from src.core.battery_manager import BatteryManager
-from src.core.log_manager import LogEntry, LogManager
+from src.core.log_manager import MAX_LOGGED_THREATS, LogEntry, LogManager
 from src.core.quarantine import QuarantineManager
-from src.core.scanner import Scanner, ScanResult, ScanStatus
+from src.core.scan_cache import ScanCache
+from src.core.scan_checkpoint import ScanCheckpoint
+from src.core.scanner import Scanner, ScanResult, ScanStatus, ThreatDetail
+from src.core.scheduler import get_schedule_interval
 from src.core.settings_manager import SettingsManager
 
 
@@ -55,6 +63,7 @@ class ScanContext:
     auto_quarantine: bool
     dry_run: bool
     verbose: bool
+    resume: bool = False
     settings: SettingsManager | None = None
     battery_manager: BatteryManager | None = None
     log_manager: LogManager | None = None
@@ -69,7 +78,10 @@ class ScanContext:
         if self.log_manager is None:
             self.log_manager = LogManager()
         if self.scanner is None:
-            self.scanner = Scanner(log_manager=self.log_manager)
+            scan_cache = ScanCache() if self.settings.get("scan_cache_enabled", True) else None
+            self.scanner = Scanner(
+                log_manager=self.log_manager, scan_cache=scan_cache, interactive=False
+            )
 
 
 @dataclass
@@ -78,12 +90,16 @@ class ScanAggregateResult:
 
     total_scanned: int = 0
     total_infected: int = 0
-    all_infected_files: list[str] = field(default_factory=list)
     all_results: list[ScanResult] = field(default_factory=list)
     has_errors: bool = False
     duration: float = 0.0
     valid_targets: list[str] = field(default_factory=list)
 
+    def iter_threats(self) -> Iterator[ThreatDetail]:
+        """Iterate over the threats of every target, without copying them into one list."""
+        for result in self.all_results:
+            yield from result.threat_details
+
 
 @dataclass
 class QuarantineResult:
@@ -133,6 +149,12 @@ Examples:
         help="Path to scan (can be specified multiple times)",
     )
 
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted scan of the same targets from its last checkpoint",
+    )
+
     parser.add_argument(
         "--dry-run", action="store_true", help="Show what would be done without executing"
     )
@@ -287,6 +309,7 @@ def _handle_dry_run(ctx: ScanContext, valid_targets: list[str]) -> int:
     log_message("Dry run mode - scan not executed", ctx.verbose)
     log_message(f"  Skip on battery: {ctx.skip_on_battery}", ctx.verbose)
     log_message(f"  Auto quarantine: {ctx.auto_quarantine}", ctx.verbose)
+    log_message(f"  Resume: {ctx.resume}", ctx.verbose)
     log_message(f"  Targets: {valid_targets}", ctx.verbose)
     return 0
 
@@ -348,14 +371,31 @@ def _execute_scans(ctx: ScanContext, valid_targets: list[str]) -> ScanAggregateR
     agg = ScanAggregateResult(valid_targets=valid_targets)
     start_time = time.monotonic()
 
-    for target in valid_targets:
-        log_message(f"Scanning: {target}", ctx.verbose)
-        result = ctx.scanner.scan_sync(target, recursive=True)
+    # Progress is journaled so a killed scan can be resumed with --resume.
+    # A run older than the schedule interval is stale: the files it skips
+    # would go unscanned for longer than the schedule promises.
+    checkpoint = ScanCheckpoint(valid_targets, recursive=True)
+    max_age = get_schedule_interval(ctx.settings.get("schedule_frequency", "weekly"))
+    if checkpoint.start(resume=ctx.resume, max_age=max_age):
+        log_message(
+            f"Resuming interrupted scan: {checkpoint.resumed_files} file(s) already scanned",
+            ctx.verbose,
+        )
+
+    # One scanner invocation for all targets loads the signature database once
+    try:
+        results = ctx.scanner.scan_targets(valid_targets, recursive=True, checkpoint=checkpoint)
+    finally:
+        checkpoint.close()
+    if not any(result.status == ScanStatus.CANCELLED for result in results):
+        checkpoint.discard()
+
+    for target, result in zip(valid_targets, results, strict=True):
+        log_message(f"Scanned: {target}", ctx.verbose)
         agg.all_results.append(result)
 
         agg.total_scanned += result.scanned_files
         agg.total_infected += result.infected_count
-        agg.all_infected_files.extend(result.infected_files)
 
         if result.status == ScanStatus.ERROR:
             agg.has_errors = True
@@ -382,20 +422,16 @@ def _process_quarantine(ctx: ScanContext, agg: ScanAggregateResult) -> Quarantin
     """
     qr = QuarantineResult()
 
-    if not agg.all_infected_files or not ctx.auto_quarantine:
+    if not agg.total_infected or not ctx.auto_quarantine:
         return qr
 
-    log_message(f"Quarantining {len(agg.all_infected_files)} infected file(s)...", ctx.verbose)
+    log_message(f"Quarantining {agg.total_infected} infected file(s)...", ctx.verbose)
 
     quarantine_manager = QuarantineManager()
 
-    # Collect all threat details from scan results
-    all_threat_details = []
-    for result in agg.all_results:
-        all_threat_details.extend(result.threat_details)
-
-    # Quarantine each infected file with its threat name
-    for threat in all_threat_details:
+    # Quarantine each infected file with its threat name, streaming each
+    # result's threats rather than copying them into one list
+    for threat in agg.iter_threats():
         quarantine_result = quarantine_manager.quarantine_file(threat.file_path, threat.threat_name)
         if quarantine_result.is_success:
             qr.quarantined_count += 1
@@ -467,19 +503,24 @@ def _build_log_details(
         f"Targets: {', '.join(agg.valid_targets)}",
     ]
 
-    if auto_quarantine and agg.all_infected_files:
+    if auto_quarantine and agg.total_infected:
         details_parts.append(f"Quarantined: {qr.quarantined_count}")
         if qr.failed:
             details_parts.append(f"Quarantine Failed: {len(qr.failed)}")
 
-    if agg.all_infected_files:
+    if agg.total_infected:
         details_parts.append("\n--- Infected Files ---")
-        for result in agg.all_results:
-            for threat in result.threat_details:
-                details_parts.append(
-                    f"  {threat.file_path}: {threat.threat_name} "
-                    f"[{threat.category}/{threat.severity}]"
-                )
+        listed = omitted = 0
+        for threat in agg.iter_threats():
+            if listed >= MAX_LOGGED_THREATS:
+                omitted += 1
+                continue
+            listed += 1
+            details_parts.append(
+                f"  {threat.file_path}: {threat.threat_name} [{threat.category}/{threat.severity}]"
+            )
+        if omitted:
+            details_parts.append(f"  ... and {omitted} more")
 
     # Combine stdout from all scan results
     for i, result in enumerate(agg.all_results):
@@ -584,6 +625,7 @@ def run_scheduled_scan(
     auto_quarantine: bool,
     dry_run: bool = False,
     verbose: bool = False,
+    resume: bool = False,
 ) -> int:
     """
     Execute a scheduled scan.
@@ -597,6 +639,7 @@ def run_scheduled_scan(
         auto_quarantine: Whether to quarantine detected threats
         dry_run: If True, show what would be done without executing
         verbose: Enable verbose output
+        resume: Continue an interrupted scan of the same targets
 
     Returns:
         Exit code (0 for success/clean, 1 for threats found, 2 for error)
@@ -608,6 +651,7 @@ def run_scheduled_scan(
         auto_quarantine=auto_quarantine,
         dry_run=dry_run,
         verbose=verbose,
+        resume=resume,
     )
 
     log_message("ClamUI scheduled scan starting...", verbose)
@@ -690,6 +734,7 @@ def main() -> int:
         auto_quarantine=auto_quarantine,
         dry_run=args.dry_run,
         verbose=args.verbose,
+        resume=args.resume,
     )
 
 
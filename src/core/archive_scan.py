@@ -0,0 +1,141 @@
+# ClamUI Archive Scan Module
+"""
+Members of tar and zip archives, read as streams.
+
+Container image exports, backup tarballs and CI artifacts are usually
+scanned by extracting them first, or as one file subject to the scanner's
+archive limits. DaemonScanner.scan_archive() instead reads the members one
+after the other from the archive and streams each to clamd over INSTREAM:
+
+- tar archives (plain or gzip, bzip2 and xz compressed) are read in
+  tarfile's stream mode ("r|*"), a single forward pass over the file.
+- zip archives are read member by member through zipfile, which needs the
+  central directory at the end of the file but no more than one member's
+  decompression state at a time.
+
+Nothing is written to disk, and each member is read a chunk at a time, so
+memory stays bounded by the chunk size whatever the archive's size.
+Threats are reported as "<archive>!<member>".
+"""
+
+import logging
+import tarfile
+import zipfile
+import zlib
+from collections.abc import Iterator
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Separator between the archive path and a member name in reported paths
+MEMBER_SEPARATOR = "!"
+
+
+class ArchiveError(Exception):
+    """Raised when an archive can't be opened or read."""
+
+
+class MemberStream:
+    """
+    Read-only view of an archive member that turns read errors into EOF.
+
+    A member that fails to decompress half way is streamed to clamd up to
+    the failure, which keeps the INSTREAM request well-formed; the error
+    is kept in the error attribute.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.error: Exception | None = None
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes, or nothing once reading failed."""
+        if self.error is not None:
+            return b""
+        try:
+            return self._stream.read(size)
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError, zlib.error) as e:
+            self.error = e
+            return b""
+
+
+def member_path(archive_path: str, member_name: str) -> str:
+    """
+    Build the reported path of an archive member.
+
+    Args:
+        archive_path: Path of the archive
+        member_name: Name of the member inside the archive
+
+    Returns:
+        "<archive_path>!<member_name>"
+    """
+    return f"{archive_path}{MEMBER_SEPARATOR}{member_name}"
+
+
+def is_supported_archive(path: str) -> bool:
+    """
+    Check whether a file is a tar or zip archive.
+
+    Args:
+        path: Path of a regular file
+
+    Returns:
+        True if iter_archive_members() can read it
+    """
+    try:
+        return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+    except OSError:
+        return False
+
+
+def iter_archive_members(path: str) -> Iterator[tuple[str, MemberStream]]:
+    """
+    Yield the regular files of a tar or zip archive as streams.
+
+    Each stream is only valid until the next member is requested.
+    Directories, links, device entries and encrypted zip members are
+    skipped.
+
+    Args:
+        path: Path of the archive
+
+    Yields:
+        Tuples of (member_name, MemberStream of its contents)
+
+    Raises:
+        ArchiveError: If the file isn't a supported archive, or it is
+                      corrupt or truncated
+    """
+    try:
+        if zipfile.is_zipfile(path):
+            yield from _iter_zip_members(path)
+        else:
+            yield from _iter_tar_members(path)
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError, zlib.error) as e:
+        raise ArchiveError(f"Cannot read archive {path}: {e}") from e
+
+
+def _iter_tar_members(path: str) -> Iterator[tuple[str, MemberStream]]:
+    """Yield the regular files of a tar archive in one forward pass."""
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                yield member.name, MemberStream(stream)
+
+
+def _iter_zip_members(path: str) -> Iterator[tuple[str, MemberStream]]:
+    """Yield the regular files of a zip archive."""
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            if info.flag_bits & 0x1:
+                # Encrypted members can't be read without the password
+                logger.debug("Skipping encrypted member %s of %s", info.filename, path)
+                continue
+            with archive.open(info) as stream:
+                yield info.filename, MemberStream(stream)
@@ -0,0 +1,269 @@
+# ClamUI Backend Selection Module
+"""
+Adaptive choice of the backend for "auto" scans.
+
+The backends cost different things. clamscan loads the signature database
+before its first file, which takes seconds, but a large tree is sharded
+across several clamscan workers. A running clamd has its database loaded
+already, but scans at most MaxThreads files at once. A one-file scan is
+therefore cheapest on a running daemon, while a huge tree can finish
+sooner on sharded clamscan when clamd has few threads.
+
+With "auto_backend_adaptive" set, an "auto" scan estimates its workload
+and the cost of each available backend, and picks the cheapest:
+
+- The workload is the file count and bytes of the targets, remembered by
+  the progress tracker from the last scan of the same targets, or counted
+  by a bounded stat walk.
+- The cost of a backend is a fixed overhead plus a time per file, fitted
+  to the durations of its recent scan logs. Until enough logs exist, it
+  is modeled from typical ClamAV throughput, the clamscan worker count and
+  clamd's MaxThreads.
+"""
+
+import logging
+import os
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .clamav_config import CLAMD_CONFIG_PATHS
+from .clamd_concurrency import DEFAULT_MAX_THREADS, get_clamd_limits
+from .log_manager import LogManager
+from .scan_progress import get_remembered_totals
+from .scan_walker import iter_target_files
+
+logger = logging.getLogger(__name__)
+
+# Backends an "auto" scan chooses from
+CLAMSCAN = "clamscan"
+DAEMON = "daemon"
+MANAGED = "managed"
+
+# clamd's MaxThreads when its configuration doesn't set it
+DEFAULT_CLAMD_THREADS = DEFAULT_MAX_THREADS
+
+# Typical seconds clamscan spends loading the signature database
+CLAMSCAN_STARTUP_SECONDS = 12.0
+
+# Typical seconds to connect to a running clamd and start a session
+DAEMON_STARTUP_SECONDS = 0.2
+
+# Typical engine time of one file and one byte, on one thread
+ENGINE_SECONDS_PER_FILE = 0.01
+ENGINE_SECONDS_PER_BYTE = 1 / (40 * 1024 * 1024)
+
+# Bounds of the stat walk estimating a workload without history
+PREPASS_MAX_FILES = 10000
+PREPASS_MAX_SECONDS = 0.25
+
+# Recent scan logs read to learn the backend costs, and the number of
+# them a backend needs before its fitted costs replace the model
+LOG_SAMPLE_LIMIT = 200
+MIN_LOG_SAMPLES = 3
+
+# Seconds learned costs are reused before the logs are read again
+LEARNED_COSTS_TTL = 300
+
+_SCANNED_FILES_PATTERN = re.compile(r"^Scanned: (\d+) files", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Estimated size of a scan."""
+
+    files: int
+    bytes: int
+    # Where the estimate comes from: "history", "walk" or "partial walk"
+    source: str
+
+
+@dataclass(frozen=True)
+class BackendCost:
+    """Cost model of one backend: seconds = overhead + work / parallelism."""
+
+    overhead: float
+    per_file: float
+    per_byte: float = 0.0
+    parallelism: int = 1
+    # Number of scan logs the costs were fitted to; 0 for the default model
+    samples: int = 0
+
+    def estimate(self, workload: Workload) -> float:
+        """Estimate the seconds a workload takes on this backend."""
+        work = workload.files * self.per_file + workload.bytes * self.per_byte
+        return self.overhead + work / max(1, self.parallelism)
+
+
+def estimate_workload(
+    paths: list[str],
+    recursive: bool = True,
+    history_path: Path | None = None,
+    max_files: int = PREPASS_MAX_FILES,
+    max_seconds: float = PREPASS_MAX_SECONDS,
+) -> Workload:
+    """
+    Estimate the number of files and bytes a scan will walk.
+
+    Args:
+        paths: Targets of the scan
+        recursive: Whether directories are scanned recursively
+        history_path: Optional file of remembered scan totals, see
+                      scan_progress.get_remembered_totals()
+        max_files: Files after which the walk stops
+        max_seconds: Seconds after which the walk stops
+
+    Returns:
+        Workload; a stopped walk reports what it counted so far as a
+        "partial walk", a lower bound of the real workload
+    """
+    totals = get_remembered_totals(paths, history_path)
+    if totals is not None:
+        return Workload(files=totals[0], bytes=totals[1], source="history")
+
+    deadline = time.monotonic() + max_seconds
+    files = 0
+    size = 0
+    for _, st in iter_target_files(paths, recursive):
+        files += 1
+        size += st.st_size
+        if files >= max_files or (files % 256 == 0 and time.monotonic() > deadline):
+            return Workload(files=files, bytes=size, source="partial walk")
+    return Workload(files=files, bytes=size, source="walk")
+
+
+def get_clamd_max_threads(config_paths: Iterable[str] = CLAMD_CONFIG_PATHS) -> int:
+    """
+    Read MaxThreads from the system clamd configuration.
+
+    Args:
+        config_paths: clamd.conf files to try, in order
+
+    Returns:
+        The configured MaxThreads, or DEFAULT_CLAMD_THREADS
+    """
+    return get_clamd_limits(config_paths).max_threads
+
+
+def get_default_costs(clamscan_workers: int, clamd_threads: int) -> dict[str, BackendCost]:
+    """
+    Model the backend costs from typical ClamAV throughput.
+
+    Args:
+        clamscan_workers: clamscan workers the workload would be sharded to
+        clamd_threads: Files clamd scans at once
+
+    Returns:
+        Cost of clamscan and of a running clamd, by backend
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return {
+        CLAMSCAN: BackendCost(
+            overhead=CLAMSCAN_STARTUP_SECONDS,
+            per_file=ENGINE_SECONDS_PER_FILE,
+            per_byte=ENGINE_SECONDS_PER_BYTE,
+            parallelism=clamscan_workers,
+        ),
+        DAEMON: BackendCost(
+            overhead=DAEMON_STARTUP_SECONDS,
+            per_file=ENGINE_SECONDS_PER_FILE,
+            per_byte=ENGINE_SECONDS_PER_BYTE,
+            parallelism=min(clamd_threads, cpus),
+        ),
+    }
+
+
+def _fit_cost(samples: list[tuple[int, float]]) -> BackendCost | None:
+    """Fit duration = overhead + files * per_file by least squares."""
+    count = len(samples)
+    mean_files = sum(files for files, _ in samples) / count
+    mean_duration = sum(duration for _, duration in samples) / count
+    variance = sum((files - mean_files) ** 2 for files, _ in samples)
+    if variance == 0:
+        return None
+    covariance = sum(
+        (files - mean_files) * (duration - mean_duration) for files, duration in samples
+    )
+    per_file = covariance / variance
+    if per_file <= 0:
+        return None
+    overhead = max(0.0, mean_duration - per_file * mean_files)
+    return BackendCost(overhead=overhead, per_file=per_file, samples=count)
+
+
+def learn_backend_costs(
+    log_manager: LogManager, limit: int = LOG_SAMPLE_LIMIT
+) -> dict[str, BackendCost]:
+    """
+    Fit the cost of each backend to the durations of recent scan logs.
+
+    Only completed scans count. Logs of the daemon scanner carry the
+    "(daemon)" suffix, which the private clamd shares; watch folder logs
+    group several scans and are left out.
+
+    Args:
+        log_manager: LogManager holding the scan logs
+        limit: Number of recent scan logs to read
+
+    Returns:
+        Fitted cost by backend ("clamscan" or "daemon"), for the backends
+        with at least MIN_LOG_SAMPLES usable logs
+    """
+    samples: dict[str, list[tuple[int, float]]] = {CLAMSCAN: [], DAEMON: []}
+    for entry in log_manager.get_logs(limit=limit, log_type="scan"):
+        if entry.status not in ("clean", "infected") or entry.duration <= 0:
+            continue
+        if entry.summary.endswith("(watch folders)"):
+            continue
+        match = _SCANNED_FILES_PATTERN.search(entry.details)
+        if match is None or int(match.group(1)) == 0:
+            continue
+        backend = DAEMON if entry.summary.endswith("(daemon)") else CLAMSCAN
+        samples[backend].append((int(match.group(1)), entry.duration))
+
+    costs = {}
+    for backend, backend_samples in samples.items():
+        if len(backend_samples) < MIN_LOG_SAMPLES:
+            continue
+        cost = _fit_cost(backend_samples)
+        if cost is not None:
+            logger.debug(
+                "Learned %s costs from %d logs: %.2fs overhead, %.1f files/s",
+                backend,
+                cost.samples,
+                cost.overhead,
+                1 / cost.per_file,
+            )
+            costs[backend] = cost
+    return costs
+
+
+def choose_backend(candidates: dict[str, BackendCost], workload: Workload) -> tuple[str, str]:
+    """
+    Pick the backend that finishes a workload soonest.
+
+    Args:
+        candidates: Cost of each available backend; ties go to the first
+        workload: Estimated workload of the scan
+
+    Returns:
+        Tuple of (backend, reason), the reason listing the estimates
+    """
+    estimates = {backend: cost.estimate(workload) for backend, cost in candidates.items()}
+    backend = min(estimates, key=estimates.__getitem__)
+    details = ", ".join(
+        f"{name} {seconds:.1f}s"
+        + (f" (fitted to {candidates[name].samples} logs)" if candidates[name].samples else "")
+        for name, seconds in estimates.items()
+    )
+    bound = "at least " if workload.source == "partial walk" else ""
+    reason = (
+        f"{bound}{workload.files} files, {workload.bytes / (1024 * 1024):.1f} MB "
+        f"(from {workload.source}); estimated {details}"
+    )
+    return backend, reason
@@ -8,10 +8,17 @@ import os
 import shutil
 import subprocess
 import tempfile
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+# clamd.conf of the system clamd, by distribution layout
+CLAMD_CONFIG_PATHS = ("/etc/clamav/clamd.conf", "/etc/clamd.d/scan.conf")
+
+# Multipliers of the size suffixes clamd accepts
+_SIZE_SUFFIXES = {"k": 1024, "m": 1024 * 1024, "g": 1024 * 1024 * 1024}
+
 
 @dataclass
 class ClamAVConfigValue:
@@ -177,6 +184,28 @@ class ClamAVConfig:
         except ValueError:
             return None
 
+    def get_size(self, key: str) -> int | None:
+        """
+        Get a size configuration value in bytes.
+
+        Args:
+            key: The configuration option name
+
+        Returns:
+            The size, with a K, M or G suffix applied, or None if invalid
+        """
+        value = self.get_value(key)
+        if not value:
+            return None
+        value = value.strip()
+        multiplier = _SIZE_SUFFIXES.get(value[-1].lower(), 1)
+        if multiplier != 1:
+            value = value[:-1]
+        try:
+            return int(value) * multiplier
+        except ValueError:
+            return None
+
     def to_string(self) -> str:
         """
         Serialize the configuration back to a string.
@@ -256,6 +285,25 @@ class ClamAVConfig:
         return result
 
 
+def find_clamd_config(config_paths: Iterable[str] = CLAMD_CONFIG_PATHS) -> ClamAVConfig | None:
+    """
+    Parse the clamd.conf of the system clamd.
+
+    Args:
+        config_paths: clamd.conf files to try, in order
+
+    Returns:
+        The first configuration that exists and parses, or None
+    """
+    for conf_path in config_paths:
+        if not os.path.exists(conf_path):
+            continue
+        config, _ = parse_config(conf_path)
+        if config is not None:
+            return config
+    return None
+
+
 def parse_config(file_path: str) -> tuple[ClamAVConfig | None, str | None]:
     """
     Parse a ClamAV configuration file.
@@ -356,9 +404,7 @@ def parse_config(file_path: str) -> tuple[ClamAVConfig | None, str | None]:
         value = parts[1] if len(parts) > 1 else ""
 
         # Add value to config (supports multi-value options)
-        config_value = ClamAVConfigValue(
-            value=value, comment=comment, line_number=line_number
-        )
+        config_value = ClamAVConfigValue(value=value, comment=comment, line_number=line_number)
 
         if key not in config.values:
             config.values[key] = []
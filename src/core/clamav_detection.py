@@ -7,13 +7,17 @@ This module provides functions for:
 - Getting paths to ClamAV executables
 - Detecting clamd socket locations
 - Testing clamd daemon connectivity
+- Locating the signature database directory
 """
 
 import os
 import subprocess
+from pathlib import Path
 
+from .clamav_config import parse_config
 from .flatpak import (
     ensure_freshclam_config,
+    get_clamav_database_dir,
     is_flatpak,
     which_host_command,
     wrap_host_command,
@@ -238,3 +242,42 @@ def get_freshclam_path() -> str | None:
         The full path to freshclam if found, None otherwise
     """
     return which_host_command("freshclam")
+
+
+def get_signature_database_dir() -> Path | None:
+    """
+    Get the directory holding the ClamAV signature databases.
+
+    In Flatpak this is the sandbox's data directory. On native installs the
+    DatabaseDirectory option from freshclam.conf/clamd.conf is used, falling
+    back to the common distribution defaults.
+
+    Returns:
+        Path to the database directory if found, None otherwise
+    """
+    flatpak_dir = get_clamav_database_dir()
+    if flatpak_dir is not None:
+        return flatpak_dir if flatpak_dir.is_dir() else None
+
+    config_paths = [
+        "/etc/clamav/freshclam.conf",
+        "/etc/freshclam.conf",
+        "/etc/clamav/clamd.conf",
+        "/etc/clamd.d/scan.conf",
+    ]
+    for conf_path in config_paths:
+        if not os.path.exists(conf_path):
+            continue
+        config, _ = parse_config(conf_path)
+        if config is None:
+            continue
+        db_dir = config.get_value("DatabaseDirectory")
+        if db_dir and os.path.isdir(db_dir):
+            return Path(db_dir)
+
+    default_dirs = ["/var/lib/clamav", "/var/clamav", "/usr/local/share/clamav"]
+    for db_dir in default_dirs:
+        if os.path.isdir(db_dir):
+            return Path(db_dir)
+
+    return None
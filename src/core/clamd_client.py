@@ -0,0 +1,1067 @@
+# ClamUI clamd Client Module
+"""
+Native client for the clamd socket protocol.
+
+Talks to the ClamAV daemon directly over its unix or TCP socket instead of
+spawning clamdscan for every scan and health check. Supported commands:
+- PING / VERSION for health checks
+- RELOAD / SHUTDOWN for managing a private clamd instance
+- SCAN / CONTSCAN / MULTISCAN for paths clamd can read itself
+- FILDES to hand an open file descriptor to clamd (unix sockets only)
+- INSTREAM to stream file contents (works over TCP), with os.sendfile()
+  for whole files
+- IDSESSION / END to pipeline many requests over one connection, and
+  ClamdStreamPool to stream files over several such sessions at once
+- ClamdBalancer to spread the requests of one scan over several clamd
+  servers
+
+All commands use the null-delimited "z" form documented in clamd(8), so
+replies can be split reliably even when file names contain newlines.
+"""
+
+import logging
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Timeout for connecting and for short commands like PING/VERSION (seconds)
+DEFAULT_TIMEOUT = 10.0
+
+# Chunk size for INSTREAM transfers. clamd rejects chunks larger than its
+# StreamMaxLength, which defaults to 25 MB, so this stays well below it.
+INSTREAM_CHUNK_SIZE = 256 * 1024
+
+# Chunk size for INSTREAM transfers of whole files. The kernel copies these
+# from the file to the socket (sendfile), so large chunks only save headers
+# and system calls.
+SENDFILE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# clamd's default StreamMaxLength. clamd drops the connection when a stream
+# is longer, so longer files are streamed up to the limit only.
+DEFAULT_STREAM_MAX_LENGTH = 25 * 1024 * 1024
+
+# Error reported instead of "OK" for a stream cut off at StreamMaxLength
+STREAM_TRUNCATED_ERROR = "Exceeds StreamMaxLength, not fully scanned"
+
+# Connections a ClamdStreamPool streams over by default
+STREAM_CONNECTIONS = 4
+
+# Receive buffer size for reading replies
+_RECV_SIZE = 64 * 1024
+
+TCP_ADDRESS_PREFIX = "tcp://"
+
+
+class ClamdError(Exception):
+    """Raised when clamd cannot be reached or returns an unusable reply."""
+
+
+@dataclass
+class ClamdVerdict:
+    """
+    Verdict for a single file reported by clamd.
+
+    Attributes:
+        path: Path (or "stream"/"fd[N]" name) clamd reported for the file
+        status: "OK", "FOUND" or "ERROR", or "LOST" when a ClamdBalancer
+                lost the server before it answered
+        detail: Signature name for FOUND, error message for ERROR and LOST,
+                None for OK
+    """
+
+    path: str
+    status: str
+    detail: str | None = None
+
+    @property
+    def is_infected(self) -> bool:
+        """Check if clamd reported a signature match."""
+        return self.status == "FOUND"
+
+    @property
+    def is_error(self) -> bool:
+        """Check if clamd could not scan the file."""
+        return self.status == "ERROR"
+
+    @property
+    def is_lost(self) -> bool:
+        """Check if the request went unanswered and can be submitted again."""
+        return self.status == "LOST"
+
+
+def parse_clamd_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """
+    Parse a clamd address into a socket family and connect address.
+
+    Args:
+        address: Unix socket path, or "tcp://host:port" for a TCP socket
+
+    Returns:
+        Tuple of (socket_family, connect_address)
+
+    Raises:
+        ClamdError: If a TCP address is malformed
+    """
+    if address.startswith(TCP_ADDRESS_PREFIX):
+        host, sep, port = address[len(TCP_ADDRESS_PREFIX) :].rpartition(":")
+        if not sep or not host or not port.isdigit():
+            raise ClamdError(f"Invalid clamd TCP address: {address}")
+        # Allow bracketed IPv6 literals like tcp://[::1]:3310
+        host = host.strip("[]")
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        return family, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def parse_clamd_reply(reply: str) -> ClamdVerdict:
+    """
+    Parse a single clamd scan reply into a ClamdVerdict.
+
+    Reply formats:
+    - "<path>: OK"
+    - "<path>: <signature> FOUND"
+    - "<path>: <message> ERROR" (or just "<message> ERROR")
+
+    Args:
+        reply: One null-delimited reply with any session id already removed
+
+    Returns:
+        Parsed ClamdVerdict
+
+    Raises:
+        ClamdError: If the reply is not a scan verdict
+    """
+    reply = reply.strip()
+
+    if reply.endswith(" FOUND"):
+        # Signatures never contain ": ", so split from the right
+        path, _, signature = reply[: -len(" FOUND")].rpartition(": ")
+        return ClamdVerdict(path=path, status="FOUND", detail=signature)
+
+    if reply.endswith(" ERROR"):
+        # Error messages may contain ": " themselves, so split from the left
+        body = reply[: -len(" ERROR")]
+        path, sep, message = body.partition(": ")
+        if not sep:
+            return ClamdVerdict(path="", status="ERROR", detail=body)
+        return ClamdVerdict(path=path, status="ERROR", detail=message)
+
+    if reply.endswith(": OK"):
+        return ClamdVerdict(path=reply[: -len(": OK")], status="OK")
+
+    raise ClamdError(f"Unexpected clamd reply: {reply}")
+
+
+class _ReplyReader:
+    """Splits the clamd byte stream into null-delimited replies."""
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._buffer = b""
+
+    def read(self) -> str | None:
+        """
+        Read the next reply.
+
+        Returns:
+            The decoded reply, or None when clamd closed the connection
+        """
+        while b"\0" not in self._buffer:
+            try:
+                data = self._sock.recv(_RECV_SIZE)
+            except OSError as e:
+                raise ClamdError(f"Error reading from clamd: {e}") from e
+            if not data:
+                if self._buffer.strip():
+                    # Last reply without a terminator
+                    reply, self._buffer = self._buffer, b""
+                    return reply.decode("utf-8", errors="replace")
+                return None
+            self._buffer += data
+
+        reply, _, self._buffer = self._buffer.partition(b"\0")
+        return reply.decode("utf-8", errors="replace")
+
+
+def _send_instream(
+    sock: socket.socket, stream: BinaryIO, chunk_size: int, max_length: int | None = None
+) -> bool:
+    """
+    Send a stream's content as INSTREAM chunks, without the terminator.
+
+    Returns:
+        True if the stream goes on past max_length and was cut off
+    """
+    sock.sendall(b"zINSTREAM\0")
+    remaining = max_length
+    while remaining is None or remaining > 0:
+        chunk = stream.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            return False
+        sock.sendall(struct.pack("!L", len(chunk)) + chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+    return bool(stream.read(1))
+
+
+def _send_instream_file(sock: socket.socket, file: BinaryIO, length: int, chunk_size: int) -> None:
+    """Send the first length bytes of a file as INSTREAM chunks, copied by the kernel."""
+    sock.sendall(b"zINSTREAM\0")
+    offset = 0
+    while offset < length:
+        size = min(chunk_size, length - offset)
+        sock.sendall(struct.pack("!L", size))
+        # socket.sendfile() falls back to read and send where the kernel can't
+        sent = sock.sendfile(file, offset, size)
+        if sent < size:
+            # The file shrank while it was sent; complete the announced chunk
+            sock.sendall(bytes(size - sent))
+            break
+        offset += size
+    sock.sendall(struct.pack("!L", 0))
+
+
+def _send_fildes(sock: socket.socket, fd: int) -> None:
+    """Send a FILDES command with the descriptor as SCM_RIGHTS ancillary data."""
+    sock.sendall(b"zFILDES\0")
+    # clamd needs at least one byte of regular data alongside the descriptor
+    sock.sendmsg([b"\0"], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, struct.pack("i", fd))])
+
+
+class ClamdSession:
+    """
+    A pipelined IDSESSION on a single clamd connection.
+
+    Requests are numbered from 1 in submission order and clamd prefixes each
+    reply with the request number, so callers can keep several requests in
+    flight and match replies as they arrive (clamd may reorder them).
+
+    A stream cut off at StreamMaxLength was only scanned in part, so an "OK"
+    reply for it is turned into an ERROR verdict (STREAM_TRUNCATED_ERROR).
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, sock: socket.socket, supports_fdpass: bool):
+        self._sock = sock
+        self._reader = _ReplyReader(sock)
+        self._supports_fdpass = supports_fdpass
+        self._next_id = 1
+        self._pending = 0
+        # Ids of requests whose stream was cut off at StreamMaxLength
+        self._truncated: set[int] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted requests that have not been answered yet."""
+        return self._pending
+
+    @property
+    def supports_fdpass(self) -> bool:
+        """Whether FILDES can be used (unix sockets only)."""
+        return self._supports_fdpass
+
+    def _claim_id(self) -> int:
+        request_id = self._next_id
+        self._next_id += 1
+        self._pending += 1
+        return request_id
+
+    def submit_fd(self, fd: int) -> int:
+        """
+        Submit an open file descriptor for scanning.
+
+        The descriptor is duplicated into clamd when sent, so the caller may
+        close it as soon as this returns.
+
+        Args:
+            fd: Open, readable file descriptor
+
+        Returns:
+            The request id the reply will carry
+
+        Raises:
+            ClamdError: If the connection doesn't support fd passing or fails
+        """
+        if not self._supports_fdpass:
+            raise ClamdError("File descriptor passing requires a local unix socket")
+        try:
+            _send_fildes(self._sock, fd)
+        except OSError as e:
+            raise ClamdError(f"Error sending file descriptor to clamd: {e}") from e
+        return self._claim_id()
+
+    def submit_stream(
+        self,
+        stream: BinaryIO,
+        chunk_size: int = INSTREAM_CHUNK_SIZE,
+        max_length: int | None = None,
+    ) -> int:
+        """
+        Submit file contents for scanning via INSTREAM.
+
+        Args:
+            stream: Binary file object to read from
+            chunk_size: Size of each INSTREAM chunk
+            max_length: Optional StreamMaxLength of clamd; only the first
+                        max_length bytes of a longer stream are sent, and
+                        it is reported as an ERROR unless clamd finds a
+                        signature in them
+
+        Returns:
+            The request id the reply will carry
+
+        Raises:
+            ClamdError: If sending fails
+        """
+        try:
+            if _send_instream(self._sock, stream, chunk_size, max_length):
+                # Another thread may read the reply as soon as the stream ends
+                self._truncated.add(self._next_id)
+            self._sock.sendall(struct.pack("!L", 0))
+        except OSError as e:
+            self._truncated.discard(self._next_id)
+            raise ClamdError(f"Error streaming data to clamd: {e}") from e
+        return self._claim_id()
+
+    def submit_file(
+        self,
+        file: BinaryIO,
+        max_length: int = DEFAULT_STREAM_MAX_LENGTH,
+        chunk_size: int = SENDFILE_CHUNK_SIZE,
+    ) -> int:
+        """
+        Submit the contents of an open regular file via INSTREAM.
+
+        The contents go from the file to the socket with os.sendfile(),
+        without passing through userspace buffers.
+
+        Args:
+            file: Binary file object of a regular file
+            max_length: clamd's StreamMaxLength; only the first max_length
+                        bytes of a longer file are sent, and it is reported
+                        as an ERROR unless clamd finds a signature in them
+            chunk_size: Maximum size of each INSTREAM chunk
+
+        Returns:
+            The request id the reply will carry
+
+        Raises:
+            ClamdError: If sending fails
+        """
+        try:
+            size = os.fstat(file.fileno()).st_size
+            if size > max_length:
+                # Another thread may read the reply as soon as the stream ends
+                self._truncated.add(self._next_id)
+            _send_instream_file(
+                self._sock, file, min(size, max_length), min(chunk_size, max_length)
+            )
+        except OSError as e:
+            self._truncated.discard(self._next_id)
+            raise ClamdError(f"Error streaming data to clamd: {e}") from e
+        return self._claim_id()
+
+    def read_reply(self) -> tuple[int, ClamdVerdict]:
+        """
+        Wait for the next reply in the session.
+
+        Returns:
+            Tuple of (request_id, verdict)
+
+        Raises:
+            ClamdError: If the connection closes early or the reply is malformed
+        """
+        reply = self._reader.read()
+        if reply is None:
+            raise ClamdError("clamd closed the session unexpectedly")
+
+        id_part, sep, body = reply.partition(": ")
+        if not sep or not id_part.isdigit():
+            # Session-level errors (e.g. queue full) carry no request id
+            raise ClamdError(f"clamd session error: {reply.strip()}")
+
+        self._pending = max(0, self._pending - 1)
+        request_id = int(id_part)
+        verdict = parse_clamd_reply(body)
+        if request_id in self._truncated:
+            self._truncated.discard(request_id)
+            if verdict.status == "OK":
+                verdict = ClamdVerdict(
+                    path=verdict.path, status="ERROR", detail=STREAM_TRUNCATED_ERROR
+                )
+        return request_id, verdict
+
+    def abort(self) -> None:
+        """
+        Tear down the connection immediately.
+
+        Safe to call from another thread; wakes up a blocked read_reply().
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def close(self) -> None:
+        """End the session and close the connection."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._sock.sendall(b"zEND\0")
+        except OSError:
+            pass
+        self._sock.close()
+
+    def __enter__(self) -> "ClamdSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ClamdStreamPool:
+    """
+    Streams files to clamd over several IDSESSION connections at once.
+
+    clamd receives the INSTREAM transfers of one connection one after the
+    other, so a single session serializes the upload of every file. The
+    pool sends from one thread per connection, and merges the replies of
+    all connections. It has the submit/read_reply interface of
+    ClamdSession, with request ids numbered across the pool.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, sessions: list[ClamdSession], max_length: int = DEFAULT_STREAM_MAX_LENGTH):
+        """
+        Start streaming over open sessions.
+
+        Args:
+            sessions: Open sessions; the pool closes them
+            max_length: clamd's StreamMaxLength, see ClamdSession.submit_file()
+        """
+        self._sessions = sessions
+        self._max_length = max_length
+        self._submissions: queue.Queue[tuple[int, BinaryIO] | None] = queue.Queue()
+        self._replies: queue.Queue[tuple[int, ClamdVerdict] | ClamdError] = queue.Queue()
+        # (session index, session request id) -> pool request id
+        self._request_ids: dict[tuple[int, int], int] = {}
+        # Held while a file is sent, so its reply isn't mapped before its id is known
+        self._submit_locks = [threading.Lock() for _ in sessions]
+        self._next_id = 1
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._senders = []
+        for index in range(len(sessions)):
+            sender = threading.Thread(target=self._send, args=(index,), daemon=True)
+            sender.start()
+            self._senders.append(sender)
+            threading.Thread(target=self._receive, args=(index,), daemon=True).start()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted files that have not been answered yet."""
+        return self._pending
+
+    @property
+    def supports_fdpass(self) -> bool:
+        """Always False; the pool streams file contents."""
+        return False
+
+    def submit_file(self, file: BinaryIO) -> int:
+        """
+        Queue an open regular file for streaming.
+
+        The pool takes ownership of the file and closes it once sent. If
+        an error is raised, the file stays open and the caller keeps it.
+
+        Args:
+            file: Binary file object of a regular file
+
+        Returns:
+            The request id the reply will carry
+
+        Raises:
+            ClamdError: If the pool was closed
+        """
+        with self._lock:
+            if self._closed:
+                raise ClamdError("The clamd stream pool is closed")
+            request_id = self._next_id
+            self._next_id += 1
+            self._pending += 1
+        self._submissions.put((request_id, file))
+        return request_id
+
+    def read_reply(self) -> tuple[int, ClamdVerdict]:
+        """
+        Wait for the next reply on any connection.
+
+        Returns:
+            Tuple of (request_id, verdict)
+
+        Raises:
+            ClamdError: If a connection failed
+        """
+        reply = self._replies.get()
+        if isinstance(reply, ClamdError):
+            # Let other readers see the failure too
+            self._replies.put(reply)
+            raise reply
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+        return reply
+
+    def _send(self, index: int) -> None:
+        """Stream queued files over one session until the pool closes."""
+        session = self._sessions[index]
+        while (item := self._submissions.get()) is not None:
+            request_id, file = item
+            with file, self._submit_locks[index]:
+                if self._closed:
+                    continue
+                try:
+                    session_id = session.submit_file(file, self._max_length)
+                except ClamdError as e:
+                    if not self._closed:
+                        self._replies.put(e)
+                    continue
+                with self._lock:
+                    self._request_ids[(index, session_id)] = request_id
+
+    def _receive(self, index: int) -> None:
+        """Forward the replies of one session until it closes."""
+        session = self._sessions[index]
+        while True:
+            try:
+                session_id, verdict = session.read_reply()
+            except ClamdError as e:
+                if not self._closed:
+                    self._replies.put(e)
+                return
+            with self._submit_locks[index], self._lock:
+                request_id = self._request_ids.pop((index, session_id), 0)
+            self._replies.put((request_id, verdict))
+
+    def _stop_senders(self) -> None:
+        """Drop the queued files and stop the sending threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._senders:
+            self._submissions.put(None)
+
+    def abort(self) -> None:
+        """
+        Tear down all connections immediately.
+
+        Safe to call from another thread; wakes up a blocked read_reply().
+        """
+        self._stop_senders()
+        for session in self._sessions:
+            session.abort()
+        self._replies.put(ClamdError("clamd stream pool aborted"))
+
+    def close(self) -> None:
+        """End the sessions and close the connections."""
+        self._stop_senders()
+        for sender in self._senders:
+            sender.join()
+        for session in self._sessions:
+            session.close()
+
+    def __enter__(self) -> "ClamdStreamPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ClamdBalancer:
+    """
+    Spreads the requests of one scan over several clamd servers.
+
+    Each endpoint takes files over a ClamdSession passing descriptors (a
+    local unix socket) or a ClamdStreamPool streaming their contents (TCP).
+    A file goes to the endpoint with the fewest unanswered requests, so a
+    faster or less busy server takes more of the work.
+
+    An endpoint that fails gets no further requests, and its unanswered
+    requests are answered with a "LOST" verdict for the caller to submit
+    again; read_reply() raises once every endpoint failed. The balancer has
+    the submit_file/read_reply interface of ClamdStreamPool, with request
+    ids numbered across the endpoints.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, endpoints: dict[str, ClamdSession | ClamdStreamPool]):
+        """
+        Start balancing over open connections.
+
+        Args:
+            endpoints: Open session or stream pool by clamd address; the
+                       balancer closes them
+        """
+        self._addresses = list(endpoints)
+        self._members = list(endpoints.values())
+        self._replies: queue.Queue[tuple[int, ClamdVerdict] | ClamdError] = queue.Queue()
+        # Unanswered requests of each endpoint: its request id -> balancer request id
+        self._outstanding: list[dict[int, int]] = [{} for _ in self._members]
+        self._alive = [True] * len(self._members)
+        # Held while a file is submitted, so its reply isn't mapped before its id is known
+        self._submit_locks = [threading.Lock() for _ in self._members]
+        self._next_id = 1
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        for index in range(len(self._members)):
+            threading.Thread(target=self._receive, args=(index,), daemon=True).start()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted files that have not been answered yet."""
+        return self._pending
+
+    @property
+    def supports_fdpass(self) -> bool:
+        """Always False; submit_file() hands each file over as its endpoint can."""
+        return False
+
+    @property
+    def live_endpoints(self) -> int:
+        """Number of endpoints that haven't failed."""
+        return sum(self._alive)
+
+    @property
+    def failed_endpoints(self) -> list[str]:
+        """Addresses of the endpoints that failed."""
+        return [
+            address
+            for address, alive in zip(self._addresses, self._alive, strict=True)
+            if not alive
+        ]
+
+    def submit_file(self, file: BinaryIO) -> int:
+        """
+        Submit an open regular file to the least loaded endpoint.
+
+        The balancer takes ownership of the file and closes it once sent,
+        or once no endpoint is left to take it. An endpoint that fails to
+        take the file is dropped, and the file goes to the next one; the
+        endpoints leave it open when they fail.
+
+        Args:
+            file: Binary file object of a regular file
+
+        Returns:
+            The request id the reply will carry
+
+        Raises:
+            ClamdError: If every endpoint failed or the balancer was closed
+        """
+        while True:
+            with self._lock:
+                live = [index for index, alive in enumerate(self._alive) if alive]
+                if self._closed or not live:
+                    file.close()
+                    if self._closed:
+                        raise ClamdError("The clamd balancer is closed")
+                    raise ClamdError("No clamd endpoint is reachable")
+                index = min(live, key=lambda i: len(self._outstanding[i]))
+            member = self._members[index]
+            try:
+                with self._submit_locks[index]:
+                    if member.supports_fdpass:
+                        member_id = member.submit_fd(file.fileno())
+                        file.close()
+                    else:
+                        # The stream pool closes the file once it is sent
+                        member_id = member.submit_file(file)
+                    return self._track(index, member_id)
+            except ClamdError as e:
+                self._fail(index, e)
+
+    def _track(self, index: int, member_id: int) -> int:
+        """Number a request sent to an endpoint and remember it until answered."""
+        with self._lock:
+            request_id = self._next_id
+            self._next_id += 1
+            self._pending += 1
+            if self._alive[index]:
+                self._outstanding[index][member_id] = request_id
+                return request_id
+        # The endpoint failed while the file was sent
+        self._replies.put(
+            (request_id, ClamdVerdict(path="", status="LOST", detail="clamd endpoint failed"))
+        )
+        return request_id
+
+    def read_reply(self) -> tuple[int, ClamdVerdict]:
+        """
+        Wait for the next reply from any endpoint.
+
+        Returns:
+            Tuple of (request_id, verdict); the verdict is "LOST" if the
+            endpoint failed before answering
+
+        Raises:
+            ClamdError: If every endpoint failed
+        """
+        reply = self._replies.get()
+        if isinstance(reply, ClamdError):
+            # Let other readers see the failure too
+            self._replies.put(reply)
+            raise reply
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+        return reply
+
+    def _receive(self, index: int) -> None:
+        """Forward the replies of one endpoint until it closes or fails."""
+        member = self._members[index]
+        while True:
+            try:
+                member_id, verdict = member.read_reply()
+            except ClamdError as e:
+                self._fail(index, e)
+                return
+            with self._submit_locks[index], self._lock:
+                if not self._alive[index]:
+                    return
+                request_id = self._outstanding[index].pop(member_id, 0)
+            self._replies.put((request_id, verdict))
+
+    def _fail(self, index: int, error: ClamdError) -> None:
+        """Drop a failed endpoint and hand back its unanswered requests."""
+        with self._lock:
+            if self._closed or not self._alive[index]:
+                return
+            self._alive[index] = False
+            lost = list(self._outstanding[index].values())
+            self._outstanding[index].clear()
+            remaining = any(self._alive)
+        address = self._addresses[index]
+        logger.warning(
+            "clamd at %s failed with %d requests unanswered: %s", address, len(lost), error
+        )
+        self._members[index].abort()
+        for request_id in lost:
+            self._replies.put((request_id, ClamdVerdict(path="", status="LOST", detail=str(error))))
+        if not remaining:
+            self._replies.put(ClamdError(f"Every clamd endpoint failed, last {address}: {error}"))
+
+    def abort(self) -> None:
+        """
+        Tear down all connections immediately.
+
+        Safe to call from another thread; wakes up a blocked read_reply().
+        """
+        with self._lock:
+            self._closed = True
+        for member in self._members:
+            member.abort()
+        self._replies.put(ClamdError("clamd balancer aborted"))
+
+    def close(self) -> None:
+        """End the sessions and close the connections of every endpoint."""
+        with self._lock:
+            self._closed = True
+        for member in self._members:
+            member.close()
+
+    def __enter__(self) -> "ClamdBalancer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ClamdClient:
+    """
+    Client for a clamd unix or TCP socket.
+
+    Each method opens its own short-lived connection, except session() which
+    returns a ClamdSession for pipelining many scan requests.
+    """
+
+    def __init__(self, address: str, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the client.
+
+        Args:
+            address: Unix socket path, or "tcp://host:port"
+            timeout: Timeout in seconds for connecting and short commands
+
+        Raises:
+            ClamdError: If the address is malformed
+        """
+        self._address = address
+        self._family, self._connect_address = parse_clamd_address(address)
+        self._timeout = timeout
+
+    @property
+    def address(self) -> str:
+        """The address this client connects to."""
+        return self._address
+
+    @property
+    def supports_fdpass(self) -> bool:
+        """Whether FILDES can be used (only over a local unix socket)."""
+        return self._family == socket.AF_UNIX
+
+    def _connect(self) -> socket.socket:
+        """Open a new connection to clamd."""
+        sock = socket.socket(self._family, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._connect_address)
+        except OSError as e:
+            sock.close()
+            raise ClamdError(f"Cannot connect to clamd at {self._address}: {e}") from e
+        return sock
+
+    def _simple_command(self, command: bytes) -> str:
+        """Send a command that gets exactly one reply and return it."""
+        sock = self._connect()
+        try:
+            sock.sendall(b"z" + command + b"\0")
+            reply = _ReplyReader(sock).read()
+        except OSError as e:
+            raise ClamdError(f"Error talking to clamd: {e}") from e
+        finally:
+            sock.close()
+        if reply is None:
+            raise ClamdError("clamd closed the connection without replying")
+        return reply.strip()
+
+    def ping(self) -> bool:
+        """
+        Check that clamd is alive.
+
+        Returns:
+            True if clamd answered PONG
+
+        Raises:
+            ClamdError: If clamd cannot be reached
+        """
+        return self._simple_command(b"PING") == "PONG"
+
+    def version(self) -> str:
+        """
+        Get the clamd version string.
+
+        Returns:
+            Version string, e.g. "ClamAV 1.0.3/27100/Mon Nov 20 09:23:41 2023"
+
+        Raises:
+            ClamdError: If clamd cannot be reached
+        """
+        return self._simple_command(b"VERSION")
+
+    def reload(self) -> None:
+        """
+        Make clamd reload its signature database.
+
+        clamd keeps scanning with the old database while the new one loads.
+
+        Raises:
+            ClamdError: If clamd cannot be reached or refuses to reload
+        """
+        reply = self._simple_command(b"RELOAD")
+        if reply != "RELOADING":
+            raise ClamdError(f"Unexpected reply to RELOAD: {reply}")
+
+    def shutdown(self) -> None:
+        """
+        Ask clamd to exit. clamd does not reply to this command.
+
+        Raises:
+            ClamdError: If clamd cannot be reached
+        """
+        sock = self._connect()
+        try:
+            sock.sendall(b"zSHUTDOWN\0")
+        except OSError as e:
+            raise ClamdError(f"Error talking to clamd: {e}") from e
+        finally:
+            sock.close()
+
+    def _iter_path_command(self, command: str, path: str) -> Iterator[ClamdVerdict]:
+        """Run a path-based scan command and yield verdicts as they arrive."""
+        if "\0" in path:
+            raise ClamdError("Path contains a null byte")
+        sock = self._connect()
+        # Directory scans can run for a long time; rely on close() to stop them
+        sock.settimeout(None)
+        try:
+            sock.sendall(f"z{command} {path}\0".encode())
+            reader = _ReplyReader(sock)
+            while (reply := reader.read()) is not None:
+                if reply.strip():
+                    yield parse_clamd_reply(reply)
+        except OSError as e:
+            raise ClamdError(f"Error talking to clamd: {e}") from e
+        finally:
+            sock.close()
+
+    def scan(self, path: str) -> Iterator[ClamdVerdict]:
+        """Scan a path clamd can read, stopping at the first match."""
+        return self._iter_path_command("SCAN", path)
+
+    def contscan(self, path: str) -> Iterator[ClamdVerdict]:
+        """Scan a path clamd can read, continuing after matches."""
+        return self._iter_path_command("CONTSCAN", path)
+
+    def multiscan(self, path: str) -> Iterator[ClamdVerdict]:
+        """Scan a path clamd can read using clamd's thread pool."""
+        return self._iter_path_command("MULTISCAN", path)
+
+    def scan_fd(self, fd: int) -> ClamdVerdict:
+        """
+        Scan an open file descriptor via FILDES.
+
+        Args:
+            fd: Open, readable file descriptor
+
+        Returns:
+            The verdict (its path is "fd[N]" as seen by clamd)
+
+        Raises:
+            ClamdError: If the socket isn't local or the scan fails
+        """
+        with self.session() as session:
+            session.submit_fd(fd)
+            return session.read_reply()[1]
+
+    def scan_stream(self, stream: BinaryIO, chunk_size: int = INSTREAM_CHUNK_SIZE) -> ClamdVerdict:
+        """
+        Scan file contents via INSTREAM.
+
+        Args:
+            stream: Binary file object to read from
+            chunk_size: Size of each INSTREAM chunk
+
+        Returns:
+            The verdict (its path is "stream")
+
+        Raises:
+            ClamdError: If the scan fails
+        """
+        with self.session() as session:
+            session.submit_stream(stream, chunk_size)
+            return session.read_reply()[1]
+
+    def session(self) -> ClamdSession:
+        """
+        Open a pipelined IDSESSION.
+
+        Returns:
+            A ClamdSession; close it (or use it as a context manager) when done
+
+        Raises:
+            ClamdError: If clamd cannot be reached
+        """
+        sock = self._connect()
+        # Scans of large files can take a while; cancellation uses abort()
+        sock.settimeout(None)
+        try:
+            sock.sendall(b"zIDSESSION\0")
+        except OSError as e:
+            sock.close()
+            raise ClamdError(f"Error starting clamd session: {e}") from e
+        return ClamdSession(sock, self.supports_fdpass)
+
+    def stream_pool(
+        self,
+        connections: int = STREAM_CONNECTIONS,
+        max_length: int = DEFAULT_STREAM_MAX_LENGTH,
+    ) -> ClamdStreamPool:
+        """
+        Open a ClamdStreamPool streaming files over several sessions.
+
+        Args:
+            connections: Number of sessions to stream over
+            max_length: clamd's StreamMaxLength
+
+        Returns:
+            A ClamdStreamPool; close it (or use it as a context manager) when done
+
+        Raises:
+            ClamdError: If clamd cannot be reached
+        """
+        sessions: list[ClamdSession] = []
+        try:
+            for _ in range(max(1, connections)):
+                sessions.append(self.session())
+        except ClamdError:
+            for session in sessions:
+                session.close()
+            raise
+        return ClamdStreamPool(sessions, max_length)
+
+
+def open_for_scan(path: str) -> int | None:
+    """
+    Open a regular file for handing to clamd without following symlinks.
+
+    Args:
+        path: File path
+
+    Returns:
+        A read-only file descriptor, or None if the path isn't a regular file
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW | os.O_NONBLOCK | os.O_CLOEXEC)
+    try:
+        is_regular = stat.S_ISREG(os.fstat(fd).st_mode)
+    except OSError:
+        os.close(fd)
+        raise
+    if not is_regular:
+        os.close(fd)
+        return None
+    return fd
+
+
+def ping_clamd(address: str, timeout: float = DEFAULT_TIMEOUT) -> tuple[bool, str | None]:
+    """
+    Check clamd connectivity over its socket without spawning clamdscan.
+
+    Args:
+        address: Unix socket path, or "tcp://host:port"
+        timeout: Connection timeout in seconds
+
+    Returns:
+        Tuple of (is_connected, message):
+        - (True, "PONG") if clamd answered
+        - (False, error_message) otherwise
+    """
+    try:
+        if ClamdClient(address, timeout=timeout).ping():
+            return (True, "PONG")
+        return (False, "Unexpected reply to PING")
+    except ClamdError as e:
+        return (False, str(e))
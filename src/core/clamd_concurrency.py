@@ -0,0 +1,88 @@
+# ClamUI clamd Concurrency Module
+"""
+How many requests a native clamd scan keeps in flight.
+
+clamd scans MaxThreads files at once and queues up to MaxQueue more
+requests, shared by all of its clients. clamdscan --multiscan leaves all
+concurrency to clamd, so one big scan fills the queue and clamonacc or
+other scans of the same daemon wait behind it, while a client that sends
+too little leaves threads idle.
+
+The daemon scanner instead keeps a window of FILDES/INSTREAM requests in
+flight per scan, pipelined over IDSESSION connections, sized from the
+clamd.conf of the system clamd:
+
+- Interactive scans keep every thread busy, with one request queued
+  behind each so no thread waits on the client.
+- Background scans (scheduled scans and watch folders) take half the
+  threads, leaving the others to interactive use of the daemon.
+- No scan queues more than half of MaxQueue.
+
+A "clamd_max_inflight" setting above 0 replaces the window of
+interactive scans; background scans take half of it.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .clamav_config import CLAMD_CONFIG_PATHS, find_clamd_config
+
+# clamd's MaxThreads and MaxQueue when its configuration doesn't set them
+DEFAULT_MAX_THREADS = 10
+DEFAULT_MAX_QUEUE = 100
+
+# Requests an interactive scan keeps in flight per clamd thread
+INTERACTIVE_REQUESTS_PER_THREAD = 2
+
+
+@dataclass(frozen=True)
+class ClamdLimits:
+    """Concurrency limits of a clamd."""
+
+    max_threads: int = DEFAULT_MAX_THREADS
+    max_queue: int = DEFAULT_MAX_QUEUE
+
+
+def get_clamd_limits(config_paths: Iterable[str] = CLAMD_CONFIG_PATHS) -> ClamdLimits:
+    """
+    Read MaxThreads and MaxQueue from the system clamd configuration.
+
+    Args:
+        config_paths: clamd.conf files to try, in order; an empty list
+                      gives clamd's defaults
+
+    Returns:
+        ClamdLimits; options that are missing or invalid keep clamd's default
+    """
+    config = find_clamd_config(config_paths)
+    if config is None:
+        return ClamdLimits()
+    max_threads = config.get_int("MaxThreads")
+    max_queue = config.get_int("MaxQueue")
+    return ClamdLimits(
+        max_threads=max_threads if max_threads and max_threads > 0 else DEFAULT_MAX_THREADS,
+        max_queue=max_queue if max_queue and max_queue > 0 else DEFAULT_MAX_QUEUE,
+    )
+
+
+def get_request_window(limits: ClamdLimits, interactive: bool = True, configured: int = 0) -> int:
+    """
+    Get the number of requests a scan keeps in flight on one clamd.
+
+    Args:
+        limits: Concurrency limits of the clamd
+        interactive: Whether the scan was started by the user, rather than
+                     by a schedule or a watched folder
+        configured: Window of interactive scans from settings, 0 to size
+                    it from the limits
+
+    Returns:
+        Number of unanswered requests the scan may have (at least 1)
+    """
+    if configured > 0:
+        return max(1, configured if interactive else configured // 2)
+    if interactive:
+        window = limits.max_threads * INTERACTIVE_REQUESTS_PER_THREAD
+    else:
+        window = limits.max_threads // 2
+    return max(1, min(window, limits.max_queue // 2))
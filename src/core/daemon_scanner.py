@@ -1,27 +1,65 @@
 # ClamUI Daemon Scanner Module
 """
-Daemon scanner module for ClamUI using clamdscan for clamd communication.
+Daemon scanner module for ClamUI using clamd for scanning.
 Provides faster scanning by leveraging the ClamAV daemon's in-memory database.
+
+Talks to clamd natively over its socket when one is reachable, and falls
+back to spawning clamdscan otherwise (e.g. inside the Flatpak sandbox).
+With several clamd endpoints configured ("daemon_endpoints"), a scan is
+spread over the ones answering, see ClamdBalancer.
 """
 
-import fnmatch
 import logging
 import os
 import subprocess
 import threading
 import time
-from collections.abc import Callable
-from pathlib import Path
+from collections import deque
+from collections.abc import Callable, Iterator
 
 from gi.repository import GLib
 
+from .archive_scan import ArchiveError, is_supported_archive, iter_archive_members, member_path
+from .clamav_config import CLAMD_CONFIG_PATHS, find_clamd_config
+from .clamd_client import (
+    DEFAULT_STREAM_MAX_LENGTH,
+    STREAM_CONNECTIONS,
+    ClamdBalancer,
+    ClamdClient,
+    ClamdError,
+    ClamdSession,
+    ClamdStreamPool,
+    open_for_scan,
+    ping_clamd,
+)
+from .clamd_concurrency import get_clamd_limits, get_request_window
+from .exclusion_matcher import get_exclusion_matcher
+from .health_probe import CLAMDSCAN_CHECK, HealthProbe, native_clamd_check
 from .log_manager import LogManager
+from .package_verify import create_package_verifier
+from .scan_cache import ScanCache, get_clamd_signature_version
+from .scan_checkpoint import ScanCheckpoint
+from .scan_dedup import create_deduplicator
+from .scan_governor import ScanGovernor
+from .scan_limits import ScanLimits
+from .scan_ordering import is_risk_ordering_enabled, order_by_risk
+from .scan_progress import ProgressTracker, ScanProgress, SequentialProgress
+from .scan_walker import (
+    WalkStats,
+    iter_scan_files,
+    iter_target_files,
+    merge_skipped,
+    write_file_list,
+)
 from .scanner_base import (
+    OUTPUT_TAIL_LINES,
+    ScanOutputParser,
     cleanup_process,
-    communicate_with_cancel_check,
     create_cancelled_result,
     create_error_result,
     save_scan_log,
+    split_result_by_target,
+    stream_with_cancel_check,
     terminate_process_gracefully,
 )
 from .scanner_types import ScanResult, ScanStatus, ThreatDetail
@@ -30,9 +68,11 @@ from .threat_classifier import (
     categorize_threat,
     classify_threat_severity_str,
 )
+from .threat_store import ThreatList
 from .utils import (
     check_clamd_connection,
     check_clamdscan_installed,
+    get_clamd_socket_path,
     is_flatpak,
     validate_path,
     which_host_command,
@@ -44,14 +84,23 @@ logger = logging.getLogger(__name__)
 
 class DaemonScanner:
     """
-    ClamAV daemon scanner using clamdscan.
+    ClamAV daemon scanner using clamd.
 
     Provides faster scanning by communicating with the clamd daemon,
-    which keeps the virus database loaded in memory.
+    which keeps the virus database loaded in memory. Scans go through
+    the native socket client when possible, with clamdscan as fallback.
     """
 
     def __init__(
-        self, log_manager: LogManager | None = None, settings_manager: SettingsManager | None = None
+        self,
+        log_manager: LogManager | None = None,
+        settings_manager: SettingsManager | None = None,
+        scan_cache: ScanCache | None = None,
+        health_probe: HealthProbe | None = None,
+        clamd_address: str | None = None,
+        save_logs: bool = True,
+        interactive: bool = True,
+        governor: ScanGovernor | None = None,
     ):
         """
         Initialize the daemon scanner.
@@ -60,22 +109,149 @@ class DaemonScanner:
             log_manager: Optional LogManager instance for saving scan logs.
             settings_manager: Optional SettingsManager instance for reading
                               exclusion patterns and daemon settings.
+            scan_cache: Optional ScanCache used to skip files that were
+                        already scanned clean and have not changed since.
+                        Only the native clamd protocol path uses it.
+            health_probe: Optional HealthProbe caching clamd availability
+                          checks. If not provided, a private one is created.
+            clamd_address: Optional fixed clamd address, e.g. the socket of
+                           ClamUI's private clamd. Only the native protocol
+                           is used for it, never the system clamdscan.
+            save_logs: Whether each scan saves its result to the log manager.
+            interactive: Whether the scans are started by the user. Background
+                         scans keep fewer requests in flight on clamd, see
+                         clamd_concurrency.
+            governor: Optional ScanGovernor throttling or pausing the scans.
+                      Watching the system is left to its owner, the Scanner.
         """
         self._current_process: subprocess.Popen | None = None
         self._process_lock = threading.Lock()
         self._cancel_event = threading.Event()
         self._log_manager = log_manager if log_manager else LogManager()
         self._settings_manager = settings_manager
+        self._scan_cache = scan_cache
+        self._health_probe = health_probe if health_probe else HealthProbe()
+        self._current_session: ClamdSession | ClamdStreamPool | ClamdBalancer | None = None
+        self._clamd_address = clamd_address
+        self._save_logs = save_logs
+        self._interactive = interactive
+        self._governor = governor
+
+    def get_clamd_address(self) -> str | None:
+        """
+        Get the clamd socket address to connect to.
+
+        Uses the fixed address given to the constructor, then the
+        "daemon_socket_path" setting when set (a unix socket path or
+        "tcp://host:port"), otherwise auto-detects the local socket.
+
+        Returns:
+            The clamd address, or None if no socket was found
+        """
+        if self._clamd_address:
+            return self._clamd_address
+        if self._settings_manager is not None:
+            configured = self._settings_manager.get("daemon_socket_path", "")
+            if configured:
+                return configured
+        # The host's clamd socket isn't visible inside the Flatpak sandbox
+        if is_flatpak():
+            return None
+        return get_clamd_socket_path()
+
+    def get_endpoints(self) -> list[str]:
+        """
+        Get the clamd endpoints configured to spread scans over.
+
+        Returns:
+            The distinct addresses of the "daemon_endpoints" setting (unix
+            socket paths or "tcp://host:port"), or an empty list if scans go
+            to the single address of get_clamd_address()
+        """
+        if self._clamd_address or self._settings_manager is None:
+            return []
+        endpoints = self._settings_manager.get("daemon_endpoints", [])
+        if not isinstance(endpoints, list):
+            logger.warning("Ignoring invalid daemon_endpoints setting")
+            return []
+        return list(dict.fromkeys(e for e in endpoints if isinstance(e, str) and e))
+
+    def get_native_clients(self) -> list[ClamdClient]:
+        """
+        Get a native clamd client for every endpoint that answers.
+
+        Each endpoint is checked with its own PING, cached by the health
+        probe, so repeated calls don't reconnect every time and an endpoint
+        that is down doesn't hide the others.
+
+        Returns:
+            ClamdClients for the configured endpoints, or the single clamd
+            address, that responded to PING
+        """
+        addresses = self.get_endpoints()
+        if not addresses:
+            address = self.get_clamd_address()
+            addresses = [address] if address else []
+
+        clients = []
+        for address in addresses:
+            is_connected, message = self._health_probe.check(
+                native_clamd_check(address), lambda address=address: ping_clamd(address)
+            )
+            if not is_connected:
+                logger.debug("Native clamd connection to %s unavailable: %s", address, message)
+                continue
+            clients.append(ClamdClient(address))
+        return clients
+
+    def get_native_client(self) -> ClamdClient | None:
+        """
+        Get a native clamd client if clamd answers on its socket.
+
+        The PING result is cached by the health probe, so repeated calls
+        don't reconnect to clamd every time.
+
+        Returns:
+            A ClamdClient for an address that responded to PING (the first
+            answering endpoint if several are configured), or None if the
+            native protocol can't be used and clamdscan must be spawned
+        """
+        clients = self.get_native_clients()
+        return clients[0] if clients else None
 
     def check_available(self) -> tuple[bool, str | None]:
         """
         Check if daemon scanning is available.
 
-        Verifies both clamdscan is installed and clamd is responding.
+        Tries a native PING on the clamd socket first. If that fails,
+        verifies both clamdscan is installed and clamd is responding.
 
         Returns:
             Tuple of (is_available, version_or_error)
         """
+        if self.get_native_client() is not None:
+            return (True, "clamd is available")
+        return self._check_clamdscan_available()
+
+    def _check_clamdscan_available(self) -> tuple[bool, str | None]:
+        """
+        Check if the clamdscan fallback can reach clamd.
+
+        The result is cached by the health probe. clamdscan talks to the
+        system clamd, so it is never used with a fixed clamd address or
+        configured endpoints.
+
+        Returns:
+            Tuple of (is_available, version_or_error)
+        """
+        if self._clamd_address:
+            return (False, f"clamd not accessible at {self._clamd_address}")
+        if self.get_endpoints():
+            return (False, "No clamd endpoint is reachable")
+        return self._health_probe.check(CLAMDSCAN_CHECK, self._probe_clamdscan)
+
+    def _probe_clamdscan(self) -> tuple[bool, str | None]:
+        """Spawn clamdscan to check it is installed and clamd is responding."""
         # Check clamdscan is installed
         is_installed, error = check_clamdscan_installed()
         if not is_installed:
@@ -88,15 +264,35 @@ class DaemonScanner:
 
         return (True, "clamd is available")
 
+    def _invalidate_health(self, result: ScanResult, addresses: list[str] | None) -> None:
+        """
+        Forget cached clamd availability after a scan that failed.
+
+        Args:
+            result: Result of the scan
+            addresses: Addresses of the native clients used, or None for clamdscan
+        """
+        if result.status != ScanStatus.ERROR:
+            return
+        if addresses is not None:
+            for address in addresses:
+                self._health_probe.invalidate(native_clamd_check(address))
+        else:
+            self._health_probe.invalidate(CLAMDSCAN_CHECK)
+
     def scan_sync(
         self,
         path: str,
         recursive: bool = True,
         profile_exclusions: dict | None = None,
         count_targets: bool = True,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
     ) -> ScanResult:
         """
-        Execute a synchronous scan using clamdscan.
+        Execute a synchronous scan using clamd.
 
         WARNING: This will block the calling thread. For UI applications,
         use scan_async() instead.
@@ -105,10 +301,23 @@ class DaemonScanner:
             path: Path to file or directory to scan
             recursive: Whether to scan directories recursively (always true for clamdscan)
             profile_exclusions: Optional exclusions from a scan profile.
-            count_targets: Whether to pre-count files/directories before scanning.
-                If False, scanned_files and scanned_dirs will be 0 in the result,
-                but scanning will be faster for large directories by avoiding
-                a separate tree walk. Default is True for backwards compatibility.
+            count_targets: Whether to report scanned_files and scanned_dirs when
+                clamdscan has to be spawned. Counting makes clamdscan scan a
+                file list built by walking the target, instead of walking it
+                itself. If False, the counts will be 0 unless the target is
+                walked anyway (native clamd protocol or exclusions present).
+            on_threat: Optional callback invoked from the scanning thread with
+                each non-excluded ThreatDetail as soon as clamd reports it.
+            checkpoint: Optional started ScanCheckpoint of the job. Progress
+                is recorded in it, and files it completed before the scan
+                was resumed are skipped. Only the native clamd protocol
+                uses it; clamdscan rescans everything.
+            on_progress: Optional callback invoked from the scanning thread
+                with coalesced ScanProgress snapshots. Only the native clamd
+                protocol reports progress.
+            profile_options: Optional options of a scan profile. clamd takes
+                its engine limits from clamd.conf, so the walk leaves out the
+                files they rule out instead (see scan_limits).
 
         Returns:
             ScanResult with scan details
@@ -126,37 +335,318 @@ class DaemonScanner:
             self._save_scan_log(result, time.monotonic() - start_time)
             return result
 
-        # Check daemon is available
-        is_available, error_msg = self.check_available()
-        if not is_available:
-            result = create_error_result(path, error_msg or "Daemon not available")
+        # Prefer the native socket protocol; fall back to spawning clamdscan
+        clients = self.get_native_clients()
+        if not clients:
+            is_available, error_msg = self._check_clamdscan_available()
+            if not is_available:
+                result = create_error_result(path, error_msg or "Daemon not available")
+                self._save_scan_log(result, time.monotonic() - start_time)
+                return result
+
+        # clamd has no notion of exclusions, so they are applied while
+        # walking and only the remaining files are handed to it
+        matcher = get_exclusion_matcher(self._settings_manager, profile_exclusions)
+        is_excluded = None if matcher.is_empty else matcher.is_excluded
+        skip_file = ScanLimits.from_options(profile_options).get_file_filter(engine_types=False)
+
+        # clamd doesn't report file/directory counts; they are collected
+        # by the same walk that feeds the scan
+        if clients:
+            result = self._scan_with_client(
+                clients,
+                [path],
+                on_threat,
+                is_excluded,
+                checkpoint=checkpoint,
+                on_progress=on_progress,
+                skip_file=skip_file,
+            )
+            self._invalidate_health(result, [client.address for client in clients])
             self._save_scan_log(result, time.monotonic() - start_time)
             return result
 
-        # Count files/directories before scanning (clamdscan doesn't report these)
-        # Skip counting if count_targets is False for performance on large directories
-        file_count, dir_count = (
-            self._count_scan_targets(path, profile_exclusions) if count_targets else (0, 0)
-        )
+        file_count, dir_count = 0, 0
+        list_file = None
+        stats = WalkStats()
+        try:
+            # Walk once to list the files for clamdscan, unless it can just
+            # be pointed at the path (no exclusions, limits or counts wanted)
+            if skip_file is not None or (
+                os.path.isdir(path) and (is_excluded is not None or count_targets)
+            ):
+                try:
+                    list_file, listed_count = write_file_list(
+                        file_path
+                        for file_path, _ in iter_scan_files(
+                            path,
+                            is_excluded=is_excluded,
+                            is_cancelled=self._cancel_event.is_set,
+                            stats=stats,
+                            skip_file=skip_file,
+                        )
+                    )
+                except (ValueError, OSError) as e:
+                    logger.debug("Falling back to clamdscan walking %s: %s", path, e)
+                else:
+                    if self._cancel_event.is_set():
+                        result = create_cancelled_result(path)
+                        self._save_scan_log(result, time.monotonic() - start_time)
+                        return result
+                    if count_targets:
+                        file_count, dir_count = stats.files, stats.dirs
+                    if listed_count == 0:
+                        result = self._build_result(
+                            path, ScanOutputParser(), "", "", 0, file_count, dir_count
+                        )
+                        result.skipped_files = dict(stats.skipped)
+                        self._save_scan_log(result, time.monotonic() - start_time)
+                        return result
+            elif count_targets and os.path.isfile(path):
+                file_count = 1
+
+            result = self._scan_with_clamdscan(
+                path,
+                recursive,
+                profile_exclusions,
+                file_count,
+                dir_count,
+                on_threat,
+                list_file,
+            )
+            result.skipped_files = dict(stats.skipped)
+        finally:
+            if list_file is not None:
+                os.unlink(list_file)
 
-        # Check if cancelled during counting phase
-        if self._cancel_event.is_set():
-            result = create_cancelled_result(path)
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
+        self._invalidate_health(result, None)
+        self._save_scan_log(result, time.monotonic() - start_time)
+        return result
+
+    def scan_targets(
+        self,
+        paths: list[str],
+        recursive: bool = True,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
+    ) -> list[ScanResult]:
+        """
+        Execute a synchronous scan of several targets using clamd.
+
+        All targets share one clamd session, or one clamdscan run over a
+        combined file list. Threats, output and counts are attributed back
+        to the target they belong to, and a scan log is saved per target.
+
+        WARNING: This will block the calling thread.
+
+        Args:
+            paths: Paths to files or directories to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+            on_threat: Optional callback invoked from the scanning thread with
+                each non-excluded ThreatDetail as soon as clamd reports it.
+            checkpoint: Optional started ScanCheckpoint of the job, see scan_sync().
+            on_progress: Optional callback for progress snapshots of the
+                whole scan, see scan_sync().
+            profile_options: Optional options of a scan profile, see scan_sync().
 
-        # Build clamdscan command
-        cmd = self._build_command(path, recursive, profile_exclusions)
+        Returns:
+            List of ScanResults, one per entry of paths and in the same order
+        """
+        if len(paths) == 1:
+            return [
+                self.scan_sync(
+                    paths[0],
+                    recursive,
+                    profile_exclusions,
+                    on_threat=on_threat,
+                    checkpoint=checkpoint,
+                    on_progress=on_progress,
+                    profile_options=profile_options,
+                )
+            ]
+
+        start_time = time.monotonic()
+        self._cancel_event.clear()
+
+        # Invalid targets are reported individually; duplicates are scanned once
+        results: dict[str, ScanResult] = {}
+        targets: list[str] = []
+        for path in dict.fromkeys(paths):
+            is_valid, error = validate_path(path)
+            if is_valid:
+                targets.append(path)
+            else:
+                results[path] = create_error_result(path, error or "Invalid path")
+
+        if targets:
+            target_results = self._scan_targets(
+                targets,
+                recursive,
+                profile_exclusions,
+                on_threat,
+                checkpoint,
+                on_progress,
+                profile_options,
+            )
+            if target_results is None:
+                # Some file can't be put in a file list; scan target by target,
+                # without the checkpoint, whose threats belong to all targets
+                if checkpoint is not None:
+                    logger.info("Scanning targets one by one, the scan can't be resumed")
+                    checkpoint.discard()
+                progress = SequentialProgress(on_progress) if on_progress is not None else None
+                return [
+                    self.scan_sync(
+                        path,
+                        recursive,
+                        profile_exclusions,
+                        on_threat=on_threat,
+                        on_progress=progress.next_scan() if progress is not None else None,
+                        profile_options=profile_options,
+                    )
+                    for path in paths
+                ]
+            results.update(zip(targets, target_results, strict=True))
+
+        duration = time.monotonic() - start_time
+        for result in results.values():
+            self._save_scan_log(result, duration)
+        return [results[path] for path in paths]
+
+    def _scan_targets(
+        self,
+        targets: list[str],
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
+    ) -> list[ScanResult] | None:
+        """
+        Scan several valid targets in one clamd session or clamdscan run.
+
+        Args:
+            targets: Distinct, validated paths to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+            on_threat: Optional callback for each non-excluded threat
+            checkpoint: Optional started ScanCheckpoint of the job
+            on_progress: Optional callback for progress snapshots
+            profile_options: Optional options of a scan profile
+
+        Returns:
+            List of ScanResults, one per target, or None if the targets
+            contain a file that can't be listed for --file-list
+        """
+        label = ", ".join(targets)
+        stats = [WalkStats() for _ in targets]
+
+        clients = self.get_native_clients()
+        if not clients:
+            is_available, error_msg = self._check_clamdscan_available()
+            if not is_available:
+                result = create_error_result(label, error_msg or "Daemon not available")
+                return split_result_by_target(result, targets, stats)
+
+        matcher = get_exclusion_matcher(self._settings_manager, profile_exclusions)
+        is_excluded = None if matcher.is_empty else matcher.is_excluded
+        skip_file = ScanLimits.from_options(profile_options).get_file_filter(engine_types=False)
+
+        if clients:
+            result = self._scan_with_client(
+                clients, targets, on_threat, is_excluded, stats, checkpoint, on_progress, skip_file
+            )
+            self._invalidate_health(result, [client.address for client in clients])
+            return split_result_by_target(result, targets, stats)
+
+        # clamdscan gets one list of the files of every target
+        try:
+            list_file, listed_count = write_file_list(
+                file_path
+                for file_path, _ in iter_target_files(
+                    targets,
+                    recursive,
+                    is_excluded,
+                    self._cancel_event.is_set,
+                    stats,
+                    skip_file,
+                )
+            )
+        except (ValueError, OSError) as e:
+            logger.debug("Falling back to scanning targets one by one: %s", e)
+            return None
+
+        try:
+            if self._cancel_event.is_set():
+                result = create_cancelled_result(label)
+            elif listed_count == 0:
+                result = self._build_result(label, ScanOutputParser(), "", "", 0)
+            else:
+                result = self._scan_with_clamdscan(
+                    label, recursive, profile_exclusions, on_threat=on_threat, file_list=list_file
+                )
+        finally:
+            os.unlink(list_file)
+
+        self._invalidate_health(result, None)
+        return split_result_by_target(result, targets, stats)
+
+    def _scan_with_clamdscan(
+        self,
+        path: str,
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        file_count: int = 0,
+        dir_count: int = 0,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        file_list: str | None = None,
+    ) -> ScanResult:
+        """
+        Scan a path by spawning clamdscan.
+
+        Args:
+            path: Path to file or directory to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+            file_count: Pre-counted number of files
+            dir_count: Pre-counted number of directories
+            on_threat: Optional callback for each non-excluded threat
+            file_list: Optional file listing the non-excluded files to scan.
+                       Without it clamdscan walks the path itself and
+                       excluded threats are filtered out afterwards.
+
+        Returns:
+            ScanResult with scan details
+        """
+        # Report threats as they arrive, minus the ones filtered out afterwards
+        report_threat = on_threat
+        if on_threat is not None and file_list is None:
+            matcher = get_exclusion_matcher(self._settings_manager, profile_exclusions)
+
+            def report_threat(threat: ThreatDetail) -> None:
+                if not matcher.matches(threat.file_path):
+                    on_threat(threat)
+
+        # Build clamdscan command and parse its output as it streams in
+        cmd = self._build_command(path, recursive, profile_exclusions, file_list)
+        parser = ScanOutputParser(on_threat=report_threat)
 
         try:
             with self._process_lock:
                 self._current_process = subprocess.Popen(
                     cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
                 )
+            if self._governor is not None:
+                self._governor.track(self._current_process)
 
             try:
-                stdout, stderr, was_cancelled = communicate_with_cancel_check(
-                    self._current_process, self._cancel_event.is_set
+                stdout, stderr, was_cancelled = stream_with_cancel_check(
+                    self._current_process, self._cancel_event.is_set, parser.feed_line
                 )
                 exit_code = self._current_process.returncode
             finally:
@@ -165,12 +655,14 @@ class DaemonScanner:
                 with self._process_lock:
                     process = self._current_process
                     self._current_process = None
+                if self._governor is not None and process is not None:
+                    self._governor.untrack(process)
                 # Perform cleanup outside lock to avoid holding it during I/O
                 cleanup_process(process)
 
             # Check if cancelled during execution
             if was_cancelled:
-                result = create_cancelled_result(
+                return create_cancelled_result(
                     path,
                     stdout,
                     stderr,
@@ -178,30 +670,175 @@ class DaemonScanner:
                     file_count,
                     dir_count,
                 )
-                self._save_scan_log(result, time.monotonic() - start_time)
-                return result
 
-            # Parse the results
-            result = self._parse_results(path, stdout, stderr, exit_code, file_count, dir_count)
-
-            # Apply exclusion filtering (clamdscan doesn't support --exclude)
-            result = self._filter_excluded_threats(result, profile_exclusions)
+            result = self._build_result(
+                path, parser, stdout, stderr, exit_code, file_count, dir_count
+            )
 
-            self._save_scan_log(result, time.monotonic() - start_time)
+            # Apply exclusion filtering when clamdscan walked the path itself
+            if file_list is None:
+                result = self._filter_excluded_threats(result, profile_exclusions)
             return result
 
         except FileNotFoundError:
-            result = create_error_result(path, "clamdscan executable not found")
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
+            return create_error_result(path, "clamdscan executable not found")
         except PermissionError as e:
-            result = create_error_result(path, f"Permission denied: {e}", str(e))
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
+            return create_error_result(path, f"Permission denied: {e}", str(e))
         except Exception as e:
-            result = create_error_result(path, f"Scan failed: {e}", str(e))
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
+            return create_error_result(path, f"Scan failed: {e}", str(e))
+
+    def scan_archive(
+        self,
+        path: str,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+    ) -> ScanResult:
+        """
+        Scan the members of a tar or zip archive without extracting it.
+
+        Each member is read from the archive and streamed to clamd over a
+        pipelined IDSESSION (see archive_scan). Threats are reported as
+        "<archive>!<member>". Only the native clamd protocol can do this.
+
+        WARNING: This will block the calling thread.
+
+        Args:
+            path: Path of the archive
+            on_threat: Optional callback invoked from the scanning thread with
+                each ThreatDetail as soon as clamd reports it.
+
+        Returns:
+            ScanResult with scan details; scanned_files counts the members
+        """
+        start_time = time.monotonic()
+        self._cancel_event.clear()
+
+        is_valid, error = validate_path(path)
+        if not is_valid:
+            result = create_error_result(path, error or "Invalid path")
+        elif not os.path.isfile(path) or not is_supported_archive(path):
+            result = create_error_result(path, "Not a tar or zip archive")
+        else:
+            client = self.get_native_client()
+            if client is None:
+                result = create_error_result(
+                    path, "Scanning inside archives needs a clamd socket ClamUI can reach"
+                )
+            else:
+                result = self._scan_archive_with_client(client, path, on_threat)
+                self._invalidate_health(result, [client.address])
+        self._save_scan_log(result, time.monotonic() - start_time)
+        return result
+
+    def _scan_archive_with_client(
+        self,
+        client: ClamdClient,
+        path: str,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+    ) -> ScanResult:
+        """
+        Stream the members of an archive to clamd, see scan_archive().
+
+        Args:
+            client: A connected native clamd client
+            path: Path of a tar or zip archive
+            on_threat: Optional callback for each threat as clamd reports it
+
+        Returns:
+            ScanResult with scan details
+        """
+        threat_details = ThreatList()
+        output_lines: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        error_lines: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        pending_members: dict[int, str] = {}
+        max_length = self._get_stream_max_length()
+        window = self._get_request_window()
+        scanned_members = 0
+
+        def handle_reply(session: ClamdSession) -> None:
+            request_id, verdict = session.read_reply()
+            name = pending_members.pop(request_id, verdict.path)
+            if verdict.is_infected:
+                threat_name = verdict.detail or "Unknown"
+                threat = ThreatDetail(
+                    file_path=name,
+                    threat_name=threat_name,
+                    category=categorize_threat(threat_name),
+                    severity=classify_threat_severity_str(threat_name),
+                )
+                output_lines.append(f"{name}: {threat_name} FOUND")
+                threat_details.append(threat)
+                if on_threat is not None:
+                    on_threat(threat)
+            elif verdict.is_error:
+                error_lines.append(f"{name}: {verdict.detail} ERROR")
+
+        def drain(session: ClamdSession) -> None:
+            while session.pending:
+                handle_reply(session)
+
+        try:
+            session = client.session()
+        except ClamdError as e:
+            return create_error_result(path, f"Scan failed: {e}", str(e))
+
+        with self._process_lock:
+            self._current_session = session
+        try:
+            try:
+                for member_name, stream in iter_archive_members(path):
+                    if self._cancel_event.is_set():
+                        break
+                    if self._governor is not None and self._governor.is_paused:
+                        resumed = self._pause_session(session, drain, client.session)
+                        if resumed is None:
+                            break
+                        session = resumed
+                    name = member_path(path, member_name)
+                    # Members are read a chunk at a time, so memory stays bounded
+                    request_id = session.submit_stream(stream, max_length=max_length)
+                    pending_members[request_id] = name
+                    scanned_members += 1
+                    if stream.error is not None:
+                        raise ArchiveError(f"Cannot read {name}: {stream.error}")
+                    while session.pending >= self._throttle(window, 1):
+                        handle_reply(session)
+            except ArchiveError as e:
+                error_lines.append(f"{e} ERROR")
+            while session.pending and not self._cancel_event.is_set():
+                handle_reply(session)
+        except ClamdError as e:
+            if not self._cancel_event.is_set():
+                return create_error_result(path, f"Scan failed: {e}", str(e))
+        finally:
+            with self._process_lock:
+                self._current_session = None
+            self._close_session(session)
+
+        stdout = "\n".join([*output_lines, *error_lines])
+        stderr = "\n".join(error_lines)
+        if self._cancel_event.is_set():
+            return create_cancelled_result(path, stdout, stderr, -1, scanned_members, 0)
+
+        if threat_details:
+            status, exit_code = ScanStatus.INFECTED, 1
+        elif error_lines:
+            status, exit_code = ScanStatus.ERROR, 2
+        else:
+            status, exit_code = ScanStatus.CLEAN, 0
+
+        return ScanResult(
+            status=status,
+            path=path,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            infected_files=threat_details.file_paths,
+            scanned_files=scanned_members,
+            scanned_dirs=0,
+            infected_count=len(threat_details),
+            error_message=stderr if status == ScanStatus.ERROR else None,
+            threat_details=threat_details,
+        )
 
     def scan_async(
         self,
@@ -210,6 +847,7 @@ class DaemonScanner:
         recursive: bool = True,
         profile_exclusions: dict | None = None,
         count_targets: bool = True,
+        profile_options: dict | None = None,
     ) -> None:
         """
         Execute an asynchronous scan using clamdscan.
@@ -226,10 +864,13 @@ class DaemonScanner:
                 If False, scanned_files and scanned_dirs will be 0 in the result,
                 but scanning will be faster for large directories by avoiding
                 a separate tree walk. Default is True for backwards compatibility.
+            profile_options: Optional options of a scan profile, see scan_sync().
         """
 
         def scan_thread():
-            result = self.scan_sync(path, recursive, profile_exclusions, count_targets)
+            result = self.scan_sync(
+                path, recursive, profile_exclusions, count_targets, profile_options=profile_options
+            )
             GLib.idle_add(callback, result)
 
         thread = threading.Thread(target=scan_thread)
@@ -245,167 +886,455 @@ class DaemonScanner:
         the grace period.
         """
         self._cancel_event.set()
-        # Acquire lock to safely get process reference
+        # Acquire lock to safely get process and session references
         with self._process_lock:
             process = self._current_process
+            session = self._current_session
         # Terminate outside lock to avoid holding it during I/O
         terminate_process_gracefully(process)
+        if session is not None:
+            session.abort()
 
-    def _build_command(
-        self, path: str, recursive: bool, profile_exclusions: dict | None = None
-    ) -> list[str]:
+    def _scan_with_client(
+        self,
+        clients: list[ClamdClient],
+        paths: list[str],
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        is_excluded: Callable[[str, bool], bool] | None = None,
+        target_stats: list[WalkStats] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        skip_file: Callable[[str, os.stat_result], str | None] | None = None,
+    ) -> ScanResult:
         """
-        Build the clamdscan command arguments.
-
-        Uses --multiscan for parallel scanning and --fdpass for
-        file descriptor passing (faster than streaming).
+        Scan one or more paths through the native clamd protocol.
+
+        Files are opened locally and handed to clamd over a pipelined
+        IDSESSION: by file descriptor on a unix socket, or streamed with
+        INSTREAM over several TCP connections, and spread over several clamd
+        servers if more than one client is given (see _open_session()).
+        Files an endpoint lost by failing are submitted to the others. Each
+        clamd gets at most a window of requests at a time, sized from its
+        MaxThreads and MaxQueue (see clamd_concurrency), or a single one
+        while the governor throttles the scan; a paused scan submits nothing
+        until it resumes (see _pause_session()). Verdicts are
+        collected as clamd reports them, and recorded in the checkpoint if
+        there is one. Excluded files, files
+        completed before a resumed scan was interrupted, files with a cached
+        clean verdict, system files matching their packaged digest if
+        "scan_skip_package_files" is set and duplicates of files already
+        submitted are skipped; threats are reported for the duplicates of
+        infected files too. File and directory counts come from the same
+        walk. Files are submitted riskiest first within a window of the walk
+        (see scan_ordering), and while the walk goes on, so the progress
+        total is estimated from the previous scan of the same paths until
+        the walk ends.
 
         Args:
-            path: Path to scan
-            recursive: Whether to scan recursively (clamdscan is always recursive)
-            profile_exclusions: Optional exclusions from a scan profile.
+            clients: Connected native clamd clients, one per endpoint
+            paths: Distinct files or directories to scan in one session
+            on_threat: Optional callback for each threat as clamd reports it
+            is_excluded: Optional walker predicate (path, is_dir) -> bool
+            target_stats: Optional WalkStats per path, filled with its counts
+            checkpoint: Optional started ScanCheckpoint of the job
+            on_progress: Optional callback for progress snapshots
+            skip_file: Optional walker filter leaving out the files the
+                       limits of a scan profile rule out
 
         Returns:
-            List of command arguments (wrapped with flatpak-spawn if in Flatpak)
+            ScanResult with scan details (its path is the paths joined by ", ")
         """
-        clamdscan = which_host_command("clamdscan") or "clamdscan"
-        cmd = [clamdscan]
+        path = ", ".join(paths)
+        if target_stats is None:
+            target_stats = [WalkStats() for _ in paths]
+        threat_details = ThreatList()
+        # Raw output is only kept as a bounded tail, like the clamdscan path
+        output_lines: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        error_lines: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        pending_files: dict[int, tuple[str, os.stat_result]] = {}
+        cache = self._scan_cache
+        if cache is not None:
+            signature_version = self._get_signature_version(clients)
+            if signature_version is None or not cache.prepare(signature_version):
+                cache = None
+        verifier = create_package_verifier(self._settings_manager, paths)
+        dedup = create_deduplicator(self._settings_manager)
+        tracker = ProgressTracker(on_progress, paths) if on_progress is not None else None
+        completed = False
+
+        def report_threat(threat: ThreatDetail) -> None:
+            output_lines.append(f"{threat.file_path}: {threat.threat_name} FOUND")
+            threat_details.append(threat)
+            if on_threat is not None:
+                on_threat(threat)
+
+        def submit(
+            session: ClamdSession | ClamdStreamPool | ClamdBalancer, file_path: str
+        ) -> os.stat_result | None:
+            """Open a file and submit it, returning its stat or None if it isn't submitted."""
+            try:
+                fd = open_for_scan(file_path)
+                if fd is None:
+                    return None
+                # Stat the opened file so the cached key matches what clamd saw
+                if session.supports_fdpass:
+                    try:
+                        st = os.fstat(fd)
+                        request_id = session.submit_fd(fd)
+                    finally:
+                        os.close(fd)
+                else:
+                    stream = os.fdopen(fd, "rb")
+                    try:
+                        st = os.fstat(fd)
+                    except OSError:
+                        stream.close()
+                        raise
+                    # The pool or balancer closes the file once it is sent
+                    try:
+                        request_id = session.submit_file(stream)
+                    except ClamdError:
+                        stream.close()
+                        raise
+            except OSError as e:
+                error_lines.append(f"{file_path}: {e.strerror or e}. ERROR")
+                return None
+            pending_files[request_id] = (file_path, st)
+            return st
+
+        def handle_reply(session: ClamdSession | ClamdStreamPool | ClamdBalancer) -> None:
+            request_id, verdict = session.read_reply()
+            file_path, st = pending_files.pop(request_id, (verdict.path, None))
+            # A failed endpoint's files go to the others; progress counts them once
+            if verdict.is_lost and st is not None and submit(session, file_path) is not None:
+                return
+            if tracker is not None:
+                tracker.file_done(st.st_size if st is not None else 0)
+            if verdict.status == "OK":
+                if cache is not None and st is not None:
+                    cache.mark_clean(st)
+                if checkpoint is not None and st is not None:
+                    checkpoint.mark_completed(file_path, st)
+            elif verdict.is_infected:
+                threat_name = verdict.detail or "Unknown"
+                threat = ThreatDetail(
+                    file_path=file_path,
+                    threat_name=threat_name,
+                    category=categorize_threat(threat_name),
+                    severity=classify_threat_severity_str(threat_name),
+                )
+                if checkpoint is not None:
+                    checkpoint.record_threat(threat, st)
+                report_threat(threat)
+            elif verdict.is_error or verdict.is_lost:
+                error_lines.append(f"{file_path}: {verdict.detail} ERROR")
 
-        # Use multiscan and fdpass for better performance
-        # In Flatpak: use --stream instead (clamdscan reads file and streams to clamd)
-        # This avoids permission issues where clamd can't access files created by Flatpak
-        if is_flatpak():
-            cmd.append("--stream")
-        else:
-            cmd.append("--multiscan")
-            cmd.append("--fdpass")
+        def drain(session: ClamdSession | ClamdStreamPool | ClamdBalancer) -> None:
+            while session.pending:
+                handle_reply(session)
 
-        # Show infected files only
-        cmd.append("-i")
+        window = self._get_request_window()
+        try:
+            session = self._open_session(clients, window)
+        except ClamdError as e:
+            if verifier is not None:
+                verifier.close()
+            return create_error_result(path, f"Scan failed: {e}", str(e))
+
+        # Threats found before the scan was interrupted are reported again
+        if checkpoint is not None:
+            for threat in checkpoint.resumed_threats:
+                report_threat(threat)
+
+        def files_to_scan() -> Iterator[tuple[str, os.stat_result]]:
+            for file_path, walk_stat in iter_target_files(
+                paths,
+                is_excluded=is_excluded,
+                is_cancelled=self._cancel_event.is_set,
+                stats=target_stats,
+                skip_file=skip_file,
+            ):
+                if checkpoint is not None and checkpoint.is_completed(file_path, walk_stat):
+                    continue
+                if cache is not None and cache.is_clean(walk_stat):
+                    continue
+                if verifier is not None and verifier.is_verified(file_path, walk_stat):
+                    continue
+                if dedup.add(file_path, walk_stat):
+                    yield file_path, walk_stat
 
-        # NOTE: clamdscan does NOT support --exclude or --exclude-dir options
-        # (it silently ignores them with a warning). Exclusion filtering is
-        # performed post-scan in _filter_excluded_threats() instead.
+        # Likely infections first, for an early first detection
+        scan_files = files_to_scan()
+        if is_risk_ordering_enabled(self._settings_manager):
+            scan_files = order_by_risk(scan_files)
 
-        cmd.append(path)
-        return wrap_host_command(cmd)
+        # Every endpoint of a balanced scan is a clamd of its own
+        max_pending = window * len(clients)
+        with self._process_lock:
+            self._current_session = session
+        try:
+            for file_path, _ in scan_files:
+                if self._cancel_event.is_set():
+                    break
+                if self._governor is not None and self._governor.is_paused:
+                    resumed = self._pause_session(
+                        session, drain, lambda: self._open_session(clients, window)
+                    )
+                    if resumed is None:
+                        break
+                    session = resumed
+                st = submit(session, file_path)
+                if st is None:
+                    continue
+                if tracker is not None:
+                    tracker.add_pending(st.st_size)
+
+                # A throttled scan keeps one request in flight per clamd
+                while session.pending >= self._throttle(max_pending, len(clients)):
+                    handle_reply(session)
+
+            if tracker is not None and not self._cancel_event.is_set():
+                tracker.finish_walk()
+            while session.pending and not self._cancel_event.is_set():
+                handle_reply(session)
+            completed = not self._cancel_event.is_set()
+        except ClamdError as e:
+            if not self._cancel_event.is_set():
+                return create_error_result(path, f"Scan failed: {e}", str(e))
+        finally:
+            with self._process_lock:
+                self._current_session = None
+            self._close_session(session)
+            if cache is not None:
+                cache.flush()
+            if verifier is not None:
+                verifier.close()
+            if checkpoint is not None:
+                checkpoint.flush()
+            if tracker is not None:
+                tracker.finish(completed=completed)
+
+        scanned_files = sum(st.files for st in target_stats)
+        scanned_dirs = sum(st.dirs for st in target_stats)
+        if self._cancel_event.is_set():
+            stdout = "\n".join([*output_lines, *error_lines])
+            stderr = "\n".join(error_lines)
+            return create_cancelled_result(path, stdout, stderr, -1, scanned_files, scanned_dirs)
+
+        # Duplicates of infected files are infected too
+        for threat in dedup.expand_threats(threat_details):
+            # Duplicates have no stat of their own; a resumed run scans them again
+            if checkpoint is not None:
+                checkpoint.record_threat(threat)
+            report_threat(threat)
+        stdout = "\n".join([*output_lines, *error_lines])
+        stderr = "\n".join(error_lines)
+
+        if threat_details:
+            status, exit_code = ScanStatus.INFECTED, 1
+        elif error_lines:
+            status, exit_code = ScanStatus.ERROR, 2
+        else:
+            status, exit_code = ScanStatus.CLEAN, 0
+
+        return ScanResult(
+            status=status,
+            path=path,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            infected_files=threat_details.file_paths,
+            scanned_files=scanned_files,
+            scanned_dirs=scanned_dirs,
+            infected_count=len(threat_details),
+            error_message=stderr if status == ScanStatus.ERROR else None,
+            threat_details=threat_details,
+            skipped_files=merge_skipped(target_stats),
+        )
 
-    def _count_scan_targets(
-        self, path: str, profile_exclusions: dict | None = None
-    ) -> tuple[int, int]:
+    def _get_signature_version(self, clients: list[ClamdClient]) -> str | None:
         """
-        Count files and directories that will be scanned.
+        Fingerprint the signatures the clamd servers of a scan have loaded.
 
-        Since clamdscan doesn't report file/directory counts in its output,
-        we count them ourselves before scanning.
+        The fingerprint comes from their VERSION replies, not from the
+        installed databases: a running clamd keeps scanning with the
+        databases it loaded until it reloads them, and servers reached
+        over TCP or from inside the Flatpak sandbox have their own.
 
         Args:
-            path: Path to scan
-            profile_exclusions: Optional exclusions from a scan profile.
+            clients: Connected native clamd clients, one per endpoint
 
         Returns:
-            Tuple of (file_count, dir_count)
+            Signature fingerprint, or None if it can't be determined and
+            cached verdicts must not be used
         """
-        scan_path = Path(path)
-
-        # Single file scan
-        if scan_path.is_file():
-            return (1, 0)
+        try:
+            return get_clamd_signature_version([client.version() for client in clients])
+        except ClamdError as e:
+            logger.debug("Cannot get the clamd signature version: %s", e)
+            return None
+
+    def _open_session(
+        self, clients: list[ClamdClient], window: int
+    ) -> ClamdSession | ClamdStreamPool | ClamdBalancer:
+        """
+        Open the connections a native scan submits its files over.
 
-        # Not a valid path
-        if not scan_path.is_dir():
-            return (0, 0)
+        On a unix socket, one IDSESSION takes file descriptors. Otherwise
+        (a TCP clamd, e.g. the host's from inside the Flatpak sandbox), the
+        contents are streamed with sendfile over a ClamdStreamPool of up to
+        STREAM_CONNECTIONS sessions. Streams are cut at the StreamMaxLength
+        of the local clamd.conf, or clamd's default if it can't be read.
 
-        # Collect exclusion patterns
-        exclude_patterns: list[str] = []
-        exclude_dirs: list[str] = []
+        With several clients, each endpoint gets such a session or pool and
+        a ClamdBalancer spreads the files over them. Endpoints that can't
+        be connected to are left out.
 
-        # Global exclusions from settings
-        if self._settings_manager is not None:
-            exclusions = self._settings_manager.get("exclusion_patterns", [])
-            for exclusion in exclusions:
-                if not exclusion.get("enabled", True):
-                    continue
-                pattern = exclusion.get("pattern", "")
-                if not pattern:
-                    continue
-                exclusion_type = exclusion.get("type", "pattern")
-                if exclusion_type == "directory":
-                    exclude_dirs.append(pattern)
-                else:
-                    exclude_patterns.append(pattern)
+        Args:
+            clients: Connected native clamd clients, one per endpoint
+            window: Requests the scan keeps in flight on each clamd; a
+                    stream pool has no more connections than that
 
-        # Profile exclusions
-        if profile_exclusions:
-            for excl_path in profile_exclusions.get("paths", []):
-                if excl_path:
-                    # Expand ~ in paths
-                    if excl_path.startswith("~"):
-                        excl_path = str(Path(excl_path).expanduser())
-                    exclude_dirs.append(excl_path)
+        Returns:
+            The ClamdSession, ClamdStreamPool or ClamdBalancer to submit files to
 
-            for pattern in profile_exclusions.get("patterns", []):
-                if pattern:
-                    exclude_patterns.append(pattern)
+        Raises:
+            ClamdError: If no clamd can be reached
+        """
+        if len(clients) == 1:
+            return self._open_endpoint(clients[0], window)
 
-        file_count = 0
-        dir_count = 0
+        endpoints: dict[str, ClamdSession | ClamdStreamPool] = {}
+        for client in clients:
+            try:
+                endpoints[client.address] = self._open_endpoint(client, window)
+            except ClamdError as e:
+                logger.warning("Leaving clamd at %s out of the scan: %s", client.address, e)
+                self._health_probe.invalidate(native_clamd_check(client.address))
+        if not endpoints:
+            raise ClamdError("No clamd endpoint is reachable")
+        return ClamdBalancer(endpoints)
+
+    def _close_session(self, session: ClamdSession | ClamdStreamPool | ClamdBalancer) -> None:
+        """Close the connections of a native scan."""
+        session.close()
+        if isinstance(session, ClamdBalancer):
+            # The next scan checks again whether they are back
+            for address in session.failed_endpoints:
+                self._health_probe.invalidate(native_clamd_check(address))
+
+    def _pause_session(
+        self,
+        session: ClamdSession | ClamdStreamPool | ClamdBalancer,
+        drain: Callable[[ClamdSession | ClamdStreamPool | ClamdBalancer], None],
+        reopen: Callable[[], ClamdSession | ClamdStreamPool | ClamdBalancer],
+    ) -> ClamdSession | ClamdStreamPool | ClamdBalancer | None:
+        """
+        Hold a native scan while the governor pauses it.
 
-        try:
-            for root, dirs, files in os.walk(path):
-                # Check for cancellation during counting
-                if self._cancel_event.is_set():
-                    logger.info("File counting cancelled by user")
-                    return (0, 0)
-
-                # Filter out excluded directories (modifies dirs in-place)
-                dirs[:] = [
-                    d
-                    for d in dirs
-                    if not self._is_excluded(os.path.join(root, d), d, exclude_dirs, is_dir=True)
-                ]
+        clamd answers the requests in flight first. The connections are
+        closed while the scan waits, since clamd drops a session that stays
+        idle longer than its IdleTimeout, and opened again on resume.
 
-                # Count directories (excluding the root)
-                dir_count += len(dirs)
+        Args:
+            session: Session, stream pool or balancer of the scan
+            drain: Reads the replies to the requests in flight of a session
+            reopen: Opens the connections of the scan again
 
-                # Count files that aren't excluded
-                for f in files:
-                    file_path = os.path.join(root, f)
-                    if not self._is_excluded(file_path, f, exclude_patterns, is_dir=False):
-                        file_count += 1
-        except (PermissionError, OSError):
-            # If we can't access the directory, return 0 counts
-            pass
+        Returns:
+            The connections to go on with, or None if the scan was cancelled
 
-        # Count the root directory itself
-        if dir_count > 0 or file_count > 0:
-            dir_count += 1
+        Raises:
+            ClamdError: If clamd fails while draining or reconnecting
+        """
+        drain(session)
+        with self._process_lock:
+            self._current_session = None
+        self._close_session(session)
+        self._governor.wait_while_paused(self._cancel_event.is_set)
+        if self._cancel_event.is_set():
+            return None
+        session = reopen()
+        with self._process_lock:
+            self._current_session = session
+        return session
+
+    def _throttle(self, window: int, throttled_window: int) -> int:
+        """Get the requests a scan may keep in flight, fewer while throttled."""
+        if self._governor is not None and self._governor.is_throttled:
+            return min(window, throttled_window)
+        return window
+
+    def _open_endpoint(self, client: ClamdClient, window: int) -> ClamdSession | ClamdStreamPool:
+        """Open the session or stream pool of one clamd, see _open_session()."""
+        if client.supports_fdpass:
+            return client.session()
+        return client.stream_pool(min(STREAM_CONNECTIONS, window), self._get_stream_max_length())
+
+    def _get_request_window(self) -> int:
+        """Get the requests a scan keeps in flight on one clamd, see clamd_concurrency."""
+        # The private clamd runs with clamd's defaults, not the system clamd.conf
+        limits = get_clamd_limits(() if self._clamd_address else CLAMD_CONFIG_PATHS)
+        configured = 0
+        if self._settings_manager is not None:
+            configured = self._settings_manager.get("clamd_max_inflight", 0)
+        return get_request_window(limits, self._interactive, configured)
 
-        return (file_count, dir_count)
+    @staticmethod
+    def _get_stream_max_length() -> int:
+        """Get clamd's StreamMaxLength from the local clamd.conf, or its default."""
+        config = find_clamd_config()
+        max_length = config.get_size("StreamMaxLength") if config is not None else None
+        return max_length or DEFAULT_STREAM_MAX_LENGTH
 
-    def _is_excluded(self, full_path: str, name: str, patterns: list[str], is_dir: bool) -> bool:
+    def _build_command(
+        self,
+        path: str,
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        file_list: str | None = None,
+    ) -> list[str]:
         """
-        Check if a path matches any exclusion pattern.
+        Build the clamdscan command arguments.
+
+        Uses --multiscan for parallel scanning and --fdpass for
+        file descriptor passing (faster than streaming).
 
         Args:
-            full_path: Full path to check
-            name: Base name of the file/directory
-            patterns: List of exclusion patterns (glob or path)
-            is_dir: Whether this is a directory
+            path: Path to scan
+            recursive: Whether to scan recursively (clamdscan is always recursive)
+            profile_exclusions: Optional exclusions from a scan profile.
+            file_list: Optional file listing the files to scan instead of path
 
         Returns:
-            True if the path should be excluded
-        """
-        for pattern in patterns:
-            # Check if pattern is an absolute path
-            if pattern.startswith("/") or pattern.startswith("~"):
-                expanded = str(Path(pattern).expanduser()) if pattern.startswith("~") else pattern
-                if full_path.startswith(expanded):
-                    return True
-            # Check glob pattern against filename
-            elif fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(full_path, pattern):
-                return True
-        return False
+            List of command arguments (wrapped with flatpak-spawn if in Flatpak)
+        """
+        clamdscan = which_host_command("clamdscan") or "clamdscan"
+        cmd = [clamdscan]
+
+        # Use multiscan and fdpass for better performance
+        # In Flatpak: use --stream instead (clamdscan reads file and streams to clamd)
+        # This avoids permission issues where clamd can't access files created by Flatpak.
+        # With a configured TCP clamd address, the native client streams instead.
+        if is_flatpak():
+            cmd.append("--stream")
+        else:
+            cmd.append("--multiscan")
+            cmd.append("--fdpass")
+
+        # Show infected files only
+        cmd.append("-i")
+
+        # NOTE: clamdscan does NOT support --exclude or --exclude-dir options
+        # (it silently ignores them with a warning). Exclusions are applied
+        # while building the file list instead, or post-scan in
+        # _filter_excluded_threats() when there is no list.
+
+        if file_list is not None:
+            cmd.append(f"--file-list={file_list}")
+        else:
+            cmd.append(path)
+        return wrap_host_command(cmd)
 
     def _parse_results(
         self,
@@ -436,37 +1365,35 @@ class DaemonScanner:
         Returns:
             Parsed ScanResult
         """
-        infected_files = []
-        threat_details = []
-        scanned_files = file_count
-        scanned_dirs = dir_count
-        infected_count = 0
-
-        for line in stdout.splitlines():
-            line = line.strip()
-
-            if line.endswith("FOUND"):
-                parts = line.rsplit(":", 1)
-                if len(parts) == 2:
-                    file_path = parts[0].strip()
-                    threat_part = parts[1].strip()
-                    threat_name = (
-                        threat_part.rsplit(" ", 1)[0].strip()
-                        if " FOUND" in threat_part
-                        else threat_part
-                    )
+        parser = ScanOutputParser()
+        parser.feed(stdout)
+        return self._build_result(path, parser, stdout, stderr, exit_code, file_count, dir_count)
 
-                    infected_files.append(file_path)
+    def _build_result(
+        self,
+        path: str,
+        parser: ScanOutputParser,
+        stdout: str,
+        stderr: str,
+        exit_code: int,
+        file_count: int = 0,
+        dir_count: int = 0,
+    ) -> ScanResult:
+        """
+        Build a ScanResult from parsed clamdscan output.
 
-                    threat_detail = ThreatDetail(
-                        file_path=file_path,
-                        threat_name=threat_name,
-                        category=categorize_threat(threat_name),
-                        severity=classify_threat_severity_str(threat_name),
-                    )
-                    threat_details.append(threat_detail)
-                    infected_count += 1
+        Args:
+            path: The scanned path
+            parser: Parser that was fed the clamdscan output
+            stdout: Standard output (or its retained tail) from clamdscan
+            stderr: Standard error from clamdscan
+            exit_code: Process exit code
+            file_count: Pre-counted number of files scanned
+            dir_count: Pre-counted number of directories scanned
 
+        Returns:
+            ScanResult with scan details
+        """
         if exit_code == 0:
             status = ScanStatus.CLEAN
         elif exit_code == 1:
@@ -480,111 +1407,14 @@ class DaemonScanner:
             stdout=stdout,
             stderr=stderr,
             exit_code=exit_code,
-            infected_files=infected_files,
-            scanned_files=scanned_files,
-            scanned_dirs=scanned_dirs,
-            infected_count=infected_count,
+            infected_files=parser.infected_files,
+            scanned_files=file_count,
+            scanned_dirs=dir_count,
+            infected_count=len(parser.threat_details),
             error_message=stderr if status == ScanStatus.ERROR else None,
-            threat_details=threat_details,
+            threat_details=parser.threat_details,
         )
 
-    def _collect_exclusion_patterns(self, profile_exclusions: dict | None = None) -> list[str]:
-        """
-        Collect all exclusion patterns from settings and profile.
-
-        Args:
-            profile_exclusions: Optional exclusions from a scan profile
-
-        Returns:
-            List of exclusion patterns (glob patterns or exact paths)
-        """
-        patterns: list[str] = []
-
-        # Global exclusions from settings
-        if self._settings_manager is not None:
-            exclusions = self._settings_manager.get("exclusion_patterns", [])
-            for exclusion in exclusions:
-                if not exclusion.get("enabled", True):
-                    continue
-                pattern = exclusion.get("pattern", "")
-                if pattern:
-                    patterns.append(pattern)
-
-        # Profile exclusions - patterns
-        if profile_exclusions:
-            for pattern in profile_exclusions.get("patterns", []):
-                if pattern:
-                    patterns.append(pattern)
-
-        return patterns
-
-    def _collect_exclusion_paths(self, profile_exclusions: dict | None = None) -> list[Path]:
-        """
-        Collect all exclusion directory paths from profile.
-
-        Args:
-            profile_exclusions: Optional exclusions from a scan profile
-
-        Returns:
-            List of resolved Path objects for excluded directories
-        """
-        paths: list[Path] = []
-
-        if profile_exclusions:
-            for path_str in profile_exclusions.get("paths", []):
-                if path_str:
-                    path = Path(path_str).expanduser().resolve()
-                    paths.append(path)
-
-        return paths
-
-    def _matches_exclusion_pattern(self, file_path: str, patterns: list[str]) -> bool:
-        """
-        Check if a file path matches any exclusion pattern.
-
-        Args:
-            file_path: The file path to check
-            patterns: List of exclusion patterns (glob or exact path)
-
-        Returns:
-            True if the file matches any pattern
-        """
-        for pattern in patterns:
-            # Expand ~ in patterns
-            if pattern.startswith("~"):
-                pattern = str(Path(pattern).expanduser())
-
-            # Check for exact path match or fnmatch pattern match
-            if file_path == pattern or fnmatch.fnmatch(file_path, pattern):
-                return True
-
-        return False
-
-    def _matches_exclusion_path(self, file_path: str, exclude_paths: list[Path]) -> bool:
-        """
-        Check if a file path is under any excluded directory.
-
-        Args:
-            file_path: The file path to check
-            exclude_paths: List of resolved excluded directory paths
-
-        Returns:
-            True if the file is under any excluded directory
-        """
-        if not exclude_paths:
-            return False
-
-        resolved_file = Path(file_path).resolve()
-        resolved_file_str = str(resolved_file)
-
-        for excl_path in exclude_paths:
-            excl_path_str = str(excl_path)
-            # Match if file is the excluded path or under it
-            if resolved_file == excl_path or resolved_file_str.startswith(excl_path_str + "/"):
-                return True
-
-        return False
-
     def _filter_excluded_threats(
         self, result: ScanResult, profile_exclusions: dict | None = None
     ) -> ScanResult:
@@ -604,28 +1434,13 @@ class DaemonScanner:
         if result.status != ScanStatus.INFECTED or not result.threat_details:
             return result
 
-        # Collect exclusion patterns and paths using helper methods
-        exclude_patterns = self._collect_exclusion_patterns(profile_exclusions)
-        exclude_paths = self._collect_exclusion_paths(profile_exclusions)
-
-        if not exclude_patterns and not exclude_paths:
+        matcher = get_exclusion_matcher(self._settings_manager, profile_exclusions)
+        if matcher.is_empty:
             return result
 
-        # Filter threats using helper methods
-        filtered_threats = []
-        filtered_files = []
-
-        for threat in result.threat_details:
-            file_path = threat.file_path
-
-            # Check pattern exclusions, then path exclusions
-            if self._matches_exclusion_pattern(file_path, exclude_patterns):
-                continue
-            if self._matches_exclusion_path(file_path, exclude_paths):
-                continue
-
-            filtered_threats.append(threat)
-            filtered_files.append(file_path)
+        filtered_threats = ThreatList(
+            threat for threat in result.threat_details if not matcher.matches(threat.file_path)
+        )
 
         # Build result based on remaining threats
         if not filtered_threats:
@@ -649,7 +1464,7 @@ class DaemonScanner:
             stdout=result.stdout,
             stderr=result.stderr,
             exit_code=result.exit_code,
-            infected_files=filtered_files,
+            infected_files=filtered_threats.file_paths,
             scanned_files=result.scanned_files,
             scanned_dirs=result.scanned_dirs,
             infected_count=len(filtered_threats),
@@ -659,4 +1474,5 @@ class DaemonScanner:
 
     def _save_scan_log(self, result: ScanResult, duration: float) -> None:
         """Save scan result to log."""
-        save_scan_log(self._log_manager, result, duration, suffix="(daemon)")
+        if self._save_logs:
+            save_scan_log(self._log_manager, result, duration, suffix="(daemon)")
@@ -0,0 +1,242 @@
+# ClamUI Exclusion Matcher Module
+"""
+Compiled scan exclusions for ClamUI.
+
+Exclusions come from two places: the global "exclusion_patterns" setting
+and the optional exclusions of a scan profile. ExclusionMatcher compiles
+both once into combined regular expressions and a path-prefix trie, so
+checking a path while walking a large tree costs a dictionary lookup per
+path component and at most three regex matches.
+
+Matching rules:
+- Glob patterns match a file's name or full path. Patterns of type
+  "directory" match a directory's name or full path and prune its tree.
+- Absolute patterns without wildcards and profile paths exclude that path
+  and everything below it. A leading ~ is expanded to the home directory.
+"""
+
+import fnmatch
+import os
+import re
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .settings_manager import SettingsManager
+
+# Characters that make a pattern a glob rather than a literal path
+_GLOB_CHARS = frozenset("*?[")
+
+# Trie key marking the end of an excluded path
+_END = None
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Convert a user-friendly glob pattern to POSIX ERE for ClamAV.
+
+    Uses fnmatch.translate() for conversion and strips Python-specific
+    regex suffixes for ClamAV compatibility. Adds anchors (^ and $) to ensure
+    the pattern matches the entire string, not just a substring.
+
+    Note: fnmatch doesn't support '**' recursive wildcards - document as limitation.
+
+    Args:
+        pattern: Glob pattern (e.g., '*.log', 'node_modules', '/tmp/*')
+
+    Returns:
+        POSIX Extended Regular Expression string with anchors
+    """
+    regex = fnmatch.translate(pattern)
+    # Strip fnmatch's \Z(?ms) suffix for ClamAV compatibility
+    # fnmatch.translate() adds (?s:...) wrapper and \Z anchor
+    # We need to remove these for ClamAV's regex engine
+    if regex.endswith(r"\Z"):
+        regex = regex[:-2]
+    # Handle newer Python versions that use (?s:pattern)\Z format
+    if regex.startswith("(?s:") and regex.endswith(")"):
+        regex = regex[4:-1]
+    # Add anchors to ensure full string match (prevents substring matching)
+    if not regex.startswith("^"):
+        regex = "^" + regex
+    if not regex.endswith("$"):
+        regex = regex + "$"
+    return regex
+
+
+def _compile_globs(patterns: Iterable[str]) -> re.Pattern | None:
+    """Compile glob patterns into one full-match regex, or None if empty."""
+    regexes = [f"(?:{fnmatch.translate(pattern)})" for pattern in patterns]
+    return re.compile("|".join(regexes)) if regexes else None
+
+
+class ExclusionMatcher:
+    """
+    Matcher for the combined settings and profile scan exclusions.
+
+    Instances are immutable once built and safe to share between threads.
+    Use SettingsManager.get_exclusion_matcher() (or the module-level
+    get_exclusion_matcher()) to reuse a cached instance.
+    """
+
+    def __init__(
+        self,
+        exclusions: list[dict] | None = None,
+        profile_exclusions: dict | None = None,
+    ):
+        """
+        Compile the exclusions.
+
+        Args:
+            exclusions: Entries of the "exclusion_patterns" setting, each a
+                        dict with "pattern", "type" and "enabled" keys
+            profile_exclusions: Optional exclusions from a scan profile.
+                               Format: {"paths": ["/path1", ...], "patterns": ["*.ext", ...]}
+        """
+        file_globs: list[str] = []
+        dir_globs: list[str] = []
+        self._path_trie: dict = {}
+        self._clamscan_args: list[str] = []
+
+        for exclusion in exclusions or []:
+            pattern = exclusion.get("pattern", "")
+            if not exclusion.get("enabled", True) or not pattern:
+                continue
+            is_dir = exclusion.get("type", "pattern") == "directory"
+            self._clamscan_args.extend(
+                ["--exclude-dir" if is_dir else "--exclude", glob_to_regex(pattern)]
+            )
+            if pattern.startswith("~"):
+                pattern = os.path.expanduser(pattern)
+            if pattern.startswith("/") and not _GLOB_CHARS.intersection(pattern):
+                self._add_path(pattern)
+            else:
+                (dir_globs if is_dir else file_globs).append(pattern)
+
+        if profile_exclusions:
+            for excl_path in profile_exclusions.get("paths", []):
+                if not excl_path:
+                    continue
+                excl_path = os.path.expanduser(excl_path)
+                # Use the path directly for --exclude-dir (ClamAV accepts paths)
+                self._clamscan_args.extend(["--exclude-dir", excl_path])
+                self._add_path(os.path.abspath(excl_path))
+                self._add_path(os.path.realpath(excl_path))
+            for pattern in profile_exclusions.get("patterns", []):
+                if not pattern:
+                    continue
+                self._clamscan_args.extend(["--exclude", glob_to_regex(pattern)])
+                file_globs.append(os.path.expanduser(pattern))
+
+        self._file_regex = _compile_globs(file_globs)
+        self._dir_regex = _compile_globs(dir_globs)
+        # Directory patterns also apply to full file paths, e.g. "*/build/*"
+        self._file_path_regex = _compile_globs(file_globs + dir_globs)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether nothing is excluded."""
+        return not self._clamscan_args
+
+    @property
+    def clamscan_args(self) -> list[str]:
+        """clamscan --exclude/--exclude-dir arguments for these exclusions."""
+        return list(self._clamscan_args)
+
+    def _add_path(self, path: str) -> None:
+        """Add a path to the prefix trie."""
+        node = self._path_trie
+        for part in path.split("/"):
+            if part:
+                node = node.setdefault(part, {})
+        node[_END] = True
+
+    def _is_under_excluded_path(self, path: str) -> bool:
+        """Check whether path is an excluded path or lies below one."""
+        node = self._path_trie
+        if not node:
+            return False
+        for part in path.split("/"):
+            if _END in node:
+                return True
+            if part:
+                node = node.get(part)
+                if node is None:
+                    return False
+        return _END in node
+
+    def is_excluded(self, path: str, is_dir: bool) -> bool:
+        """
+        Check whether a path found while walking is excluded.
+
+        Walkers call this for every entry and prune excluded directories,
+        so ancestors of path are assumed to have been checked already.
+
+        Args:
+            path: Full path of the file or directory
+            is_dir: Whether path is a directory
+
+        Returns:
+            True if the path should not be scanned
+        """
+        if self._is_under_excluded_path(path):
+            return True
+        name = os.path.basename(path)
+        if is_dir:
+            regex = self._dir_regex
+            return regex is not None and bool(regex.match(name) or regex.match(path))
+        return bool(
+            (self._file_regex is not None and self._file_regex.match(name))
+            or (self._file_path_regex is not None and self._file_path_regex.match(path))
+        )
+
+    def matches(self, file_path: str) -> bool:
+        """
+        Check whether a reported file is excluded, including by its parents.
+
+        Used for paths that did not come from a pruning walk, such as
+        threats reported by clamdscan.
+
+        Args:
+            file_path: Full path of a file
+
+        Returns:
+            True if the file or one of its parent directories is excluded
+        """
+        if self.is_excluded(file_path, is_dir=False):
+            return True
+        if self._dir_regex is None:
+            return False
+        parent = os.path.dirname(file_path)
+        while parent and parent != os.path.dirname(parent):
+            if self.is_excluded(parent, is_dir=True):
+                return True
+            parent = os.path.dirname(parent)
+        return False
+
+
+def get_exclusion_matcher(
+    settings_manager: "SettingsManager | None" = None, profile_exclusions: dict | None = None
+) -> ExclusionMatcher:
+    """
+    Get the exclusion matcher for a settings manager and scan profile.
+
+    Real SettingsManager instances return a cached matcher. Anything else
+    that provides get() (or None) gets a freshly compiled one.
+
+    Args:
+        settings_manager: Optional SettingsManager providing "exclusion_patterns"
+        profile_exclusions: Optional exclusions from a scan profile
+
+    Returns:
+        ExclusionMatcher for the combined exclusions
+    """
+    # Imported here to avoid a circular import
+    from .settings_manager import SettingsManager
+
+    if isinstance(settings_manager, SettingsManager):
+        return settings_manager.get_exclusion_matcher(profile_exclusions)
+    exclusions = []
+    if settings_manager is not None:
+        exclusions = settings_manager.get("exclusion_patterns", [])
+    return ExclusionMatcher(exclusions, profile_exclusions)
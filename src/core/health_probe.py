@@ -0,0 +1,165 @@
+# ClamUI Health Probe Module
+"""
+Cached availability checks for the scan backends.
+
+Checking whether clamscan is installed or clamd is answering normally
+spawns clamscan --version or clamdscan --ping (through flatpak-spawn
+--host inside the Flatpak sandbox), which adds 100-500 ms to every scan
+start and every backend label in the UI. HealthProbe keeps the result of
+each check for a short time so these callers can share it:
+
+- Positive results are reused for POSITIVE_TTL seconds. After that they
+  are still served, up to STALE_TTL, while a background thread re-probes.
+- Negative results expire after NEGATIVE_TTL seconds and are never served
+  stale, so installing or starting ClamAV is noticed quickly.
+- Scanners invalidate a check when a scan fails, so the next scan probes
+  again instead of trusting an outdated "available".
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds a successful check is reused before it is re-probed
+POSITIVE_TTL = 60.0
+
+# Seconds a failed check is reused before it is re-probed
+NEGATIVE_TTL = 5.0
+
+# Maximum age of a successful check that is served while re-probing
+STALE_TTL = 600.0
+
+# Check keys used by the scanners
+CLAMSCAN_CHECK = "clamscan"
+CLAMDSCAN_CHECK = "clamdscan"
+
+
+def native_clamd_check(address: str) -> str:
+    """
+    Get the check key for a native PING of a clamd address.
+
+    Args:
+        address: Unix socket path, or "tcp://host:port"
+
+    Returns:
+        Check key for HealthProbe
+    """
+    return f"clamd:{address}"
+
+
+class HealthProbe:
+    """
+    TTL cache for backend availability checks.
+
+    Each check is identified by a key and performed by a probe function
+    returning (is_available, version_or_error), like check_clamav_installed().
+    The probe function is passed on every call, so callers keep control of
+    what actually runs. Safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        ttl: float = POSITIVE_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        stale_ttl: float = STALE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the probe cache.
+
+        Args:
+            ttl: Seconds a successful check is reused
+            negative_ttl: Seconds a failed check is reused
+            stale_ttl: Maximum age of a successful check served while a
+                       background re-probe is running
+            clock: Monotonic time source (for tests)
+        """
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._stale_ttl = stale_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (result, time it was probed)
+        self._results: dict[str, tuple[tuple[bool, str | None], float]] = {}
+        # key -> counter bumped on invalidation, to drop outdated probe results
+        self._generations: dict[str, int] = {}
+        self._refreshing: set[str] = set()
+
+    def check(
+        self, key: str, probe: Callable[[], tuple[bool, str | None]]
+    ) -> tuple[bool, str | None]:
+        """
+        Get the result of a check, probing only when no usable result is cached.
+
+        Args:
+            key: Identifies the check, e.g. CLAMSCAN_CHECK
+            probe: Function performing the check
+
+        Returns:
+            Tuple of (is_available, version_or_error)
+        """
+        now = self._clock()
+        with self._lock:
+            cached = self._results.get(key)
+            generation = self._generations.get(key, 0)
+        if cached is not None:
+            result, probed_at = cached
+            age = now - probed_at
+            if age < (self._ttl if result[0] else self._negative_ttl):
+                return result
+            if result[0] and age < self._stale_ttl:
+                self._refresh_in_background(key, probe)
+                return result
+        return self._probe(key, probe, generation)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """
+        Forget a cached result so the next check probes again.
+
+        Args:
+            key: Check to forget, or None to forget every check
+        """
+        with self._lock:
+            keys = list(self._results) if key is None else [key]
+            for name in keys:
+                self._results.pop(name, None)
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    def _probe(
+        self, key: str, probe: Callable[[], tuple[bool, str | None]], generation: int
+    ) -> tuple[bool, str | None]:
+        """Run a probe and cache its result unless the check was invalidated meanwhile."""
+        probed_at = self._clock()
+        try:
+            result = probe()
+        except Exception as e:
+            logger.debug("Health probe %s failed: %s", key, e)
+            result = (False, f"Error checking {key}: {e}")
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._results[key] = (result, probed_at)
+        return result
+
+    def _refresh_in_background(
+        self, key: str, probe: Callable[[], tuple[bool, str | None]]
+    ) -> None:
+        """Re-probe a check in a daemon thread, unless a re-probe is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generations.get(key, 0)
+
+        def refresh() -> None:
+            try:
+                self._probe(key, probe, generation)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=refresh, name=f"health-probe-{key}")
+        thread.daemon = True
+        thread.start()
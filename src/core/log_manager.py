@@ -171,6 +171,10 @@ _INDEX_FIELD_PATTERN = re.compile(r'"(id|timestamp|type)"\s*:\s*"([^"\\]*(?:\\.[
 # whitespace variations and ensures we capture all three fields.
 _INDEX_EXTRACT_MAX_BYTES = 512
 
+# Threat lines written to the details of a scan log. A mass infection can
+# report millions of threats; the ones past this are only counted.
+MAX_LOGGED_THREATS = 1000
+
 
 def _extract_index_fields(file_path: Path) -> dict[str, str] | None:
     """
@@ -344,7 +348,8 @@ class LogEntry:
             scanned_files: Number of files scanned
             scanned_dirs: Number of directories scanned
             infected_count: Number of infections found
-            threat_details: List of threat details (dicts with file_path, threat_name)
+            threat_details: Threat details (dicts with file_path, threat_name), any
+                            iterable; the first MAX_LOGGED_THREATS are listed
             error_message: Error message if status is error
             stdout: Raw stdout from scan command
             suffix: Optional suffix for summary (e.g., "(daemon)")
@@ -382,13 +387,20 @@ class LogEntry:
             details_parts.append(f"Scanned: {scanned_files} files, {scanned_dirs} directories")
         if infected_count > 0:
             details_parts.append(f"Threats found: {infected_count}")
+            listed = omitted = 0
             for threat in threat_details:
+                if listed >= MAX_LOGGED_THREATS:
+                    omitted += 1
+                    continue
+                listed += 1
                 # Sanitize threat details before adding to log
                 raw_file_path = threat.get("file_path", threat.get("path", "unknown"))
                 raw_threat_name = threat.get("threat_name", threat.get("name", "unknown"))
                 sanitized_file_path = sanitize_log_line(raw_file_path)
                 sanitized_threat_name = sanitize_log_line(raw_threat_name)
                 details_parts.append(f"  - {sanitized_file_path}: {sanitized_threat_name}")
+            if omitted:
+                details_parts.append(f"  ... and {omitted} more")
         if sanitized_error_message:
             details_parts.append(f"Error: {sanitized_error_message}")
         details = "\n".join(details_parts) if details_parts else sanitized_stdout or ""
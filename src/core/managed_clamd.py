@@ -0,0 +1,316 @@
+# ClamUI Managed clamd Module
+"""
+Private clamd instance managed by ClamUI.
+
+Without a system clamd, every clamscan run loads the whole signature
+database again, which takes 10-20 seconds and over 1 GB of memory. The
+"managed" scan backend runs an unprivileged clamd owned by the user
+instead, listening on a socket under $XDG_RUNTIME_DIR/clamui:
+
+- It is started on the first scan (or when ClamUI starts, if selected)
+  and kept running while ClamUI or its tray icon runs.
+- It reloads its database after a successful freshclam update.
+- It shuts down after being idle for a while, and when ClamUI exits.
+
+A clamd already answering on the socket (e.g. started by another ClamUI
+process) is used as is, but only an instance started by this process is
+shut down by it.
+"""
+
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .clamav_detection import get_signature_database_dir
+from .clamd_client import ClamdClient, ClamdError, ping_clamd
+from .flatpak import is_flatpak, which_host_command, wrap_host_command
+from .scanner_base import terminate_process_gracefully
+
+logger = logging.getLogger(__name__)
+
+# Seconds of inactivity after which the private clamd is shut down
+DEFAULT_IDLE_TIMEOUT = 600
+
+# Seconds to wait for clamd to load the database and open its socket
+STARTUP_TIMEOUT = 120
+
+# Seconds between checks for an idle or exited clamd
+IDLE_CHECK_INTERVAL = 15
+
+# Timeout for the PING used to check the private clamd (seconds)
+_PING_TIMEOUT = 2.0
+
+# Delay between PINGs while clamd is starting (seconds)
+_STARTUP_POLL_INTERVAL = 0.25
+
+
+def get_runtime_dir() -> Path:
+    """
+    Get the directory holding the private clamd's socket, config and log.
+
+    Returns:
+        $XDG_RUNTIME_DIR/clamui, or a per-user directory in the system
+        temporary directory if XDG_RUNTIME_DIR is not set
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "clamui"
+    return Path(tempfile.gettempdir()) / f"clamui-{os.getuid()}"
+
+
+class ManagedClamd:
+    """
+    Lifecycle manager for a private, unprivileged clamd.
+
+    Thread-safe. Scans should hold in_use() while they talk to clamd, so
+    the idle timeout never stops it mid-scan.
+    """
+
+    def __init__(self, runtime_dir: Path | None = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """
+        Initialize the manager. Nothing is started until ensure_running().
+
+        Args:
+            runtime_dir: Directory for the socket, config and log.
+                         Defaults to get_runtime_dir().
+            idle_timeout: Seconds of inactivity after which clamd is stopped
+        """
+        self._runtime_dir = runtime_dir if runtime_dir else get_runtime_dir()
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._process: subprocess.Popen | None = None
+        self._users = 0
+        self._last_used = time.monotonic()
+        self._stop_event = threading.Event()
+
+    @property
+    def socket_path(self) -> str:
+        """Path of the private clamd's unix socket."""
+        return str(self._runtime_dir / "clamd.sock")
+
+    @property
+    def config_path(self) -> Path:
+        """Path of the generated clamd.conf."""
+        return self._runtime_dir / "clamd.conf"
+
+    @property
+    def log_path(self) -> Path:
+        """Path of the private clamd's log file."""
+        return self._runtime_dir / "clamd.log"
+
+    def check_available(self) -> tuple[bool, str | None]:
+        """
+        Check whether a private clamd can be started.
+
+        Returns:
+            Tuple of (is_available, clamd_path_or_error)
+        """
+        clamd = which_host_command("clamd")
+        if clamd is None:
+            return (
+                False,
+                "clamd is not installed. Please install it with: sudo apt install clamav-daemon",
+            )
+        # A host clamd couldn't read the socket directory inside the sandbox
+        if is_flatpak() and not clamd.startswith("/app/"):
+            return (False, "clamd is not bundled with this Flatpak")
+        if get_signature_database_dir() is None:
+            return (False, "No virus database found. Please update the database first.")
+        return (True, clamd)
+
+    def is_running(self) -> bool:
+        """Check whether a clamd answers on the private socket."""
+        is_connected, _ = ping_clamd(self.socket_path, timeout=_PING_TIMEOUT)
+        return is_connected
+
+    def ensure_running(self) -> tuple[bool, str | None]:
+        """
+        Start the private clamd if needed and wait until it answers.
+
+        Blocks while clamd loads the database, which can take a while on
+        the first call.
+
+        Returns:
+            Tuple of (is_running, socket_path_or_error)
+        """
+        with self._lock:
+            self._last_used = time.monotonic()
+            if self.is_running():
+                return (True, self.socket_path)
+
+            if self._process is None or self._process.poll() is not None:
+                is_available, clamd_or_error = self.check_available()
+                if not is_available:
+                    return (False, clamd_or_error)
+                try:
+                    self._start(clamd_or_error)
+                except OSError as e:
+                    return (False, f"Could not start clamd: {e}")
+
+            return self._wait_until_ready()
+
+    def start_in_background(self) -> None:
+        """Start the private clamd from a background thread, e.g. at application startup."""
+
+        def start() -> None:
+            is_running, detail = self.ensure_running()
+            if not is_running:
+                logger.info("Private clamd not started: %s", detail)
+
+        threading.Thread(target=start, name="managed-clamd-start", daemon=True).start()
+
+    @contextmanager
+    def in_use(self) -> Iterator[None]:
+        """Keep clamd from being stopped for being idle while the block runs."""
+        with self._lock:
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._users -= 1
+                self._last_used = time.monotonic()
+
+    def reload(self) -> bool:
+        """
+        Make a running private clamd reload its database.
+
+        Returns:
+            True if clamd started reloading, False if it isn't running
+        """
+        try:
+            ClamdClient(self.socket_path, timeout=_PING_TIMEOUT).reload()
+        except ClamdError as e:
+            logger.debug("Private clamd not reloaded: %s", e)
+            return False
+        logger.info("Private clamd is reloading its database")
+        return True
+
+    def stop(self) -> None:
+        """Stop the private clamd if this process started it."""
+        with self._lock:
+            self._stop_event.set()
+            process = self._process
+            self._process = None
+            if process is None or process.poll() is not None:
+                return
+            try:
+                ClamdClient(self.socket_path, timeout=_PING_TIMEOUT).shutdown()
+                process.wait(timeout=_PING_TIMEOUT)
+            except (ClamdError, subprocess.TimeoutExpired):
+                terminate_process_gracefully(process)
+            logger.info("Private clamd stopped")
+
+    def _write_config(self, database_dir: Path) -> None:
+        """Write the clamd.conf for the private instance."""
+        temp_dir = self._runtime_dir / "tmp"
+        temp_dir.mkdir(mode=0o700, exist_ok=True)
+        lines = [
+            "# Generated by ClamUI for its private clamd. Changes are overwritten.",
+            "Foreground yes",
+            f"LocalSocket {self.socket_path}",
+            "LocalSocketMode 600",
+            f"DatabaseDirectory {database_dir}",
+            f"PidFile {self._runtime_dir / 'clamd.pid'}",
+            f"TemporaryDirectory {temp_dir}",
+            f"LogFile {self.log_path}",
+            "LogFileMaxSize 1M",
+            "LogTime yes",
+            # ClamUI reloads the database itself after updates
+            "SelfCheck 0",
+        ]
+        self.config_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.config_path.chmod(0o600)
+
+    def _start(self, clamd: str) -> None:
+        """Start clamd and the thread stopping it when idle. Caller holds the lock."""
+        self._runtime_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._runtime_dir.chmod(0o700)
+        database_dir = get_signature_database_dir()
+        if database_dir is None:
+            raise OSError("No virus database found")
+        self._write_config(database_dir)
+        # A socket left behind by a clamd that crashed would block the new one
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+        cmd = wrap_host_command([clamd, f"--config-file={self.config_path}"])
+        logger.info("Starting private clamd on %s", self.socket_path)
+        self._process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self._stop_event = threading.Event()
+        threading.Thread(
+            target=self._watch_idle,
+            args=(self._process, self._stop_event),
+            name="managed-clamd-idle",
+            daemon=True,
+        ).start()
+
+    def _wait_until_ready(self) -> tuple[bool, str | None]:
+        """Wait for the started clamd to answer. Caller holds the lock."""
+        process = self._process
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process is None or process.poll() is not None:
+                self._process = None
+                return (False, f"clamd exited during startup, see {self.log_path}")
+            if self.is_running():
+                return (True, self.socket_path)
+            time.sleep(_STARTUP_POLL_INTERVAL)
+        return (False, "Timed out waiting for clamd to load the database")
+
+    def _watch_idle(self, process: subprocess.Popen, stop_event: threading.Event) -> None:
+        """Stop clamd once it has been idle for idle_timeout seconds."""
+        while not stop_event.wait(IDLE_CHECK_INTERVAL):
+            with self._lock:
+                if self._process is not process or process.poll() is not None:
+                    return
+                idle_for = time.monotonic() - self._last_used
+                if self._users == 0 and idle_for >= self.idle_timeout:
+                    logger.info("Stopping private clamd after %d s idle", idle_for)
+                    self.stop()
+                    return
+
+
+# Private clamd shared by everything in this process
+_managed_clamd: ManagedClamd | None = None
+_managed_clamd_lock = threading.Lock()
+
+
+def get_managed_clamd() -> ManagedClamd:
+    """
+    Get the process-wide ManagedClamd.
+
+    Returns:
+        The shared ManagedClamd instance
+    """
+    global _managed_clamd
+    with _managed_clamd_lock:
+        if _managed_clamd is None:
+            _managed_clamd = ManagedClamd()
+        return _managed_clamd
+
+
+def reload_managed_clamd() -> None:
+    """Reload the private clamd's database if this process has one running."""
+    with _managed_clamd_lock:
+        managed = _managed_clamd
+    if managed is not None:
+        managed.reload()
+
+
+def shutdown_managed_clamd() -> None:
+    """Stop the private clamd if this process started one."""
+    with _managed_clamd_lock:
+        managed = _managed_clamd
+    if managed is not None:
+        managed.stop()
@@ -0,0 +1,293 @@
+# ClamUI Package Verification Module
+"""
+Skip system files that the package manager can vouch for.
+
+Most of a full-system scan is spent on /usr, whose files dpkg and rpm
+already record digests for. With "scan_skip_package_files" set, the
+walker-driven scan paths hash each walked file that the package database
+knows and skip it when the hash matches the packaged digest, so only
+modified or unpackaged system files reach ClamAV:
+
+- dpkg: the MD5 digests in /var/lib/dpkg/info/*.md5sums.
+- rpm: the file digests from a local `rpm -qa` query.
+
+Verified files are remembered per inode and change stamps in a ScanCache
+of their own, fingerprinted with the package database, so unchanged files
+are not hashed again until a package is installed or updated.
+
+This trusts the package database: an attacker able to rewrite it could
+hide a modified system file. It is therefore off by default, and not
+available inside the Flatpak sandbox, which sees its runtime's /usr
+instead of the host's.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .flatpak import is_flatpak
+from .scan_cache import ScanCache
+
+if TYPE_CHECKING:
+    from .settings_manager import SettingsManager
+
+logger = logging.getLogger(__name__)
+
+# Directories whose files come from packages
+SYSTEM_ROOTS = ("/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/libx32", "/opt", "/boot")
+
+DPKG_INFO_DIR = "/var/lib/dpkg/info"
+DPKG_STATUS = "/var/lib/dpkg/status"
+
+# rpm database files, by rpm version and distribution layout
+RPM_DATABASES = (
+    "/var/lib/rpm/rpmdb.sqlite",
+    "/usr/lib/sysimage/rpm/rpmdb.sqlite",
+    "/var/lib/rpm/Packages.db",
+    "/var/lib/rpm/Packages",
+)
+
+# One line per packaged file: digest algorithm, path and digest
+RPM_QUERY_FORMAT = "[%{FILEDIGESTALGO}\t%{FILENAMES}\t%{FILEDIGESTS}\n]"
+
+# rpm digest algorithm numbers (PGPHASHALGO_*); packages without one use MD5
+_RPM_DIGEST_ALGORITHMS = {
+    "1": "md5",
+    "2": "sha1",
+    "8": "sha256",
+    "9": "sha384",
+    "10": "sha512",
+    "11": "sha224",
+}
+
+# Seconds a query of the rpm database may take
+RPM_QUERY_TIMEOUT = 120
+
+# Bytes read at a time while hashing
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _is_within(path: str, parent: str) -> bool:
+    """Check whether path is parent or lies below it."""
+    return path == parent or path.startswith(parent.rstrip("/") + "/")
+
+
+def touches_system_roots(paths: Iterable[str]) -> bool:
+    """
+    Check whether scanning paths would walk into packaged directories.
+
+    Args:
+        paths: Files or directories to scan
+
+    Returns:
+        True if a path contains or lies within one of SYSTEM_ROOTS
+    """
+    for path in paths:
+        path = os.path.abspath(path)
+        if any(_is_within(path, root) or _is_within(root, path) for root in SYSTEM_ROOTS):
+            return True
+    return False
+
+
+def get_package_database_version() -> tuple[str, str] | None:
+    """
+    Detect the package manager and fingerprint its database.
+
+    Returns:
+        Tuple of (package manager, fingerprint), or None if neither a dpkg
+        nor an rpm database was found. The fingerprint changes whenever
+        packages are installed, updated or removed.
+    """
+    candidates = [("dpkg", DPKG_STATUS)] + [("rpm", path) for path in RPM_DATABASES]
+    for manager, db_path in candidates:
+        try:
+            st = os.stat(db_path)
+        except OSError:
+            continue
+        return manager, f"{manager}:{db_path}:{st.st_size}:{st.st_mtime_ns}"
+    return None
+
+
+def get_verified_cache_path() -> Path:
+    """
+    Get the path of the verified files database.
+
+    Returns:
+        XDG_CACHE_HOME/clamui/package_verified.db
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME", "~/.cache")
+    return Path(xdg_cache_home).expanduser() / "clamui" / "package_verified.db"
+
+
+class PackageVerifier:
+    """
+    Checks walked files against the digests of the package database.
+
+    One instance serves one scan, from the thread that walks it.
+    """
+
+    def __init__(self, paths: list[str], cache: ScanCache | None = None):
+        """
+        Initialize the verifier.
+
+        Args:
+            paths: Targets of the scan; only packaged files within them
+                   are loaded
+            cache: Optional ScanCache remembering verified files. Defaults
+                   to one at get_verified_cache_path().
+        """
+        self._paths = [os.path.abspath(path) for path in paths]
+        self._cache = cache if cache is not None else ScanCache(str(get_verified_cache_path()))
+        self._cache_ready = False
+        self._digests: dict[str, tuple[str, str]] = {}
+        self._real_dirs: dict[str, str] = {}
+
+    def prepare(self) -> bool:
+        """
+        Load the packaged digests for the scan targets.
+
+        Returns:
+            True if a package database was read, False otherwise
+        """
+        version = get_package_database_version()
+        if version is None:
+            logger.debug("No dpkg or rpm database found; not verifying packaged files")
+            return False
+        manager, fingerprint = version
+
+        if manager == "dpkg":
+            entries = self._read_dpkg_digests()
+        else:
+            entries = self._read_rpm_digests()
+        for file_path, algorithm, digest in entries:
+            file_path = self._resolve(file_path)
+            if any(_is_within(file_path, path) for path in self._paths):
+                self._digests[file_path] = (algorithm, digest)
+        if not self._digests:
+            return False
+
+        self._cache_ready = self._cache.prepare(fingerprint)
+        logger.info(
+            "Verifying %d packaged files against the %s database", len(self._digests), manager
+        )
+        return True
+
+    def is_verified(self, file_path: str, st: os.stat_result) -> bool:
+        """
+        Check whether a file is unchanged from its package.
+
+        Args:
+            file_path: Path of a walked regular file
+            st: Its stat result from the walk
+
+        Returns:
+            True if the file matches its packaged digest and can be skipped
+        """
+        entry = self._digests.get(file_path)
+        if entry is None:
+            return False
+        if self._cache_ready and self._cache.is_clean(st):
+            return True
+
+        algorithm, digest = entry
+        if self._hash_file(file_path, algorithm) != digest:
+            return False
+        if self._cache_ready:
+            self._cache.mark_clean(st)
+        return True
+
+    def close(self) -> None:
+        """Record the verified files and release the database."""
+        self._cache.close()
+        self._digests.clear()
+
+    def _resolve(self, file_path: str) -> str:
+        """Map a packaged path to the path the walk sees (e.g. /bin to /usr/bin)."""
+        directory, name = os.path.split(file_path)
+        real_dir = self._real_dirs.get(directory)
+        if real_dir is None:
+            real_dir = os.path.realpath(directory)
+            self._real_dirs[directory] = real_dir
+        return os.path.join(real_dir, name)
+
+    @staticmethod
+    def _hash_file(file_path: str, algorithm: str) -> str | None:
+        """Hash a file, or return None if it can't be read."""
+        try:
+            digest = hashlib.new(algorithm)
+            with open(file_path, "rb") as f:
+                while chunk := f.read(_CHUNK_SIZE):
+                    digest.update(chunk)
+        except (OSError, ValueError):
+            return None
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_dpkg_digests() -> Iterable[tuple[str, str, str]]:
+        """Yield (path, algorithm, digest) from the dpkg md5sums files."""
+        for md5sums in glob.glob(os.path.join(DPKG_INFO_DIR, "*.md5sums")):
+            try:
+                with open(md5sums, encoding="utf-8", errors="surrogateescape") as f:
+                    for line in f:
+                        digest, _, relative_path = line.rstrip("\n").partition("  ")
+                        if digest and relative_path:
+                            yield "/" + relative_path, "md5", digest
+            except OSError as e:
+                logger.debug("Cannot read %s: %s", md5sums, e)
+
+    @staticmethod
+    def _read_rpm_digests() -> Iterable[tuple[str, str, str]]:
+        """Yield (path, algorithm, digest) from a query of the rpm database."""
+        try:
+            result = subprocess.run(
+                ["rpm", "-qa", "--qf", RPM_QUERY_FORMAT],
+                capture_output=True,
+                text=True,
+                errors="surrogateescape",
+                timeout=RPM_QUERY_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning("Cannot query the rpm database: %s", e)
+            return
+        if result.returncode != 0:
+            logger.warning("Cannot query the rpm database: %s", result.stderr.strip())
+            return
+        for line in result.stdout.splitlines():
+            algorithm, _, rest = line.partition("\t")
+            file_path, _, digest = rest.partition("\t")
+            # Directories, symlinks and ghost files have no digest
+            if file_path and digest:
+                yield file_path, _RPM_DIGEST_ALGORITHMS.get(algorithm, "md5"), digest
+
+
+def create_package_verifier(
+    settings_manager: "SettingsManager | None", paths: list[str]
+) -> PackageVerifier | None:
+    """
+    Create a PackageVerifier for a scan, if it applies to it.
+
+    Args:
+        settings_manager: Optional SettingsManager providing "scan_skip_package_files"
+        paths: Targets of the scan
+
+    Returns:
+        A prepared PackageVerifier, or None if the setting is off, the scan
+        doesn't reach system directories or no package database was found
+    """
+    if (
+        settings_manager is None
+        or settings_manager.get("scan_skip_package_files", False) is not True
+    ):
+        return None
+    if is_flatpak() or not touches_system_roots(paths):
+        return None
+    verifier = PackageVerifier(paths)
+    if not verifier.prepare():
+        verifier.close()
+        return None
+    return verifier
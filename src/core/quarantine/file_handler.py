@@ -130,12 +130,14 @@ class SecureFileHandler:
         except OSError as e:
             return (False, f"Error creating quarantine directory: {e}")
 
-    def calculate_hash(self, file_path: Path) -> tuple[str | None, str | None]:
+    @classmethod
+    def calculate_hash(cls, file_path: Path) -> tuple[str | None, str | None]:
         """
         Calculate SHA256 hash of a file for integrity verification.
 
         Uses buffered reading to handle large files efficiently without
-        loading the entire file into memory.
+        loading the entire file into memory. Can be called on the class,
+        without creating a quarantine directory.
 
         Args:
             file_path: Path to the file to hash
@@ -155,7 +157,7 @@ class SecureFileHandler:
             sha256_hash = hashlib.sha256()
 
             with open(file_path, "rb") as f:
-                for block in iter(lambda: f.read(self.HASH_BUFFER_SIZE), b""):
+                for block in iter(lambda: f.read(cls.HASH_BUFFER_SIZE), b""):
                     sha256_hash.update(block)
 
             return (sha256_hash.hexdigest(), None)
@@ -0,0 +1,321 @@
+# ClamUI Scan Cache Module
+"""
+Persistent scan-verdict cache for ClamUI.
+
+Remembers files that were scanned clean so later scans can skip them while
+they are unchanged. Entries are keyed by inode identity and change stamps
+(st_dev, st_ino, st_size, st_mtime_ns, st_ctime_ns) together with a
+fingerprint of the installed signature databases, so both editing a file
+and freshclam installing new signatures make its verdict stale. Verdicts
+of clamd are keyed on its VERSION reply instead, since a running clamd
+keeps its loaded databases until it reloads them.
+
+The GUI and the scheduled scans may scan with different backends, so
+verdicts are kept for the few signature versions used most recently
+rather than only the current one.
+
+Only clean verdicts are stored: infected files and scan errors are always
+reported again. The database lives next to the quarantine database and is
+shared by the GUI and the scheduled-scan CLI.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .clamav_detection import get_signature_database_dir
+
+logger = logging.getLogger(__name__)
+
+# Files in the database directory that change without new signatures
+_NON_SIGNATURE_FILES = frozenset({"freshclam.dat", "mirrors.dat"})
+
+
+def get_signature_version(db_dir: Path | None = None) -> str | None:
+    """
+    Fingerprint the installed ClamAV signature databases.
+
+    The fingerprint covers the name, size and modification time of every
+    database file, so it changes whenever freshclam installs an update.
+
+    Args:
+        db_dir: Optional database directory. Defaults to the detected one.
+
+    Returns:
+        Hex fingerprint string, or None if no signature databases were found
+    """
+    if db_dir is None:
+        db_dir = get_signature_database_dir()
+    if db_dir is None:
+        return None
+
+    entries = []
+    try:
+        with os.scandir(db_dir) as it:
+            for entry in it:
+                if entry.name.startswith(".") or entry.name in _NON_SIGNATURE_FILES:
+                    continue
+                if not entry.is_file(follow_symlinks=True):
+                    continue
+                st = entry.stat(follow_symlinks=True)
+                entries.append(f"{entry.name}:{st.st_size}:{st.st_mtime_ns}")
+    except OSError as e:
+        logger.debug("Cannot read signature directory %s: %s", db_dir, e)
+        return None
+
+    if not entries:
+        return None
+    digest = hashlib.sha256("\n".join(sorted(entries)).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def get_clamd_signature_version(versions: list[str]) -> str:
+    """
+    Fingerprint the signature databases loaded by clamd servers.
+
+    Args:
+        versions: VERSION replies of the servers, which carry the database
+                  version and date, e.g.
+                  "ClamAV 1.0.3/27100/Mon Nov 20 09:23:41 2023"
+
+    Returns:
+        Hex fingerprint string
+    """
+    digest = hashlib.sha256("\n".join(["clamd", *sorted(set(versions))]).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class ScanCache:
+    """
+    SQLite-backed cache of clean scan verdicts.
+
+    The database is opened lazily on the first prepare() call. Clean
+    verdicts are buffered and written in batches; call flush() once a
+    scan finishes. Instances are safe to share between threads.
+    """
+
+    # Database file permissions: 0o600 (owner read/write only)
+    # The cache records inode numbers and timestamps of the user's files
+    DB_FILE_PERMISSIONS = 0o600
+
+    # Number of buffered verdicts written per transaction
+    BATCH_SIZE = 500
+
+    # Number of most recently used signature versions whose verdicts are kept
+    KEPT_SIGNATURES = 4
+
+    def __init__(self, db_path: str | None = None):
+        """
+        Initialize the ScanCache.
+
+        Args:
+            db_path: Optional custom database path.
+                     Defaults to XDG_DATA_HOME/clamui/scan_cache.db
+        """
+        if db_path:
+            self._db_path = Path(db_path)
+        else:
+            xdg_data_home = os.environ.get("XDG_DATA_HOME", "~/.local/share")
+            self._db_path = Path(xdg_data_home).expanduser() / "clamui" / "scan_cache.db"
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._signature: str | None = None
+        self._pending: list[tuple[int, int, int, int, int, str]] = []
+
+    @property
+    def db_path(self) -> Path:
+        """Path to the cache database file."""
+        return self._db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema. Caller holds the lock."""
+        if self._conn is not None:
+            return self._conn
+
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._db_path), timeout=30.0, check_same_thread=False)
+        try:
+            # WAL lets the GUI and a scheduled scan use the cache concurrently
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Caches from before verdicts were kept per signature version
+            # are dropped; they only hold verdicts of the last scan
+            columns = {row[1]: row[5] for row in conn.execute("PRAGMA table_info(verdicts)")}
+            if columns and not columns.get("signature"):
+                conn.execute("DROP TABLE verdicts")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    signature TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    ctime_ns INTEGER NOT NULL,
+                    PRIMARY KEY (dev, ino, signature)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signatures (
+                    signature TEXT PRIMARY KEY,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.close()
+            raise
+
+        for suffix in ("", "-wal", "-shm"):
+            db_file = Path(str(self._db_path) + suffix)
+            if db_file.exists():
+                try:
+                    os.chmod(db_file, self.DB_FILE_PERMISSIONS)
+                except OSError:
+                    pass
+
+        self._conn = conn
+        return conn
+
+    def prepare(self, signature_version: str | None = None) -> bool:
+        """
+        Prepare the cache for a scan against the current signatures.
+
+        Verdicts of other signature versions are not used, and only those of
+        the KEPT_SIGNATURES versions used most recently are kept.
+
+        Args:
+            signature_version: Optional signature fingerprint. Defaults to
+                               fingerprinting the installed databases.
+
+        Returns:
+            True if the cache can be used for this scan, False otherwise
+        """
+        if signature_version is None:
+            signature_version = get_signature_version()
+
+        with self._lock:
+            self._pending.clear()
+            self._signature = None
+            if signature_version is None:
+                return False
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO signatures (signature, last_used) VALUES (?, ?)",
+                    (signature_version, time.time()),
+                )
+                expired = conn.execute(
+                    "DELETE FROM signatures WHERE signature NOT IN "
+                    "(SELECT signature FROM signatures ORDER BY last_used DESC, rowid DESC LIMIT ?)",
+                    (self.KEPT_SIGNATURES,),
+                ).rowcount
+                if expired:
+                    conn.execute(
+                        "DELETE FROM verdicts WHERE signature NOT IN "
+                        "(SELECT signature FROM signatures)"
+                    )
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Scan cache unavailable at %s: %s", self._db_path, e)
+                return False
+            self._signature = signature_version
+            return True
+
+    def is_clean(self, st: os.stat_result) -> bool:
+        """
+        Check whether a file is known to be clean and unchanged.
+
+        Args:
+            st: Stat result of the file (lstat or fstat)
+
+        Returns:
+            True if the file can be skipped, False if it must be scanned
+        """
+        with self._lock:
+            if self._conn is None or self._signature is None:
+                return False
+            try:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, ctime_ns FROM verdicts "
+                    "WHERE dev = ? AND ino = ? AND signature = ?",
+                    (st.st_dev, st.st_ino, self._signature),
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+            return row == (st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+    def mark_clean(self, st: os.stat_result) -> None:
+        """
+        Record a clean verdict for a file.
+
+        The stat result must be taken before the file was scanned, so a
+        modification during the scan leaves a stale (ignored) entry.
+
+        Args:
+            st: Stat result of the scanned file
+        """
+        with self._lock:
+            if self._signature is None:
+                return
+            self._pending.append(
+                (
+                    st.st_dev,
+                    st.st_ino,
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_ctime_ns,
+                    self._signature,
+                )
+            )
+            if len(self._pending) >= self.BATCH_SIZE:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write buffered verdicts to the database."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Write buffered verdicts. Caller holds the lock."""
+        if not self._pending or self._conn is None:
+            self._pending.clear()
+            return
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO verdicts "
+                "(dev, ino, size, mtime_ns, ctime_ns, signature) VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Failed to write scan cache: %s", e)
+        self._pending.clear()
+
+    def invalidate(self) -> None:
+        """Forget all cached verdicts."""
+        with self._lock:
+            self._pending.clear()
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM verdicts")
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Failed to clear scan cache: %s", e)
+
+    def close(self) -> None:
+        """Flush pending verdicts and close the database."""
+        with self._lock:
+            self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._signature = None
@@ -0,0 +1,527 @@
+# ClamUI Scan Checkpoint Module
+"""
+Checkpoint journal for resuming interrupted scans.
+
+A long scan that is killed by a suspend, a logout or the battery cutoff
+would otherwise start from zero next time. While a scan runs, the
+walker-driven scan paths record every file that received a verdict and
+every threat found in a small SQLite journal for the scan job. Entries
+are committed every CHECKPOINT_INTERVAL seconds, so at most that much
+work is lost when the process dies.
+
+Resuming the same job (same targets, recursion, profile exclusions and
+profile options) skips the recorded files that are unchanged since and
+reports their recorded threats again. Files are matched by inode identity
+and change stamps, like in the scan cache, so a file that was replaced
+after the interrupted run is scanned again. A journal recorded under other
+signatures, or older than the caller allows, is not resumed. The caller
+deletes the journal once the job has finished with discard(); a cancelled
+or killed scan leaves it behind for find_interrupted_scan().
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .scan_cache import get_signature_version
+from .scanner_types import ThreatDetail
+from .threat_store import ThreatList
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two commits of the journal
+CHECKPOINT_INTERVAL = 10.0
+
+# Buffered entries that force a commit before the interval has passed
+_MAX_PENDING = 5000
+
+# Version of the journal schema; journals of other versions are not resumed
+_JOURNAL_VERSION = "2"
+
+# A completed file: path, st_dev, st_ino, st_size, st_mtime_ns, st_ctime_ns
+_CompletedRow = tuple[str, int, int, int, int, int]
+
+
+def _completed_row(file_path: str, st: os.stat_result) -> _CompletedRow:
+    """Build the journal row of a completed file."""
+    return (file_path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+def get_checkpoint_dir() -> Path:
+    """
+    Get the directory holding the checkpoint journals.
+
+    Returns:
+        XDG_DATA_HOME/clamui/checkpoints
+    """
+    xdg_data_home = os.environ.get("XDG_DATA_HOME", "~/.local/share")
+    return Path(xdg_data_home).expanduser() / "clamui" / "checkpoints"
+
+
+def get_job_id(
+    targets: list[str],
+    recursive: bool = True,
+    profile_exclusions: dict | None = None,
+    profile_options: dict | None = None,
+) -> str:
+    """
+    Identify a scan job by what it scans.
+
+    Args:
+        targets: Paths scanned by the job
+        recursive: Whether directories are scanned recursively
+        profile_exclusions: Optional exclusions from a scan profile
+        profile_options: Optional options (engine limits) of a scan profile
+
+    Returns:
+        Hex identifier, the same for every run of the same job
+    """
+    job = json.dumps(
+        {
+            "targets": list(targets),
+            "recursive": recursive,
+            "exclusions": profile_exclusions or {},
+            "options": profile_options or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(job.encode("utf-8")).hexdigest()[:32]
+
+
+class ScanCheckpoint:
+    """
+    SQLite-backed progress journal of one scan job.
+
+    Call start() before the scan, then pass the checkpoint to the scanner,
+    which records completed files and threats. Afterwards, call discard()
+    if the scan finished or close() to keep the journal for a later
+    resume. The database is only created once there is progress to
+    record. Instances are safe to share between threads.
+    """
+
+    # Database file permissions: 0o600 (owner read/write only)
+    # The journal lists the paths of the user's files
+    DB_FILE_PERMISSIONS = 0o600
+
+    def __init__(
+        self,
+        targets: list[str],
+        recursive: bool = True,
+        profile_exclusions: dict | None = None,
+        checkpoint_dir: str | None = None,
+        profile_options: dict | None = None,
+    ):
+        """
+        Initialize the checkpoint of a scan job.
+
+        Args:
+            targets: Paths scanned by the job
+            recursive: Whether directories are scanned recursively
+            profile_exclusions: Optional exclusions from a scan profile
+            checkpoint_dir: Optional directory for the journal.
+                            Defaults to XDG_DATA_HOME/clamui/checkpoints
+            profile_options: Optional options (engine limits) of a scan profile
+        """
+        self._targets = list(targets)
+        self._recursive = recursive
+        self._profile_exclusions = profile_exclusions
+        self._profile_options = profile_options
+        directory = Path(checkpoint_dir) if checkpoint_dir else get_checkpoint_dir()
+        job_id = get_job_id(self._targets, recursive, profile_exclusions, profile_options)
+        self._db_path = directory / f"{job_id}.db"
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._resumed = False
+        self._resumed_files = 0
+        self._resumed_threats = ThreatList()
+        self._signature: str | None = None
+        self._pending_files: list[_CompletedRow] = []
+        self._pending_threats: list[tuple[str, str, str, str]] = []
+        self._last_commit = time.monotonic()
+
+    @property
+    def targets(self) -> list[str]:
+        """Paths scanned by the job."""
+        return list(self._targets)
+
+    @property
+    def recursive(self) -> bool:
+        """Whether directories are scanned recursively."""
+        return self._recursive
+
+    @property
+    def profile_exclusions(self) -> dict | None:
+        """Exclusions from the scan profile of the job."""
+        return self._profile_exclusions
+
+    @property
+    def profile_options(self) -> dict | None:
+        """Options of the scan profile of the job."""
+        return self._profile_options
+
+    @property
+    def db_path(self) -> Path:
+        """Path to the journal database file."""
+        return self._db_path
+
+    @property
+    def resumed_files(self) -> int:
+        """Number of files completed before the scan was resumed."""
+        return self._resumed_files
+
+    @property
+    def resumed_threats(self) -> ThreatList:
+        """Threats found before the scan was resumed."""
+        return self._resumed_threats
+
+    def start(self, resume: bool = False, max_age: float | None = None) -> bool:
+        """
+        Prepare the journal for a run of the job.
+
+        Args:
+            resume: Whether to continue from the last checkpoint. Otherwise
+                    any previous progress of the job is forgotten.
+            max_age: Optional age in seconds beyond which the progress of an
+                     interrupted run is forgotten instead of resumed
+
+        Returns:
+            True if progress from an interrupted run was found and will be
+            skipped, False if the scan starts from zero
+        """
+        signature = get_signature_version()
+        with self._lock:
+            self._close_locked()
+            self._pending_files.clear()
+            self._pending_threats.clear()
+            self._resumed = False
+            self._resumed_files = 0
+            self._resumed_threats = ThreatList()
+            self._signature = signature
+            self._last_commit = time.monotonic()
+
+            if not resume or not self._db_path.exists():
+                self._remove_files_locked()
+                return False
+            try:
+                stale = _get_stale_reason(_read_meta(self._db_path), signature, max_age)
+                if stale is not None:
+                    logger.info("Not resuming checkpoint %s: %s", self._db_path, stale)
+                    self._remove_files_locked()
+                    return False
+                conn = self._connect()
+                self._resumed_files = conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+                # Threats of files that changed since are found again when rescanned
+                self._resumed_threats = ThreatList(
+                    ThreatDetail(*row[:4])
+                    for row in conn.execute(
+                        "SELECT t.file_path, t.threat_name, t.category, t.severity, "
+                        "c.dev, c.ino, c.size, c.mtime_ns, c.ctime_ns "
+                        "FROM threats t JOIN completed c ON c.path = t.file_path "
+                        "ORDER BY t.rowid"
+                    )
+                    if _is_unchanged(row[0], row[4:])
+                )
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Cannot resume from checkpoint %s: %s", self._db_path, e)
+                self._close_locked()
+                self._remove_files_locked()
+                self._resumed_files = 0
+                self._resumed_threats = ThreatList()
+                return False
+            self._resumed = True
+            return True
+
+    def is_completed(self, file_path: str, st: os.stat_result) -> bool:
+        """
+        Check whether a file got its verdict before the scan was resumed.
+
+        Args:
+            file_path: Path of a walked file
+            st: Stat result of the file from the walk
+
+        Returns:
+            True if the file can be skipped, False if it must be scanned
+        """
+        with self._lock:
+            if not self._resumed or self._conn is None:
+                return False
+            try:
+                row = self._conn.execute(
+                    "SELECT path, dev, ino, size, mtime_ns, ctime_ns FROM completed WHERE path = ?",
+                    (file_path,),
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+            return row == _completed_row(file_path, st)
+
+    def mark_completed(self, file_path: str, st: os.stat_result) -> None:
+        """
+        Record that a file got a clean verdict.
+
+        The stat result must be taken before the file was scanned, so a
+        modification during the scan makes a resumed run scan it again.
+
+        Args:
+            file_path: Path of the scanned file
+            st: Stat result of the scanned file
+        """
+        with self._lock:
+            self._pending_files.append(_completed_row(file_path, st))
+            self._commit_if_due()
+
+    def record_threat(self, threat: ThreatDetail, st: os.stat_result | None = None) -> None:
+        """
+        Record a threat, which also completes its file.
+
+        Args:
+            threat: Threat reported by the scanner
+            st: Stat result of the infected file taken before it was
+                scanned. Without it, a resumed run scans the file again.
+        """
+        with self._lock:
+            if st is not None:
+                self._pending_files.append(_completed_row(threat.file_path, st))
+            self._pending_threats.append(
+                (threat.file_path, threat.threat_name, threat.category, threat.severity)
+            )
+            self._commit_if_due()
+
+    def flush(self) -> None:
+        """Commit the buffered progress now."""
+        with self._lock:
+            self._commit_locked()
+
+    def close(self) -> None:
+        """Commit the buffered progress and keep the journal for a resume."""
+        with self._lock:
+            self._commit_locked()
+            self._close_locked()
+
+    def discard(self) -> None:
+        """Delete the journal, once the job has finished."""
+        with self._lock:
+            self._pending_files.clear()
+            self._pending_threats.clear()
+            self._close_locked()
+            self._remove_files_locked()
+            self._resumed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the journal and create the schema. Caller holds the lock."""
+        if self._conn is not None:
+            return self._conn
+
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._db_path), timeout=30.0, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS completed (
+                    path TEXT PRIMARY KEY,
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    ctime_ns INTEGER NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS threats (
+                    file_path TEXT NOT NULL,
+                    threat_name TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    severity TEXT NOT NULL
+                )
+                """
+            )
+            job = {
+                "targets": self._targets,
+                "recursive": self._recursive,
+                "profile_exclusions": self._profile_exclusions,
+                "profile_options": self._profile_options,
+            }
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('job', ?)", (json.dumps(job),)
+            )
+            # Kept from the run that created the journal, to tell its age and signatures
+            conn.executemany(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("version", _JOURNAL_VERSION),
+                    ("created", str(time.time())),
+                    ("signature", self._signature or ""),
+                ],
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.close()
+            raise
+
+        for db_file in self._journal_files():
+            if db_file.exists():
+                try:
+                    os.chmod(db_file, self.DB_FILE_PERMISSIONS)
+                except OSError:
+                    pass
+
+        self._conn = conn
+        return conn
+
+    def _commit_if_due(self) -> None:
+        """Commit if the interval has passed or the buffer is full. Caller holds the lock."""
+        if (
+            len(self._pending_files) >= _MAX_PENDING
+            or time.monotonic() - self._last_commit >= CHECKPOINT_INTERVAL
+        ):
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        """Write the buffered progress. Caller holds the lock."""
+        self._last_commit = time.monotonic()
+        if not self._pending_files and not self._pending_threats:
+            return
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO completed (path, dev, ino, size, mtime_ns, ctime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending_files,
+            )
+            conn.executemany(
+                "INSERT INTO threats (file_path, threat_name, category, severity) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending_threats,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('updated', ?)",
+                (str(time.time()),),
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Failed to write scan checkpoint: %s", e)
+        self._pending_files.clear()
+        self._pending_threats.clear()
+
+    def _close_locked(self) -> None:
+        """Close the journal database. Caller holds the lock."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _remove_files_locked(self) -> None:
+        """Delete the journal database files. Caller holds the lock."""
+        for db_file in self._journal_files():
+            try:
+                db_file.unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug("Cannot remove checkpoint file %s: %s", db_file, e)
+
+    def _journal_files(self) -> list[Path]:
+        """Get the database file and its WAL files."""
+        return [Path(str(self._db_path) + suffix) for suffix in ("", "-wal", "-shm")]
+
+
+def _read_meta(db_file: Path) -> dict[str, str]:
+    """Read the meta table of a journal without changing it."""
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True, timeout=5.0)
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    finally:
+        conn.close()
+
+
+def _get_stale_reason(
+    meta: dict[str, str], signature: str | None, max_age: float | None
+) -> str | None:
+    """
+    Check whether the progress in a journal may still be resumed.
+
+    Args:
+        meta: Meta table of the journal
+        signature: Fingerprint of the installed signature databases
+        max_age: Optional maximum age of the journal in seconds
+
+    Returns:
+        Why the journal can't be resumed, or None if it can
+    """
+    if meta.get("version") != _JOURNAL_VERSION:
+        return "written by another version of ClamUI"
+    if meta.get("signature", "") != (signature or ""):
+        return "the signature databases changed since"
+    if max_age is not None:
+        try:
+            age = time.time() - float(meta.get("created", 0))
+        except ValueError:
+            age = float("inf")
+        if age > max_age:
+            return f"started {age / 3600:.0f} hour(s) ago"
+    return None
+
+
+def _is_unchanged(file_path: str, stamps: tuple) -> bool:
+    """Check whether a file still has the inode identity and change stamps recorded."""
+    try:
+        st = os.lstat(file_path)
+    except OSError:
+        return False
+    return _completed_row(file_path, st)[1:] == tuple(stamps)
+
+
+def find_interrupted_scan(checkpoint_dir: str | None = None) -> ScanCheckpoint | None:
+    """
+    Find the most recently interrupted scan job.
+
+    Journals that can no longer be resumed, because they were recorded
+    under other signatures or by another version, are left out.
+
+    Args:
+        checkpoint_dir: Optional directory of the journals.
+                        Defaults to XDG_DATA_HOME/clamui/checkpoints
+
+    Returns:
+        ScanCheckpoint of the job (not started yet), or None if no
+        interrupted scan left a journal
+    """
+    directory = Path(checkpoint_dir) if checkpoint_dir else get_checkpoint_dir()
+    signature = get_signature_version()
+    latest: tuple[float, ScanCheckpoint] | None = None
+    try:
+        db_files = list(directory.glob("*.db"))
+    except OSError:
+        return None
+
+    for db_file in db_files:
+        try:
+            meta = _read_meta(db_file)
+            job = json.loads(meta["job"])
+            updated = float(meta.get("updated", 0))
+            checkpoint = ScanCheckpoint(
+                job["targets"],
+                job["recursive"],
+                job["profile_exclusions"],
+                checkpoint_dir=str(directory),
+                profile_options=job.get("profile_options"),
+            )
+        except (sqlite3.Error, OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug("Ignoring unreadable checkpoint %s: %s", db_file, e)
+            continue
+        # A journal whose name doesn't match its job belongs to no resumable scan
+        if checkpoint.db_path != db_file:
+            continue
+        if _get_stale_reason(meta, signature, None) is not None:
+            continue
+        if latest is None or updated > latest[0]:
+            latest = (updated, checkpoint)
+
+    return latest[1] if latest is not None else None
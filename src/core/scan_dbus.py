@@ -0,0 +1,302 @@
+# ClamUI Scan D-Bus Service Module
+"""
+org.clamui.Scanner D-Bus interface of the running application.
+
+Other tools (file manager actions, scripts, scheduled scans) can submit
+scans to the running ClamUI instead of starting their own scanner:
+
+    gdbus call --session --dest org.clamui.Scanner \\
+        --object-path /org/clamui/Scanner \\
+        --method org.clamui.Scanner.Scan "['/home/user/Downloads']" interactive
+
+Scan() returns a job id at once; the scan runs in the ScanJobQueue, which
+merges overlapping requests and bounds concurrency. JobStarted,
+JobProgress and JobFinished signals report the job, with that id.
+JobFinished lists at most MAX_SIGNALED_INFECTED_FILES infected files;
+its infected_count tells how many there were.
+"""
+
+import itertools
+import logging
+from collections.abc import Callable
+
+from gi.repository import Gio, GLib
+
+from .scan_progress import ScanProgress
+from .scan_queue import JobPriority, ScanJobQueue
+from .scanner import Scanner
+from .scanner_types import ScanResult, ScanStatus
+
+logger = logging.getLogger(__name__)
+
+DBUS_NAME = "org.clamui.Scanner"
+DBUS_PATH = "/org/clamui/Scanner"
+DBUS_INTERFACE = "org.clamui.Scanner"
+
+SCANNER_XML = """
+<!DOCTYPE node PUBLIC "-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"
+"http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd">
+<node>
+  <interface name="org.clamui.Scanner">
+    <method name="Scan">
+      <arg type="as" name="paths" direction="in"/>
+      <arg type="s" name="priority" direction="in"/>
+      <arg type="t" name="job_id" direction="out"/>
+    </method>
+    <method name="Cancel">
+      <arg type="t" name="job_id" direction="in"/>
+      <arg type="b" name="cancelled" direction="out"/>
+    </method>
+    <method name="GetJobs">
+      <arg type="a(tsas)" name="jobs" direction="out"/>
+    </method>
+    <signal name="JobStarted">
+      <arg type="t" name="job_id"/>
+    </signal>
+    <signal name="JobProgress">
+      <arg type="t" name="job_id"/>
+      <arg type="t" name="files_done"/>
+      <arg type="x" name="files_total"/>
+      <arg type="d" name="fraction"/>
+      <arg type="d" name="eta"/>
+    </signal>
+    <signal name="JobFinished">
+      <arg type="t" name="job_id"/>
+      <arg type="s" name="status"/>
+      <arg type="x" name="scanned_files"/>
+      <arg type="t" name="infected_count"/>
+      <arg type="as" name="infected_files"/>
+    </signal>
+  </interface>
+</node>
+"""
+
+# Infected files listed in a JobFinished signal at most
+MAX_SIGNALED_INFECTED_FILES = 100
+
+# Priorities accepted by Scan()
+PRIORITIES = {
+    "interactive": JobPriority.INTERACTIVE,
+    "scheduled": JobPriority.SCHEDULED,
+}
+
+
+def summarize_results(results: list[ScanResult]) -> tuple[str, int, int, list[str]]:
+    """
+    Summarize the results of a job for the JobFinished signal.
+
+    Args:
+        results: One ScanResult per scanned path, empty if cancelled
+
+    Returns:
+        Tuple of (status, scanned_files, infected_count, infected_files).
+        Status is "infected", "error", "cancelled" or "clean", and
+        infected_files holds the first MAX_SIGNALED_INFECTED_FILES paths.
+        scanned_files is -1 if a result doesn't know its count.
+    """
+    statuses = {result.status for result in results}
+    if ScanStatus.INFECTED in statuses:
+        status = "infected"
+    elif ScanStatus.ERROR in statuses:
+        status = "error"
+    elif not results or ScanStatus.CANCELLED in statuses:
+        status = "cancelled"
+    else:
+        status = "clean"
+    # Spilled threat lists are read no further than the listed paths
+    infected_files = list(
+        itertools.islice(
+            itertools.chain.from_iterable(result.infected_files for result in results),
+            MAX_SIGNALED_INFECTED_FILES,
+        )
+    )
+    counts = [result.scanned_files for result in results]
+    scanned_files = -1 if any(count < 0 for count in counts) else sum(counts)
+    return (
+        status,
+        scanned_files,
+        sum(result.infected_count for result in results),
+        infected_files,
+    )
+
+
+class ScanDBusService:
+    """
+    Exports the org.clamui.Scanner interface for a ScanJobQueue.
+
+    Signals are emitted from the main loop, whatever thread reports them.
+    """
+
+    def __init__(self, scanner_factory: Callable[[], Scanner], max_concurrent: int | None = None):
+        """
+        Initialize the service and its job queue.
+
+        Args:
+            scanner_factory: Creates the Scanner of each queue worker
+            max_concurrent: Optional maximum number of jobs scanned at once
+        """
+        kwargs = {"max_concurrent": max_concurrent} if max_concurrent else {}
+        self._queue = ScanJobQueue(
+            scanner_factory,
+            on_job_started=self._on_job_started,
+            on_job_progress=self._on_job_progress,
+            on_job_finished=self._on_job_finished,
+            **kwargs,
+        )
+        self._connection: Gio.DBusConnection | None = None
+        self._registration_id = 0
+        self._name_id = 0
+
+    @property
+    def queue(self) -> ScanJobQueue:
+        """The job queue running the submitted scans."""
+        return self._queue
+
+    def register(self, connection: Gio.DBusConnection) -> bool:
+        """
+        Export the interface and own org.clamui.Scanner on a connection.
+
+        Args:
+            connection: Session bus connection, e.g. the application's
+
+        Returns:
+            True if the interface was exported
+        """
+        try:
+            node_info = Gio.DBusNodeInfo.new_for_xml(SCANNER_XML)
+            self._registration_id = connection.register_object(
+                DBUS_PATH,
+                node_info.interfaces[0],
+                self._handle_method_call,
+                None,
+                None,
+            )
+        except GLib.Error as e:
+            logger.warning(f"Failed to export {DBUS_INTERFACE}: {e}")
+            return False
+        self._connection = connection
+        self._name_id = Gio.bus_own_name_on_connection(
+            connection,
+            DBUS_NAME,
+            Gio.BusNameOwnerFlags.NONE,
+            self._on_name_acquired,
+            self._on_name_lost,
+        )
+        logger.debug(f"{DBUS_INTERFACE} interface exported at {DBUS_PATH}")
+        return True
+
+    def _on_name_acquired(self, connection: Gio.DBusConnection, name: str) -> None:
+        """Log that the service is reachable under its well-known name."""
+        logger.info(f"{DBUS_INTERFACE} interface registered as {name} at {DBUS_PATH}")
+
+    def _on_name_lost(self, connection: Gio.DBusConnection | None, name: str) -> None:
+        """Stop exporting the interface once the name is owned by someone else."""
+        logger.warning(f"Cannot own {name}, another instance may provide it")
+        if self._connection is not None and self._registration_id:
+            self._connection.unregister_object(self._registration_id)
+            self._registration_id = 0
+
+    def unregister(self) -> None:
+        """Stop the queue and remove the interface from the bus."""
+        self._queue.shutdown()
+        if self._connection is not None:
+            if self._registration_id:
+                self._connection.unregister_object(self._registration_id)
+                self._registration_id = 0
+            if self._name_id:
+                Gio.bus_unown_name(self._name_id)
+                self._name_id = 0
+            self._connection = None
+
+    def _handle_method_call(
+        self,
+        connection: Gio.DBusConnection,
+        sender: str,
+        object_path: str,
+        interface_name: str,
+        method_name: str,
+        parameters: GLib.Variant,
+        invocation: Gio.DBusMethodInvocation,
+    ) -> None:
+        """Handle D-Bus method calls for org.clamui.Scanner."""
+        logger.debug(f"Method call: {method_name} from {sender}")
+
+        if method_name == "Scan":
+            paths, priority_name = parameters.unpack()
+            priority = PRIORITIES.get(priority_name)
+            if priority is None:
+                invocation.return_dbus_error(
+                    "org.freedesktop.DBus.Error.InvalidArgs",
+                    f"Unknown priority: {priority_name}",
+                )
+                return
+            try:
+                job_id = self._queue.submit(list(paths), priority)
+            except (ValueError, RuntimeError) as e:
+                invocation.return_dbus_error("org.freedesktop.DBus.Error.Failed", str(e))
+                return
+            invocation.return_value(GLib.Variant("(t)", (job_id,)))
+
+        elif method_name == "Cancel":
+            (job_id,) = parameters.unpack()
+            invocation.return_value(GLib.Variant("(b)", (self._queue.cancel(job_id),)))
+
+        elif method_name == "GetJobs":
+            jobs = [
+                (job_id, job.state.value, list(job.paths))
+                for job in self._queue.get_jobs()
+                for job_id in job.ids
+            ]
+            invocation.return_value(GLib.Variant("(a(tsas))", (jobs,)))
+
+        else:
+            invocation.return_dbus_error(
+                "org.freedesktop.DBus.Error.UnknownMethod", f"Unknown method: {method_name}"
+            )
+
+    def _emit(self, signal_name: str, parameters: GLib.Variant) -> None:
+        """Emit a signal from the main loop."""
+
+        def emit() -> bool:
+            if self._connection is not None:
+                try:
+                    self._connection.emit_signal(
+                        None, DBUS_PATH, DBUS_INTERFACE, signal_name, parameters
+                    )
+                except GLib.Error as e:
+                    logger.debug(f"Failed to emit {signal_name}: {e}")
+            return False
+
+        GLib.idle_add(emit)
+
+    def _on_job_started(self, job_id: int) -> None:
+        """Signal that the job of a request started scanning."""
+        self._emit("JobStarted", GLib.Variant("(t)", (job_id,)))
+
+    def _on_job_progress(self, job_id: int, progress: ScanProgress) -> None:
+        """Signal the progress of the job of a request."""
+        fraction = progress.fraction
+        eta = progress.eta
+        self._emit(
+            "JobProgress",
+            GLib.Variant(
+                "(ttxdd)",
+                (
+                    job_id,
+                    progress.files_done,
+                    progress.files_total if progress.files_total is not None else -1,
+                    fraction if fraction is not None else -1.0,
+                    eta if eta is not None else -1.0,
+                ),
+            ),
+        )
+
+    def _on_job_finished(self, job_id: int, results: list[ScanResult]) -> None:
+        """Signal the results of the job of a request."""
+        status, scanned_files, infected_count, infected_files = summarize_results(results)
+        self._emit(
+            "JobFinished",
+            GLib.Variant(
+                "(tsxtas)", (job_id, status, scanned_files, infected_count, infected_files)
+            ),
+        )
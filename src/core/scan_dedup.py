@@ -0,0 +1,153 @@
+# ClamUI Scan Deduplication Module
+"""
+Duplicate detection for the walker-driven scan paths.
+
+Home directories, container layers and backup trees hold many hardlinks
+and byte-identical copies. ScanDeduplicator sits between the walk and
+the scanner so each distinct content is scanned once:
+
+- Hardlinks are collapsed by (st_dev, st_ino) from the walk's lstat
+  results, without reading anything.
+- With content hashing enabled, files of a size seen before are hashed
+  with SHA-256, and a file with the same size and hash as an earlier one
+  is not scanned. Only size collisions are hashed, so unique sizes cost
+  nothing extra.
+
+Verdicts are fanned out afterwards: every threat found in a scanned file
+is reported for each of its duplicates too (see expand_threats()).
+"""
+
+import os
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .quarantine.file_handler import SecureFileHandler
+from .scanner_types import ThreatDetail
+
+if TYPE_CHECKING:
+    from .settings_manager import SettingsManager
+
+
+class ScanDeduplicator:
+    """
+    Tracks the files of one scan and which of them duplicate another.
+
+    Not thread-safe; feed it from the thread that walks the scan targets.
+    """
+
+    def __init__(self, hash_content: bool = False):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            hash_content: Whether to hash same-size files to find
+                          identical copies, in addition to hardlinks
+        """
+        self._hash_content = hash_content
+        # (st_dev, st_ino) -> scanned path
+        self._by_inode: dict[tuple[int, int], str] = {}
+        # size -> first scanned path of that size, until it has been hashed
+        self._unhashed_by_size: dict[int, str] = {}
+        # Sizes of the files that have been hashed
+        self._hashed_sizes: set[int] = set()
+        # (size, sha256) -> scanned path
+        self._by_content: dict[tuple[int, str], str] = {}
+        # scanned path -> paths of its duplicates
+        self._duplicates: dict[str, list[str]] = {}
+        self._duplicate_count = 0
+
+    @property
+    def duplicate_count(self) -> int:
+        """Number of files skipped as duplicates of a scanned file."""
+        return self._duplicate_count
+
+    def add(self, path: str, st: os.stat_result) -> bool:
+        """
+        Register a walked file.
+
+        Args:
+            path: Path of the file
+            st: Its stat result from the walk
+
+        Returns:
+            True if the file must be scanned, False if it duplicates a file
+            that is already being scanned
+        """
+        inode = (st.st_dev, st.st_ino)
+        original = self._by_inode.get(inode)
+        if original is None and self._hash_content:
+            original = self._find_same_content(path, st.st_size)
+        if original is not None:
+            self._duplicates.setdefault(original, []).append(path)
+            self._duplicate_count += 1
+            return False
+        self._by_inode[inode] = path
+        return True
+
+    def duplicates_of(self, path: str) -> list[str]:
+        """
+        Get the files that were skipped as duplicates of a scanned file.
+
+        Args:
+            path: Path of a scanned file
+
+        Returns:
+            Paths of its duplicates (empty if it has none)
+        """
+        return self._duplicates.get(path, [])
+
+    def expand_threats(self, threats: list[ThreatDetail]) -> list[ThreatDetail]:
+        """
+        Get the threats found in the duplicates of the scanned files.
+
+        Args:
+            threats: Threats reported for the scanned files
+
+        Returns:
+            One ThreatDetail per duplicate of an infected file, with the
+            threat of the file it duplicates
+        """
+        return [
+            replace(threat, file_path=duplicate)
+            for threat in threats
+            for duplicate in self.duplicates_of(threat.file_path)
+        ]
+
+    def _find_same_content(self, path: str, size: int) -> str | None:
+        """Get an earlier file with the same content, or register this file's content."""
+        first = self._unhashed_by_size.pop(size, None)
+        if first is None and size not in self._hashed_sizes:
+            # First file of this size: hash it only if another one shows up
+            self._unhashed_by_size[size] = path
+            return None
+        self._hashed_sizes.add(size)
+        if first is not None:
+            first_hash, _ = SecureFileHandler.calculate_hash(Path(first))
+            if first_hash is not None:
+                self._by_content.setdefault((size, first_hash), first)
+
+        file_hash, _ = SecureFileHandler.calculate_hash(Path(path))
+        if file_hash is None:
+            # Unreadable here; let the scanner report it
+            return None
+        original = self._by_content.get((size, file_hash))
+        if original is None:
+            self._by_content[(size, file_hash)] = path
+        return original
+
+
+def create_deduplicator(settings_manager: "SettingsManager | None" = None) -> ScanDeduplicator:
+    """
+    Create a ScanDeduplicator configured from the settings.
+
+    Args:
+        settings_manager: Optional SettingsManager providing "scan_dedup_content"
+
+    Returns:
+        A new ScanDeduplicator for one scan
+    """
+    hash_content = False
+    if settings_manager is not None:
+        hash_content = settings_manager.get("scan_dedup_content", False) is True
+    return ScanDeduplicator(hash_content=hash_content)
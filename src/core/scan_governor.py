@@ -0,0 +1,494 @@
+# ClamUI Scan Governor Module
+"""
+Throttling and pausing of running scans.
+
+BatteryManager only decides whether a scheduled scan starts. While a scan
+runs, a ScanGovernor polls the power supply, the load average and the
+thermal zones of /sys/class/thermal, and moves the scan between three
+states:
+
+- RUNNING: full speed.
+- THROTTLED, on battery power, with a load average above
+  HIGH_LOAD_PER_CPU per CPU, or with a thermal zone at HOT_TEMPERATURE:
+  clamscan processes get the lowest CPU priority (nice 19) and the idle
+  I/O class, and native clamd scans keep one request in flight per clamd.
+- PAUSED, on battery power at or below "scan_governor_battery_percent",
+  with a thermal zone at CRITICAL_TEMPERATURE, or when the user paused the
+  scan: clamscan processes are stopped with SIGSTOP, and native clamd
+  scans stop submitting files once clamd answered the ones in flight.
+
+The scan resumes by itself when the condition clears; conditions clear
+with some hysteresis, so a scan doesn't flap around a threshold. A scan
+paused by the user waits for the user, and a scan the user resumed is at
+most throttled until it ends.
+
+The scan's own workers count towards the load average, which is why the
+load threshold is above one per CPU. Unprivileged processes can't raise
+their priority back, so a clamscan that was throttled usually keeps
+nice 19 until it exits.
+"""
+
+import glob
+import logging
+import os
+import signal
+import subprocess
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from .battery_manager import BatteryManager
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from .settings_manager import SettingsManager
+
+logger = logging.getLogger(__name__)
+
+# Where the kernel exposes thermal zones, temperatures in millidegrees Celsius
+THERMAL_DIR = "/sys/class/thermal"
+
+# Seconds between two looks at the system while a scan runs
+POLL_INTERVAL = 5.0
+
+# Seconds between two checks for cancellation while a scan waits to resume
+WAIT_INTERVAL = 0.5
+
+# Temperatures (°C) at which scans are throttled and paused
+HOT_TEMPERATURE = 80.0
+CRITICAL_TEMPERATURE = 90.0
+# Degrees below a threshold a zone must cool down to for the scan to speed up
+TEMPERATURE_HYSTERESIS = 5.0
+
+# 1-minute load average per CPU above which scans are throttled, and below
+# which a throttled scan speeds up again
+HIGH_LOAD_PER_CPU = 1.5
+LOW_LOAD_PER_CPU = 1.0
+
+# Percent of charge above "scan_governor_battery_percent" at which a scan
+# paused on a low battery resumes without AC power
+BATTERY_HYSTERESIS = 5.0
+
+# CPU priority of throttled clamscan processes
+THROTTLED_NICE = 19
+
+
+class GovernorState(Enum):
+    """How fast a scan may run."""
+
+    RUNNING = "running"
+    THROTTLED = "throttled"
+    PAUSED = "paused"
+
+
+@dataclass(frozen=True)
+class SystemReadings:
+    """
+    What the governor looks at.
+
+    Attributes:
+        on_battery: Whether the system runs on battery power
+        battery_percent: Battery charge (0-100), None without a battery
+        load_per_cpu: 1-minute load average divided by the CPU count,
+                      None if unknown
+        temperature: Highest temperature of the thermal zones in °C,
+                     None if none can be read
+    """
+
+    on_battery: bool = False
+    battery_percent: float | None = None
+    load_per_cpu: float | None = None
+    temperature: float | None = None
+
+
+def read_temperature(thermal_dir: str = THERMAL_DIR) -> float | None:
+    """
+    Get the highest temperature of the system's thermal zones.
+
+    Args:
+        thermal_dir: Directory holding the thermal_zone* entries
+
+    Returns:
+        Temperature in °C, or None if no zone can be read
+    """
+    highest = None
+    for temp_path in glob.glob(os.path.join(thermal_dir, "thermal_zone*", "temp")):
+        try:
+            with open(temp_path, encoding="ascii") as f:
+                temperature = int(f.read().strip()) / 1000
+        except (OSError, ValueError):
+            # Some zones (e.g. of a powered down device) refuse to be read
+            continue
+        if temperature > 0 and (highest is None or temperature > highest):
+            highest = temperature
+    return highest
+
+
+def read_load_per_cpu() -> float | None:
+    """
+    Get the 1-minute load average per CPU.
+
+    Returns:
+        Load average divided by the CPU count, or None if unknown
+    """
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return None
+
+
+def read_system(battery_manager: BatteryManager, thermal_dir: str = THERMAL_DIR) -> SystemReadings:
+    """
+    Take the readings the governor decides on.
+
+    Args:
+        battery_manager: Source of the power supply status
+        thermal_dir: Directory holding the thermal_zone* entries
+
+    Returns:
+        SystemReadings of the moment
+    """
+    battery = battery_manager.get_status()
+    return SystemReadings(
+        on_battery=battery.has_battery and not battery.is_plugged,
+        battery_percent=battery.percent,
+        load_per_cpu=read_load_per_cpu(),
+        temperature=read_temperature(thermal_dir),
+    )
+
+
+def decide(
+    readings: SystemReadings, previous: GovernorState, battery_percent: float
+) -> tuple[GovernorState, str]:
+    """
+    Decide how fast a scan may run.
+
+    Thresholds are lowered while the scan is already paused or throttled,
+    so it only speeds up once the condition has clearly gone.
+
+    Args:
+        readings: Current readings of the system
+        previous: State the system readings led to last time
+        battery_percent: Charge at or below which a scan on battery pauses
+
+    Returns:
+        Tuple of (state, reason); the reason is "" when RUNNING
+    """
+    paused = previous is GovernorState.PAUSED
+    slowed = previous is not GovernorState.RUNNING
+    temperature = readings.temperature
+    percent = readings.battery_percent
+
+    if temperature is not None and temperature >= CRITICAL_TEMPERATURE - (
+        TEMPERATURE_HYSTERESIS if paused else 0
+    ):
+        return GovernorState.PAUSED, f"Temperature at {temperature:.0f} °C"
+    if (
+        readings.on_battery
+        and percent is not None
+        and percent <= battery_percent + (BATTERY_HYSTERESIS if paused else 0)
+    ):
+        return GovernorState.PAUSED, f"Battery at {percent:.0f}%"
+    if temperature is not None and temperature >= HOT_TEMPERATURE - (
+        TEMPERATURE_HYSTERESIS if slowed else 0
+    ):
+        return GovernorState.THROTTLED, f"Temperature at {temperature:.0f} °C"
+    if readings.on_battery:
+        return GovernorState.THROTTLED, "On battery power"
+    load = readings.load_per_cpu
+    if load is not None and load >= (LOW_LOAD_PER_CPU if slowed else HIGH_LOAD_PER_CPU):
+        return GovernorState.THROTTLED, f"System load at {load:.1f} per CPU"
+    return GovernorState.RUNNING, ""
+
+
+def _signal_process(process: subprocess.Popen, signum: int) -> None:
+    """Send a signal to a process unless it has exited."""
+    try:
+        process.send_signal(signum)
+    except (OSError, ProcessLookupError):
+        pass
+
+
+def _set_process_priority(process: subprocess.Popen, throttled: bool) -> None:
+    """Give a process the lowest CPU and I/O priority, or ClamUI's own."""
+    nice = THROTTLED_NICE if throttled else os.getpriority(os.PRIO_PROCESS, 0)
+    try:
+        if os.getpriority(os.PRIO_PROCESS, process.pid) != nice:
+            os.setpriority(os.PRIO_PROCESS, process.pid, nice)
+    except PermissionError:
+        logger.debug("Cannot raise the priority of process %d back", process.pid)
+    except OSError:
+        # The process has exited
+        return
+
+    if not PSUTIL_AVAILABLE:
+        return
+    ioclass = psutil.IOPRIO_CLASS_IDLE if throttled else psutil.IOPRIO_CLASS_NONE
+    try:
+        psutil.Process(process.pid).ionice(ioclass)
+    except (psutil.Error, OSError, AttributeError, ValueError):
+        # ionice is Linux only, and the process may be gone
+        pass
+
+
+class ScanGovernor:
+    """
+    Throttles or pauses the scans of a Scanner as the system requires.
+
+    The scanner wraps each scan in watching(), which polls the system from
+    a background thread while the scan runs, and registers its clamscan
+    processes with track(). Native clamd scans read the state between two
+    submissions and call wait_while_paused(). pause() and resume() are
+    the user's controls; listeners are told of every change of state.
+    """
+
+    def __init__(
+        self,
+        settings_manager: "SettingsManager | None" = None,
+        battery_manager: BatteryManager | None = None,
+        thermal_dir: str = THERMAL_DIR,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            settings_manager: Optional SettingsManager holding
+                              "scan_governor_enabled" and
+                              "scan_governor_battery_percent"
+            battery_manager: Optional source of the power supply status
+            thermal_dir: Directory holding the thermal_zone* entries
+            poll_interval: Seconds between two looks at the system
+        """
+        self._settings_manager = settings_manager
+        self._battery_manager = battery_manager if battery_manager else BatteryManager()
+        self._thermal_dir = thermal_dir
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        # Held while a change of state is applied, so changes reach the
+        # processes and listeners in the order they were decided
+        self._apply_lock = threading.RLock()
+        self._state = GovernorState.RUNNING
+        self._reason = ""
+        self._system_state = GovernorState.RUNNING
+        self._system_reason = ""
+        self._user_paused = False
+        self._user_resumed = False
+        self._processes: list[subprocess.Popen] = []
+        self._listeners: list[Callable[[GovernorState, str], None]] = []
+        self._running = threading.Event()
+        self._running.set()
+        self._watchers = 0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def state(self) -> GovernorState:
+        """Current state of the scans."""
+        return self._state
+
+    @property
+    def reason(self) -> str:
+        """Why the scans are throttled or paused, "" when running."""
+        return self._reason
+
+    @property
+    def is_paused(self) -> bool:
+        """Whether scans must not make progress."""
+        return self._state is GovernorState.PAUSED
+
+    @property
+    def is_throttled(self) -> bool:
+        """Whether scans must leave most of the system to other work."""
+        return self._state is GovernorState.THROTTLED
+
+    def _is_enabled(self) -> bool:
+        """Whether the system readings may slow scans down."""
+        if self._settings_manager is None:
+            return True
+        return bool(self._settings_manager.get("scan_governor_enabled", True))
+
+    def _get_battery_percent(self) -> float:
+        """Get the battery charge at or below which scans pause."""
+        if self._settings_manager is None:
+            return 20
+        percent = self._settings_manager.get("scan_governor_battery_percent", 20)
+        return percent if isinstance(percent, int | float) else 20
+
+    def add_listener(self, listener: Callable[[GovernorState, str], None]) -> None:
+        """
+        Register a callback for changes of state.
+
+        Args:
+            listener: Called with (state, reason) from the thread that made
+                      the change, e.g. the governor's polling thread
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[GovernorState, str], None]) -> None:
+        """Unregister a callback registered with add_listener()."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def pause(self) -> None:
+        """Pause the running scans until resume() is called."""
+        with self._lock:
+            self._user_paused = True
+        self._update()
+
+    def resume(self) -> None:
+        """
+        Resume scans paused with pause() or by the system.
+
+        Until the scan ends, the system readings can then only throttle it.
+        """
+        with self._lock:
+            self._user_paused = False
+            self._user_resumed = True
+        self._update()
+
+    def poll(self) -> None:
+        """Look at the system once and apply the resulting state."""
+        if self._is_enabled():
+            readings = read_system(self._battery_manager, self._thermal_dir)
+            state, reason = decide(readings, self._system_state, self._get_battery_percent())
+        else:
+            state, reason = GovernorState.RUNNING, ""
+        with self._lock:
+            self._system_state = state
+            self._system_reason = reason
+        self._update()
+
+    @contextmanager
+    def watching(self) -> Iterator["ScanGovernor"]:
+        """
+        Watch the system for the duration of a scan.
+
+        Nested and concurrent scans share one polling thread. When the last
+        scan ends, the scans run at full speed again and the user's pause
+        or resume is forgotten.
+        """
+        with self._lock:
+            self._watchers += 1
+            first = self._watchers == 1
+            previous = self._thread if first else None
+        if first:
+            # The thread of the previous scan may still be finishing a poll
+            if previous is not None:
+                previous.join()
+            self._stop_event.clear()
+            # A scan on battery or on a hot system starts slowed down
+            self.poll()
+            self._thread = threading.Thread(
+                target=self._poll_loop, name="scan-governor", daemon=True
+            )
+            self._thread.start()
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._watchers -= 1
+                last = self._watchers == 0
+                if last:
+                    self._stop_event.set()
+                    self._system_state = GovernorState.RUNNING
+                    self._system_reason = ""
+                    self._user_paused = False
+                    self._user_resumed = False
+            if last:
+                self._update()
+
+    def _poll_loop(self) -> None:
+        """Poll the system until the last scan ends."""
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Scan governor failed to read the system state")
+
+    def wait_while_paused(self, is_cancelled: Callable[[], bool]) -> None:
+        """
+        Block while scans are paused.
+
+        Args:
+            is_cancelled: Callable returning True once the scan is cancelled,
+                          which ends the wait early
+        """
+        while not self._running.wait(WAIT_INTERVAL):
+            if is_cancelled():
+                return
+
+    def track(self, process: subprocess.Popen) -> None:
+        """
+        Register a scanner process, applying the current state to it.
+
+        Args:
+            process: A clamscan or clamdscan process of a running scan
+        """
+        with self._apply_lock:
+            with self._lock:
+                self._processes.append(process)
+                state = self._state
+            # A new process runs at full speed already
+            if state is not GovernorState.RUNNING:
+                self._apply(process, state)
+
+    def untrack(self, process: subprocess.Popen) -> None:
+        """Unregister a process registered with track()."""
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+
+    def _update(self) -> None:
+        """Apply the user's controls and the system state, telling listeners of a change."""
+        with self._apply_lock:
+            with self._lock:
+                if self._user_paused:
+                    state, reason = GovernorState.PAUSED, "Paused by user"
+                elif self._system_state is GovernorState.PAUSED and self._user_resumed:
+                    state, reason = GovernorState.THROTTLED, self._system_reason
+                else:
+                    state, reason = self._system_state, self._system_reason
+                if state is self._state and reason == self._reason:
+                    return
+                changed = state is not self._state
+                self._state = state
+                self._reason = reason
+                processes = list(self._processes) if changed else []
+                listeners = list(self._listeners)
+
+            if changed:
+                logger.info("Scans %s%s", state.value, f": {reason}" if reason else "")
+                if state is GovernorState.PAUSED:
+                    self._running.clear()
+                else:
+                    self._running.set()
+                for process in processes:
+                    self._apply(process, state)
+            for listener in listeners:
+                try:
+                    listener(state, reason)
+                except Exception:
+                    logger.exception("Scan governor listener failed")
+
+    @staticmethod
+    def _apply(process: subprocess.Popen, state: GovernorState) -> None:
+        """Stop, continue, throttle or unthrottle one process."""
+        if process.poll() is not None:
+            return
+        if state is GovernorState.PAUSED:
+            _signal_process(process, signal.SIGSTOP)
+            return
+        _signal_process(process, signal.SIGCONT)
+        _set_process_priority(process, throttled=state is GovernorState.THROTTLED)
@@ -0,0 +1,202 @@
+# ClamUI Scan Limits Module
+"""
+ClamAV engine limits from the options of a scan profile.
+
+ScanProfile.options may hold these keys:
+
+- "max_filesize": Skip files larger than this many MB
+- "max_scansize": Stop scanning a file after this many MB of content
+- "max_files": Maximum number of files scanned inside an archive
+- "max_recursion": Maximum nesting depth of archives
+- "max_scantime": Maximum seconds spent on one file
+- "scan_archive", "scan_pdf", "scan_ole2", "scan_html", "scan_mail",
+  "scan_pe", "scan_elf": False to turn off the parser for that file type
+- "skip_extensions": File extensions never handed to the scanner
+
+clamscan takes them all as command-line options. clamd reads its engine
+limits from clamd.conf, so for the daemon backends the walk leaves out the
+files the profile rules out instead: files above max_filesize, and files
+whose extension belongs to a turned-off type. The walk counts the files it
+leaves out by limit, which ScanResult.skipped_files reports.
+
+A clean verdict from a clamscan run under engine limits or turned-off
+parsers only covers what the engine looked at, so such runs don't record
+verdicts in the scan cache (see ScanLimits.narrows_scan).
+"""
+
+import logging
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Skip reasons reported in ScanResult.skipped_files
+SKIP_MAX_FILESIZE = "max_filesize"
+SKIP_FILE_TYPE = "file_type"
+
+# Size options, in MB
+_SIZE_OPTIONS = ("max_filesize", "max_scansize")
+
+# Count options
+_COUNT_OPTIONS = ("max_files", "max_recursion")
+
+# File types clamscan can be told not to parse, with their extensions for
+# the walker-side filter of the daemon backends
+_TYPE_EXTENSIONS: dict[str, frozenset[str]] = {
+    "archive": frozenset(
+        {"zip", "rar", "7z", "gz", "tgz", "bz2", "xz", "tar", "cab", "arj", "lzh", "ace"}
+        | {"iso", "cpio", "z", "zst", "jar", "apk"}
+    ),
+    "pdf": frozenset({"pdf"}),
+    "ole2": frozenset({"doc", "dot", "xls", "xlt", "ppt", "pps", "msi", "msg"}),
+    "html": frozenset({"html", "htm", "xhtml", "mht"}),
+    "mail": frozenset({"eml", "mbox"}),
+    "pe": frozenset({"exe", "dll", "scr", "sys", "cpl", "ocx", "com"}),
+    "elf": frozenset({"so"}),
+}
+
+_MB = 1024 * 1024
+
+
+def _positive_number(options: dict[str, Any], key: str) -> float | None:
+    """Read a positive number from the options, ignoring invalid values."""
+    value = options.get(key)
+    if isinstance(value, bool) or not isinstance(value, int | float) or value <= 0:
+        if value is not None:
+            logger.warning("Ignoring invalid scan profile option %s=%r", key, value)
+        return None
+    return value
+
+
+@dataclass(frozen=True)
+class ScanLimits:
+    """Engine limits and file filters of a scan profile."""
+
+    max_filesize: int | None = None
+    max_scansize: int | None = None
+    max_files: int | None = None
+    max_recursion: int | None = None
+    max_scantime: float | None = None
+    # File type -> whether clamscan parses it; only types set by the profile
+    file_types: dict[str, bool] = field(default_factory=dict)
+    skip_extensions: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any] | None) -> "ScanLimits":
+        """
+        Read the limits from the options of a scan profile.
+
+        Args:
+            options: ScanProfile.options, or None
+
+        Returns:
+            ScanLimits; invalid values are logged and ignored
+        """
+        if not options:
+            return cls()
+
+        sizes = {}
+        for key in _SIZE_OPTIONS:
+            value = _positive_number(options, key)
+            sizes[key] = int(value * _MB) if value is not None else None
+        counts = {}
+        for key in _COUNT_OPTIONS:
+            value = _positive_number(options, key)
+            counts[key] = int(value) if value is not None else None
+
+        file_types = {}
+        for file_type in _TYPE_EXTENSIONS:
+            value = options.get(f"scan_{file_type}")
+            if isinstance(value, bool):
+                file_types[file_type] = value
+
+        skip_extensions = options.get("skip_extensions", [])
+        if not isinstance(skip_extensions, list):
+            logger.warning("Ignoring invalid scan profile option skip_extensions")
+            skip_extensions = []
+
+        return cls(
+            **sizes,
+            **counts,
+            max_scantime=_positive_number(options, "max_scantime"),
+            file_types=file_types,
+            skip_extensions=frozenset(
+                str(extension).lower().lstrip(".") for extension in skip_extensions
+            ),
+        )
+
+    @property
+    def narrows_scan(self) -> bool:
+        """Whether clamscan may leave parts of a file it reports as OK unscanned."""
+        return any(
+            limit is not None
+            for limit in (
+                self.max_filesize,
+                self.max_scansize,
+                self.max_files,
+                self.max_recursion,
+                self.max_scantime,
+            )
+        ) or not all(self.file_types.values())
+
+    @property
+    def clamscan_args(self) -> list[str]:
+        """The limits as clamscan command-line options."""
+        args = []
+        if self.max_filesize is not None:
+            args.append(f"--max-filesize={self.max_filesize}")
+        if self.max_scansize is not None:
+            args.append(f"--max-scansize={self.max_scansize}")
+        if self.max_files is not None:
+            args.append(f"--max-files={self.max_files}")
+        if self.max_recursion is not None:
+            args.append(f"--max-recursion={self.max_recursion}")
+        if self.max_scantime is not None:
+            # clamscan takes milliseconds
+            args.append(f"--max-scantime={int(self.max_scantime * 1000)}")
+        for file_type, enabled in self.file_types.items():
+            args.append(f"--scan-{file_type}={'yes' if enabled else 'no'}")
+        if self.skip_extensions:
+            extensions = "|".join(
+                re.escape(extension) for extension in sorted(self.skip_extensions)
+            )
+            args.append(f"--exclude=\\.({extensions})$")
+        return args
+
+    def get_file_filter(
+        self, engine_types: bool = True
+    ) -> Callable[[str, os.stat_result], str | None] | None:
+        """
+        Get the walker-side filter enforcing the limits.
+
+        Args:
+            engine_types: Whether the scanner honors the file type options
+                          itself (clamscan). If False (clamd), files of the
+                          turned-off types are left out by extension.
+
+        Returns:
+            Predicate (path, stat_result) -> skip reason or None, or None
+            if no file needs to be left out
+        """
+        skipped_extensions = set(self.skip_extensions)
+        if not engine_types:
+            for file_type, enabled in self.file_types.items():
+                if not enabled:
+                    skipped_extensions |= _TYPE_EXTENSIONS[file_type]
+        max_filesize = self.max_filesize
+        if max_filesize is None and not skipped_extensions:
+            return None
+
+        def skip_reason(file_path: str, st: os.stat_result) -> str | None:
+            if max_filesize is not None and st.st_size > max_filesize:
+                return SKIP_MAX_FILESIZE
+            if skipped_extensions:
+                _, dot, extension = os.path.basename(file_path).rpartition(".")
+                if dot and extension.lower() in skipped_extensions:
+                    return SKIP_FILE_TYPE
+            return None
+
+        return skip_reason
@@ -0,0 +1,321 @@
+# ClamUI Scan Progress Module
+"""
+Progress model for running scans: throughput and ETA.
+
+ProgressTracker counts the files and bytes that got a verdict, as the
+scanner streams them, against an estimated total:
+
+- The clamscan file-list path knows the exact total once its walk (the
+  metadata pre-pass it needs anyway) has listed the files to scan.
+- The native clamd path submits files while it walks, so until the walk
+  ends the total is the larger of what has been walked and what the
+  previous run of the same targets scanned.
+
+Snapshots (ScanProgress) carry files/s, bytes/s and an ETA and are
+reported at most every PROGRESS_INTERVAL seconds, from the scanning
+thread, so consumers get coalesced updates. SequentialProgress joins the
+snapshots of scans run one after the other.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two reported snapshots
+PROGRESS_INTERVAL = 0.25
+
+# Number of target sets whose totals are remembered
+_MAX_HISTORY_ENTRIES = 50
+
+
+@dataclass(frozen=True)
+class ScanProgress:
+    """Snapshot of the progress of a scan."""
+
+    files_done: int
+    bytes_done: int
+    files_total: int | None
+    bytes_total: int | None
+    elapsed: float
+
+    @property
+    def fraction(self) -> float | None:
+        """Completed fraction (0.0 to 1.0), by bytes if known, or None if unknown."""
+        if self.bytes_total:
+            return min(self.bytes_done / self.bytes_total, 1.0)
+        if self.files_total:
+            return min(self.files_done / self.files_total, 1.0)
+        return None
+
+    @property
+    def files_per_second(self) -> float:
+        """Average number of files scanned per second."""
+        return self.files_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average number of bytes scanned per second."""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds until the scan finishes, or None if unknown."""
+        fraction = self.fraction
+        if not fraction or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1.0 - fraction) / fraction
+
+
+def get_totals_history_path() -> Path:
+    """
+    Get the file remembering the totals of previous scans.
+
+    Returns:
+        XDG_CACHE_HOME/clamui/scan_totals.json
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME", "~/.cache")
+    return Path(xdg_cache_home).expanduser() / "clamui" / "scan_totals.json"
+
+
+def _load_history(history_path: Path) -> dict[str, list[int]]:
+    """Read the remembered totals, keyed by target set."""
+    try:
+        with open(history_path, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return history if isinstance(history, dict) else {}
+
+
+def get_remembered_totals(
+    targets: list[str], history_path: Path | None = None
+) -> tuple[int, int] | None:
+    """
+    Get the totals of the last completed scan of the same targets.
+
+    Args:
+        targets: Scanned paths, in scan order
+        history_path: Optional file of the remembered totals.
+                      Defaults to XDG_CACHE_HOME/clamui/scan_totals.json
+
+    Returns:
+        Tuple of (files, bytes), or None if the targets weren't scanned yet
+    """
+    history = _load_history(history_path if history_path else get_totals_history_path())
+    previous = history.get("\n".join(targets))
+    if isinstance(previous, list) and len(previous) == 2:
+        return (int(previous[0]), int(previous[1]))
+    return None
+
+
+class ProgressTracker:
+    """
+    Thread-safe counter of the progress of one scan.
+
+    Scanners report each file they will scan with add_pending() (or the
+    whole total with set_total()) and each verdict with file_done(). The
+    callback gets a ScanProgress at most every interval seconds and once
+    more from finish().
+    """
+
+    def __init__(
+        self,
+        on_progress: Callable[[ScanProgress], None],
+        targets: list[str] | None = None,
+        interval: float = PROGRESS_INTERVAL,
+        history_path: Path | None = None,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            on_progress: Callback invoked with each snapshot, from the
+                         thread that reported the progress
+            targets: Optional scanned paths. Their previous totals are used
+                     as the estimate until the total is known, and the
+                     totals of this scan are remembered for the next one.
+            interval: Minimum seconds between two snapshots
+            history_path: Optional file for the remembered totals.
+                          Defaults to XDG_CACHE_HOME/clamui/scan_totals.json
+        """
+        self._on_progress = on_progress
+        self._interval = interval
+        self._history_path = history_path if history_path else get_totals_history_path()
+        self._history_key = "\n".join(targets) if targets else None
+
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_report = 0.0
+        self._files_done = 0
+        self._bytes_done = 0
+        self._files_pending = 0
+        self._bytes_pending = 0
+        self._total_known = False
+        self._estimate: tuple[int, int] | None = None
+        if targets:
+            self._estimate = get_remembered_totals(targets, self._history_path)
+
+    def add_pending(self, size: int) -> None:
+        """
+        Count a file that will be scanned, while the total is still unknown.
+
+        Args:
+            size: Size of the file in bytes
+        """
+        with self._lock:
+            self._files_pending += 1
+            self._bytes_pending += size
+
+    def set_total(self, files: int, size: int) -> None:
+        """
+        Set the exact total, e.g. after a pre-pass listed the files to scan.
+
+        Args:
+            files: Number of files that will be scanned
+            size: Their total size in bytes
+        """
+        with self._lock:
+            self._files_pending = files
+            self._bytes_pending = size
+            self._total_known = True
+        self._report(force=True)
+
+    def finish_walk(self) -> None:
+        """Make the files counted with add_pending() the exact total."""
+        with self._lock:
+            self._total_known = True
+        self._report(force=True)
+
+    def file_done(self, size: int = 0) -> None:
+        """
+        Count a file that got its verdict.
+
+        Args:
+            size: Size of the file in bytes
+        """
+        with self._lock:
+            self._files_done += 1
+            self._bytes_done += size
+        self._report()
+
+    def snapshot(self) -> ScanProgress:
+        """
+        Get the current progress.
+
+        Returns:
+            ScanProgress with the counts so far
+        """
+        with self._lock:
+            files_total, bytes_total = self._files_pending, self._bytes_pending
+            if not self._total_known and self._estimate is not None:
+                files_total = max(files_total, self._estimate[0])
+                bytes_total = max(bytes_total, self._estimate[1])
+            known = self._total_known or self._estimate is not None
+            return ScanProgress(
+                files_done=self._files_done,
+                bytes_done=self._bytes_done,
+                files_total=files_total if known else None,
+                bytes_total=bytes_total if known else None,
+                elapsed=time.monotonic() - self._start,
+            )
+
+    def finish(self, completed: bool = True) -> None:
+        """
+        Report the final progress.
+
+        Args:
+            completed: Whether the scan ran to the end. Only the totals of
+                       a completed scan are remembered for the next one.
+        """
+        self._report(force=True)
+        with self._lock:
+            if not completed or not self._total_known or self._history_key is None:
+                return
+            totals = [self._files_pending, self._bytes_pending]
+        self._save_totals(totals)
+
+    def _report(self, force: bool = False) -> None:
+        """Invoke the callback if the interval has passed since the last report."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self._interval:
+                return
+            self._last_report = now
+        self._on_progress(self.snapshot())
+
+    def _save_totals(self, totals: list[int]) -> None:
+        """Remember the totals of this scan for the next scan of the same targets."""
+        history = _load_history(self._history_path)
+        history.pop(self._history_key, None)
+        history[self._history_key] = totals
+        # Dicts keep insertion order, so the first entries are the oldest
+        for key in list(history)[:-_MAX_HISTORY_ENTRIES]:
+            del history[key]
+        try:
+            self._history_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self._history_path.parent, delete=False, encoding="utf-8"
+            ) as f:
+                json.dump(history, f)
+            os.replace(f.name, self._history_path)
+        except OSError as e:
+            logger.debug("Cannot save scan totals to %s: %s", self._history_path, e)
+
+
+class SequentialProgress:
+    """
+    Reports the progress of scans run one after the other as one scan.
+
+    Each scan counts its progress from zero; the files and bytes of the
+    scans before it are added, so the counts only move forward. The total
+    of the remaining scans isn't known, so it is reported as unknown.
+    """
+
+    def __init__(self, on_progress: Callable[[ScanProgress], None]):
+        """
+        Initialize the reporter.
+
+        Args:
+            on_progress: Callback invoked with each combined snapshot
+        """
+        self._on_progress = on_progress
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._files_before = 0
+        self._bytes_before = 0
+        self._last: ScanProgress | None = None
+
+    def next_scan(self) -> Callable[[ScanProgress], None]:
+        """
+        Start the next scan, adding the last snapshot of the previous one.
+
+        Returns:
+            Progress callback for the next scan
+        """
+        with self._lock:
+            if self._last is not None:
+                self._files_before += self._last.files_done
+                self._bytes_before += self._last.bytes_done
+                self._last = None
+        return self._report
+
+    def _report(self, progress: ScanProgress) -> None:
+        """Report a snapshot of the current scan as one of the whole sequence."""
+        with self._lock:
+            self._last = progress
+            combined = ScanProgress(
+                files_done=self._files_before + progress.files_done,
+                bytes_done=self._bytes_before + progress.bytes_done,
+                files_total=None,
+                bytes_total=None,
+                elapsed=time.monotonic() - self._start,
+            )
+        self._on_progress(combined)
@@ -0,0 +1,374 @@
+# ClamUI Scan Queue Module
+"""
+Central queue for scan jobs submitted by other tools.
+
+ScanJobQueue runs the scans requested through the D-Bus service (see
+scan_dbus), so concurrent requests share scanners instead of each paying
+the full scan startup:
+
+- A request whose paths are all covered by a running job joins it.
+- Requests for overlapping paths (the same path, or one inside the other)
+  are merged while they wait, keeping the higher priority.
+- Waiting jobs run by priority (interactive before scheduled), then in
+  submission order, at most max_concurrent at a time.
+
+Every request gets a job id. Ids of merged requests stay valid: progress
+is reported for each of them, and results for the paths each one asked
+for. Cancelling a request detaches it from its job; the job itself is
+cancelled once no request is left.
+"""
+
+import itertools
+import logging
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+
+from .scan_progress import ScanProgress
+from .scan_walker import WalkStats
+from .scanner import Scanner
+from .scanner_base import create_error_result, find_target, split_result_by_target
+from .scanner_types import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# Default number of jobs scanned at the same time
+DEFAULT_MAX_CONCURRENT = 2
+
+
+class JobPriority(IntEnum):
+    """Priority of a scan job; lower values run first."""
+
+    INTERACTIVE = 0
+    SCHEDULED = 1
+
+
+class JobState(Enum):
+    """State of a scan job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class ScanJob:
+    """A scan job and the requests merged into it."""
+
+    id: int
+    paths: list[str]
+    priority: JobPriority
+    sequence: int
+    state: JobState = JobState.QUEUED
+    # Paths asked for by each request served by this job, by request id
+    requests: dict[int, list[str]] = field(default_factory=dict)
+    scanner: Scanner | None = None
+
+    @property
+    def ids(self) -> list[int]:
+        """Ids of all requests served by this job."""
+        return list(self.requests)
+
+
+def _is_within(path: str, parent: str) -> bool:
+    """Check whether path is parent or lies below it."""
+    return path == parent or path.startswith(parent.rstrip("/") + "/")
+
+
+def _covers(paths: list[str], others: list[str]) -> bool:
+    """Check whether every path of others lies within one of paths."""
+    return all(any(_is_within(other, path) for path in paths) for other in others)
+
+
+def _overlaps(paths: list[str], others: list[str]) -> bool:
+    """Check whether a path of paths and a path of others contain each other."""
+    return any(_is_within(a, b) or _is_within(b, a) for a in paths for b in others)
+
+
+def merge_paths(paths: list[str]) -> list[str]:
+    """
+    Reduce paths to those not contained in another one.
+
+    Args:
+        paths: Absolute paths
+
+    Returns:
+        The outermost paths, in their original order
+    """
+    merged: list[str] = []
+    for path in dict.fromkeys(paths):
+        if any(_is_within(path, other) for other in paths if other != path):
+            continue
+        merged.append(path)
+    return merged
+
+
+def select_results(results: list[ScanResult], paths: list[str]) -> list[ScanResult]:
+    """
+    Select the results of a request from the results of the job serving it.
+
+    A path the job scanned as part of a broader one gets its share of that
+    result. The walk only counted the broader path, so the file and
+    directory counts of its share are unknown (-1).
+
+    Args:
+        results: Results of the job, one per job path
+        paths: Paths of the request, each within a job path
+
+    Returns:
+        List of ScanResults, one per request path
+    """
+    job_paths = [result.path for result in results]
+    selected = []
+    for path in paths:
+        index = find_target(path, job_paths)
+        if index is None:
+            continue
+        result = results[index]
+        if os.path.normpath(result.path) == os.path.normpath(path):
+            selected.append(result)
+        else:
+            # The broader path takes the threats and output outside this one
+            unknown = WalkStats(files=-1, dirs=-1)
+            selected.append(
+                split_result_by_target(result, [path, result.path], [unknown, WalkStats()])[0]
+            )
+    return selected
+
+
+class ScanJobQueue:
+    """
+    Thread-safe queue running scan jobs on a bounded pool of workers.
+
+    Callbacks are invoked from the worker threads.
+    """
+
+    def __init__(
+        self,
+        scanner_factory: Callable[[], Scanner],
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        on_job_started: Callable[[int], None] | None = None,
+        on_job_progress: Callable[[int, ScanProgress], None] | None = None,
+        on_job_finished: Callable[[int, list[ScanResult]], None] | None = None,
+    ):
+        """
+        Initialize the queue. Workers are started on the first submission.
+
+        Args:
+            scanner_factory: Creates the Scanner of a worker. Each worker
+                             keeps its own, since a Scanner runs one scan
+                             at a time.
+            max_concurrent: Maximum number of jobs scanned at the same time
+            on_job_started: Optional callback with the id of each request
+                            whose job starts scanning
+            on_job_progress: Optional callback with the id of each request
+                             and the progress of its job
+            on_job_finished: Optional callback with the id of each request
+                             and the results of its job, one per path of
+                             the request. A cancelled request gets an
+                             empty list.
+        """
+        self._scanner_factory = scanner_factory
+        self._max_concurrent = max(1, max_concurrent)
+        self._on_job_started = on_job_started
+        self._on_job_progress = on_job_progress
+        self._on_job_finished = on_job_finished
+
+        self._condition = threading.Condition()
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._queued: list[ScanJob] = []
+        self._running: list[ScanJob] = []
+        self._workers: list[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, paths: list[str], priority: JobPriority = JobPriority.INTERACTIVE) -> int:
+        """
+        Request a scan.
+
+        Args:
+            paths: Files and directories to scan
+            priority: Priority of the request
+
+        Returns:
+            Id of the request, used in the callbacks
+
+        Raises:
+            ValueError: If no path is given
+            RuntimeError: If the queue was shut down
+        """
+        paths = merge_paths([os.path.abspath(os.path.expanduser(path)) for path in paths])
+        if not paths:
+            raise ValueError("No paths to scan")
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("The scan queue was shut down")
+            job_id = next(self._ids)
+
+            for job in self._running:
+                if _covers(job.paths, paths):
+                    job.requests[job_id] = paths
+                    logger.debug("Scan request %d joined running job %d", job_id, job.id)
+                    return job_id
+
+            overlapping = [job for job in self._queued if _overlaps(job.paths, paths)]
+            if overlapping:
+                target = min(overlapping, key=lambda job: job.sequence)
+                for job in overlapping:
+                    if job is not target:
+                        self._queued.remove(job)
+                        target.paths.extend(job.paths)
+                        target.requests.update(job.requests)
+                        target.priority = min(target.priority, job.priority)
+                target.paths = merge_paths(target.paths + paths)
+                target.requests[job_id] = paths
+                target.priority = min(target.priority, priority)
+                logger.debug("Scan request %d merged into job %d", job_id, target.id)
+                return job_id
+
+            self._queued.append(
+                ScanJob(job_id, paths, priority, next(self._sequence), requests={job_id: paths})
+            )
+            self._ensure_workers()
+            self._condition.notify()
+            return job_id
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a request.
+
+        The request is detached from the job serving it. The job is only
+        cancelled if no other request is left; a waiting job drops the
+        paths no remaining request asked for.
+
+        Args:
+            job_id: Id returned by submit()
+
+        Returns:
+            True if a waiting or running request was cancelled
+        """
+        with self._condition:
+            job = next((job for job in self._running if job_id in job.requests), None)
+            if job is not None:
+                if len(job.requests) > 1:
+                    del job.requests[job_id]
+                    logger.debug("Scan request %d left running job %d", job_id, job.id)
+                else:
+                    # The worker reports the cancelled job once its scan stops
+                    job.state = JobState.CANCELLED
+                    if job.scanner is not None:
+                        job.scanner.cancel()
+                    return True
+            else:
+                job = next((job for job in self._queued if job_id in job.requests), None)
+                if job is None:
+                    return False
+                del job.requests[job_id]
+                if job.requests:
+                    job.paths = merge_paths(
+                        [path for paths in job.requests.values() for path in paths]
+                    )
+                else:
+                    self._queued.remove(job)
+                    job.state = JobState.CANCELLED
+        if self._on_job_finished is not None:
+            self._on_job_finished(job_id, [])
+        return True
+
+    def get_jobs(self) -> list[ScanJob]:
+        """
+        Get the running and waiting jobs.
+
+        Returns:
+            Running jobs, then waiting jobs in the order they will run
+        """
+        with self._condition:
+            return [*self._running, *sorted(self._queued, key=self._job_order)]
+
+    def shutdown(self) -> None:
+        """Cancel all jobs and stop the workers."""
+        with self._condition:
+            self._shutdown = True
+            queued = self._queued
+            self._queued = []
+            for job in self._running:
+                job.state = JobState.CANCELLED
+                if job.scanner is not None:
+                    job.scanner.cancel()
+            self._condition.notify_all()
+        for job in queued:
+            job.state = JobState.CANCELLED
+            self._report_finished(job, [])
+
+    @staticmethod
+    def _job_order(job: ScanJob) -> tuple[int, int]:
+        """Sort key ordering jobs by priority, then submission order."""
+        return (job.priority, job.sequence)
+
+    def _ensure_workers(self) -> None:
+        """Start another worker if jobs wait for one and the pool isn't full. Caller holds the lock."""
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        idle_workers = len(self._workers) - len(self._running)
+        if len(self._workers) < self._max_concurrent and idle_workers < len(self._queued):
+            worker = threading.Thread(
+                target=self._work, name=f"scan-queue-{len(self._workers)}", daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self) -> None:
+        """Run waiting jobs until the queue is shut down."""
+        scanner = self._scanner_factory()
+        while True:
+            with self._condition:
+                while not self._queued and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                job = min(self._queued, key=self._job_order)
+                self._queued.remove(job)
+                job.state = JobState.RUNNING
+                job.scanner = scanner
+                self._running.append(job)
+                job_ids = job.ids
+            if self._on_job_started is not None:
+                for job_id in job_ids:
+                    self._on_job_started(job_id)
+
+            results = self._run_job(job, scanner)
+
+            with self._condition:
+                self._running.remove(job)
+                job.scanner = None
+                if job.state != JobState.CANCELLED:
+                    job.state = JobState.FINISHED
+            self._report_finished(job, results if job.state == JobState.FINISHED else [])
+
+    def _run_job(self, job: ScanJob, scanner: Scanner) -> list[ScanResult]:
+        """Scan the paths of a job."""
+
+        def on_progress(progress: ScanProgress) -> None:
+            if self._on_job_progress is not None:
+                with self._condition:
+                    job_ids = job.ids
+                for job_id in job_ids:
+                    self._on_job_progress(job_id, progress)
+
+        try:
+            return scanner.scan_targets(list(job.paths), on_progress=on_progress)
+        except Exception as e:
+            logger.error("Scan job %d failed: %s", job.id, e)
+            return [create_error_result(path, f"Scan failed: {e}") for path in job.paths]
+
+    def _report_finished(self, job: ScanJob, results: list[ScanResult]) -> None:
+        """Report the results of a job to every request it served."""
+        if self._on_job_finished is None:
+            return
+        with self._condition:
+            requests = dict(job.requests)
+        for job_id, paths in requests.items():
+            self._on_job_finished(job_id, select_results(results, paths) if results else [])
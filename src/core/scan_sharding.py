@@ -0,0 +1,182 @@
+# ClamUI Scan Sharding Module
+"""
+Helpers for splitting a clamscan run across several worker processes.
+
+clamscan is single threaded, so on multi-core machines the standalone
+backend can run several clamscan processes on disjoint file lists. Each
+worker loads its own copy of the signature database, which bounds the
+number of workers by available memory as well as by CPU count.
+"""
+
+import heapq
+import math
+import os
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Approximate resident memory of one clamscan with the full signature set loaded
+WORKER_MEMORY_BYTES = 1536 * 1024 * 1024
+
+# Below this many files per worker, the database load time outweighs the gain
+MIN_FILES_PER_WORKER = 200
+
+# Marker line that starts clamscan's summary block
+SUMMARY_MARKER = "----------- SCAN SUMMARY -----------"
+
+# Summary counters that are added up across workers
+_SUMMED_SUMMARY_KEYS = ("Scanned directories", "Scanned files", "Infected files", "Total errors")
+
+# Summary lines that are identical for every worker
+_SHARED_SUMMARY_KEYS = ("Known viruses", "Engine version")
+
+
+def get_available_memory() -> int | None:
+    """
+    Get the amount of memory available to new processes.
+
+    Returns:
+        Available memory in bytes, or None if it cannot be determined
+    """
+    if PSUTIL_AVAILABLE:
+        try:
+            return int(psutil.virtual_memory().available)
+        except Exception:
+            pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def get_max_workers(configured: int = 0) -> int:
+    """
+    Get the maximum number of clamscan workers for this machine.
+
+    Args:
+        configured: Worker count from settings. 0 sizes it automatically
+                    from the CPU count and available memory.
+
+    Returns:
+        Maximum number of workers (at least 1)
+    """
+    if configured > 0:
+        return configured
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    available = get_available_memory()
+    if available is not None:
+        cpus = min(cpus, available // WORKER_MEMORY_BYTES)
+    return max(1, cpus)
+
+
+def get_worker_count(file_count: int, max_workers: int) -> int:
+    """
+    Get the number of workers to use for a given number of files.
+
+    Args:
+        file_count: Number of files to scan
+        max_workers: Upper bound from get_max_workers()
+
+    Returns:
+        Number of workers (at least 1)
+    """
+    return max(1, min(max_workers, math.ceil(file_count / MIN_FILES_PER_WORKER)))
+
+
+def partition_files(files: dict[str, os.stat_result], shard_count: int) -> list[list[str]]:
+    """
+    Split files into shards of roughly equal total size.
+
+    Files are assigned largest first to the currently smallest shard, which
+    keeps one worker from being left with all the big archives.
+
+    Args:
+        files: Mapping of file path to its stat result
+        shard_count: Number of shards to produce
+
+    Returns:
+        List of non-empty shards, each a list of file paths
+    """
+    heap = [(0, index) for index in range(shard_count)]
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    for file_path, st in sorted(files.items(), key=lambda item: item[1].st_size, reverse=True):
+        total, index = heapq.heappop(heap)
+        shards[index].append(file_path)
+        heapq.heappush(heap, (total + st.st_size, index))
+    return [shard for shard in shards if shard]
+
+
+def merge_exit_codes(exit_codes: list[int | None]) -> int:
+    """
+    Combine worker exit codes into one clamscan-style exit code.
+
+    Args:
+        exit_codes: Exit code of each worker
+
+    Returns:
+        1 if any worker found a threat, else 2 if any failed, else 0
+    """
+    if 1 in exit_codes:
+        return 1
+    if any(code != 0 for code in exit_codes):
+        return 2
+    return 0
+
+
+def merge_clamscan_output(outputs: list[str]) -> str:
+    """
+    Merge the stdout of several clamscan workers.
+
+    Per-file lines are kept in worker order, and the per-worker summary
+    blocks are replaced by a single summary with the counters added up.
+
+    Args:
+        outputs: stdout of each worker
+
+    Returns:
+        Merged stdout in clamscan's format
+    """
+    file_lines: list[str] = []
+    totals = dict.fromkeys(_SUMMED_SUMMARY_KEYS, 0)
+    shared: dict[str, str] = {}
+    has_summary = False
+
+    for output in outputs:
+        in_summary = False
+        for line in output.splitlines():
+            if line.strip() == SUMMARY_MARKER:
+                in_summary = has_summary = True
+                continue
+            if not in_summary:
+                if line.strip():
+                    file_lines.append(line)
+                continue
+            key, _, value = line.partition(":")
+            if key in totals:
+                try:
+                    totals[key] += int(value.strip())
+                except ValueError:
+                    pass
+            elif key in _SHARED_SUMMARY_KEYS:
+                shared.setdefault(key, value.strip())
+
+    if not has_summary:
+        return "\n".join(file_lines)
+
+    summary = [SUMMARY_MARKER]
+    summary.extend(f"{key}: {value}" for key, value in shared.items())
+    summary.extend(
+        f"{key}: {value}"
+        for key, value in totals.items()
+        if value or key != "Total errors"  # clamscan omits a zero error count
+    )
+    return "\n".join(file_lines + [""] + summary)
@@ -0,0 +1,221 @@
+# ClamUI Scan Walker Module
+"""
+Filesystem walker shared by the walker-driven scan paths.
+
+Both backends can feed ClamAV an explicit list of files instead of letting
+it recurse on its own (clamscan/clamdscan --file-list, clamd FILDES/INSTREAM).
+This module produces that list in a single pass, without following symlinks
+(matching ClamAV's recursive defaults), and keeps file/directory counts
+as it goes. Exclusions are applied while walking, so excluded directories
+are never read. An optional file filter leaves out files a scan profile
+rules out (see scan_limits); they are counted by reason instead.
+"""
+
+import os
+import stat
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class WalkStats:
+    """Counters collected while walking a scan target."""
+
+    files: int = 0
+    dirs: int = 0
+    # Files left out by the file filter, by skip reason
+    skipped: dict[str, int] = field(default_factory=dict)
+
+
+def merge_skipped(stats: Iterable[WalkStats]) -> dict[str, int]:
+    """
+    Add up the skipped file counts of several walks.
+
+    Args:
+        stats: WalkStats of the walks
+
+    Returns:
+        Number of skipped files by skip reason
+    """
+    skipped: dict[str, int] = {}
+    for walk_stats in stats:
+        for reason, count in walk_stats.skipped.items():
+            skipped[reason] = skipped.get(reason, 0) + count
+    return skipped
+
+
+def iter_scan_files(
+    path: str,
+    recursive: bool = True,
+    is_excluded: Callable[[str, bool], bool] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    stats: WalkStats | None = None,
+    skip_file: Callable[[str, os.stat_result], str | None] | None = None,
+) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    Yield the regular files below a scan target with their lstat results.
+
+    Symlinks, sockets, FIFOs and device nodes are skipped. Unreadable
+    directories are skipped silently, like ClamAV does.
+
+    Args:
+        path: File or directory to walk
+        recursive: Whether to descend into subdirectories
+        is_excluded: Optional predicate (path, is_dir) -> bool; excluded
+                     directories are pruned without being read
+        is_cancelled: Optional callable checked between directories
+        stats: Optional WalkStats updated with counts of yielded files,
+               visited directories (including the root) and skipped files
+        skip_file: Optional filter (path, stat_result) -> skip reason or
+                   None; files it gives a reason for are not yielded
+
+    Yields:
+        Tuples of (file_path, stat_result)
+    """
+    try:
+        root_stat = os.stat(path)
+    except OSError:
+        return
+
+    def is_skipped(file_path: str, file_stat: os.stat_result) -> bool:
+        reason = skip_file(file_path, file_stat) if skip_file is not None else None
+        if reason is not None and stats is not None:
+            stats.skipped[reason] = stats.skipped.get(reason, 0) + 1
+        return reason is not None
+
+    if not stat.S_ISDIR(root_stat.st_mode):
+        if stat.S_ISREG(root_stat.st_mode) and not (is_excluded and is_excluded(path, False)):
+            if is_skipped(path, root_stat):
+                return
+            if stats is not None:
+                stats.files += 1
+            yield path, root_stat
+        return
+
+    if stats is not None:
+        stats.dirs += 1
+
+    pending = [path]
+    while pending:
+        if is_cancelled is not None and is_cancelled():
+            return
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                entry_list = list(entries)
+        except OSError:
+            continue
+
+        for entry in entry_list:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not recursive or (is_excluded and is_excluded(entry.path, True)):
+                        continue
+                    if stats is not None:
+                        stats.dirs += 1
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if is_excluded and is_excluded(entry.path, False):
+                        continue
+                    entry_stat = entry.stat(follow_symlinks=False)
+                    if skip_file is not None and is_skipped(entry.path, entry_stat):
+                        continue
+                    if stats is not None:
+                        stats.files += 1
+                    yield entry.path, entry_stat
+            except OSError:
+                continue
+
+
+def iter_target_files(
+    paths: list[str],
+    recursive: bool = True,
+    is_excluded: Callable[[str, bool], bool] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    stats: list[WalkStats] | None = None,
+    skip_file: Callable[[str, os.stat_result], str | None] | None = None,
+) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    Yield the regular files of several scan targets, each file once.
+
+    A target inside another target is pruned from the outer walk and
+    walked on its own, so every file is counted for its most specific
+    target (see scanner_base.find_target()).
+
+    Args:
+        paths: Distinct files or directories to walk
+        recursive: Whether to descend into subdirectories
+        is_excluded: Optional predicate (path, is_dir) -> bool
+        is_cancelled: Optional callable checked between directories
+        stats: Optional WalkStats per target, updated like iter_scan_files()
+        skip_file: Optional file filter, see iter_scan_files()
+
+    Yields:
+        Tuples of (file_path, stat_result)
+    """
+    roots = {os.path.normpath(path) for path in paths}
+    for index, path in enumerate(paths):
+        other_roots = roots - {os.path.normpath(path)}
+
+        def excluded(entry_path: str, is_dir: bool, other_roots=other_roots) -> bool:
+            return entry_path in other_roots or bool(
+                is_excluded and is_excluded(entry_path, is_dir)
+            )
+
+        if is_cancelled is not None and is_cancelled():
+            return
+        yield from iter_scan_files(
+            path,
+            recursive,
+            excluded if other_roots else is_excluded,
+            is_cancelled,
+            stats[index] if stats is not None else None,
+            skip_file,
+        )
+
+
+def write_file_list(paths: Iterable[str]) -> tuple[str, int]:
+    """
+    Write paths to a temporary list file for ClamAV's --file-list option.
+
+    The file is created in XDG_CACHE_HOME/clamui, which is also readable
+    by host commands run from the Flatpak sandbox. The caller must delete
+    it once the scan is done.
+
+    Args:
+        paths: File paths to list
+
+    Returns:
+        Tuple of (list_file_path, number_of_paths)
+
+    Raises:
+        ValueError: If a path contains a newline and cannot be listed
+        OSError: If the list file cannot be written
+    """
+    list_dir = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "clamui"
+    list_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=list_dir,
+        prefix="scan-",
+        suffix=".lst",
+        delete=False,
+        encoding="utf-8",
+        errors="surrogateescape",
+    ) as list_file:
+        try:
+            for file_path in paths:
+                # The list is newline separated
+                if "\n" in file_path:
+                    raise ValueError(f"Cannot list path containing a newline: {file_path!r}")
+                list_file.write(file_path)
+                list_file.write("\n")
+                count += 1
+        except BaseException:
+            list_file.close()
+            os.unlink(list_file.name)
+            raise
+    return list_file.name, count
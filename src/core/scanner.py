@@ -3,34 +3,65 @@
 Scanner module for ClamUI providing ClamAV subprocess execution and async scanning.
 """
 
-import fnmatch
 import logging
+import os
 import re
 import subprocess
 import threading
 import time
 from collections.abc import Callable
+from functools import wraps
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from gi.repository import GLib
 
+from .backend_selection import (
+    CLAMSCAN,
+    DAEMON,
+    DEFAULT_CLAMD_THREADS,
+    LEARNED_COSTS_TTL,
+    MANAGED,
+    BackendCost,
+    choose_backend,
+    estimate_workload,
+    get_clamd_max_threads,
+    get_default_costs,
+    learn_backend_costs,
+)
+from .exclusion_matcher import get_exclusion_matcher, glob_to_regex
 from .flatpak import get_clamav_database_dir, is_flatpak
+from .health_probe import CLAMDSCAN_CHECK, CLAMSCAN_CHECK, HealthProbe
 from .log_manager import LogManager
+from .package_verify import create_package_verifier
+from .scan_cache import ScanCache
+from .scan_checkpoint import ScanCheckpoint
+from .scan_dedup import create_deduplicator
+from .scan_governor import ScanGovernor
+from .scan_limits import ScanLimits
+from .scan_ordering import is_risk_ordering_enabled, sort_by_risk
+from .scan_progress import ProgressTracker, ScanProgress, SequentialProgress
+from .scan_sharding import (
+    get_max_workers,
+    get_worker_count,
+    merge_clamscan_output,
+    merge_exit_codes,
+    partition_files,
+)
+from .scan_walker import WalkStats, iter_target_files, merge_skipped, write_file_list
 from .scanner_base import (
+    ScanOutputParser,
     cleanup_process,
-    communicate_with_cancel_check,
     create_cancelled_result,
     create_error_result,
     save_scan_log,
+    split_result_by_target,
+    stream_with_cancel_check,
     terminate_process_gracefully,
 )
 from .scanner_types import ScanResult, ScanStatus, ThreatDetail
 from .settings_manager import SettingsManager
-from .threat_classifier import (
-    categorize_threat,
-    classify_threat_severity_str,
-)
+from .threat_store import ThreatList
 from .utils import (
     check_clamav_installed,
     check_clamd_connection,
@@ -41,43 +72,11 @@ from .utils import (
 
 if TYPE_CHECKING:
     from .daemon_scanner import DaemonScanner
+    from .managed_clamd import ManagedClamd
 
 logger = logging.getLogger(__name__)
 
 
-def glob_to_regex(pattern: str) -> str:
-    """
-    Convert a user-friendly glob pattern to POSIX ERE for ClamAV.
-
-    Uses fnmatch.translate() for conversion and strips Python-specific
-    regex suffixes for ClamAV compatibility. Adds anchors (^ and $) to ensure
-    the pattern matches the entire string, not just a substring.
-
-    Note: fnmatch doesn't support '**' recursive wildcards - document as limitation.
-
-    Args:
-        pattern: Glob pattern (e.g., '*.log', 'node_modules', '/tmp/*')
-
-    Returns:
-        POSIX Extended Regular Expression string with anchors
-    """
-    regex = fnmatch.translate(pattern)
-    # Strip fnmatch's \Z(?ms) suffix for ClamAV compatibility
-    # fnmatch.translate() adds (?s:...) wrapper and \Z anchor
-    # We need to remove these for ClamAV's regex engine
-    if regex.endswith(r"\Z"):
-        regex = regex[:-2]
-    # Handle newer Python versions that use (?s:pattern)\Z format
-    if regex.startswith("(?s:") and regex.endswith(")"):
-        regex = regex[4:-1]
-    # Add anchors to ensure full string match (prevents substring matching)
-    if not regex.startswith("^"):
-        regex = "^" + regex
-    if not regex.endswith("$"):
-        regex = regex + "$"
-    return regex
-
-
 def validate_pattern(pattern: str) -> bool:
     """
     Validate that a pattern can be converted and compiled as regex.
@@ -97,6 +96,17 @@ def validate_pattern(pattern: str) -> bool:
         return False
 
 
+def _governed(method: Callable) -> Callable:
+    """Run a scan method of the Scanner while its governor watches the system."""
+
+    @wraps(method)
+    def wrapper(self: "Scanner", *args, **kwargs):
+        with self._governor.watching():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 # Re-export types for backwards compatibility
 __all__ = [
     "ScanStatus",
@@ -113,16 +123,26 @@ class Scanner:
     ClamAV scanner with async execution support.
 
     Supports multiple scan backends:
-    - "auto": Prefer daemon if available, fallback to clamscan
+    - "auto": Pick the cheapest available backend for the workload
+      (see backend_selection), clamscan if no daemon is running
     - "daemon": Use clamd daemon only (error if unavailable)
     - "clamscan": Use standalone clamscan only
+    - "managed": Use a private clamd started by ClamUI, fallback to clamscan
 
     Provides methods for running scans in a background thread
     while safely updating the UI via GLib.idle_add.
     """
 
     def __init__(
-        self, log_manager: LogManager | None = None, settings_manager: SettingsManager | None = None
+        self,
+        log_manager: LogManager | None = None,
+        settings_manager: SettingsManager | None = None,
+        scan_cache: ScanCache | None = None,
+        health_probe: HealthProbe | None = None,
+        managed_clamd: "ManagedClamd | None" = None,
+        save_logs: bool = True,
+        interactive: bool = True,
+        governor: ScanGovernor | None = None,
     ):
         """
         Initialize the scanner.
@@ -132,23 +152,49 @@ class Scanner:
                          If not provided, a default instance is created.
             settings_manager: Optional SettingsManager instance for reading
                               exclusion patterns and scan backend settings.
+            scan_cache: Optional ScanCache used to skip files that were
+                        already scanned clean and have not changed since.
+            health_probe: Optional HealthProbe caching backend availability
+                          checks. Share one between scanners to share its
+                          results; if not provided, a private one is created.
+            managed_clamd: Optional ManagedClamd used by the "managed" backend.
+                           If not provided, the process-wide one is used.
+            save_logs: Whether each scan saves its result to the log manager.
+                       Callers that log results in groups turn it off.
+            interactive: Whether the scans are started by the user. Scheduled
+                         and watch folder scans leave clamd threads to other
+                         clients, see clamd_concurrency.
+            governor: Optional ScanGovernor throttling or pausing the scans
+                      on battery, high load or heat, and on pause(). If not
+                      provided, a private one is created.
         """
         self._current_process: subprocess.Popen | None = None
+        self._worker_processes: list[subprocess.Popen] = []
         self._process_lock = threading.Lock()
         self._cancel_event = threading.Event()
         self._log_manager = log_manager if log_manager else LogManager()
         self._settings_manager = settings_manager
+        self._scan_cache = scan_cache
+        self._health_probe = health_probe if health_probe else HealthProbe()
         self._daemon_scanner: DaemonScanner | None = None
+        self._managed_clamd = managed_clamd
+        self._managed_scanner: DaemonScanner | None = None
+        self._save_logs = save_logs
+        self._interactive = interactive
+        self._governor = governor if governor else ScanGovernor(settings_manager)
+        self._learned_costs: tuple[float, dict[str, BackendCost]] | None = None
 
     def _get_backend(self) -> str:
         """Get the configured scan backend.
 
-        In Flatpak mode, always returns "clamscan" because the bundled
-        clamdscan cannot connect to the host's clamd socket from inside
-        the sandbox.
+        In Flatpak mode, returns "clamscan" unless the private clamd is
+        selected, because the bundled clamdscan cannot connect to the
+        host's clamd socket from inside the sandbox.
         """
-        # Flatpak only supports standalone clamscan (no daemon access)
+        # Flatpak only supports standalone clamscan or its own clamd
         if is_flatpak():
+            if self._settings_manager and self._settings_manager.get("scan_backend") == "managed":
+                return "managed"
             return "clamscan"
         if self._settings_manager:
             return self._settings_manager.get("scan_backend", "auto")
@@ -160,26 +206,184 @@ class Scanner:
             from .daemon_scanner import DaemonScanner
 
             self._daemon_scanner = DaemonScanner(
-                log_manager=self._log_manager, settings_manager=self._settings_manager
+                log_manager=self._log_manager,
+                settings_manager=self._settings_manager,
+                scan_cache=self._scan_cache,
+                health_probe=self._health_probe,
+                save_logs=self._save_logs,
+                interactive=self._interactive,
+                governor=self._governor,
             )
         return self._daemon_scanner
 
+    def _get_managed_clamd(self) -> "ManagedClamd":
+        """Get the private clamd used by the "managed" backend."""
+        if self._managed_clamd is None:
+            from .managed_clamd import get_managed_clamd
+
+            self._managed_clamd = get_managed_clamd()
+        if self._settings_manager:
+            self._managed_clamd.idle_timeout = self._settings_manager.get(
+                "managed_clamd_idle_timeout", self._managed_clamd.idle_timeout
+            )
+        return self._managed_clamd
+
+    def _get_managed_scanner(self) -> "DaemonScanner":
+        """Get or create the daemon scanner talking to the private clamd."""
+        if self._managed_scanner is None:
+            from .daemon_scanner import DaemonScanner
+
+            self._managed_scanner = DaemonScanner(
+                log_manager=self._log_manager,
+                settings_manager=self._settings_manager,
+                scan_cache=self._scan_cache,
+                health_probe=self._health_probe,
+                clamd_address=self._get_managed_clamd().socket_path,
+                save_logs=self._save_logs,
+                interactive=self._interactive,
+                governor=self._governor,
+            )
+        return self._managed_scanner
+
+    def _start_managed_clamd(self) -> bool:
+        """
+        Start the private clamd if it isn't running yet.
+
+        Returns:
+            True if it is running, False if scans must fall back to clamscan
+        """
+        is_running, error = self._get_managed_clamd().ensure_running()
+        if not is_running:
+            logger.warning("Private clamd unavailable, falling back to clamscan: %s", error)
+        return is_running
+
+    def _is_daemon_reachable(self) -> bool:
+        """
+        Check whether clamd is answering.
+
+        Uses a native PING on the clamd socket, which avoids spawning a
+        process, and falls back to clamdscan --ping when no socket is usable.
+        Both results are cached by the health probe. With "daemon_endpoints"
+        set, only the configured endpoints count.
+        """
+        daemon_scanner = self._get_daemon_scanner()
+        if daemon_scanner.get_native_client() is not None:
+            return True
+        if daemon_scanner.get_endpoints():
+            return False
+        is_available, _ = self._health_probe.check(CLAMDSCAN_CHECK, check_clamd_connection)
+        return is_available
+
+    def _endpoints_unreachable(self) -> bool:
+        """
+        Check whether the configured clamd endpoints are all down.
+
+        A "daemon" scan with "daemon_endpoints" set fails over to local
+        clamscan then, instead of failing.
+
+        Returns:
+            True if endpoints are configured and none of them answers
+        """
+        daemon_scanner = self._get_daemon_scanner()
+        if not daemon_scanner.get_endpoints() or daemon_scanner.get_native_client() is not None:
+            return False
+        logger.warning("No clamd endpoint is reachable, falling back to clamscan")
+        return True
+
+    def _get_learned_costs(self) -> dict[str, BackendCost]:
+        """Get the backend costs fitted to the scan logs, reusing a recent fit."""
+        now = time.monotonic()
+        if self._learned_costs is None or now - self._learned_costs[0] > LEARNED_COSTS_TTL:
+            try:
+                costs = learn_backend_costs(self._log_manager)
+            except Exception as e:
+                logger.debug("Cannot learn backend costs from the scan logs: %s", e)
+                costs = {}
+            self._learned_costs = (now, costs)
+        return self._learned_costs[1]
+
+    def _choose_auto_backend(self, paths: list[str], recursive: bool) -> str:
+        """
+        Choose the backend of an "auto" scan.
+
+        With "auto_backend_adaptive" off, the daemon is used whenever it
+        answers. Otherwise the workload of the scan is estimated and the
+        cheapest of the running daemons and clamscan is used; the private
+        clamd is only considered while it is running already.
+
+        Args:
+            paths: Targets of the scan
+            recursive: Whether directories are scanned recursively
+
+        Returns:
+            "daemon", "managed" or "clamscan"
+        """
+        daemon_reachable = self._is_daemon_reachable()
+        if (
+            self._settings_manager is not None
+            and self._settings_manager.get("auto_backend_adaptive", True) is False
+        ):
+            return DAEMON if daemon_reachable else CLAMSCAN
+
+        available = []
+        if daemon_reachable:
+            available.append(DAEMON)
+        if self._get_managed_clamd().is_running():
+            available.append(MANAGED)
+        if not available:
+            return CLAMSCAN
+        clamscan_installed, _ = self._check_clamscan_installed()
+        if clamscan_installed:
+            available.append(CLAMSCAN)
+        if len(available) == 1:
+            return available[0]
+
+        workload = estimate_workload(paths, recursive)
+        configured_workers = 0
+        if self._settings_manager is not None:
+            configured_workers = self._settings_manager.get("clamscan_workers", 0)
+        clamscan_workers = get_worker_count(workload.files, get_max_workers(configured_workers))
+        learned = self._get_learned_costs()
+        candidates = {}
+        for backend in available:
+            if backend == CLAMSCAN:
+                default = get_default_costs(clamscan_workers, DEFAULT_CLAMD_THREADS)[CLAMSCAN]
+                candidates[backend] = learned.get(CLAMSCAN, default)
+            else:
+                # The private clamd runs with clamd's default thread count
+                threads = get_clamd_max_threads() if backend == DAEMON else DEFAULT_CLAMD_THREADS
+                default = get_default_costs(clamscan_workers, threads)[DAEMON]
+                candidates[backend] = learned.get(DAEMON, default)
+
+        backend, reason = choose_backend(candidates, workload)
+        logger.info("Auto backend %s for %s: %s", backend, ", ".join(paths), reason)
+        return backend
+
+    def _check_clamscan_installed(self) -> tuple[bool, str | None]:
+        """Check if clamscan is installed, reusing a recent result."""
+        return self._health_probe.check(CLAMSCAN_CHECK, check_clamav_installed)
+
     def get_active_backend(self) -> str:
         """
         Get the backend that will actually be used for scanning.
 
         Returns:
-            "daemon" if daemon will be used, "clamscan" otherwise
+            "daemon" if daemon will be used, "managed" if the private clamd
+            will be used, "clamscan" otherwise
         """
         backend = self._get_backend()
         if backend == "clamscan":
             return "clamscan"
+        elif backend == "managed":
+            is_available, _ = self._get_managed_clamd().check_available()
+            return "managed" if is_available else "clamscan"
         elif backend == "daemon":
+            if self._endpoints_unreachable():
+                return "clamscan"
             is_available, _ = self._get_daemon_scanner().check_available()
             return "daemon" if is_available else "unavailable"
         else:  # auto
-            is_available, _ = check_clamd_connection()
-            return "daemon" if is_available else "clamscan"
+            return "daemon" if self._is_daemon_reachable() else "clamscan"
 
     def check_available(self) -> tuple[bool, str | None]:
         """
@@ -191,18 +395,32 @@ class Scanner:
         backend = self._get_backend()
 
         if backend == "clamscan":
-            return check_clamav_installed()
+            return self._check_clamscan_installed()
         elif backend == "daemon":
+            if self._endpoints_unreachable():
+                return self._check_clamscan_installed()
             return self._get_daemon_scanner().check_available()
+        elif backend == "managed":
+            is_available, _ = self._get_managed_clamd().check_available()
+            if is_available:
+                return (True, "Using private clamd")
+            return self._check_clamscan_installed()
         else:  # auto
             # For auto, check if daemon is available, otherwise fallback to clamscan
-            is_daemon_available, _ = check_clamd_connection()
-            if is_daemon_available:
+            if self._is_daemon_reachable():
                 return (True, "Using clamd daemon")
-            return check_clamav_installed()
+            return self._check_clamscan_installed()
 
+    @_governed
     def scan_sync(
-        self, path: str, recursive: bool = True, profile_exclusions: dict | None = None
+        self,
+        path: str,
+        recursive: bool = True,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
     ) -> ScanResult:
         """
         Execute a synchronous scan on the given path.
@@ -215,6 +433,16 @@ class Scanner:
             recursive: Whether to scan directories recursively
             profile_exclusions: Optional exclusions from a scan profile.
                                Format: {"paths": ["/path1", ...], "patterns": ["*.ext", ...]}
+            on_threat: Optional callback invoked from the scanning thread with
+                       each ThreatDetail as soon as the scanner reports it.
+            checkpoint: Optional started ScanCheckpoint of the job. Progress
+                        is recorded in it, and files it completed before
+                        the scan was resumed are skipped.
+            on_progress: Optional callback invoked from the scanning thread
+                         with coalesced ScanProgress snapshots (files and
+                         bytes done, throughput and ETA).
+            profile_options: Optional options of a scan profile, holding
+                             ClamAV engine limits (see scan_limits).
 
         Returns:
             ScanResult with scan details
@@ -235,45 +463,75 @@ class Scanner:
         # Determine which backend to use
         backend = self._get_backend()
 
-        # For daemon-only mode, delegate entirely to daemon scanner
-        if backend == "daemon":
-            return self._get_daemon_scanner().scan_sync(path, recursive, profile_exclusions)
+        # For daemon-only mode, delegate entirely to daemon scanner, unless
+        # every configured endpoint is down
+        if backend == "daemon" and not self._endpoints_unreachable():
+            return self._get_daemon_scanner().scan_sync(
+                path,
+                recursive,
+                profile_exclusions,
+                on_threat=on_threat,
+                checkpoint=checkpoint,
+                on_progress=on_progress,
+                profile_options=profile_options,
+            )
 
-        # For auto mode, try daemon first if available
+        # For auto mode, use the cheapest backend for this scan
         if backend == "auto":
-            is_daemon_available, _ = check_clamd_connection()
-            if is_daemon_available:
-                return self._get_daemon_scanner().scan_sync(path, recursive, profile_exclusions)
+            backend = self._choose_auto_backend([path], recursive)
+            if backend == DAEMON:
+                return self._get_daemon_scanner().scan_sync(
+                    path,
+                    recursive,
+                    profile_exclusions,
+                    on_threat=on_threat,
+                    checkpoint=checkpoint,
+                    on_progress=on_progress,
+                    profile_options=profile_options,
+                )
+
+        # For managed mode, start the private clamd if needed
+        if backend == "managed":
+            with self._get_managed_clamd().in_use():
+                if self._start_managed_clamd():
+                    return self._get_managed_scanner().scan_sync(
+                        path,
+                        recursive,
+                        profile_exclusions,
+                        on_threat=on_threat,
+                        checkpoint=checkpoint,
+                        on_progress=on_progress,
+                        profile_options=profile_options,
+                    )
 
         # Fall through to clamscan for "clamscan" mode or auto fallback
-        is_installed, version_or_error = check_clamav_installed()
+        is_installed, version_or_error = self._check_clamscan_installed()
         if not is_installed:
             result = create_error_result(path, version_or_error or "ClamAV not installed")
             self._save_scan_log(result, time.monotonic() - start_time)
             return result
 
-        # Build clamscan command
-        cmd = self._build_command(path, recursive, profile_exclusions)
-
         try:
-            with self._process_lock:
-                self._current_process = subprocess.Popen(
-                    cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-                )
+            # Skip cached files and shard large trees across clamscan workers
+            result = self._scan_with_file_lists(
+                [path],
+                recursive,
+                profile_exclusions,
+                on_threat,
+                checkpoint=checkpoint,
+                on_progress=on_progress,
+                profile_options=profile_options,
+            )
+            if result is not None:
+                self._save_scan_log(result, time.monotonic() - start_time)
+                return result
 
-            try:
-                stdout, stderr, was_cancelled = communicate_with_cancel_check(
-                    self._current_process, self._cancel_event.is_set
-                )
-                exit_code = self._current_process.returncode
-            finally:
-                # Ensure process is cleaned up even if communicate() raises
-                # Acquire lock to safely clear process reference and get it for cleanup
-                with self._process_lock:
-                    process = self._current_process
-                    self._current_process = None
-                # Perform cleanup outside lock to avoid holding it during I/O
-                cleanup_process(process)
+            # Build clamscan command and parse its output as it streams in
+            cmd = self._build_command(
+                path, recursive, profile_exclusions, profile_options=profile_options
+            )
+            parser = ScanOutputParser(on_threat=on_threat)
+            stdout, stderr, exit_code, was_cancelled = self._run_clamscan(cmd, parser)
 
             # Check if cancelled during execution
             if was_cancelled:
@@ -283,23 +541,253 @@ class Scanner:
                 self._save_scan_log(result, time.monotonic() - start_time)
                 return result
 
-            # Parse the results
-            result = self._parse_results(path, stdout, stderr, exit_code)
+            result = self._build_result(path, parser, stdout, stderr, exit_code)
             self._save_scan_log(result, time.monotonic() - start_time)
             return result
 
         except FileNotFoundError:
             result = create_error_result(path, "ClamAV executable not found")
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
         except PermissionError as e:
             result = create_error_result(path, f"Permission denied: {e}", str(e))
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
         except Exception as e:
             result = create_error_result(path, f"Scan failed: {e}", str(e))
-            self._save_scan_log(result, time.monotonic() - start_time)
-            return result
+
+        # clamscan could not be run, so the cached availability is outdated
+        self._health_probe.invalidate(CLAMSCAN_CHECK)
+        self._save_scan_log(result, time.monotonic() - start_time)
+        return result
+
+    @_governed
+    def scan_targets(
+        self,
+        paths: list[str],
+        recursive: bool = True,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
+    ) -> list[ScanResult]:
+        """
+        Execute a synchronous scan of several targets in one scanner invocation.
+
+        clamscan loads its signature database once for all targets instead
+        of once per target, and the daemon backend scans them all in one
+        clamd session. Threats, output and counts are attributed back to
+        the target they belong to, and a scan log is saved per target.
+
+        WARNING: This will block the calling thread. For UI applications,
+        run it from a worker thread.
+
+        Args:
+            paths: Paths to files or directories to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+                               Format: {"paths": ["/path1", ...], "patterns": ["*.ext", ...]}
+            on_threat: Optional callback invoked from the scanning thread with
+                       each ThreatDetail as soon as the scanner reports it.
+            checkpoint: Optional started ScanCheckpoint of the job, see scan_sync().
+            on_progress: Optional callback for progress snapshots of the
+                         whole scan, see scan_sync().
+            profile_options: Optional options of a scan profile, holding
+                             ClamAV engine limits (see scan_limits).
+
+        Returns:
+            List of ScanResults, one per entry of paths and in the same order
+        """
+        if len(paths) == 1:
+            return [
+                self.scan_sync(
+                    paths[0],
+                    recursive,
+                    profile_exclusions,
+                    on_threat,
+                    checkpoint,
+                    on_progress,
+                    profile_options=profile_options,
+                )
+            ]
+
+        start_time = time.monotonic()
+        self._cancel_event.clear()
+
+        # Invalid targets are reported individually; duplicates are scanned once
+        results: dict[str, ScanResult] = {}
+        targets: list[str] = []
+        for path in dict.fromkeys(paths):
+            is_valid, error = validate_path(path)
+            if is_valid:
+                targets.append(path)
+            else:
+                results[path] = create_error_result(path, error or "Invalid path")
+        logged = list(results.values())
+
+        backend = self._get_backend()
+        if targets and backend == "auto":
+            backend = self._choose_auto_backend(targets, recursive)
+        managed_results = None
+        if targets and backend == "managed":
+            # In use before starting, so the idle timer can't stop it in between
+            with self._get_managed_clamd().in_use():
+                if self._start_managed_clamd():
+                    managed_results = self._get_managed_scanner().scan_targets(
+                        targets,
+                        recursive,
+                        profile_exclusions,
+                        on_threat=on_threat,
+                        checkpoint=checkpoint,
+                        on_progress=on_progress,
+                        profile_options=profile_options,
+                    )
+        if targets and backend == "daemon" and not self._endpoints_unreachable():
+            # The daemon scanner saves the logs of the targets it scans
+            results.update(
+                zip(
+                    targets,
+                    self._get_daemon_scanner().scan_targets(
+                        targets,
+                        recursive,
+                        profile_exclusions,
+                        on_threat=on_threat,
+                        checkpoint=checkpoint,
+                        on_progress=on_progress,
+                        profile_options=profile_options,
+                    ),
+                    strict=True,
+                )
+            )
+        elif managed_results is not None:
+            results.update(zip(targets, managed_results, strict=True))
+        elif targets:
+            target_results = self._scan_targets_with_clamscan(
+                targets,
+                recursive,
+                profile_exclusions,
+                on_threat,
+                checkpoint,
+                on_progress,
+                profile_options=profile_options,
+            )
+            if target_results is None:
+                # Some file can't be put in a file list; scan target by target,
+                # without the checkpoint, whose threats belong to all targets
+                if checkpoint is not None:
+                    logger.info("Scanning targets one by one, the scan can't be resumed")
+                    checkpoint.discard()
+                progress = SequentialProgress(on_progress) if on_progress is not None else None
+                return [
+                    self.scan_sync(
+                        path,
+                        recursive,
+                        profile_exclusions,
+                        on_threat,
+                        on_progress=progress.next_scan() if progress is not None else None,
+                        profile_options=profile_options,
+                    )
+                    for path in paths
+                ]
+            results.update(zip(targets, target_results, strict=True))
+            logged.extend(target_results)
+
+        duration = time.monotonic() - start_time
+        for result in logged:
+            self._save_scan_log(result, duration)
+        return [results[path] for path in paths]
+
+    def _scan_targets_with_clamscan(
+        self,
+        targets: list[str],
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
+    ) -> list[ScanResult] | None:
+        """
+        Scan several valid targets with clamscan workers sharing file lists.
+
+        Args:
+            targets: Distinct, validated paths to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+            on_threat: Optional callback for each threat as it is reported.
+            checkpoint: Optional started ScanCheckpoint of the job.
+            on_progress: Optional callback for progress snapshots.
+            profile_options: Optional options of a scan profile.
+
+        Returns:
+            List of ScanResults, one per target, or None if the targets
+            contain a file that can't be listed for --file-list
+        """
+        stats = [WalkStats() for _ in targets]
+        is_installed, version_or_error = self._check_clamscan_installed()
+        if not is_installed:
+            result = create_error_result(
+                ", ".join(targets), version_or_error or "ClamAV not installed"
+            )
+            return split_result_by_target(result, targets, stats)
+
+        try:
+            result = self._scan_with_file_lists(
+                targets,
+                recursive,
+                profile_exclusions,
+                on_threat,
+                stats,
+                checkpoint,
+                on_progress,
+                profile_options,
+            )
+        except FileNotFoundError:
+            result = create_error_result(", ".join(targets), "ClamAV executable not found")
+        except PermissionError as e:
+            result = create_error_result(", ".join(targets), f"Permission denied: {e}", str(e))
+        except Exception as e:
+            result = create_error_result(", ".join(targets), f"Scan failed: {e}", str(e))
+        else:
+            if result is None:
+                return None
+            return split_result_by_target(result, targets, stats)
+
+        # clamscan could not be run, so the cached availability is outdated
+        self._health_probe.invalidate(CLAMSCAN_CHECK)
+        return split_result_by_target(result, targets, stats)
+
+    @_governed
+    def scan_archive(
+        self,
+        path: str,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+    ) -> ScanResult:
+        """
+        Scan the members of a tar or zip archive without extracting it.
+
+        The members are streamed to clamd one by one and threats are
+        reported as "<archive>!<member>" (see archive_scan). clamscan can't
+        take streams, so this uses the system clamd, or the private clamd
+        for the "managed" backend and for "auto" when no clamd answers.
+
+        WARNING: This will block the calling thread.
+
+        Args:
+            path: Path of the archive
+            on_threat: Optional callback invoked from the scanning thread with
+                       each ThreatDetail as soon as clamd reports it.
+
+        Returns:
+            ScanResult with scan details; scanned_files counts the members
+        """
+        backend = self._get_backend()
+        if backend == "daemon" or (backend == "auto" and self._is_daemon_reachable()):
+            return self._get_daemon_scanner().scan_archive(path, on_threat)
+        if backend in ("auto", "managed"):
+            with self._get_managed_clamd().in_use():
+                if self._start_managed_clamd():
+                    return self._get_managed_scanner().scan_archive(path, on_threat)
+        result = create_error_result(path, "Scanning inside archives needs clamd")
+        self._save_scan_log(result, 0.0)
+        return result
 
     def scan_async(
         self,
@@ -307,6 +795,7 @@ class Scanner:
         callback: Callable[[ScanResult], None],
         recursive: bool = True,
         profile_exclusions: dict | None = None,
+        profile_options: dict | None = None,
     ) -> None:
         """
         Execute an asynchronous scan on the given path.
@@ -320,10 +809,14 @@ class Scanner:
             recursive: Whether to scan directories recursively
             profile_exclusions: Optional exclusions from a scan profile.
                                Format: {"paths": ["/path1", ...], "patterns": ["*.ext", ...]}
+            profile_options: Optional options of a scan profile, holding
+                             ClamAV engine limits (see scan_limits).
         """
 
         def scan_thread():
-            result = self.scan_sync(path, recursive, profile_exclusions)
+            result = self.scan_sync(
+                path, recursive, profile_exclusions, profile_options=profile_options
+            )
             # Schedule callback on main thread
             GLib.idle_add(callback, result)
 
@@ -337,21 +830,405 @@ class Scanner:
 
         If a scan is in progress, it will be terminated with SIGTERM first,
         then escalated to SIGKILL if the process doesn't respond within
-        the grace period. Cancels both clamscan and daemon scanner if active.
+        the grace period. Cancels every clamscan worker and the daemon scanner
+        if active.
         """
         self._cancel_event.set()
-        # Acquire lock to safely get process reference
+        # Acquire lock to safely get process references
         with self._process_lock:
             process = self._current_process
+            workers = list(self._worker_processes)
         # Terminate outside lock to avoid holding it during I/O
         terminate_process_gracefully(process)
+        for worker in workers:
+            terminate_process_gracefully(worker)
 
-        # Also cancel daemon scanner if it exists
+        # Also cancel the daemon scanners if they exist
         if self._daemon_scanner is not None:
             self._daemon_scanner.cancel()
+        if self._managed_scanner is not None:
+            self._managed_scanner.cancel()
+
+    @property
+    def governor(self) -> ScanGovernor:
+        """The ScanGovernor throttling or pausing the scans of this scanner."""
+        return self._governor
+
+    def pause(self) -> None:
+        """
+        Pause the current scan until resume() is called.
+
+        clamscan processes are stopped, and daemon scans stop submitting
+        files once clamd answered the ones in flight.
+        """
+        self._governor.pause()
+
+    def resume(self) -> None:
+        """Resume a scan paused by pause() or by the governor."""
+        self._governor.resume()
+
+    def _run_clamscan(
+        self, cmd: list[str], parser: ScanOutputParser
+    ) -> tuple[str, str, int | None, bool]:
+        """
+        Run a clamscan command, honouring cancellation.
+
+        Args:
+            cmd: Command arguments to execute
+            parser: Parser fed with each stdout line as it is printed
+
+        Returns:
+            Tuple of (stdout_tail, stderr_tail, exit_code, was_cancelled)
+        """
+        with self._process_lock:
+            self._current_process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        self._governor.track(self._current_process)
+
+        try:
+            stdout, stderr, was_cancelled = stream_with_cancel_check(
+                self._current_process, self._cancel_event.is_set, parser.feed_line
+            )
+            exit_code = self._current_process.returncode
+        finally:
+            # Ensure process is cleaned up even if communicate() raises
+            # Acquire lock to safely clear process reference and get it for cleanup
+            with self._process_lock:
+                process = self._current_process
+                self._current_process = None
+            if process is not None:
+                self._governor.untrack(process)
+            # Perform cleanup outside lock to avoid holding it during I/O
+            cleanup_process(process)
+
+        return stdout, stderr, exit_code, was_cancelled
+
+    def _run_clamscan_workers(
+        self, cmds: list[list[str]], parsers: list[ScanOutputParser]
+    ) -> list[tuple[str, str, int | None, bool]]:
+        """
+        Run several clamscan commands in parallel, honouring cancellation.
+
+        Args:
+            cmds: Command arguments of each worker
+            parsers: Output parser of each worker
+
+        Returns:
+            List of (stdout_tail, stderr_tail, exit_code, was_cancelled),
+            one per worker
+        """
+        if len(cmds) == 1:
+            return [self._run_clamscan(cmds[0], parsers[0])]
+
+        outcomes: list = [None] * len(cmds)
+
+        def run_worker(index: int, cmd: list[str]) -> None:
+            process = None
+            try:
+                with self._process_lock:
+                    process = subprocess.Popen(
+                        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+                    )
+                    self._worker_processes.append(process)
+                self._governor.track(process)
+                stdout, stderr, was_cancelled = stream_with_cancel_check(
+                    process, self._cancel_event.is_set, parsers[index].feed_line
+                )
+                outcomes[index] = (stdout, stderr, process.returncode, was_cancelled)
+            except Exception as e:
+                outcomes[index] = e
+            finally:
+                if process is not None:
+                    with self._process_lock:
+                        self._worker_processes.remove(process)
+                    self._governor.untrack(process)
+                    cleanup_process(process)
+
+        threads = [
+            threading.Thread(target=run_worker, args=(index, cmd), daemon=True)
+            for index, cmd in enumerate(cmds)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+        return outcomes
+
+    def _scan_with_file_lists(
+        self,
+        paths: list[str],
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        target_stats: list[WalkStats] | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+        on_progress: Callable[[ScanProgress], None] | None = None,
+        profile_options: dict | None = None,
+    ) -> ScanResult | None:
+        """
+        Scan one or more targets by handing clamscan explicit file lists.
+
+        Walks the targets, pruning excluded files and directories, and
+        skips files completed before a resumed scan was interrupted, files
+        with a cached clean verdict, system files matching their packaged
+        digest if "scan_skip_package_files" is set, and duplicates
+        (hardlinks, and identical copies if "scan_dedup_content" is set).
+        The remaining files are split into size-balanced shards and scanned
+        by parallel clamscan workers through --file-list, and their output
+        is merged. Threats are reported for the duplicates of infected files
+        too. Files that clamscan reports as OK are recorded in the checkpoint,
+        and in the cache unless the profile's engine limits narrow the scan.
+
+        Args:
+            paths: Distinct files or directories to scan
+            recursive: Whether to scan directories recursively
+            profile_exclusions: Optional exclusions from a scan profile.
+            on_threat: Optional callback for each threat as it is reported.
+            target_stats: Optional WalkStats per target, filled with its
+                          file/directory counts. When given, file lists are
+                          always used, so all targets share one clamscan run.
+            checkpoint: Optional started ScanCheckpoint of the job. When
+                        given, file lists are always used.
+            on_progress: Optional callback for progress snapshots. When
+                         given, file lists are always used and the walk
+                         provides the exact total.
+            profile_options: Optional options of a scan profile. When they
+                             leave out files, file lists are always used,
+                             so the walk can count them.
+
+        Returns:
+            ScanResult for all targets (its path is the targets joined by
+            ", "), or None if neither the cache, package verification,
+            deduplication nor sharding apply to this scan and a regular
+            clamscan run should be done instead
+        """
+        path = ", ".join(paths)
+        cache = self._scan_cache
+        if cache is not None and not cache.prepare():
+            cache = None
+
+        configured_workers = 0
+        if self._settings_manager is not None:
+            configured_workers = self._settings_manager.get("clamscan_workers", 0)
+            if not isinstance(configured_workers, int):
+                configured_workers = 0
+        max_workers = get_max_workers(configured_workers)
+        verifier = create_package_verifier(self._settings_manager, paths)
+        limits = ScanLimits.from_options(profile_options)
+        skip_file = limits.get_file_filter()
+        # A file that clamscan parsed only partially is not known to be clean,
+        # so limited runs read the cache but don't add their verdicts to it
+        record_cache = cache if cache is not None and not limits.narrows_scan else None
+        use_file_lists = (
+            target_stats is not None
+            or cache is not None
+            or verifier is not None
+            or skip_file is not None
+            or checkpoint is not None
+            or on_progress is not None
+        )
+        if not use_file_lists and (max_workers <= 1 or not os.path.isdir(paths[0])):
+            return None
+
+        matcher = get_exclusion_matcher(self._settings_manager, profile_exclusions)
+        if target_stats is None:
+            target_stats = [WalkStats() for _ in paths]
+        dedup = create_deduplicator(self._settings_manager)
+        cached_count = 0
+        verified_count = 0
+        uncached: dict[str, os.stat_result] = {}
+
+        # Threats found before the scan was interrupted are reported again
+        resumed_threats = checkpoint.resumed_threats if checkpoint is not None else ThreatList()
+        resumed_count = 0
+        if on_threat is not None:
+            for threat in resumed_threats:
+                on_threat(threat)
+
+        try:
+            for file_path, st in iter_target_files(
+                paths,
+                recursive,
+                None if matcher.is_empty else matcher.is_excluded,
+                self._cancel_event.is_set,
+                target_stats,
+                skip_file,
+            ):
+                # --file-list is newline separated
+                if "\n" in file_path:
+                    return None
+                if checkpoint is not None and checkpoint.is_completed(file_path, st):
+                    resumed_count += 1
+                elif cache is not None and cache.is_clean(st):
+                    cached_count += 1
+                elif verifier is not None and verifier.is_verified(file_path, st):
+                    verified_count += 1
+                elif dedup.add(file_path, st):
+                    uncached[file_path] = st
+        finally:
+            if verifier is not None:
+                verifier.close()
+
+        walked_files = sum(st.files for st in target_stats)
+        walked_dirs = sum(st.dirs for st in target_stats)
+        if self._cancel_event.is_set():
+            return create_cancelled_result(path, "", "", -1, walked_files, walked_dirs)
+
+        # The walk is the pre-pass that gives the exact total to scan
+        tracker = None
+        if on_progress is not None:
+            tracker = ProgressTracker(on_progress, paths)
+            tracker.set_total(len(uncached), sum(st.st_size for st in uncached.values()))
+
+        worker_count = get_worker_count(len(uncached), max_workers)
+        if not use_file_lists and worker_count <= 1 and not dedup.duplicate_count:
+            return None
+
+        if not uncached:
+            if tracker is not None:
+                tracker.finish()
+            threat_details = ThreatList(resumed_threats)
+            return ScanResult(
+                status=ScanStatus.INFECTED if threat_details else ScanStatus.CLEAN,
+                path=path,
+                stdout="\n".join(f"{t.file_path}: {t.threat_name} FOUND" for t in threat_details),
+                stderr="",
+                exit_code=1 if threat_details else 0,
+                infected_files=threat_details.file_paths,
+                scanned_files=walked_files,
+                scanned_dirs=walked_dirs,
+                infected_count=len(threat_details),
+                error_message=None,
+                threat_details=threat_details,
+                skipped_files=merge_skipped(target_stats),
+            )
+
+        # Without -i clamscan reports every clean file, which is recorded
+        # in the cache, the checkpoint and the progress as it streams in
+        on_clean = None
+        if record_cache is not None or checkpoint is not None or tracker is not None:
+
+            def on_clean(file_path: str) -> None:
+                st = uncached.get(file_path)
+                if checkpoint is not None and st is not None:
+                    checkpoint.mark_completed(file_path, st)
+                if tracker is not None:
+                    tracker.file_done(st.st_size if st is not None else 0)
+                if record_cache is not None and st is not None:
+                    record_cache.mark_clean(st)
+
+        # Workers report threats concurrently; serialize the caller's callback
+        threat_lock = threading.Lock()
+
+        def report_threat(threat: ThreatDetail) -> None:
+            if checkpoint is not None:
+                # Duplicates have no stat of their own; a resumed run scans them again
+                checkpoint.record_threat(threat, uncached.get(threat.file_path))
+            if on_threat is not None:
+                with threat_lock:
+                    on_threat(threat)
+
+        def on_scanned_threat(threat: ThreatDetail) -> None:
+            if tracker is not None:
+                st = uncached.get(threat.file_path)
+                tracker.file_done(st.st_size if st is not None else 0)
+            report_threat(threat)
+
+        list_files: list[str] = []
+        parsers: list[ScanOutputParser] = []
+        try:
+            cmds = []
+            risk_ordering = is_risk_ordering_enabled(self._settings_manager)
+            for shard in partition_files(uncached, worker_count):
+                # Likely infections first, for an early first detection
+                if risk_ordering:
+                    shard = sort_by_risk(shard, uncached)
+                list_file, _ = write_file_list(shard)
+                list_files.append(list_file)
+                cmds.append(
+                    self._build_command(
+                        path,
+                        recursive,
+                        profile_exclusions,
+                        file_list=list_file,
+                        infected_only=on_clean is None,
+                        profile_options=profile_options,
+                    )
+                )
+                parsers.append(ScanOutputParser(on_threat=on_scanned_threat, on_clean=on_clean))
+            outcomes = self._run_clamscan_workers(cmds, parsers)
+        finally:
+            for list_path in list_files:
+                os.unlink(list_path)
+            if cache is not None:
+                cache.flush()
+            if checkpoint is not None:
+                checkpoint.flush()
+
+        stderr = "".join(outcome[1] for outcome in outcomes)
+        exit_code = merge_exit_codes([outcome[2] for outcome in outcomes])
+        was_cancelled = any(outcome[3] for outcome in outcomes)
+        if tracker is not None:
+            tracker.finish(completed=not was_cancelled)
+
+        # Duplicates of infected files are infected too
+        threat_details = ThreatList(resumed_threats)
+        threat_details.extend(threat for parser in parsers for threat in parser.threat_details)
+        duplicate_threats = [] if was_cancelled else dedup.expand_threats(threat_details)
+        for threat in duplicate_threats:
+            report_threat(threat)
+        threat_details.extend(duplicate_threats)
+
+        # Keep the raw output as it would look with -i
+        outputs = [
+            "\n".join(line for line in outcome[0].splitlines() if not line.endswith(": OK"))
+            for outcome in outcomes
+        ]
+        outputs.extend(
+            "\n".join(f"{t.file_path}: {t.threat_name} FOUND" for t in threats)
+            for threats in (duplicate_threats, resumed_threats)
+        )
+        stdout = merge_clamscan_output(outputs)
+
+        if was_cancelled:
+            return create_cancelled_result(path, stdout, stderr, -1, walked_files, walked_dirs)
+
+        status = {0: ScanStatus.CLEAN, 1: ScanStatus.INFECTED}.get(exit_code, ScanStatus.ERROR)
+        if status == ScanStatus.CLEAN and threat_details:
+            # Only threats from before the scan was resumed
+            status, exit_code = ScanStatus.INFECTED, 1
+        return ScanResult(
+            status=status,
+            path=path,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            infected_files=threat_details.file_paths,
+            scanned_files=sum(parser.scanned_files for parser in parsers)
+            + cached_count
+            + verified_count
+            + dedup.duplicate_count
+            + resumed_count,
+            scanned_dirs=walked_dirs,
+            infected_count=len(threat_details),
+            error_message=stderr if status == ScanStatus.ERROR else None,
+            threat_details=threat_details,
+            skipped_files=merge_skipped(target_stats),
+        )
 
     def _build_command(
-        self, path: str, recursive: bool, profile_exclusions: dict | None = None
+        self,
+        path: str,
+        recursive: bool,
+        profile_exclusions: dict | None = None,
+        file_list: str | None = None,
+        infected_only: bool = True,
+        profile_options: dict | None = None,
     ) -> list[str]:
         """
         Build the clamscan command arguments.
@@ -364,6 +1241,11 @@ class Scanner:
             recursive: Whether to scan recursively
             profile_exclusions: Optional exclusions from a scan profile.
                                Format: {"paths": ["/path1", ...], "patterns": ["*.ext", ...]}
+            file_list: Optional file listing the files to scan instead of path.
+            infected_only: Whether to report infected files only (-i). Clean
+                           files are reported otherwise, so callers can cache them.
+            profile_options: Optional options of a scan profile, whose engine
+                             limits are passed on to clamscan.
 
         Returns:
             List of command arguments (wrapped with flatpak-spawn if in Flatpak)
@@ -377,53 +1259,24 @@ class Scanner:
             cmd.extend(["--database", str(db_dir)])
 
         # Add recursive flag for directories
-        if recursive and Path(path).is_dir():
+        if file_list is None and recursive and Path(path).is_dir():
             cmd.append("-r")
 
         # Show infected files only (reduces output noise)
-        cmd.append("-i")
+        if infected_only:
+            cmd.append("-i")
 
-        # Inject exclusion patterns from settings
-        if self._settings_manager is not None:
-            exclusions = self._settings_manager.get("exclusion_patterns", [])
-            for exclusion in exclusions:
-                if not exclusion.get("enabled", True):
-                    continue
-
-                pattern = exclusion.get("pattern", "")
-                if not pattern:
-                    continue
-
-                regex = glob_to_regex(pattern)
-                exclusion_type = exclusion.get("type", "pattern")
-
-                if exclusion_type == "directory":
-                    cmd.extend(["--exclude-dir", regex])
-                else:  # file or pattern
-                    cmd.extend(["--exclude", regex])
-
-        # Apply profile exclusions (paths and patterns)
-        if profile_exclusions:
-            # Handle path exclusions (directories)
-            for excl_path in profile_exclusions.get("paths", []):
-                if not excl_path:
-                    continue
-                # Expand ~ in exclusion paths
-                if excl_path.startswith("~"):
-                    excl_path = str(Path(excl_path).expanduser())
-                # Use the path directly for --exclude-dir (ClamAV accepts paths)
-                cmd.extend(["--exclude-dir", excl_path])
-
-            # Handle pattern exclusions (file patterns like *.tmp)
-            for pattern in profile_exclusions.get("patterns", []):
-                if not pattern:
-                    continue
-                # Convert glob pattern to regex for ClamAV
-                regex = glob_to_regex(pattern)
-                cmd.extend(["--exclude", regex])
-
-        # Add the path to scan
-        cmd.append(path)
+        # Inject exclusion patterns from settings and the scan profile
+        cmd.extend(get_exclusion_matcher(self._settings_manager, profile_exclusions).clamscan_args)
+
+        # Engine limits and file type switches from the scan profile
+        cmd.extend(ScanLimits.from_options(profile_options).clamscan_args)
+
+        # Add the path (or list of files) to scan
+        if file_list is not None:
+            cmd.append(f"--file-list={file_list}")
+        else:
+            cmd.append(path)
 
         # Wrap with flatpak-spawn if running inside Flatpak sandbox
         return wrap_host_command(cmd)
@@ -446,54 +1299,26 @@ class Scanner:
         Returns:
             Parsed ScanResult
         """
-        infected_files = []
-        threat_details = []
-        scanned_files = 0
-        scanned_dirs = 0
-        infected_count = 0
-
-        # Parse stdout line by line
-        for line in stdout.splitlines():
-            line = line.strip()
-
-            # Look for infected file lines (format: "/path/to/file: Virus.Name FOUND")
-            if line.endswith("FOUND"):
-                # Extract file path and threat name
-                # Format: "/path/to/file: ThreatName FOUND"
-                parts = line.rsplit(":", 1)
-                if len(parts) == 2:
-                    file_path = parts[0].strip()
-                    # Extract threat name (remove " FOUND" suffix)
-                    threat_part = parts[1].strip()
-                    threat_name = (
-                        threat_part.rsplit(" ", 1)[0].strip()
-                        if " FOUND" in threat_part
-                        else threat_part
-                    )
+        parser = ScanOutputParser()
+        parser.feed(stdout)
+        return self._build_result(path, parser, stdout, stderr, exit_code)
 
-                    infected_files.append(file_path)
+    def _build_result(
+        self, path: str, parser: ScanOutputParser, stdout: str, stderr: str, exit_code: int
+    ) -> ScanResult:
+        """
+        Build a ScanResult from parsed clamscan output.
 
-                    # Create ThreatDetail with classification
-                    threat_detail = ThreatDetail(
-                        file_path=file_path,
-                        threat_name=threat_name,
-                        category=categorize_threat(threat_name),
-                        severity=classify_threat_severity_str(threat_name),
-                    )
-                    threat_details.append(threat_detail)
-                    infected_count += 1
-
-            # Look for individual summary lines from ClamAV output
-            # Format: "Scanned files: 10" or "Scanned directories: 1" or "Infected files: 0"
-            elif line.startswith("Scanned files:"):
-                match = re.search(r"Scanned files:\s*(\d+)", line)
-                if match:
-                    scanned_files = int(match.group(1))
-            elif line.startswith("Scanned directories:"):
-                match = re.search(r"Scanned directories:\s*(\d+)", line)
-                if match:
-                    scanned_dirs = int(match.group(1))
+        Args:
+            path: The scanned path
+            parser: Parser that was fed the clamscan output
+            stdout: Standard output (or its retained tail) from clamscan
+            stderr: Standard error from clamscan
+            exit_code: Process exit code
 
+        Returns:
+            ScanResult with scan details
+        """
         # Determine overall status based on exit code
         if exit_code == 0:
             status = ScanStatus.CLEAN
@@ -508,14 +1333,15 @@ class Scanner:
             stdout=stdout,
             stderr=stderr,
             exit_code=exit_code,
-            infected_files=infected_files,
-            scanned_files=scanned_files,
-            scanned_dirs=scanned_dirs,
-            infected_count=infected_count,
+            infected_files=parser.infected_files,
+            scanned_files=parser.scanned_files,
+            scanned_dirs=parser.scanned_dirs,
+            infected_count=len(parser.threat_details),
             error_message=stderr if status == ScanStatus.ERROR else None,
-            threat_details=threat_details,
+            threat_details=parser.threat_details,
         )
 
     def _save_scan_log(self, result: ScanResult, duration: float) -> None:
         """Save scan result to log."""
-        save_scan_log(self._log_manager, result, duration)
+        if self._save_logs:
+            save_scan_log(self._log_manager, result, duration)
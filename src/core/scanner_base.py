@@ -4,66 +4,258 @@ Shared utilities for ClamAV scanner implementations.
 
 This module provides common functionality used by both Scanner (clamscan) and
 DaemonScanner (clamdscan) to avoid code duplication:
-- Process communication with cancellation support
+- Streaming process output with cancellation support
+- Incremental parsing of scanner output
 - Process termination with graceful shutdown
 - Scan log saving
 - Error result creation
+- Splitting a multi-target scan into per-target results
 """
 
+import codecs
 import logging
+import os
+import re
+import selectors
+import signal
 import subprocess
+import time
+from collections import deque
 from collections.abc import Callable
 
 from .log_manager import LogEntry, LogManager
-from .scanner_types import ScanResult, ScanStatus
+from .scan_walker import WalkStats
+from .scanner_types import ScanResult, ScanStatus, ThreatDetail
+from .threat_classifier import categorize_threat, classify_threat_severity_str
+from .threat_store import ThreatList, ThreatPaths
 
 logger = logging.getLogger(__name__)
 
 # Timeout constants (seconds)
 TERMINATE_GRACE_TIMEOUT = 5  # Time to wait after SIGTERM before SIGKILL
 KILL_WAIT_TIMEOUT = 2  # Time to wait after SIGKILL
+CANCEL_DRAIN_TIMEOUT = 2  # Time to collect remaining output after SIGTERM
 
+# Output streaming
+OUTPUT_TAIL_LINES = 1000  # Raw output lines kept per stream
+READ_CHUNK_SIZE = 64 * 1024  # Bytes read from a pipe at a time
 
-def communicate_with_cancel_check(
+
+class ScanOutputParser:
+    """
+    Incremental parser for clamscan/clamdscan output.
+
+    Lines are fed one at a time as the scanner prints them. Detected threats
+    are classified immediately and reported through an optional callback,
+    so nothing but the parsed results has to be kept in memory. They are
+    collected in a ThreatList, which spills to disk on a mass infection.
+    """
+
+    def __init__(
+        self,
+        on_threat: Callable[[ThreatDetail], None] | None = None,
+        on_clean: Callable[[str], None] | None = None,
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            on_threat: Optional callback invoked with each ThreatDetail as it
+                       is parsed.
+            on_clean: Optional callback invoked with the path of each file
+                      reported as OK (only printed when -i is not used).
+        """
+        self._on_threat = on_threat
+        self._on_clean = on_clean
+        self.threat_details = ThreatList()
+        self.scanned_files = 0
+        self.scanned_dirs = 0
+
+    def feed_line(self, line: str) -> None:
+        """
+        Parse a single line of scanner output.
+
+        Args:
+            line: Output line, with or without its trailing newline
+        """
+        line = line.strip()
+
+        # Look for infected file lines (format: "/path/to/file: Virus.Name FOUND")
+        if line.endswith("FOUND"):
+            parts = line.rsplit(":", 1)
+            if len(parts) == 2:
+                file_path = parts[0].strip()
+                # Extract threat name (remove " FOUND" suffix)
+                threat_part = parts[1].strip()
+                threat_name = (
+                    threat_part.rsplit(" ", 1)[0].strip()
+                    if " FOUND" in threat_part
+                    else threat_part
+                )
+                threat = ThreatDetail(
+                    file_path=file_path,
+                    threat_name=threat_name,
+                    category=categorize_threat(threat_name),
+                    severity=classify_threat_severity_str(threat_name),
+                )
+                self.threat_details.append(threat)
+                if self._on_threat is not None:
+                    self._on_threat(threat)
+
+        elif line.endswith(": OK"):
+            if self._on_clean is not None:
+                self._on_clean(line[:-4])
+
+        # Summary lines: "Scanned files: 10", "Scanned directories: 1"
+        elif line.startswith("Scanned files:"):
+            match = re.search(r"Scanned files:\s*(\d+)", line)
+            if match:
+                self.scanned_files = int(match.group(1))
+        elif line.startswith("Scanned directories:"):
+            match = re.search(r"Scanned directories:\s*(\d+)", line)
+            if match:
+                self.scanned_dirs = int(match.group(1))
+
+    def feed(self, output: str) -> None:
+        """
+        Parse a block of scanner output.
+
+        Args:
+            output: Complete or partial output containing whole lines
+        """
+        for line in output.splitlines():
+            self.feed_line(line)
+
+    @property
+    def infected_files(self) -> ThreatPaths:
+        """Paths of the infected files parsed so far."""
+        return self.threat_details.file_paths
+
+
+class _LineReader:
+    """Split a pipe's byte stream into lines, keeping a bounded tail."""
+
+    def __init__(self, on_line: Callable[[str], None] | None, tail_lines: int):
+        # surrogateescape keeps undecodable file names intact
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+        self._partial = ""
+        self._on_line = on_line
+        self.tail: deque[str] = deque(maxlen=tail_lines)
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        lines = (self._partial + self._decoder.decode(data, final)).split("\n")
+        # The last element is an incomplete line ("" after a trailing newline)
+        self._partial = lines.pop()
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        for line in lines:
+            self.tail.append(line)
+            if self._on_line is not None:
+                self._on_line(line)
+
+    def text(self) -> str:
+        return "\n".join(self.tail)
+
+
+def _terminate(process: subprocess.Popen) -> bool:
+    """
+    Send SIGTERM to a process, continuing it if it is stopped.
+
+    A scan paused by the ScanGovernor has its processes stopped, and a
+    stopped process only acts on SIGTERM once continued.
+
+    Returns:
+        False if the process is already gone
+    """
+    try:
+        process.terminate()
+        process.send_signal(signal.SIGCONT)
+    except (OSError, ProcessLookupError):
+        return False
+    return True
+
+
+def stream_with_cancel_check(
     process: subprocess.Popen,
     is_cancelled: Callable[[], bool],
+    on_stdout_line: Callable[[str], None] | None = None,
+    on_stderr_line: Callable[[str], None] | None = None,
+    tail_lines: int = OUTPUT_TAIL_LINES,
 ) -> tuple[str, str, bool]:
     """
-    Communicate with process while checking for cancellation.
+    Read process output line by line while checking for cancellation.
 
-    Uses a polling loop with timeout to allow periodic cancellation checks.
-    This prevents the scan thread from blocking indefinitely on communicate().
+    Both pipes are watched with a selector, so output is handed to the
+    callbacks as soon as the process prints it. Only the last tail_lines
+    lines of each stream are kept, which bounds memory on verbose runs.
 
     Args:
-        process: The subprocess to communicate with.
+        process: The subprocess to read from (stdout and stderr piped).
         is_cancelled: Callable that returns True if operation was cancelled.
+        on_stdout_line: Optional callback for each stdout line.
+        on_stderr_line: Optional callback for each stderr line.
+        tail_lines: Number of trailing lines of each stream to return.
 
     Returns:
-        Tuple of (stdout, stderr, was_cancelled).
-    """
-    stdout_parts: list[str] = []
-    stderr_parts: list[str] = []
-
-    while True:
-        if is_cancelled():
-            # Terminate process and collect any remaining output
-            try:
-                process.terminate()
-                stdout, stderr = process.communicate(timeout=2.0)
-                stdout_parts.append(stdout or "")
-                stderr_parts.append(stderr or "")
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            return "".join(stdout_parts), "".join(stderr_parts), True
+        Tuple of (stdout_tail, stderr_tail, was_cancelled).
+    """
+    readers = {}
+    with selectors.DefaultSelector() as selector:
+        for stream, on_line in ((process.stdout, on_stdout_line), (process.stderr, on_stderr_line)):
+            if stream is not None:
+                reader = _LineReader(on_line, tail_lines)
+                selector.register(stream.fileno(), selectors.EVENT_READ, reader)
+                readers[stream] = reader
+
+        was_cancelled = False
+        deadline = None
+        while selector.get_map():
+            if not was_cancelled and is_cancelled():
+                # Terminate process and collect any remaining output
+                was_cancelled = True
+                deadline = time.monotonic() + CANCEL_DRAIN_TIMEOUT
+                _terminate(process)
+            if deadline is not None and time.monotonic() > deadline:
+                try:
+                    process.kill()
+                except (OSError, ProcessLookupError):
+                    pass
+                break
+
+            for key, _ in selector.select(timeout=0.5):
+                data = os.read(key.fd, READ_CHUNK_SIZE)
+                if data:
+                    key.data.feed(data)
+                else:
+                    key.data.feed(b"", final=True)
+                    selector.unregister(key.fd)
+
+    # Close the pipes like communicate() does
+    for stream in readers:
+        stream.close()
+    process.wait()
+    # cancel() may terminate the process before the loop sees the flag
+    was_cancelled = was_cancelled or is_cancelled()
+    stdout = readers[process.stdout].text() if process.stdout in readers else ""
+    stderr = readers[process.stderr].text() if process.stderr in readers else ""
+    return stdout, stderr, was_cancelled
+
+
+def keep_tail(text: str, max_lines: int = OUTPUT_TAIL_LINES) -> str:
+    """
+    Keep only the last lines of some scanner output.
 
-        try:
-            stdout, stderr = process.communicate(timeout=0.5)
-            stdout_parts.append(stdout or "")
-            stderr_parts.append(stderr or "")
-            return "".join(stdout_parts), "".join(stderr_parts), False
-        except subprocess.TimeoutExpired:
-            continue  # Loop again, check cancel flag
+    Args:
+        text: Output text
+        max_lines: Maximum number of lines to keep
+
+    Returns:
+        The last max_lines lines of text
+    """
+    if text.count("\n") < max_lines:
+        return text
+    return "\n".join(text.rsplit("\n", max_lines)[1:])
 
 
 def cleanup_process(process: subprocess.Popen | None) -> None:
@@ -98,9 +290,7 @@ def terminate_process_gracefully(process: subprocess.Popen | None) -> None:
         return
 
     # Step 1: SIGTERM (graceful)
-    try:
-        process.terminate()
-    except (OSError, ProcessLookupError):
+    if not _terminate(process):
         # Process already gone
         return
 
@@ -143,10 +333,10 @@ def save_scan_log(
     }
     scan_status = status_map.get(result.status, "error")
 
-    # Convert threat details to dicts for the factory method
-    threat_dicts = [
+    # Convert threat details to dicts for the factory method, one at a time
+    threat_dicts = (
         {"file_path": t.file_path, "threat_name": t.threat_name} for t in result.threat_details
-    ]
+    )
 
     entry = LogEntry.from_scan_result_data(
         scan_status=scan_status,
@@ -230,3 +420,115 @@ def create_cancelled_result(
         error_message="Scan cancelled by user",
         threat_details=[],
     )
+
+
+def find_target(text: str, targets: list[str]) -> int | None:
+    """
+    Find the scan target a file path (or a line of output about it) belongs to.
+
+    Nested targets are walked on their own, so the most specific target
+    containing the path wins.
+
+    Args:
+        text: A file path, or an output line starting with one
+        targets: Scan targets
+
+    Returns:
+        Index of the target in targets, or None if no target contains the path
+    """
+    best_index, best_length = None, -1
+    for index, target in enumerate(targets):
+        root = os.path.normpath(target)
+        if root == "/":
+            matched = text.startswith("/")
+        else:
+            matched = text.startswith(root) and (len(text) == len(root) or text[len(root)] in "/:")
+        if matched and len(root) > best_length:
+            best_index, best_length = index, len(root)
+    return best_index
+
+
+def split_result_by_target(
+    result: ScanResult, targets: list[str], stats: list[WalkStats]
+) -> list[ScanResult]:
+    """
+    Split the result of one scan over several targets into a result per target.
+
+    Threats and output lines are attributed to targets by path. If the scan
+    failed without saying which target caused it, every target without a
+    threat is reported as failed.
+
+    Args:
+        result: Combined result of the scan
+        targets: Scan targets, in the order results are wanted
+        stats: WalkStats of each target, providing its file/directory counts
+
+    Returns:
+        List of ScanResults, one per target
+    """
+    if result.status == ScanStatus.CANCELLED:
+        return [
+            create_cancelled_result(target, scanned_files=st.files, scanned_dirs=st.dirs)
+            for target, st in zip(targets, stats, strict=True)
+        ]
+
+    threats = [ThreatList() for _ in targets]
+    for threat in result.threat_details:
+        index = find_target(threat.file_path, targets)
+        threats[index if index is not None else 0].append(threat)
+
+    def split_lines(output: str) -> list[list[str]]:
+        lines: list[list[str]] = [[] for _ in targets]
+        for line in output.splitlines():
+            index = find_target(line, targets)
+            if index is not None:
+                lines[index].append(line)
+        return lines
+
+    stdout_lines = split_lines(result.stdout)
+    stderr_lines = split_lines(result.stderr)
+    has_errors = [
+        bool(stderr_lines[index]) or any(line.endswith("ERROR") for line in stdout_lines[index])
+        for index in range(len(targets))
+    ]
+    # Without attributable errors, a failure can't be pinned on one target
+    failed_unattributed = result.status == ScanStatus.ERROR and not any(has_errors)
+
+    results = []
+    for index, target in enumerate(targets):
+        target_threats = threats[index]
+        stderr = "\n".join(stderr_lines[index])
+        if target_threats:
+            status, exit_code = ScanStatus.INFECTED, 1
+        elif failed_unattributed or has_errors[index]:
+            status, exit_code = ScanStatus.ERROR, 2
+        else:
+            status, exit_code = ScanStatus.CLEAN, 0
+
+        error_message = None
+        if status == ScanStatus.ERROR:
+            if failed_unattributed:
+                stderr = result.stderr
+                error_message = result.error_message or stderr
+            else:
+                error_message = stderr or "\n".join(
+                    line for line in stdout_lines[index] if line.endswith("ERROR")
+                )
+
+        results.append(
+            ScanResult(
+                status=status,
+                path=target,
+                stdout="\n".join(stdout_lines[index]),
+                stderr=stderr,
+                exit_code=exit_code,
+                infected_files=target_threats.file_paths,
+                scanned_files=stats[index].files,
+                scanned_dirs=stats[index].dirs,
+                infected_count=len(target_threats),
+                error_message=error_message,
+                threat_details=target_threats,
+                skipped_files=dict(stats[index].skipped),
+            )
+        )
+    return results
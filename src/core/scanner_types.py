@@ -8,7 +8,9 @@ This module defines the shared data types used by scanner implementations:
 - ScanResult: Dataclass for complete scan results
 """
 
-from dataclasses import dataclass
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from enum import Enum
 
 
@@ -21,31 +23,50 @@ class ScanStatus(Enum):
     CANCELLED = "cancelled"  # Scan was cancelled
 
 
-@dataclass
+@dataclass(slots=True)
 class ThreatDetail:
-    """Detailed information about a detected threat."""
+    """
+    Detailed information about a detected threat.
+
+    Uses __slots__, and interns the threat name, category and severity,
+    which repeat across the threats of a mass infection.
+    """
 
     file_path: str
     threat_name: str
     category: str
     severity: str
 
+    def __post_init__(self) -> None:
+        self.threat_name = sys.intern(self.threat_name)
+        self.category = sys.intern(self.category)
+        self.severity = sys.intern(self.severity)
+
 
 @dataclass
 class ScanResult:
-    """Result of a scan operation."""
+    """
+    Result of a scan operation.
+
+    infected_files and threat_details are read-only sequences. Scanners
+    fill them with a ThreatList (see threat_store) and its file_paths view,
+    which keep huge result sets out of memory. stdout and stderr only hold
+    the tail of the scanner's output. skipped_files counts the files left
+    out by the limits of a scan profile, by limit (see scan_limits).
+    """
 
     status: ScanStatus
     path: str
     stdout: str
     stderr: str
     exit_code: int
-    infected_files: list[str]
+    infected_files: Sequence[str]
     scanned_files: int
     scanned_dirs: int
     infected_count: int
     error_message: str | None
-    threat_details: list[ThreatDetail]
+    threat_details: Sequence[ThreatDetail]
+    skipped_files: dict[str, int] = field(default_factory=dict)
 
     @property
     def is_clean(self) -> bool:
@@ -60,6 +60,31 @@ class ScheduleFrequency(Enum):
     MONTHLY = "monthly"
 
 
+# Longest time between two runs of each schedule, in seconds
+_SCHEDULE_INTERVALS = {
+    ScheduleFrequency.HOURLY: 3600,
+    ScheduleFrequency.DAILY: 86400,
+    ScheduleFrequency.WEEKLY: 7 * 86400,
+    ScheduleFrequency.MONTHLY: 31 * 86400,
+}
+
+
+def get_schedule_interval(frequency: str) -> int | None:
+    """
+    Get the time between two runs of a schedule.
+
+    Args:
+        frequency: Schedule frequency ("hourly", "daily", "weekly", "monthly")
+
+    Returns:
+        Interval in seconds, or None for an unknown frequency
+    """
+    try:
+        return _SCHEDULE_INTERVALS[ScheduleFrequency(str(frequency).lower())]
+    except ValueError:
+        return None
+
+
 @dataclass
 class ScheduleConfig:
     """
@@ -742,7 +767,10 @@ class Scheduler:
         """
         # Build command with options
         # Use shlex.quote() to prevent command injection via malicious paths
-        exec_cmd = cli_path
+        # --resume continues a run that was cut short within the last
+        # schedule interval; finished runs leave no checkpoint, so the next
+        # one starts from zero
+        exec_cmd = f"{cli_path} --resume"
         if skip_on_battery:
             exec_cmd += " --skip-on-battery"
         if auto_quarantine:
@@ -815,7 +843,7 @@ WantedBy=timers.target
 
             # Build command
             # Use shlex.quote() to prevent command injection via malicious paths
-            cron_cmd = cli_path
+            cron_cmd = f"{cli_path} --resume"
             if skip_on_battery:
                 cron_cmd += " --skip-on-battery"
             if auto_quarantine:
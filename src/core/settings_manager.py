@@ -12,6 +12,8 @@ import threading
 from pathlib import Path
 from typing import Any
 
+from .exclusion_matcher import ExclusionMatcher
+
 
 class SettingsManager:
     """
@@ -39,14 +41,33 @@ class SettingsManager:
         "schedule_day_of_week": 0,  # 0=Monday, 6=Sunday (for weekly scans)
         "schedule_day_of_month": 1,  # 1-28 (for monthly scans)
         "exclusion_patterns": [],
+        # Watch folder settings (files are scanned as they land)
+        "watch_folders_enabled": False,
+        "watch_folders": [],  # List of directory paths to watch
+        "watch_debounce_seconds": 2.0,  # Quiet time before a changed file is scanned
         # Scan backend settings
-        "scan_backend": "auto",  # "auto", "daemon", "clamscan"
+        "scan_backend": "auto",  # "auto", "daemon", "clamscan", "managed"
         "daemon_socket_path": "",  # Empty = auto-detect
+        "daemon_endpoints": [],  # clamd addresses to spread scans over, empty = daemon_socket_path
+        "clamd_max_inflight": 0,  # Requests a scan keeps in flight on clamd, 0 = from clamd.conf
+        "managed_clamd_idle_timeout": 600,  # Seconds before the private clamd stops
+        "auto_backend_adaptive": True,  # "auto" picks the cheapest backend for the workload
+        "scan_cache_enabled": True,  # Skip files already scanned clean and unchanged
+        "scan_dedup_content": False,  # Hash same-size files to scan identical copies once
+        "scan_risk_ordering": True,  # Scan executables, scripts and fresh downloads first
+        "scan_skip_package_files": False,  # Skip system files matching dpkg/rpm digests
+        "clamscan_workers": 0,  # Parallel clamscan processes, 0 = auto (CPUs and memory)
+        "scan_service_max_jobs": 2,  # Jobs the D-Bus scan service runs at the same time
+        "scan_governor_enabled": True,  # Throttle or pause scans on battery, high load or heat
+        "scan_governor_battery_percent": 20,  # Pause scans on battery at or below this charge
         # VirusTotal settings
         "virustotal_api_key": None,  # Fallback storage if keyring unavailable
         "virustotal_remember_no_key_action": "none",  # "none", "open_website", "prompt"
     }
 
+    # Number of compiled exclusion matchers (one per scan profile) to keep
+    MAX_CACHED_MATCHERS = 16
+
     def __init__(self, config_dir: Path | None = None):
         """
         Initialize the SettingsManager.
@@ -66,6 +87,9 @@ class SettingsManager:
         # Thread lock for safe concurrent access
         self._lock = threading.Lock()
 
+        # Compiled exclusion matchers keyed by profile exclusions
+        self._exclusion_matchers: dict[str, ExclusionMatcher] = {}
+
         # Load settings on initialization
         self._settings = self._load()
 
@@ -181,6 +205,8 @@ class SettingsManager:
         """
         with self._lock:
             self._settings[key] = value
+            if key == "exclusion_patterns":
+                self._exclusion_matchers.clear()
         return self.save()
 
     def reset_to_defaults(self) -> bool:
@@ -192,8 +218,34 @@ class SettingsManager:
         """
         with self._lock:
             self._settings = dict(self.DEFAULT_SETTINGS)
+            self._exclusion_matchers.clear()
         return self.save()
 
+    def get_exclusion_matcher(self, profile_exclusions: dict | None = None) -> ExclusionMatcher:
+        """
+        Get the compiled matcher for the exclusion patterns.
+
+        Matchers are cached until "exclusion_patterns" is set again.
+
+        Args:
+            profile_exclusions: Optional exclusions from a scan profile,
+                                combined with the global exclusion patterns
+
+        Returns:
+            ExclusionMatcher for the combined exclusions
+        """
+        key = json.dumps(profile_exclusions or {}, sort_keys=True, default=str)
+        with self._lock:
+            matcher = self._exclusion_matchers.get(key)
+            if matcher is None:
+                if len(self._exclusion_matchers) >= self.MAX_CACHED_MATCHERS:
+                    self._exclusion_matchers.clear()
+                matcher = ExclusionMatcher(
+                    self._settings.get("exclusion_patterns", []), profile_exclusions
+                )
+                self._exclusion_matchers[key] = matcher
+            return matcher
+
     def get_all(self) -> dict:
         """
         Get a copy of all settings.
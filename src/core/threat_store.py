@@ -0,0 +1,218 @@
+# ClamUI Threat Store Module
+"""
+Bounded-memory storage for the threats found by a scan.
+
+A mass infection or a scan of a mail store can report millions of
+threats. ThreatList keeps the first SPILL_THRESHOLD threats in a normal
+list and writes the rest to a private temporary SQLite database, which
+SQLite deletes when it is closed. Only its page cache stays in memory,
+so a huge result costs disk space instead of memory.
+
+ThreatList is a read-only Sequence for its readers (len(), indexing,
+slicing, iteration), so it can be used wherever a list of ThreatDetail
+was used. ThreatPaths is a view of the file paths of a ThreatList, used
+for ScanResult.infected_files instead of a second list.
+"""
+
+import sqlite3
+import threading
+import weakref
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+from .scanner_types import ThreatDetail
+
+# Threats kept in memory before the rest spill to disk
+SPILL_THRESHOLD = 10_000
+
+# Rows fetched at a time when iterating over spilled threats
+_FETCH_SIZE = 1000
+
+# SQLite page cache per spilled list, in KiB (negative means KiB in SQLite)
+_CACHE_SIZE_KIB = 2048
+
+
+def _close_connection(connection: sqlite3.Connection) -> None:
+    """Close a spill database, which makes SQLite delete it."""
+    try:
+        connection.close()
+    except sqlite3.Error:
+        pass
+
+
+class ThreatList(Sequence[ThreatDetail]):
+    """
+    Append-only list of ThreatDetail that spills to disk past a threshold.
+
+    Thread-safe: one thread may append while others read.
+    """
+
+    def __init__(
+        self,
+        threats: Iterable[ThreatDetail] = (),
+        spill_threshold: int = SPILL_THRESHOLD,
+    ):
+        """
+        Initialize the list.
+
+        Args:
+            threats: Optional threats to add
+            spill_threshold: Number of threats kept in memory
+        """
+        self._spill_threshold = spill_threshold
+        self._memory: list[ThreatDetail] = []
+        self._spilled = 0
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.extend(threats)
+
+    @property
+    def file_paths(self) -> "ThreatPaths":
+        """View of the file paths of the threats, in the same order."""
+        return ThreatPaths(self)
+
+    @property
+    def is_spilled(self) -> bool:
+        """Whether some threats are stored on disk."""
+        return self._spilled > 0
+
+    def append(self, threat: ThreatDetail) -> None:
+        """
+        Add a threat at the end of the list.
+
+        Args:
+            threat: Threat to add
+        """
+        self.extend((threat,))
+
+    def extend(self, threats: Iterable[ThreatDetail]) -> None:
+        """
+        Add threats at the end of the list.
+
+        Args:
+            threats: Threats to add
+        """
+        with self._lock:
+            pending: list[tuple[str, str, str, str]] = []
+            for threat in threats:
+                if len(self._memory) < self._spill_threshold:
+                    self._memory.append(threat)
+                else:
+                    pending.append(
+                        (threat.file_path, threat.threat_name, threat.category, threat.severity)
+                    )
+                    if len(pending) >= _FETCH_SIZE:
+                        self._spill(pending)
+                        pending = []
+            if pending:
+                self._spill(pending)
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    @overload
+    def __getitem__(self, index: int) -> ThreatDetail: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ThreatDetail]: ...
+
+    def __getitem__(self, index: int | slice) -> ThreatDetail | list[ThreatDetail]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._read(start, stop)
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ThreatList index out of range")
+        return self._read(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[ThreatDetail]:
+        start = 0
+        while True:
+            batch = self._read(start, start + _FETCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+            start += len(batch)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+
+    def __repr__(self) -> str:
+        return f"ThreatList({len(self)} threats, spilled={self.is_spilled})"
+
+    def _spill(self, rows: list[tuple[str, str, str, str]]) -> None:
+        """Write threats to the spill database. Caller holds the lock."""
+        if self._connection is None:
+            # An empty file name gives a private database deleted on close
+            self._connection = sqlite3.connect("", check_same_thread=False)
+            self._connection.execute(f"PRAGMA cache_size = -{_CACHE_SIZE_KIB}")
+            self._connection.execute("PRAGMA journal_mode = OFF")
+            self._connection.execute("PRAGMA synchronous = OFF")
+            self._connection.execute(
+                "CREATE TABLE threats (file_path TEXT, threat_name TEXT, category TEXT, "
+                "severity TEXT)"
+            )
+            weakref.finalize(self, _close_connection, self._connection)
+        self._connection.executemany("INSERT INTO threats VALUES (?, ?, ?, ?)", rows)
+        self._spilled += len(rows)
+
+    def _read(self, start: int, stop: int) -> list[ThreatDetail]:
+        """Get the threats from index start up to stop."""
+        with self._lock:
+            in_memory = len(self._memory)
+            threats = self._memory[start:stop]
+            if stop <= in_memory or self._connection is None:
+                return threats
+            # SQLite rowids start at 1 and follow insertion order
+            first_row = max(start - in_memory, 0) + 1
+            rows = self._connection.execute(
+                "SELECT file_path, threat_name, category, severity FROM threats "
+                "WHERE rowid >= ? AND rowid < ? ORDER BY rowid",
+                (first_row, stop - in_memory + 1),
+            ).fetchall()
+        threats.extend(ThreatDetail(*row) for row in rows)
+        return threats
+
+
+class ThreatPaths(Sequence[str]):
+    """Read-only view of the file paths of a sequence of threats."""
+
+    def __init__(self, threats: Sequence[ThreatDetail]):
+        """
+        Initialize the view.
+
+        Args:
+            threats: Threats whose file paths are viewed
+        """
+        self._threats = threats
+
+    def __len__(self) -> int:
+        return len(self._threats)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [threat.file_path for threat in self._threats[index]]
+        return self._threats[index].file_path
+
+    def __iter__(self) -> Iterator[str]:
+        return (threat.file_path for threat in self._threats)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+
+    def __repr__(self) -> str:
+        return f"ThreatPaths({list(self[:10])!r}{'...' if len(self) > 10 else ''})"
@@ -205,6 +205,11 @@ class FreshclamUpdater:
             result = self._parse_results(stdout, stderr, exit_code)
             duration = time.monotonic() - start_time
             self._save_update_log(result, duration)
+            if result.status == UpdateStatus.SUCCESS:
+                # Lazy import to avoid pulling in the scanner modules
+                from .managed_clamd import reload_managed_clamd
+
+                reload_managed_clamd()
             return result
 
         except FileNotFoundError:
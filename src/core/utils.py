@@ -26,6 +26,7 @@ from .clamav_detection import (
     get_clamav_path,
     get_clamd_socket_path,
     get_freshclam_path,
+    get_signature_database_dir,
 )
 from .clipboard import copy_to_clipboard
 from .flatpak import (
@@ -72,6 +73,7 @@ __all__ = [
     "check_clamd_connection",
     "get_clamav_path",
     "get_freshclam_path",
+    "get_signature_database_dir",
     # Path validation functions
     "check_symlink_safety",
     "validate_path",
@@ -0,0 +1,476 @@
+# ClamUI Watch Folders Module
+"""
+Watch folders: scan files as they land, without clamonacc.
+
+WatchFolderService watches the directories of the "watch_folders" setting
+(e.g. Downloads, mail attachments, browser caches) and their
+subdirectories with Linux inotify, which needs no extra privileges:
+
+- A file is queued when it is closed after writing (IN_CLOSE_WRITE) or
+  moved into a watched directory (IN_MOVED_TO). Further events for a queued
+  file restart its quiet period, so a burst of writes is scanned once.
+- Files and directories matched by the exclusion settings are dropped
+  before they are queued or watched.
+- Files that stayed quiet for "watch_debounce_seconds" are scanned in
+  batches of up to MAX_BATCH_FILES, each batch in one clamd session or
+  clamscan invocation, and logged as one grouped LogManager entry.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from collections.abc import Callable
+
+from .log_manager import LogEntry, LogManager
+from .sanitize import sanitize_log_line
+from .scan_cache import ScanCache
+from .scanner import Scanner
+from .scanner_types import ScanResult, ScanStatus
+from .settings_manager import SettingsManager
+
+logger = logging.getLogger(__name__)
+
+# Seconds a file must stay unchanged before it is scanned
+DEFAULT_DEBOUNCE = 2.0
+
+# Maximum number of files handed to the scanner at once
+MAX_BATCH_FILES = 200
+
+# Maximum seconds between checks for a stop request
+_POLL_INTERVAL = 1.0
+
+# inotify flags and event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Events watched on every directory
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK
+
+# struct inotify_event header: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Room for many events per read (names are at most NAME_MAX + 1 bytes)
+_READ_SIZE = 64 * (_EVENT_HEADER.size + 256)
+
+_libc: ctypes.CDLL | None = None
+
+
+def _get_libc() -> ctypes.CDLL:
+    """Load the C library providing the inotify calls."""
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+def is_inotify_available() -> bool:
+    """Check whether this system provides inotify."""
+    try:
+        return hasattr(_get_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+class Inotify:
+    """
+    Minimal inotify instance.
+
+    Not thread-safe; the watching thread owns it.
+    """
+
+    def __init__(self):
+        """
+        Create the inotify instance.
+
+        Raises:
+            OSError: If inotify is unavailable or the instance limit is reached
+        """
+        libc = _get_libc()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """
+        Watch a directory.
+
+        Args:
+            path: Directory to watch
+            mask: Events to report
+
+        Returns:
+            The watch descriptor, the same for a directory watched twice
+
+        Raises:
+            OSError: If the directory can't be watched, e.g. with ENOSPC
+                     when fs.inotify.max_user_watches is reached
+        """
+        wd = _get_libc().inotify_add_watch(self._fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self, timeout: float) -> list[tuple[int, int, str]]:
+        """
+        Wait for events and read them.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            List of (watch descriptor, mask, name) tuples, empty on timeout
+        """
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        if not poller.poll(max(timeout, 0.0) * 1000):
+            return []
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """Close the instance, which removes all its watches."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_batch_log_entry(
+    files: list[str], results: list[ScanResult], duration: float
+) -> LogEntry:
+    """
+    Create one log entry for a batch of files scanned from watch folders.
+
+    Args:
+        files: The scanned files
+        results: Their ScanResults, in the same order
+        duration: Scan duration in seconds
+
+    Returns:
+        LogEntry summarizing the batch
+    """
+    threat_lines = []
+    error_lines = []
+    for file_path, result in zip(files, results, strict=True):
+        for threat in result.threat_details:
+            threat_lines.append(
+                f"  - {sanitize_log_line(threat.file_path)}: "
+                f"{sanitize_log_line(threat.threat_name)}"
+            )
+        if result.status == ScanStatus.ERROR:
+            error_lines.append(
+                f"  - {sanitize_log_line(file_path)}: "
+                f"{sanitize_log_line(result.error_message or 'Scan failed')}"
+            )
+
+    folder = os.path.commonpath(files) if len(files) > 1 else os.path.dirname(files[0])
+    if threat_lines:
+        status = "infected"
+        summary = f"Found {len(threat_lines)} threat(s) in new files in {folder} (watch folders)"
+    elif error_lines and len(error_lines) == len(files):
+        status = "error"
+        summary = f"Watch folder scan error: {folder}"
+    else:
+        status = "clean"
+        summary = f"Clean scan of {len(files)} new file(s) in {folder} (watch folders)"
+
+    details_parts = [f"Scanned: {len(files)} files"]
+    if threat_lines:
+        details_parts.append(f"Threats found: {len(threat_lines)}")
+        details_parts.extend(threat_lines)
+    if error_lines:
+        details_parts.append(f"Errors: {len(error_lines)}")
+        details_parts.extend(error_lines)
+    details_parts.append("Files:")
+    details_parts.extend(f"  {sanitize_log_line(file_path)}" for file_path in files)
+
+    return LogEntry.create(
+        log_type="scan",
+        status=status,
+        summary=summary,
+        details="\n".join(details_parts),
+        path=folder,
+        duration=duration,
+    )
+
+
+class WatchFolderService:
+    """
+    Background service scanning new files in the watch folders.
+
+    One thread reads inotify events and debounces them; another scans the
+    ready batches, so a slow scan never delays the event queue.
+    """
+
+    def __init__(
+        self,
+        settings_manager: SettingsManager,
+        log_manager: LogManager | None = None,
+        scanner: Scanner | None = None,
+        on_batch_scanned: Callable[[list[str], list[ScanResult]], None] | None = None,
+    ):
+        """
+        Initialize the service. Nothing is watched until start().
+
+        Args:
+            settings_manager: SettingsManager providing the watch folders,
+                              debounce time and exclusion patterns
+            log_manager: Optional LogManager for the grouped log entries.
+                         If not provided, a default instance is created.
+            scanner: Optional Scanner for the batches. It should not save
+                     its own logs. If not provided, one is created.
+            on_batch_scanned: Optional callback invoked from the scanning
+                              thread with the files and results of each batch
+        """
+        self._settings_manager = settings_manager
+        self._log_manager = log_manager if log_manager else LogManager()
+        if scanner is None:
+            scan_cache = ScanCache() if settings_manager.get("scan_cache_enabled", True) else None
+            scanner = Scanner(
+                log_manager=self._log_manager,
+                settings_manager=settings_manager,
+                scan_cache=scan_cache,
+                save_logs=False,
+                interactive=False,
+            )
+        self._scanner = scanner
+        self._on_batch_scanned = on_batch_scanned
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._batches: queue.Queue[list[str] | None] = queue.Queue()
+
+        # Owned by the watching thread
+        self._inotify: Inotify | None = None
+        self._watches: dict[int, str] = {}
+        self._pending: dict[str, float] = {}
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the service is watching."""
+        with self._lock:
+            return bool(self._threads)
+
+    def start(self) -> bool:
+        """
+        Start watching the configured folders.
+
+        Returns:
+            True if at least one folder is watched
+        """
+        with self._lock:
+            if self._threads:
+                return True
+            try:
+                self._inotify = Inotify()
+            except (OSError, AttributeError) as e:
+                logger.warning("Watch folders unavailable: %s", e)
+                return False
+
+            self._watches.clear()
+            self._pending.clear()
+            for folder in self._settings_manager.get("watch_folders", []):
+                self._watch_tree(os.path.expanduser(folder), queue_files=False)
+            if not self._watches:
+                logger.info("No watch folders to watch")
+                self._inotify.close()
+                self._inotify = None
+                return False
+
+            # Fresh stop event and queue, so threads of a previous run can't pick them up
+            self._stop_event = threading.Event()
+            self._batches = queue.Queue()
+            args = (self._inotify, self._stop_event, self._batches)
+            self._threads = [
+                threading.Thread(
+                    target=self._watch_loop, args=args, name="watch-folders", daemon=True
+                ),
+                threading.Thread(
+                    target=self._scan_loop, args=args[1:], name="watch-folders-scan", daemon=True
+                ),
+            ]
+            for thread in self._threads:
+                thread.start()
+            logger.info("Watching %d directories for new files", len(self._watches))
+            return True
+
+    def stop(self) -> None:
+        """Stop watching and cancel a running batch scan."""
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        if not threads:
+            return
+        self._stop_event.set()
+        self._batches.put(None)
+        self._scanner.cancel()
+        for thread in threads:
+            thread.join(timeout=_POLL_INTERVAL * 5)
+
+    def _get_debounce(self) -> float:
+        """Get the quiet time before a file is scanned, in seconds."""
+        debounce = self._settings_manager.get("watch_debounce_seconds", DEFAULT_DEBOUNCE)
+        if not isinstance(debounce, int | float) or debounce < 0:
+            return DEFAULT_DEBOUNCE
+        return float(debounce)
+
+    def _watch_tree(self, root: str, queue_files: bool) -> None:
+        """
+        Watch a directory and its non-excluded subdirectories.
+
+        Args:
+            root: Directory to watch
+            queue_files: Whether to queue the files already in the tree, for
+                         directories created or moved in while watching
+        """
+        matcher = self._settings_manager.get_exclusion_matcher()
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            if matcher.is_excluded(directory, is_dir=True):
+                continue
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    logger.warning(
+                        "inotify watch limit reached, not watching %s "
+                        "(raise fs.inotify.max_user_watches)",
+                        directory,
+                    )
+                    return
+                logger.debug("Cannot watch %s: %s", directory, e)
+                continue
+            self._watches[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif queue_files and entry.is_file(follow_symlinks=False):
+                            self._queue_file(entry.path)
+            except OSError as e:
+                logger.debug("Cannot list %s: %s", directory, e)
+
+    def _queue_file(self, file_path: str) -> None:
+        """Queue a non-excluded file, restarting its quiet period."""
+        if self._settings_manager.get_exclusion_matcher().is_excluded(file_path, is_dir=False):
+            return
+        # Re-insert so the dict stays ordered by last change
+        self._pending.pop(file_path, None)
+        self._pending[file_path] = time.monotonic()
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        """Update the watches and the queued files for one inotify event."""
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify event queue overflowed, some new files were not scanned")
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF):
+            self._watches.pop(wd, None)
+            return
+        directory = self._watches.get(wd)
+        if directory is None or not name:
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path, queue_files=True)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._queue_file(path)
+
+    def _take_ready_files(self, debounce: float) -> list[str]:
+        """Remove and return the queued files that stayed quiet for debounce seconds."""
+        deadline = time.monotonic() - debounce
+        ready = []
+        for file_path, changed in self._pending.items():
+            if changed > deadline:
+                break
+            ready.append(file_path)
+        for file_path in ready:
+            del self._pending[file_path]
+        return ready
+
+    def _watch_loop(
+        self,
+        inotify: Inotify,
+        stop_event: threading.Event,
+        batches: "queue.Queue[list[str] | None]",
+    ) -> None:
+        """Read inotify events and hand ready batches to the scanning thread."""
+        try:
+            while not stop_event.is_set():
+                debounce = self._get_debounce()
+                timeout = _POLL_INTERVAL
+                if self._pending:
+                    oldest = next(iter(self._pending.values()))
+                    timeout = min(timeout, oldest + debounce - time.monotonic())
+                for wd, mask, name in inotify.read_events(timeout):
+                    self._handle_event(wd, mask, name)
+
+                ready = self._take_ready_files(debounce)
+                for start in range(0, len(ready), MAX_BATCH_FILES):
+                    batches.put(ready[start : start + MAX_BATCH_FILES])
+        except OSError as e:
+            logger.warning("Watch folders stopped: %s", e)
+        finally:
+            inotify.close()
+
+    def _scan_loop(
+        self, stop_event: threading.Event, batches: "queue.Queue[list[str] | None]"
+    ) -> None:
+        """Scan the batches handed over by the watching thread."""
+        while True:
+            batch = batches.get()
+            if batch is None or stop_event.is_set():
+                return
+            # Files removed meanwhile (e.g. browser cache churn) are skipped
+            files = [file_path for file_path in batch if os.path.isfile(file_path)]
+            if files:
+                self._scan_batch(files, stop_event)
+
+    def _scan_batch(self, files: list[str], stop_event: threading.Event) -> None:
+        """Scan a batch of files and log it as one entry."""
+        start_time = time.monotonic()
+        try:
+            results = self._scanner.scan_targets(files, recursive=False)
+        except Exception as e:
+            logger.error("Watch folder scan failed: %s", e)
+            return
+        if stop_event.is_set():
+            return
+
+        entry = create_batch_log_entry(files, results, time.monotonic() - start_time)
+        self._log_manager.save_log(entry)
+        if self._on_batch_scanned is not None:
+            self._on_batch_scanned(files, results)
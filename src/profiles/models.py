@@ -25,7 +25,8 @@ class ScanProfile:
         updated_at: ISO 8601 timestamp when profile was last modified
         is_default: Whether this is a built-in profile that cannot be deleted
         description: Optional description of the profile's purpose
-        options: Additional scan engine options (depth, file types, etc.)
+        options: ClamAV engine limits and file type settings, e.g.
+                 {"max_filesize": 25, "scan_archive": False} (see core.scan_limits)
     """
 
     id: str
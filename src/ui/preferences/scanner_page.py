@@ -109,6 +109,7 @@ class ScannerPage(PreferencesPageMixin):
         - Auto: Prefer daemon if available, fallback to clamscan
         - Daemon: Use clamd daemon only (faster, requires daemon running)
         - Clamscan: Use standalone clamscan only
+        - Managed: Start a private clamd owned by ClamUI
 
         In Flatpak mode, only clamscan is available (daemon cannot be accessed
         from inside the sandbox), so a simplified informational view is shown.
@@ -172,12 +173,13 @@ class ScannerPage(PreferencesPageMixin):
         backend_model.append("Auto (prefer daemon)")
         backend_model.append("ClamAV Daemon (clamd)")
         backend_model.append("Standalone Scanner (clamscan)")
+        backend_model.append("Private Daemon (managed clamd)")
         backend_row.set_model(backend_model)
         backend_row.set_title("Scan Backend")
 
         # Set current selection from settings
         current_backend = settings_manager.get("scan_backend", "auto")
-        backend_map = {"auto": 0, "daemon": 1, "clamscan": 2}
+        backend_map = {"auto": 0, "daemon": 1, "clamscan": 2, "managed": 3}
         backend_row.set_selected(backend_map.get(current_backend, 0))
 
         # Set initial subtitle based on current selection
@@ -248,12 +250,14 @@ class ScannerPage(PreferencesPageMixin):
 
         Args:
             row: The ComboRow widget to update
-            selected: Index of the selected backend (0=auto, 1=daemon, 2=clamscan)
+            selected: Index of the selected backend (0=auto, 1=daemon, 2=clamscan,
+                      3=managed)
         """
         subtitles = {
             0: "Recommended — Automatically uses daemon if available, falls back to clamscan for reliability",
             1: "Fastest — Instant startup with in-memory database, requires clamd service running",
             2: "Most compatible — Works anywhere, loads database each scan (3-10 sec startup)",
+            3: "No system daemon needed — ClamUI runs its own clamd while open, stops it when idle",
         }
         row.set_subtitle(subtitles.get(selected, subtitles[0]))
 
@@ -268,7 +272,7 @@ class ScannerPage(PreferencesPageMixin):
             row: The ComboRow that changed
             settings_manager: SettingsManager to save the selection
         """
-        backend_reverse_map = {0: "auto", 1: "daemon", 2: "clamscan"}
+        backend_reverse_map = {0: "auto", 1: "daemon", 2: "clamscan", 3: "managed"}
         selected = row.get_selected()
         backend = backend_reverse_map.get(selected, "auto")
         settings_manager.set("scan_backend", backend)
@@ -75,8 +75,10 @@ class ScanResultsDialog(Adw.Dialog):
         self._all_threat_details = scan_result.threat_details or []
         self._load_more_row: Gtk.ListBoxRow | None = None
 
-        # Track unquarantined threats for bulk action
-        self._unquarantined_threats: list[ThreatDetail] = list(self._all_threat_details)
+        # Track quarantined threats by index for bulk action; the threat
+        # list itself may be spilled to disk, so it is never copied
+        self._quarantined_indices: set[int] = set()
+        self._unquarantined_count = len(self._all_threat_details)
 
         # UI references
         self._quarantine_all_button: Gtk.Button | None = None
@@ -115,7 +117,7 @@ class ScanResultsDialog(Adw.Dialog):
         # Quarantine All button (right side, only if threats exist)
         if self._scan_result.infected_count > 0:
             self._quarantine_all_button = Gtk.Button()
-            count = len(self._unquarantined_threats)
+            count = self._unquarantined_count
             if count == 1:
                 self._quarantine_all_button.set_label("Quarantine 1 Threat")
             else:
@@ -271,8 +273,9 @@ class ScanResultsDialog(Adw.Dialog):
         start_idx = self._displayed_threat_count
         end_idx = min(start_idx + count, len(self._all_threat_details))
 
-        for threat in self._all_threat_details[start_idx:end_idx]:
-            threat_row = self._create_threat_row(threat)
+        threats = self._all_threat_details[start_idx:end_idx]
+        for index, threat in enumerate(threats, start_idx):
+            threat_row = self._create_threat_row(threat, index)
             self._threats_list.append(threat_row)
             self._displayed_threat_count += 1
 
@@ -303,8 +306,8 @@ class ScanResultsDialog(Adw.Dialog):
         """Handle load more button click."""
         self._load_more_threats(LOAD_MORE_BATCH_SIZE)
 
-    def _create_threat_row(self, threat: ThreatDetail) -> Gtk.ListBoxRow:
-        """Create a list row for a single threat."""
+    def _create_threat_row(self, threat: ThreatDetail, index: int) -> Gtk.ListBoxRow:
+        """Create a list row for a single threat at an index of the threat list."""
         row = Gtk.ListBoxRow()
         row.set_activatable(False)
 
@@ -355,7 +358,9 @@ class ScanResultsDialog(Adw.Dialog):
         quarantine_btn.set_label("Quarantine")
         quarantine_btn.add_css_class("pill")
         quarantine_btn.add_css_class("threat-action-btn")
-        quarantine_btn.connect("clicked", lambda btn: self._on_quarantine_single(btn, threat))
+        quarantine_btn.connect(
+            "clicked", lambda btn: self._on_quarantine_single(btn, threat, index)
+        )
         actions_box.append(quarantine_btn)
 
         # Exclude button
@@ -381,7 +386,7 @@ class ScanResultsDialog(Adw.Dialog):
 
         return row
 
-    def _on_quarantine_single(self, button: Gtk.Button, threat: ThreatDetail):
+    def _on_quarantine_single(self, button: Gtk.Button, threat: ThreatDetail, index: int):
         """Quarantine a single threat file."""
         result = self._quarantine_manager.quarantine_file(threat.file_path, threat.threat_name)
 
@@ -390,9 +395,10 @@ class ScanResultsDialog(Adw.Dialog):
             button.set_sensitive(False)
             button.add_css_class("quarantined")
 
-            # Remove from unquarantined list and update button
-            if threat in self._unquarantined_threats:
-                self._unquarantined_threats.remove(threat)
+            # Leave it out of the bulk action and update button
+            if index not in self._quarantined_indices and self._unquarantined_count > 0:
+                self._quarantined_indices.add(index)
+                self._unquarantined_count -= 1
                 self._update_quarantine_all_button()
 
             self._show_toast(f"Quarantined: {os.path.basename(threat.file_path)}")
@@ -442,19 +448,23 @@ class ScanResultsDialog(Adw.Dialog):
 
     def _on_quarantine_all_clicked(self, button: Gtk.Button):
         """Handle quarantine all button click."""
-        if not self._unquarantined_threats:
+        if self._unquarantined_count == 0:
             return
 
         button.set_sensitive(False)
         button.set_label("Quarantining...")
 
-        threats_to_quarantine = list(self._unquarantined_threats)
+        threats = self._all_threat_details
+        # Only the few threats quarantined one by one are copied
+        skipped = frozenset(self._quarantined_indices)
 
         def quarantine_worker():
             success_count = 0
             error_count = 0
 
-            for threat in threats_to_quarantine:
+            for index, threat in enumerate(threats):
+                if index in skipped:
+                    continue
                 result = self._quarantine_manager.quarantine_file(
                     threat.file_path, threat.threat_name
                 )
@@ -473,7 +483,7 @@ class ScanResultsDialog(Adw.Dialog):
 
     def _on_quarantine_all_complete(self, success_count: int, error_count: int):
         """Handle completion of bulk quarantine operation."""
-        self._unquarantined_threats.clear()
+        self._unquarantined_count = 0
 
         if self._quarantine_all_button:
             self._quarantine_all_button.set_visible(False)
@@ -490,7 +500,7 @@ class ScanResultsDialog(Adw.Dialog):
         if self._quarantine_all_button is None:
             return
 
-        count = len(self._unquarantined_threats)
+        count = self._unquarantined_count
         if count == 0:
             self._quarantine_all_button.set_visible(False)
         elif count == 1:
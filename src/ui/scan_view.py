@@ -15,7 +15,13 @@ gi.require_version("Adw", "1")
 from gi.repository import Adw, Gdk, Gio, GLib, Gtk
 
 from ..core.quarantine import QuarantineManager
+from ..core.scan_cache import ScanCache
+from ..core.scan_checkpoint import ScanCheckpoint, find_interrupted_scan
+from ..core.scan_governor import GovernorState
+from ..core.scan_progress import ScanProgress
 from ..core.scanner import Scanner, ScanResult, ScanStatus
+from ..core.scanner_base import keep_tail
+from ..core.threat_store import ThreatList
 from ..core.utils import (
     format_scan_path,
     is_flatpak,
@@ -62,7 +68,12 @@ class ScanView(Gtk.Box):
         self._settings_manager = settings_manager
 
         # Initialize scanner with settings manager for exclusion patterns
-        self._scanner = Scanner(settings_manager=settings_manager)
+        # and the verdict cache shared with scheduled scans
+        scan_cache = None
+        if settings_manager is not None and settings_manager.get("scan_cache_enabled", True):
+            scan_cache = ScanCache()
+        self._scanner = Scanner(settings_manager=settings_manager, scan_cache=scan_cache)
+        self._scanner.governor.add_listener(self._on_governor_state_changed)
 
         # Initialize quarantine manager
         self._quarantine_manager = QuarantineManager()
@@ -76,6 +87,10 @@ class ScanView(Gtk.Box):
         self._is_scanning = False
         self._cancel_all_requested = False
 
+        # Interrupted scan offered for resuming, and whether the next scan resumes it
+        self._interrupted_scan: ScanCheckpoint | None = None
+        self._resume_requested = False
+
         # Temp file path for EICAR test (for cleanup)
         self._eicar_temp_path: str = ""
 
@@ -85,12 +100,25 @@ class ScanView(Gtk.Box):
         # Scan state change callback (for tray integration)
         self._on_scan_state_changed = None
 
+        # Scan progress callback (for tray integration)
+        self._on_scan_progress = None
+
+        # Scan paused callback (for tray integration)
+        self._on_scan_paused_changed = None
+
+        # Why the governor throttles or pauses the scan, "" at full speed
+        self._governor_status = ""
+
         # Progress section state
         self._progress_section: Gtk.Box | None = None
         self._progress_bar: Gtk.ProgressBar | None = None
         self._progress_label: Gtk.Label | None = None
         self._pulse_timeout_id: int | None = None
 
+        # Latest progress snapshot from the scan worker, applied on idle
+        self._latest_progress: ScanProgress | None = None
+        self._progress_update_pending = False
+
         # View results section state
         self._view_results_section: Gtk.Box | None = None
         self._view_results_button: Gtk.Button | None = None
@@ -139,6 +167,9 @@ class ScanView(Gtk.Box):
         # Set up drag-and-drop support
         self._setup_drop_target()
 
+        # Offer to resume a scan that was cancelled or killed
+        self._update_resume_button()
+
     def _setup_drop_css(self):
         """Set up CSS styling for drag-and-drop visual feedback and severity badges."""
         css_provider = Gtk.CssProvider()
@@ -873,6 +904,7 @@ class ScanView(Gtk.Box):
     def _clear_paths(self):
         """Clear all selected paths and reset the listbox."""
         self._selected_paths.clear()
+        self._normalized_paths.clear()
 
         # Remove all path rows from listbox (keep placeholder)
         child = self._paths_listbox.get_first_child()
@@ -954,6 +986,23 @@ class ScanView(Gtk.Box):
         self._cancel_button.connect("clicked", self._on_cancel_clicked)
         button_box.append(self._cancel_button)
 
+        # Pause button - hidden initially, shown during scanning
+        self._pause_button = Gtk.Button()
+        self._pause_button.set_label("Pause")
+        self._pause_button.set_tooltip_text("Pause the current scan")
+        self._pause_button.set_size_request(120, -1)
+        self._pause_button.set_visible(False)
+        self._pause_button.connect("clicked", self._on_pause_clicked)
+        button_box.append(self._pause_button)
+
+        # Resume button - shown while an interrupted scan can be continued
+        self._resume_button = Gtk.Button()
+        self._resume_button.set_label("Resume Interrupted Scan")
+        self._resume_button.set_size_request(150, -1)
+        self._resume_button.set_visible(False)
+        self._resume_button.connect("clicked", self._on_resume_clicked)
+        button_box.append(self._resume_button)
+
         scan_group.add(button_box)
 
         self.append(scan_group)
@@ -1002,6 +1051,75 @@ class ScanView(Gtk.Box):
         if self._progress_section is not None:
             self._progress_section.set_visible(False)
 
+    def _report_progress(self, progress: ScanProgress):
+        """
+        Receive a progress snapshot from the scan worker thread.
+
+        Snapshots are coalesced: only the latest one is applied, by a
+        single pending idle callback on the main thread.
+
+        Args:
+            progress: Current progress of the scan
+        """
+        self._latest_progress = progress
+        if not self._progress_update_pending:
+            self._progress_update_pending = True
+            GLib.idle_add(self._apply_progress)
+
+    def _apply_progress(self):
+        """Show the latest progress snapshot (main thread)."""
+        # Clear the flag first so a snapshot arriving now schedules a new update
+        self._progress_update_pending = False
+        progress = self._latest_progress
+        if progress is None or not self._is_scanning:
+            return False
+
+        fraction = progress.fraction
+        if fraction is not None and self._progress_bar is not None:
+            # A real fraction replaces the indeterminate pulse
+            if self._pulse_timeout_id is not None:
+                GLib.source_remove(self._pulse_timeout_id)
+                self._pulse_timeout_id = None
+            self._progress_bar.set_fraction(fraction)
+
+        if self._progress_label is not None:
+            self._progress_label.set_label(self._progress_text(progress))
+
+        if self._on_scan_progress:
+            self._on_scan_progress(progress)
+        return False
+
+    def _progress_text(self, progress: ScanProgress) -> str:
+        """Format a progress snapshot, followed by why the scan is slowed down or paused."""
+        text = self._format_progress(progress)
+        if self._governor_status:
+            text = f"{text} · {self._governor_status}"
+        return text
+
+    @staticmethod
+    def _format_progress(progress: ScanProgress) -> str:
+        """
+        Format a progress snapshot for the progress label.
+
+        Args:
+            progress: Progress snapshot
+
+        Returns:
+            Text such as "Scanned 1200 of 5000 files · 85 files/s · 12.3 MB/s · 1m 10s left"
+        """
+        if progress.files_total is not None:
+            parts = [f"Scanned {progress.files_done} of {progress.files_total} files"]
+        else:
+            parts = [f"Scanned {progress.files_done} files"]
+        if progress.files_done:
+            parts.append(f"{progress.files_per_second:.0f} files/s")
+            parts.append(f"{progress.bytes_per_second / (1024 * 1024):.1f} MB/s")
+        eta = progress.eta
+        if eta is not None and progress.files_done:
+            minutes, seconds = divmod(int(eta), 60)
+            parts.append(f"{minutes}m {seconds}s left" if minutes else f"{seconds}s left")
+        return " · ".join(parts)
+
     def _create_view_results_section(self):
         """Create the view results button section (initially hidden)."""
         self._view_results_section = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
@@ -1074,6 +1192,39 @@ class ScanView(Gtk.Box):
 
         self._start_scanning()
 
+    def _update_resume_button(self):
+        """Show the resume button if an interrupted scan left a checkpoint."""
+        self._interrupted_scan = find_interrupted_scan()
+        if self._interrupted_scan is None:
+            self._resume_button.set_visible(False)
+            return
+
+        targets = self._interrupted_scan.targets
+        self._resume_button.set_tooltip_text(
+            "Continue scanning " + ", ".join(format_scan_path(target) for target in targets)
+        )
+        self._resume_button.set_visible(True)
+
+    def _on_resume_clicked(self, button):
+        """
+        Handle resume button click.
+
+        Selects the targets of the interrupted scan and scans them again,
+        skipping the files it had already scanned.
+
+        Args:
+            button: The Gtk.Button that was clicked
+        """
+        checkpoint = self._interrupted_scan
+        if checkpoint is None:
+            return
+
+        self._clear_paths()
+        for target in checkpoint.targets:
+            self._add_path(target)
+        self._resume_requested = True
+        self._start_scanning()
+
     def _on_eicar_test_clicked(self, button):
         """
         Handle EICAR test button click.
@@ -1113,6 +1264,11 @@ class ScanView(Gtk.Box):
         self._eicar_button.set_sensitive(False)
         self._selection_group.set_sensitive(False)
         self._cancel_button.set_visible(True)
+        self._resume_button.set_visible(False)
+        self._pause_button.set_label("Pause")
+        self._pause_button.set_tooltip_text("Pause the current scan")
+        self._pause_button.set_visible(True)
+        self._governor_status = ""
 
         # Update cancel button text based on number of targets
         path_count = len(self._selected_paths)
@@ -1139,8 +1295,10 @@ class ScanView(Gtk.Box):
                 self._progress_label.set_label(f"Scanning {display_path}")
             else:
                 self._progress_label.set_label(f"Scanning {path_count} items...")
+            self._progress_bar.set_fraction(0.0)
             self._progress_section.set_visible(True)
             self._start_progress_pulse()
+        self._latest_progress = None
 
         # Notify external handlers (e.g., tray menu)
         if self._on_scan_state_changed:
@@ -1162,7 +1320,9 @@ class ScanView(Gtk.Box):
         Perform the actual scan on all selected paths.
 
         This runs in a background thread to avoid blocking the UI.
-        Scans each selected path sequentially and aggregates results.
+        All selected paths are scanned in one scanner invocation, so the
+        signature database is loaded once, and the per-target results are
+        aggregated.
         """
         try:
             if not self._selected_paths:
@@ -1187,8 +1347,8 @@ class ScanView(Gtk.Box):
             total_scanned_files = 0
             total_scanned_dirs = 0
             total_infected_count = 0
-            all_infected_files: list[str] = []
-            all_threat_details: list = []
+            total_skipped: dict[str, int] = {}
+            all_threat_details = ThreatList()
             all_stdout: list[str] = []
             all_stderr: list[str] = []
             has_errors = False
@@ -1196,21 +1356,42 @@ class ScanView(Gtk.Box):
             final_status = ScanStatus.CLEAN
 
             target_count = len(self._selected_paths)
-
-            for idx, target_path in enumerate(self._selected_paths, start=1):
-                # Check if cancel all was requested before starting next target
-                if self._cancel_all_requested:
-                    logger.info(f"Cancel all requested, skipping target {idx}/{target_count}")
-                    final_status = ScanStatus.CANCELLED
-                    break
-
-                # Update progress to show current target
-                GLib.idle_add(self._update_scan_progress, idx, target_count, target_path)
-
-                # Scan this target
-                result = self._scanner.scan_sync(target_path)
-
-                # Check if scan was cancelled (either this target or cancel all)
+            results: list[ScanResult] = []
+
+            # The selected profile's engine limits apply to every path; a
+            # resumed scan keeps the limits of the run it continues
+            resume = self._resume_requested
+            self._resume_requested = False
+            profile = self._selected_profile
+            profile_options = profile.options if profile is not None else None
+            if resume and self._interrupted_scan is not None:
+                profile_options = self._interrupted_scan.profile_options
+
+            # Progress is journaled so a cancelled or killed scan can be resumed
+            checkpoint = ScanCheckpoint(list(self._selected_paths), profile_options=profile_options)
+
+            if self._cancel_all_requested:
+                logger.info("Cancel requested before the scan started")
+                final_status = ScanStatus.CANCELLED
+            else:
+                if target_count == 1:
+                    GLib.idle_add(self._update_scan_progress, 1, 1, self._selected_paths[0])
+                else:
+                    GLib.idle_add(self._update_multi_target_progress, target_count)
+                checkpoint.start(resume=resume)
+                try:
+                    results = self._scanner.scan_targets(
+                        list(self._selected_paths),
+                        checkpoint=checkpoint,
+                        on_progress=self._report_progress,
+                        profile_options=profile_options,
+                    )
+                finally:
+                    checkpoint.close()
+
+            # results is empty if the scan was cancelled before it started
+            for target_path, result in zip(self._selected_paths, results, strict=False):
+                # Check if the scan was cancelled
                 if result.status == ScanStatus.CANCELLED or self._cancel_all_requested:
                     final_status = ScanStatus.CANCELLED
                     break
@@ -1219,7 +1400,8 @@ class ScanView(Gtk.Box):
                 total_scanned_files += result.scanned_files
                 total_scanned_dirs += result.scanned_dirs
                 total_infected_count += result.infected_count
-                all_infected_files.extend(result.infected_files)
+                for limit, count in result.skipped_files.items():
+                    total_skipped[limit] = total_skipped.get(limit, 0) + count
                 all_threat_details.extend(result.threat_details)
 
                 if result.stdout:
@@ -1237,6 +1419,7 @@ class ScanView(Gtk.Box):
 
             # Determine final status if not cancelled
             if final_status != ScanStatus.CANCELLED:
+                checkpoint.discard()
                 if total_infected_count > 0:
                     final_status = ScanStatus.INFECTED
                 elif has_errors:
@@ -1250,15 +1433,17 @@ class ScanView(Gtk.Box):
                 path=", ".join(self._selected_paths)
                 if target_count > 1
                 else self._selected_paths[0],
-                stdout="\n\n".join(all_stdout),
-                stderr="\n\n".join(all_stderr),
+                # Each target's output is a bounded tail; so is their sum
+                stdout=keep_tail("\n\n".join(all_stdout)),
+                stderr=keep_tail("\n\n".join(all_stderr)),
                 exit_code=1 if final_status == ScanStatus.INFECTED else (2 if has_errors else 0),
-                infected_files=all_infected_files,
+                infected_files=all_threat_details.file_paths,
                 scanned_files=total_scanned_files,
                 scanned_dirs=total_scanned_dirs,
                 infected_count=total_infected_count,
                 error_message="; ".join(error_messages) if error_messages else None,
                 threat_details=all_threat_details,
+                skipped_files=total_skipped,
             )
 
             # Schedule UI update on main thread
@@ -1294,6 +1479,18 @@ class ScanView(Gtk.Box):
                 f"Scanning target {current_idx}/{total_count}: {display_path}"
             )
 
+    def _update_multi_target_progress(self, total_count: int):
+        """
+        Update the progress display for a scan of several targets.
+
+        Args:
+            total_count: Total number of targets
+        """
+        if self._progress_label is None:
+            return
+
+        self._progress_label.set_label(f"Scanning {total_count} targets")
+
     def _on_scan_complete(self, result: ScanResult):
         """
         Handle scan completion.
@@ -1323,6 +1520,8 @@ class ScanView(Gtk.Box):
         self._eicar_button.set_sensitive(True)
         self._selection_group.set_sensitive(True)
         self._cancel_button.set_visible(False)
+        self._pause_button.set_visible(False)
+        self._update_resume_button()
 
         # Notify external handlers
         if self._on_scan_state_changed:
@@ -1379,6 +1578,8 @@ class ScanView(Gtk.Box):
         self._eicar_button.set_sensitive(True)
         self._selection_group.set_sensitive(True)
         self._cancel_button.set_visible(False)
+        self._pause_button.set_visible(False)
+        self._update_resume_button()
 
         # Notify external handlers
         if self._on_scan_state_changed:
@@ -1400,6 +1601,61 @@ class ScanView(Gtk.Box):
         # The scan thread will check _cancel_all_requested and skip remaining targets
         # _on_scan_complete will handle the UI update
 
+    def _on_pause_clicked(self, button: Gtk.Button) -> None:
+        """Handle pause button click, resuming the scan if it is paused."""
+        if self._scanner.governor.is_paused:
+            self.resume_scan()
+        else:
+            self.pause_scan()
+
+    def pause_scan(self) -> None:
+        """Pause the running scan until resume_scan() is called."""
+        if self._is_scanning:
+            logger.info("Scan paused by user")
+            self._scanner.pause()
+
+    def resume_scan(self) -> None:
+        """Resume a scan paused by the user or by the scan governor."""
+        if self._is_scanning:
+            logger.info("Scan resumed by user")
+            self._scanner.resume()
+
+    def _on_governor_state_changed(self, state: GovernorState, reason: str) -> None:
+        """Receive a change of the scan governor's state (any thread)."""
+        GLib.idle_add(self._apply_governor_state, state, reason)
+
+    def _apply_governor_state(self, state: GovernorState, reason: str) -> bool:
+        """
+        Show whether the scan is throttled or paused (main thread).
+
+        Args:
+            state: New state of the scan governor
+            reason: Why the scan is throttled or paused
+        """
+        if state is GovernorState.PAUSED:
+            self._governor_status = f"Paused: {reason}"
+        elif state is GovernorState.THROTTLED:
+            self._governor_status = f"Slowed down: {reason}"
+        else:
+            self._governor_status = ""
+        if not self._is_scanning:
+            return False
+
+        paused = state is GovernorState.PAUSED
+        self._pause_button.set_label("Resume" if paused else "Pause")
+        self._pause_button.set_tooltip_text(
+            "Resume the current scan" if paused else "Pause the current scan"
+        )
+        if self._progress_label is not None:
+            if self._latest_progress is not None:
+                self._progress_label.set_label(self._progress_text(self._latest_progress))
+            elif self._governor_status:
+                self._progress_label.set_label(self._governor_status)
+
+        if self._on_scan_paused_changed:
+            self._on_scan_paused_changed(paused)
+        return False
+
     def _create_backend_indicator(self):
         """Create a small indicator showing the active scan backend."""
         self._backend_label = Gtk.Label()
@@ -1414,6 +1670,7 @@ class ScanView(Gtk.Box):
         backend = self._scanner.get_active_backend()
         backend_names = {
             "daemon": "clamd (daemon)",
+            "managed": "clamd (private)",
             "clamscan": "clamscan (standalone)",
         }
         backend_display = backend_names.get(backend, backend)
@@ -1442,6 +1699,29 @@ class ScanView(Gtk.Box):
         """Alias for set_on_scan_state_changed for backwards compatibility."""
         self.set_on_scan_state_changed(callback)
 
+    def set_on_scan_progress(self, callback):
+        """
+        Set a callback for scan progress updates.
+
+        Used by the application to show the scan percentage in the tray.
+
+        Args:
+            callback: Function called on the main thread with each coalesced
+                      ScanProgress snapshot of the running scan
+        """
+        self._on_scan_progress = callback
+
+    def set_on_scan_paused_changed(self, callback):
+        """
+        Set a callback for the running scan being paused or resumed.
+
+        Used by the application to offer Pause or Resume in the tray menu.
+
+        Args:
+            callback: Function called on the main thread with (paused: bool)
+        """
+        self._on_scan_paused_changed = callback
+
     def get_selected_profile(self) -> "ScanProfile | None":
         """Return the currently selected scan profile."""
         return self._selected_profile
@@ -67,6 +67,8 @@ class TrayManager:
         self._on_quit: Callable[[], None] | None = None
         self._on_window_toggle: Callable[[], None] | None = None
         self._on_profile_select: Callable[[str], None] | None = None
+        self._on_pause_scan: Callable[[], None] | None = None
+        self._on_resume_scan: Callable[[], None] | None = None
 
         # Profile state
         self._current_profile_id: str | None = None
@@ -326,6 +328,10 @@ class TrayManager:
             GLib.idle_add(self._on_quit)
         elif action == "toggle_window" and self._on_window_toggle:
             GLib.idle_add(self._on_window_toggle)
+        elif action == "pause_scan" and self._on_pause_scan:
+            GLib.idle_add(self._on_pause_scan)
+        elif action == "resume_scan" and self._on_resume_scan:
+            GLib.idle_add(self._on_resume_scan)
         elif action == "select_profile" and self._on_profile_select:
             profile_id = message.get("profile_id")
             if profile_id:
@@ -397,6 +403,20 @@ class TrayManager:
         self._on_profile_select = on_select
         logger.debug("Profile select callback configured")
 
+    def set_scan_pause_callbacks(
+        self, on_pause: Callable[[], None], on_resume: Callable[[], None]
+    ) -> None:
+        """
+        Set the callbacks for pausing and resuming the scan from the tray menu.
+
+        Args:
+            on_pause: Callback for Pause Scan action
+            on_resume: Callback for Resume Scan action
+        """
+        self._on_pause_scan = on_pause
+        self._on_resume_scan = on_resume
+        logger.debug("Scan pause callbacks configured")
+
     def update_status(self, status: str) -> None:
         """
         Update the tray icon based on protection status.
@@ -417,6 +437,15 @@ class TrayManager:
         """
         self._send_command({"action": "update_progress", "percentage": percentage})
 
+    def update_scan_paused(self, paused: bool) -> None:
+        """
+        Offer Resume Scan or Pause Scan in the tray menu.
+
+        Args:
+            paused: Whether the running scan is paused
+        """
+        self._send_command({"action": "update_scan_paused", "paused": paused})
+
     def update_window_menu_label(self, visible: bool = True) -> None:
         """
         Update the Show/Hide Window menu item label.
@@ -495,6 +524,8 @@ class TrayManager:
         self._on_quit = None
         self._on_window_toggle = None
         self._on_profile_select = None
+        self._on_pause_scan = None
+        self._on_resume_scan = None
 
     @property
     def is_active(self) -> bool:
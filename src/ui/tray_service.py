@@ -192,6 +192,7 @@ class TrayService:
         self._current_status = "protected"
         self._window_visible = True
         self._progress_label = ""
+        self._scan_paused = False
 
         # Profile state
         self._profiles: list[dict] = []
@@ -298,6 +299,15 @@ class TrayService:
         full_scan.connect("item-activated", self._on_menu_full_scan)
         self._menu_root.child_append(full_scan)
 
+        # Pause/Resume Scan - only while a scan runs
+        if self._current_status == "scanning":
+            pause_item = Dbusmenu.Menuitem.new_with_id(item_id)
+            item_id += 1
+            pause_label = "Resume Scan" if self._scan_paused else "Pause Scan"
+            pause_item.property_set(Dbusmenu.MENUITEM_PROP_LABEL, pause_label)
+            pause_item.connect("item-activated", self._on_menu_pause_scan)
+            self._menu_root.child_append(pause_item)
+
         # Separator
         sep2 = Dbusmenu.Menuitem.new_with_id(item_id)
         item_id += 1
@@ -337,6 +347,10 @@ class TrayService:
         """Handle full scan menu item activation."""
         self._send_action("full_scan")
 
+    def _on_menu_pause_scan(self, menuitem, timestamp):
+        """Handle pause/resume scan menu item activation."""
+        self._send_action("resume_scan" if self._scan_paused else "pause_scan")
+
     def _on_menu_update(self, menuitem, timestamp):
         """Handle update definitions menu item activation."""
         self._send_action("update")
@@ -552,7 +566,12 @@ class TrayService:
             logger.warning(f"Unknown status '{status}', using 'protected'")
             status = "protected"
 
+        scanning_changed = (status == "scanning") != (self._current_status == "scanning")
         self._current_status = status
+        if scanning_changed:
+            # Pause/Resume Scan is only offered while scanning
+            self._scan_paused = False
+            self._rebuild_menu()
 
         # Emit signals to update the icon
         self._emit_signal("NewIcon")
@@ -570,6 +589,12 @@ class TrayService:
 
         self._emit_signal("NewToolTip")
 
+    def update_scan_paused(self, paused: bool) -> None:
+        """Offer Resume Scan instead of Pause Scan while the scan is paused."""
+        if paused != self._scan_paused:
+            self._scan_paused = paused
+            self._rebuild_menu()
+
     def update_window_visible(self, visible: bool) -> None:
         """Update window visibility state."""
         self._window_visible = visible
@@ -595,6 +620,10 @@ class TrayService:
             percentage = command.get("percentage", 0)
             GLib.idle_add(self.update_progress, percentage)
 
+        elif action == "update_scan_paused":
+            paused = command.get("paused", False)
+            GLib.idle_add(self.update_scan_paused, paused)
+
         elif action == "update_window_visible":
             visible = command.get("visible", True)
             GLib.idle_add(self.update_window_visible, visible)
@@ -3,7 +3,7 @@
 
 import os
 import subprocess
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 
 class TestParseArguments:
@@ -412,6 +412,21 @@ class TestMain:
         assert call_kwargs["auto_quarantine"] is True
         assert call_kwargs["targets"] == ["/custom/path"]
 
+    def test_main_passes_resume(self):
+        """Test --resume is passed on to the scan."""
+        from src.cli.scheduled_scan import main
+
+        mock_settings = MagicMock()
+        mock_settings.get.side_effect = lambda key, default: default
+
+        with patch("sys.argv", ["clamui-scheduled-scan", "--resume", "--target", "/data"]):
+            with patch("src.cli.scheduled_scan.SettingsManager", return_value=mock_settings):
+                with patch("src.cli.scheduled_scan.run_scheduled_scan") as mock_run:
+                    mock_run.return_value = 0
+                    main()
+
+        assert mock_run.call_args[1]["resume"] is True
+
     def test_main_default_home_directory(self):
         """Test main defaults to home directory when no targets configured."""
         from src.cli.scheduled_scan import main
@@ -463,7 +478,7 @@ class TestExecuteScans:
         )
 
         mock_scanner = MagicMock()
-        mock_scanner.scan_sync.return_value = mock_result
+        mock_scanner.scan_targets.return_value = [mock_result]
 
         ctx = ScanContext(
             targets=[str(target)],
@@ -527,7 +542,7 @@ class TestExecuteScans:
         )
 
         mock_scanner = MagicMock()
-        mock_scanner.scan_sync.side_effect = [mock_result1, mock_result2]
+        mock_scanner.scan_targets.return_value = [mock_result1, mock_result2]
 
         ctx = ScanContext(
             targets=[str(target1), str(target2)],
@@ -543,10 +558,67 @@ class TestExecuteScans:
 
         agg = _execute_scans(ctx, [str(target1), str(target2)])
 
+        mock_scanner.scan_targets.assert_called_once_with(
+            [str(target1), str(target2)], recursive=True, checkpoint=ANY
+        )
         assert agg.total_scanned == 13
         assert len(agg.all_results) == 2
         assert agg.valid_targets == [str(target1), str(target2)]
 
+    def test_execute_scans_resumes_interrupted_scan(self, tmp_path, capsys, monkeypatch):
+        """Test _execute_scans continues from the checkpoint of an interrupted run."""
+        from src.cli.scheduled_scan import ScanContext, _execute_scans
+        from src.core.scan_checkpoint import ScanCheckpoint
+        from src.core.scanner_types import ScanResult, ScanStatus
+
+        monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+        target = tmp_path / "dir"
+        target.mkdir()
+        (target / "done.txt").write_text("done")
+        interrupted = ScanCheckpoint([str(target)])
+        interrupted.start()
+        interrupted.mark_completed(str(target / "done.txt"), (target / "done.txt").stat())
+        interrupted.close()
+
+        def scan_targets(paths, recursive, checkpoint):
+            assert checkpoint.is_completed(str(target / "done.txt"), (target / "done.txt").stat())
+            return [
+                ScanResult(
+                    status=ScanStatus.CLEAN,
+                    path=str(target),
+                    stdout="",
+                    stderr="",
+                    exit_code=0,
+                    infected_files=[],
+                    scanned_files=1,
+                    scanned_dirs=1,
+                    infected_count=0,
+                    error_message=None,
+                    threat_details=[],
+                )
+            ]
+
+        mock_scanner = MagicMock()
+        mock_scanner.scan_targets.side_effect = scan_targets
+        ctx = ScanContext(
+            targets=[str(target)],
+            skip_on_battery=False,
+            auto_quarantine=False,
+            dry_run=False,
+            verbose=True,
+            resume=True,
+            scanner=mock_scanner,
+            settings=MagicMock(),
+            battery_manager=MagicMock(),
+            log_manager=MagicMock(),
+        )
+
+        _execute_scans(ctx, [str(target)])
+
+        assert "Resuming interrupted scan: 1 file(s)" in capsys.readouterr().err
+        # The finished scan leaves nothing to resume
+        assert not interrupted.db_path.exists()
+
     def test_execute_scans_with_infections(self, tmp_path, capsys):
         """Test _execute_scans with infected files found."""
         from src.cli.scheduled_scan import ScanContext, _execute_scans
@@ -579,7 +651,7 @@ class TestExecuteScans:
         )
 
         mock_scanner = MagicMock()
-        mock_scanner.scan_sync.return_value = mock_result
+        mock_scanner.scan_targets.return_value = [mock_result]
 
         ctx = ScanContext(
             targets=[str(target)],
@@ -596,8 +668,7 @@ class TestExecuteScans:
         agg = _execute_scans(ctx, [str(target)])
 
         assert agg.total_infected == 1
-        assert len(agg.all_infected_files) == 1
-        assert str(infected_file) in agg.all_infected_files
+        assert [threat.file_path for threat in agg.iter_threats()] == [str(infected_file)]
 
         captured = capsys.readouterr()
         assert "1 threat(s)" in captured.err
@@ -625,7 +696,7 @@ class TestExecuteScans:
         )
 
         mock_scanner = MagicMock()
-        mock_scanner.scan_sync.return_value = mock_result
+        mock_scanner.scan_targets.return_value = [mock_result]
 
         ctx = ScanContext(
             targets=[str(target)],
@@ -673,7 +744,6 @@ class TestProcessQuarantine:
         agg = ScanAggregateResult(
             total_scanned=10,
             total_infected=1,
-            all_infected_files=["/path/to/infected"],
         )
 
         qr = _process_quarantine(ctx, agg)
@@ -704,7 +774,6 @@ class TestProcessQuarantine:
         agg = ScanAggregateResult(
             total_scanned=10,
             total_infected=0,
-            all_infected_files=[],
         )
 
         qr = _process_quarantine(ctx, agg)
@@ -760,7 +829,6 @@ class TestProcessQuarantine:
         agg = ScanAggregateResult(
             total_scanned=5,
             total_infected=1,
-            all_infected_files=[str(infected_file)],
             all_results=[mock_scan_result],
         )
 
@@ -830,7 +898,6 @@ class TestProcessQuarantine:
         agg = ScanAggregateResult(
             total_scanned=5,
             total_infected=1,
-            all_infected_files=[str(infected_file)],
             all_results=[mock_scan_result],
         )
 
@@ -996,7 +1063,6 @@ class TestBuildLogDetails:
         agg = ScanAggregateResult(
             total_scanned=5,
             total_infected=1,
-            all_infected_files=[infected_file],
             all_results=[mock_result],
             duration=2.0,
             valid_targets=[str(tmp_path)],
@@ -1009,6 +1075,48 @@ class TestBuildLogDetails:
         assert "Win.Trojan.Test" in details
         assert "Trojan" in details
 
+    def test_log_details_cap_threat_lines(self, tmp_path, monkeypatch):
+        """Test log details list the first threats and count the rest."""
+        from src.cli.scheduled_scan import (
+            QuarantineResult,
+            ScanAggregateResult,
+            _build_log_details,
+        )
+        from src.core.scanner_types import ScanResult, ScanStatus, ThreatDetail
+
+        monkeypatch.setattr("src.cli.scheduled_scan.MAX_LOGGED_THREATS", 2)
+        results = [
+            ScanResult(
+                status=ScanStatus.INFECTED,
+                path=f"/target{target}",
+                stdout="",
+                stderr="",
+                exit_code=1,
+                infected_files=[],
+                scanned_files=3,
+                scanned_dirs=1,
+                infected_count=3,
+                error_message=None,
+                threat_details=[
+                    ThreatDetail(f"/target{target}/file{index}", "Eicar", "Test", "low")
+                    for index in range(3)
+                ],
+            )
+            for target in range(2)
+        ]
+        agg = ScanAggregateResult(
+            total_scanned=6,
+            total_infected=6,
+            all_results=results,
+            valid_targets=["/target0", "/target1"],
+        )
+
+        details = _build_log_details(agg, QuarantineResult(), auto_quarantine=False)
+
+        assert "/target0/file1: Eicar" in details
+        assert "/target0/file2" not in details
+        assert "  ... and 4 more" in details
+
     def test_log_details_with_quarantine_info(self, tmp_path):
         """Test log details include quarantine information."""
         from src.cli.scheduled_scan import (
@@ -1043,7 +1151,6 @@ class TestBuildLogDetails:
         agg = ScanAggregateResult(
             total_scanned=5,
             total_infected=1,
-            all_infected_files=[infected_file],
             all_results=[mock_result],
             duration=2.0,
             valid_targets=[str(tmp_path)],
@@ -1440,7 +1547,7 @@ class TestFullWorkflow:
         with patch("src.cli.scheduled_scan.Scanner") as mock_scanner_class:
             mock_scanner = MagicMock()
             mock_scanner.check_available.return_value = (True, "ClamAV 1.0.0")
-            mock_scanner.scan_sync.return_value = mock_result
+            mock_scanner.scan_targets.return_value = [mock_result]
             mock_scanner_class.return_value = mock_scanner
 
             with patch("src.cli.scheduled_scan.LogManager"):
@@ -1494,7 +1601,7 @@ class TestFullWorkflow:
         with patch("src.cli.scheduled_scan.Scanner") as mock_scanner_class:
             mock_scanner = MagicMock()
             mock_scanner.check_available.return_value = (True, "ClamAV 1.0.0")
-            mock_scanner.scan_sync.return_value = mock_result
+            mock_scanner.scan_targets.return_value = [mock_result]
             mock_scanner_class.return_value = mock_scanner
 
             with patch("src.cli.scheduled_scan.LogManager"):
@@ -1574,7 +1681,7 @@ class TestFullWorkflow:
         with patch("src.cli.scheduled_scan.Scanner") as mock_scanner_class:
             mock_scanner = MagicMock()
             mock_scanner.check_available.return_value = (True, "ClamAV 1.0.0")
-            mock_scanner.scan_sync.side_effect = [clean_result, infected_result]
+            mock_scanner.scan_targets.return_value = [clean_result, infected_result]
             mock_scanner_class.return_value = mock_scanner
 
             with patch("src.cli.scheduled_scan.LogManager"):
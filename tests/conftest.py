@@ -393,3 +393,257 @@ def mock_scanner():
     scanner._current_process = None
 
     yield scanner
+
+
+# =============================================================================
+# Fake clamd Server
+# =============================================================================
+
+
+class FakeClamd:
+    """
+    Minimal stand-in for clamd speaking the null-delimited socket protocol.
+
+    Supports PING, VERSION, RELOAD, SHUTDOWN, SCAN/CONTSCAN/MULTISCAN, FILDES,
+    INSTREAM and IDSESSION/END. Any content containing the EICAR marker is
+    reported as "Eicar-Test-Signature FOUND". Listens on a unix socket by
+    default, or on 127.0.0.1 when tcp=True (use .address to connect either way).
+
+    Attributes:
+        commands: Every command received, in order (without the "z" prefix)
+        stream_max_length: INSTREAM size limit, like clamd's StreamMaxLength
+    """
+
+    EICAR_MARKER = b"EICAR-STANDARD-ANTIVIRUS-TEST-FILE"
+    VERSION = "ClamAV 1.0.0/27000/Mon Jan  1 00:00:00 2024"
+
+    def __init__(self, socket_path: Path | None = None, tcp: bool = False):
+        import socket
+        import threading
+
+        self.commands: list[str] = []
+        self.stream_max_length = 25 * 1024 * 1024
+        self._lock = threading.Lock()
+        self._closed = False
+        if tcp:
+            self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server.bind(("127.0.0.1", 0))
+            self.address = f"tcp://127.0.0.1:{self._server.getsockname()[1]}"
+        else:
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(str(socket_path))
+            self.address = str(socket_path)
+        self._server.listen(16)
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop accepting connections."""
+        import socket
+
+        self._closed = True
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+
+    def _accept_loop(self) -> None:
+        import threading
+
+        while not self._closed:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _verdict(self, name: str, data: bytes) -> str:
+        if self.EICAR_MARKER in data:
+            return f"{name}: Eicar-Test-Signature FOUND"
+        return f"{name}: OK"
+
+    def _handle(self, conn) -> None:
+        import array
+        import os
+        import socket
+        import struct
+
+        buffer = bytearray()
+        fds: list[int] = []
+
+        def fill() -> bool:
+            fd_size = array.array("i").itemsize
+            data, ancdata, _, _ = conn.recvmsg(65536, socket.CMSG_SPACE(4 * fd_size))
+            for level, kind, cmsg_data in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    received = array.array("i")
+                    received.frombytes(cmsg_data[: len(cmsg_data) - len(cmsg_data) % fd_size])
+                    fds.extend(received)
+            buffer.extend(data)
+            return bool(data)
+
+        def read_exact(size: int) -> bytes | None:
+            while len(buffer) < size:
+                if not fill():
+                    return None
+            chunk = bytes(buffer[:size])
+            del buffer[:size]
+            return chunk
+
+        def read_command() -> str | None:
+            while True:
+                while b"\0" not in buffer:
+                    if not fill():
+                        return None
+                index = buffer.index(b"\0")
+                command = bytes(buffer[:index]).decode()
+                del buffer[: index + 1]
+                if command:
+                    return command.removeprefix("z")
+
+        def handle_one(command: str) -> str:
+            if command == "PING":
+                return "PONG"
+            if command == "VERSION":
+                return self.VERSION
+            if command == "RELOAD":
+                return "RELOADING"
+            if command == "FILDES":
+                while not fds:
+                    if not fill():
+                        return "FILDES: no file descriptor ERROR"
+                fd = fds.pop(0)
+                with os.fdopen(fd, "rb") as f:
+                    return self._verdict(f"fd[{fd}]", f.read())
+            if command == "INSTREAM":
+                data = bytearray()
+                while True:
+                    header = read_exact(4)
+                    if header is None:
+                        return "stream: truncated ERROR"
+                    (length,) = struct.unpack("!L", header)
+                    if length == 0:
+                        break
+                    data.extend(read_exact(length) or b"")
+                if len(data) > self.stream_max_length:
+                    return "INSTREAM size limit exceeded. ERROR"
+                return self._verdict("stream", bytes(data))
+            name, _, path = command.partition(" ")
+            if name in ("SCAN", "CONTSCAN", "MULTISCAN"):
+                replies = []
+                targets = [path]
+                if os.path.isdir(path):
+                    targets = [
+                        os.path.join(root, f) for root, _, files in os.walk(path) for f in files
+                    ]
+                for target in targets:
+                    with open(target, "rb") as f:
+                        verdict = self._verdict(target, f.read())
+                    if verdict.endswith("FOUND"):
+                        replies.append(verdict)
+                return "\0".join(replies) if replies else f"{path}: OK"
+            return "UNKNOWN COMMAND"
+
+        try:
+            command = read_command()
+            if command is None:
+                return
+            with self._lock:
+                self.commands.append(command)
+            if command == "SHUTDOWN":
+                self.close()
+                return
+            if command != "IDSESSION":
+                conn.sendall(handle_one(command).encode() + b"\0")
+                return
+            request_id = 0
+            while (command := read_command()) is not None:
+                with self._lock:
+                    self.commands.append(command)
+                if command == "END":
+                    return
+                request_id += 1
+                conn.sendall(f"{request_id}: {handle_one(command)}".encode() + b"\0")
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def fake_clamd(tmp_path: Path):
+    """
+    Run a FakeClamd server on a unix socket for the duration of a test.
+
+    Yields:
+        FakeClamd: The running server; connect to fake_clamd.address
+    """
+    server = FakeClamd(socket_path=tmp_path / "clamd.sock")
+    try:
+        yield server
+    finally:
+        server.close()
+
+
+# =============================================================================
+# Scanner Process Output
+# =============================================================================
+
+
+def attach_process_output(
+    process: MagicMock, stdout: str = "", stderr: str = "", running: bool = False
+) -> MagicMock:
+    """
+    Give a mocked Popen object real stdout/stderr pipes.
+
+    Scanners read subprocess output through a selector as it is printed,
+    so a mocked process needs readable file descriptors rather than a
+    stubbed communicate(). The given output is written to the pipes and,
+    unless running=True, the pipes are closed as if the process exited.
+    With running=True the pipes stay open until terminate() or kill() is
+    called on the process, which simulates a long-running scan.
+
+    Args:
+        process: The mocked process (e.g. mock_popen.return_value)
+        stdout: Output the process prints on stdout
+        stderr: Output the process prints on stderr
+        running: Keep the process "running" until it is terminated
+
+    Returns:
+        The same process mock, for chaining
+    """
+    import os
+    import threading
+
+    writers = []
+    for name, text in (("stdout", stdout), ("stderr", stderr)):
+        read_fd, write_fd = os.pipe()
+        setattr(process, name, os.fdopen(read_fd, "rb"))
+        writer = os.fdopen(write_fd, "wb")
+        writers.append(writer)
+
+        def write(writer=writer, data=text.encode()):
+            try:
+                writer.write(data)
+                writer.flush()
+            except (OSError, ValueError):
+                return
+            if not running:
+                writer.close()
+
+        threading.Thread(target=write, daemon=True).start()
+
+    if running:
+
+        def stop(*args, **kwargs):
+            for writer in writers:
+                try:
+                    writer.close()
+                except OSError:
+                    pass
+
+        process.terminate.side_effect = stop
+        process.kill.side_effect = stop
+
+    return process
@@ -0,0 +1,86 @@
+# ClamUI Archive Scan Tests
+"""Unit tests for reading archive members as streams."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from src.core.archive_scan import (
+    ArchiveError,
+    MemberStream,
+    is_supported_archive,
+    iter_archive_members,
+    member_path,
+)
+
+
+def make_tar(path, members, mode="w:gz"):
+    """Write a tar archive with a directory and the given members."""
+    with tarfile.open(path, mode) as archive:
+        directory = tarfile.TarInfo("inner")
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+def read_members(path):
+    return {name: stream.read() for name, stream in iter_archive_members(str(path))}
+
+
+class TestIterArchiveMembers:
+    """Tests for iter_archive_members."""
+
+    def test_compressed_tar(self, tmp_path):
+        archive = make_tar(tmp_path / "backup.tar.gz", {"inner/a.txt": b"a", "b.bin": b"bb"})
+
+        assert read_members(archive) == {"inner/a.txt": b"a", "b.bin": b"bb"}
+
+    def test_zip(self, tmp_path):
+        archive = tmp_path / "artifact.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("dist/", "")
+            zf.writestr("dist/app.js", "console.log(1)")
+
+        assert read_members(archive) == {"dist/app.js": b"console.log(1)"}
+
+    def test_not_an_archive(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("just text")
+
+        assert not is_supported_archive(str(path))
+        with pytest.raises(ArchiveError):
+            read_members(path)
+
+    def test_truncated_member_keeps_error(self, tmp_path):
+        archive = make_tar(tmp_path / "cut.tar", {"big.bin": b"x" * 4096}, mode="w")
+        archive.write_bytes(archive.read_bytes()[:2048])
+
+        streams = []
+        with pytest.raises(ArchiveError):
+            for _, stream in iter_archive_members(str(archive)):
+                assert len(stream.read()) < 4096
+                streams.append(stream)
+
+        assert len(streams) == 1
+        assert streams[0].error is not None
+
+    def test_member_path(self):
+        assert member_path("/srv/image.tar", "etc/passwd") == "/srv/image.tar!etc/passwd"
+
+
+class TestMemberStream:
+    """Tests for MemberStream."""
+
+    def test_read_error_becomes_eof(self):
+        inner = io.BytesIO(b"data")
+        inner.read = lambda size=-1: (_ for _ in ()).throw(EOFError("cut"))
+        stream = MemberStream(inner)
+
+        assert stream.read(10) == b""
+        assert isinstance(stream.error, EOFError)
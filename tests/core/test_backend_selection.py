@@ -0,0 +1,159 @@
+# ClamUI Backend Selection Tests
+"""Unit tests for the adaptive backend choice of "auto" scans."""
+
+import json
+from unittest import mock
+
+import pytest
+
+from src.core.backend_selection import (
+    CLAMSCAN,
+    DAEMON,
+    BackendCost,
+    Workload,
+    choose_backend,
+    estimate_workload,
+    get_clamd_max_threads,
+    get_default_costs,
+    learn_backend_costs,
+)
+from src.core.log_manager import LogEntry
+
+
+def make_log(files, duration, suffix=" (daemon)", status="clean") -> LogEntry:
+    """Create the scan log of a completed scan."""
+    return LogEntry.create(
+        log_type="scan",
+        status=status,
+        summary=f"Clean scan of /home/user{suffix}",
+        details=f"Scanned: {files} files, 1 directories",
+        path="/home/user",
+        duration=duration,
+    )
+
+
+@pytest.fixture
+def eight_cpus():
+    with mock.patch("src.core.backend_selection.os.sched_getaffinity", return_value=set(range(8))):
+        yield
+
+
+class TestEstimateWorkload:
+    """Tests for estimate_workload."""
+
+    def test_uses_remembered_totals(self, tmp_path):
+        history_path = tmp_path / "scan_totals.json"
+        history_path.write_text(json.dumps({"/a\n/b": [1200, 5000]}))
+
+        workload = estimate_workload(["/a", "/b"], history_path=history_path)
+
+        assert workload == Workload(files=1200, bytes=5000, source="history")
+
+    def test_walks_targets(self, tmp_path):
+        (tmp_path / "a").write_bytes(b"x" * 10)
+        (tmp_path / "b").write_bytes(b"x" * 20)
+
+        workload = estimate_workload([str(tmp_path)], history_path=tmp_path / "none.json")
+
+        assert workload == Workload(files=2, bytes=30, source="walk")
+
+    def test_walk_is_bounded(self, tmp_path):
+        for name in "abc":
+            (tmp_path / name).write_bytes(b"x")
+
+        workload = estimate_workload(
+            [str(tmp_path)], history_path=tmp_path / "none.json", max_files=2
+        )
+
+        assert workload.files == 2
+        assert workload.source == "partial walk"
+
+
+class TestClamdMaxThreads:
+    """Tests for get_clamd_max_threads."""
+
+    def test_reads_clamd_conf(self, tmp_path):
+        conf = tmp_path / "clamd.conf"
+        conf.write_text("LocalSocket /run/clamav/clamd.ctl\nMaxThreads 2\n")
+
+        assert get_clamd_max_threads([str(tmp_path / "missing.conf"), str(conf)]) == 2
+
+    def test_defaults_to_clamd_default(self, tmp_path):
+        conf = tmp_path / "clamd.conf"
+        conf.write_text("LocalSocket /run/clamav/clamd.ctl\n")
+
+        assert get_clamd_max_threads([str(conf)]) == 10
+
+
+class TestLearnBackendCosts:
+    """Tests for learn_backend_costs."""
+
+    def test_fits_overhead_and_throughput(self):
+        log_manager = mock.MagicMock()
+        log_manager.get_logs.return_value = [
+            make_log(100, 11.0, suffix=""),
+            make_log(1000, 20.0, suffix=""),
+            make_log(10000, 110.0, suffix=""),
+            make_log(10, 0.5),
+        ]
+
+        costs = learn_backend_costs(log_manager)
+
+        assert set(costs) == {CLAMSCAN}
+        assert costs[CLAMSCAN].overhead == pytest.approx(10.0)
+        assert costs[CLAMSCAN].per_file == pytest.approx(0.01)
+        assert costs[CLAMSCAN].samples == 3
+        log_manager.get_logs.assert_called_once_with(limit=200, log_type="scan")
+
+    def test_skips_unusable_logs(self):
+        log_manager = mock.MagicMock()
+        log_manager.get_logs.return_value = [
+            make_log(100, 1.0),
+            make_log(1000, 10.0, status="error"),
+            make_log(1000, 10.0, status="cancelled"),
+            make_log(5000, 50.0, suffix=" (watch folders)"),
+            make_log(2000, 20.0),
+        ]
+
+        assert learn_backend_costs(log_manager) == {}
+
+
+class TestChooseBackend:
+    """Tests for choose_backend."""
+
+    def test_small_scan_goes_to_running_daemon(self, eight_cpus):
+        costs = get_default_costs(clamscan_workers=1, clamd_threads=10)
+
+        backend, reason = choose_backend(costs, Workload(files=1, bytes=4096, source="walk"))
+
+        assert backend == DAEMON
+        assert "1 files" in reason
+        assert "from walk" in reason
+
+    def test_huge_tree_goes_to_sharded_clamscan_when_clamd_has_few_threads(self, eight_cpus):
+        costs = get_default_costs(clamscan_workers=8, clamd_threads=1)
+
+        backend, _ = choose_backend(
+            costs, Workload(files=10000, bytes=10**9, source="partial walk")
+        )
+
+        assert backend == CLAMSCAN
+
+    def test_huge_tree_stays_on_daemon_with_enough_threads(self, eight_cpus):
+        costs = get_default_costs(clamscan_workers=8, clamd_threads=12)
+
+        backend, _ = choose_backend(costs, Workload(files=200000, bytes=10**10, source="history"))
+
+        assert backend == DAEMON
+
+    def test_reason_names_fitted_costs(self):
+        costs = {
+            DAEMON: BackendCost(overhead=0.1, per_file=0.5, samples=12),
+            CLAMSCAN: BackendCost(overhead=10.0, per_file=0.01),
+        }
+
+        backend, reason = choose_backend(costs, Workload(files=1000, bytes=0, source="history"))
+
+        assert backend == CLAMSCAN
+        assert "daemon 500.1s (fitted to 12 logs)" in reason
+        assert "clamscan 20.0s" in reason
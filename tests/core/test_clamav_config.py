@@ -10,6 +10,7 @@ import pytest
 from src.core.clamav_config import (
     ClamAVConfig,
     ClamAVConfigValue,
+    find_clamd_config,
     parse_config,
     write_config_with_elevation,
 )
@@ -239,6 +240,43 @@ class TestClamAVConfig:
 
         assert config.get_int("Checks") is None
 
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("26214400", 26214400), ("25M", 25 * 1024 * 1024), ("512k", 512 * 1024), ("2G", 2 << 30)],
+    )
+    def test_get_size(self, value, expected):
+        """Test get_size applies clamd's size suffixes."""
+        config = ClamAVConfig(file_path=Path("/test"))
+        config.set_value("StreamMaxLength", value)
+
+        assert config.get_size("StreamMaxLength") == expected
+
+    def test_get_size_invalid(self):
+        """Test get_size returns None for a value that isn't a size."""
+        config = ClamAVConfig(file_path=Path("/test"))
+        config.set_value("StreamMaxLength", "lots")
+
+        assert config.get_size("StreamMaxLength") is None
+        assert config.get_size("MaxFileSize") is None
+
+
+class TestFindClamdConfig:
+    """Tests for the find_clamd_config function."""
+
+    def test_first_existing_config(self, tmp_path):
+        """Test the first clamd.conf that exists is parsed."""
+        conf = tmp_path / "scan.conf"
+        conf.write_text("MaxThreads 4\n")
+
+        config = find_clamd_config([str(tmp_path / "clamd.conf"), str(conf)])
+
+        assert config is not None
+        assert config.get_int("MaxThreads") == 4
+
+    def test_no_config(self, tmp_path):
+        """Test None is returned when no clamd.conf exists."""
+        assert find_clamd_config([str(tmp_path / "clamd.conf")]) is None
+
 
 class TestParseConfig:
     """Tests for the parse_config function."""
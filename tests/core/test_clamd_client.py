@@ -0,0 +1,473 @@
+# ClamUI clamd Client Tests
+"""Unit tests for the native clamd protocol client."""
+
+import io
+import os
+import queue
+import socket
+import time
+
+import pytest
+
+from src.core.clamd_client import (
+    STREAM_TRUNCATED_ERROR,
+    ClamdBalancer,
+    ClamdClient,
+    ClamdError,
+    ClamdStreamPool,
+    ClamdVerdict,
+    open_for_scan,
+    parse_clamd_address,
+    parse_clamd_reply,
+    ping_clamd,
+)
+from tests.conftest import EICAR_STRING, FakeClamd
+
+
+class TestParseClamdAddress:
+    """Tests for parse_clamd_address."""
+
+    def test_unix_socket_path(self):
+        family, address = parse_clamd_address("/run/clamav/clamd.ctl")
+        assert family == socket.AF_UNIX
+        assert address == "/run/clamav/clamd.ctl"
+
+    def test_tcp_address(self):
+        family, address = parse_clamd_address("tcp://scanner.local:3310")
+        assert family == socket.AF_INET
+        assert address == ("scanner.local", 3310)
+
+    def test_tcp_ipv6_address(self):
+        family, address = parse_clamd_address("tcp://[::1]:3310")
+        assert family == socket.AF_INET6
+        assert address == ("::1", 3310)
+
+    @pytest.mark.parametrize("address", ["tcp://host", "tcp://:3310", "tcp://host:port"])
+    def test_invalid_tcp_address(self, address):
+        with pytest.raises(ClamdError):
+            parse_clamd_address(address)
+
+
+class TestParseClamdReply:
+    """Tests for parse_clamd_reply."""
+
+    def test_ok_reply(self):
+        assert parse_clamd_reply("/tmp/file.txt: OK") == ClamdVerdict("/tmp/file.txt", "OK")
+
+    def test_found_reply(self):
+        verdict = parse_clamd_reply("/tmp/a: b.txt: Eicar-Test-Signature FOUND")
+        assert verdict.is_infected
+        assert verdict.path == "/tmp/a: b.txt"
+        assert verdict.detail == "Eicar-Test-Signature"
+
+    def test_error_reply(self):
+        verdict = parse_clamd_reply("/tmp/x: lstat() failed: No such file. ERROR")
+        assert verdict.is_error
+        assert verdict.path == "/tmp/x"
+        assert verdict.detail == "lstat() failed: No such file."
+
+    def test_error_reply_without_path(self):
+        verdict = parse_clamd_reply("INSTREAM size limit exceeded. ERROR")
+        assert verdict.is_error
+        assert verdict.path == ""
+        assert verdict.detail == "INSTREAM size limit exceeded."
+
+    def test_unexpected_reply(self):
+        with pytest.raises(ClamdError):
+            parse_clamd_reply("UNKNOWN COMMAND")
+
+
+class TestClamdClientCommands:
+    """Tests for ClamdClient against a fake clamd server."""
+
+    def test_ping(self, fake_clamd):
+        assert ClamdClient(fake_clamd.address).ping() is True
+
+    def test_version(self, fake_clamd):
+        assert ClamdClient(fake_clamd.address).version() == FakeClamd.VERSION
+
+    def test_reload(self, fake_clamd):
+        ClamdClient(fake_clamd.address).reload()
+        assert fake_clamd.commands == ["RELOAD"]
+
+    def test_shutdown_stops_clamd(self, fake_clamd):
+        client = ClamdClient(fake_clamd.address)
+        client.shutdown()
+
+        # clamd doesn't reply, so wait for the server to handle the command
+        for _ in range(100):
+            if fake_clamd.commands:
+                break
+            time.sleep(0.01)
+        assert fake_clamd.commands == ["SHUTDOWN"]
+        with pytest.raises(ClamdError):
+            client.ping()
+
+    def test_ping_over_tcp(self):
+        server = FakeClamd(tcp=True)
+        try:
+            client = ClamdClient(server.address)
+            assert client.ping() is True
+            assert client.supports_fdpass is False
+        finally:
+            server.close()
+
+    def test_connection_refused(self, tmp_path):
+        client = ClamdClient(str(tmp_path / "missing.sock"))
+        with pytest.raises(ClamdError, match="Cannot connect"):
+            client.ping()
+
+    def test_ping_clamd_helper(self, fake_clamd, tmp_path):
+        assert ping_clamd(fake_clamd.address) == (True, "PONG")
+        is_connected, message = ping_clamd(str(tmp_path / "missing.sock"))
+        assert is_connected is False
+        assert "Cannot connect" in message
+
+    def test_scan_fd_detects_eicar(self, fake_clamd, eicar_file):
+        fd = open_for_scan(str(eicar_file))
+        try:
+            verdict = ClamdClient(fake_clamd.address).scan_fd(fd)
+        finally:
+            os.close(fd)
+        assert verdict.is_infected
+        assert verdict.detail == "Eicar-Test-Signature"
+
+    def test_scan_stream_clean(self, fake_clamd):
+        verdict = ClamdClient(fake_clamd.address).scan_stream(io.BytesIO(b"hello" * 1000), 100)
+        assert verdict == ClamdVerdict("stream", "OK")
+
+    def test_contscan_yields_matches(self, fake_clamd, eicar_directory):
+        verdicts = list(ClamdClient(fake_clamd.address).contscan(str(eicar_directory)))
+        assert len(verdicts) == 1
+        assert verdicts[0].path.endswith("eicar_test_file.txt")
+        assert "CONTSCAN " + str(eicar_directory) in fake_clamd.commands
+
+    def test_multiscan_clean_directory(self, fake_clamd, tmp_path):
+        clean_dir = tmp_path / "clean"
+        clean_dir.mkdir()
+        (clean_dir / "a.txt").write_text("clean")
+        verdicts = list(ClamdClient(fake_clamd.address).multiscan(str(clean_dir)))
+        assert verdicts == [ClamdVerdict(str(clean_dir), "OK")]
+
+
+class TestClamdSession:
+    """Tests for pipelined IDSESSION requests."""
+
+    def test_pipelined_requests_are_matched_by_id(self, fake_clamd):
+        client = ClamdClient(fake_clamd.address)
+        with client.session() as session:
+            first = session.submit_stream(io.BytesIO(b"clean"))
+            second = session.submit_stream(io.BytesIO(EICAR_STRING.encode()))
+            assert session.pending == 2
+            replies = dict(session.read_reply() for _ in range(2))
+
+        assert session.pending == 0
+        assert replies[first].status == "OK"
+        assert replies[second].is_infected
+        assert fake_clamd.commands[0] == "IDSESSION"
+
+    def test_submit_fd_requires_unix_socket(self):
+        server = FakeClamd(tcp=True)
+        try:
+            with ClamdClient(server.address).session() as session:
+                with pytest.raises(ClamdError, match="unix socket"):
+                    session.submit_fd(0)
+        finally:
+            server.close()
+
+    def test_abort_wakes_blocked_reader(self, fake_clamd):
+        session = ClamdClient(fake_clamd.address).session()
+        session.abort()
+        with pytest.raises(ClamdError):
+            session.read_reply()
+
+    def test_submit_stream_stops_at_max_length(self, fake_clamd):
+        fake_clamd.stream_max_length = 100
+        data = b"x" * 100 + EICAR_STRING.encode()
+        with ClamdClient(fake_clamd.address).session() as session:
+            session.submit_stream(io.BytesIO(data), chunk_size=64, max_length=100)
+            verdict = session.read_reply()[1]
+
+        # clamd only saw the first 100 bytes, so "OK" doesn't cover the stream
+        assert verdict == ClamdVerdict("stream", "ERROR", STREAM_TRUNCATED_ERROR)
+
+    def test_stream_of_exactly_max_length_is_complete(self, fake_clamd):
+        with ClamdClient(fake_clamd.address).session() as session:
+            session.submit_stream(io.BytesIO(b"x" * 100), chunk_size=64, max_length=100)
+            verdict = session.read_reply()[1]
+
+        assert verdict == ClamdVerdict("stream", "OK")
+
+    def test_submit_file_streams_in_chunks(self, fake_clamd, tmp_path):
+        path = tmp_path / "padded.bin"
+        # The signature straddles a chunk boundary
+        path.write_bytes(b"x" * 90 + EICAR_STRING.encode())
+        with path.open("rb") as f, ClamdClient(fake_clamd.address).session() as session:
+            session.submit_file(f, chunk_size=100)
+            verdict = session.read_reply()[1]
+
+        assert verdict.is_infected
+
+    def test_submit_file_stops_at_stream_max_length(self, fake_clamd, tmp_path):
+        fake_clamd.stream_max_length = 1000
+        path = tmp_path / "large.bin"
+        path.write_bytes(b"x" * 1000 + EICAR_STRING.encode())
+        with path.open("rb") as f, ClamdClient(fake_clamd.address).session() as session:
+            session.submit_file(f, max_length=1000)
+            verdict = session.read_reply()[1]
+
+        # clamd only saw the first 1000 bytes, so "OK" doesn't cover the file
+        assert verdict == ClamdVerdict("stream", "ERROR", STREAM_TRUNCATED_ERROR)
+
+    def test_truncated_file_keeps_signature_match(self, fake_clamd, tmp_path):
+        path = tmp_path / "large.bin"
+        path.write_bytes(EICAR_STRING.encode() + b"x" * 1000)
+        with path.open("rb") as f, ClamdClient(fake_clamd.address).session() as session:
+            session.submit_file(f, max_length=1000)
+            verdict = session.read_reply()[1]
+
+        assert verdict.is_infected
+
+
+class TestClamdStreamPool:
+    """Tests for streaming files over several sessions."""
+
+    def test_streams_files_over_several_connections(self, tmp_path):
+        server = FakeClamd(tcp=True)
+        files = []
+        for index in range(6):
+            path = tmp_path / f"file{index}.txt"
+            path.write_text(EICAR_STRING if index == 4 else f"clean {index}")
+            files.append(path.open("rb"))
+        try:
+            with ClamdClient(server.address).stream_pool(connections=3) as pool:
+                request_ids = [pool.submit_file(f) for f in files]
+                replies = dict(pool.read_reply() for _ in files)
+                assert pool.pending == 0
+        finally:
+            server.close()
+
+        assert sorted(replies) == request_ids
+        assert [replies[request_id].is_infected for request_id in request_ids] == [
+            False,
+            False,
+            False,
+            False,
+            True,
+            False,
+        ]
+        assert server.commands.count("IDSESSION") == 3
+        assert server.commands.count("INSTREAM") == 6
+        assert all(f.closed for f in files)
+
+    def test_replies_are_matched_by_the_ids_sessions_assign(self):
+        class EvenSession:
+            """Session numbering its requests 2, 4, 6..."""
+
+            def __init__(self):
+                self.replies = queue.Queue()
+                self.sent = 0
+
+            def submit_file(self, file, max_length):
+                self.sent += 2
+                self.replies.put((self.sent, ClamdVerdict("stream", "FOUND", file.read().decode())))
+                return self.sent
+
+            def read_reply(self):
+                reply = self.replies.get()
+                if isinstance(reply, ClamdError):
+                    raise reply
+                return reply
+
+            def abort(self):
+                self.replies.put(ClamdError("aborted"))
+
+            def close(self):
+                self.abort()
+
+        with ClamdStreamPool([EvenSession()]) as pool:
+            request_ids = [pool.submit_file(io.BytesIO(name.encode())) for name in ("a", "b")]
+            replies = dict(pool.read_reply() for _ in request_ids)
+
+        assert [replies[request_id].detail for request_id in request_ids] == ["a", "b"]
+
+    def test_abort_wakes_blocked_reader(self, fake_clamd):
+        pool = ClamdClient(fake_clamd.address).stream_pool(connections=2)
+        pool.abort()
+        with pytest.raises(ClamdError):
+            pool.read_reply()
+
+    def test_closed_pool_refuses_files(self, fake_clamd, clean_test_file):
+        pool = ClamdClient(fake_clamd.address).stream_pool(connections=1)
+        pool.close()
+        with open(clean_test_file, "rb") as f:
+            with pytest.raises(ClamdError):
+                pool.submit_file(f)
+            # The caller keeps a file the pool refused
+            assert not f.closed
+
+
+class StubEndpoint:
+    """Member of a ClamdBalancer whose replies the test releases."""
+
+    supports_fdpass = False
+
+    def __init__(self):
+        self.files = []
+        self.replies = queue.Queue()
+
+    def submit_file(self, file):
+        file.close()
+        self.files.append(file)
+        return len(self.files)
+
+    def answer(self, request_id, status="OK"):
+        self.replies.put((request_id, ClamdVerdict("stream", status)))
+
+    def fail(self):
+        self.replies.put(ClamdError("connection reset"))
+
+    def read_reply(self):
+        reply = self.replies.get()
+        if isinstance(reply, ClamdError):
+            self.replies.put(reply)
+            raise reply
+        return reply
+
+    def abort(self):
+        self.fail()
+
+    def close(self):
+        self.fail()
+
+
+class FdpassEndpoint(StubEndpoint):
+    """Member of a ClamdBalancer that takes file descriptors."""
+
+    supports_fdpass = True
+
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def submit_fd(self, fd):
+        self.sizes.append(os.fstat(fd).st_size)
+        return len(self.sizes)
+
+
+class TestClamdBalancer:
+    """Tests for spreading requests over several clamd endpoints."""
+
+    @staticmethod
+    def _file():
+        return io.BytesIO(b"content")
+
+    def test_submits_to_least_loaded_endpoint(self):
+        first, second = StubEndpoint(), StubEndpoint()
+        with ClamdBalancer({"a": first, "b": second}) as balancer:
+            ids = [balancer.submit_file(self._file()) for _ in range(4)]
+            assert (len(first.files), len(second.files)) == (2, 2)
+
+            # The second endpoint answers both of its requests
+            second.answer(1)
+            second.answer(2)
+            replies = dict(balancer.read_reply() for _ in range(2))
+            balancer.submit_file(self._file())
+            balancer.submit_file(self._file())
+
+            assert sorted(replies) == [ids[1], ids[3]]
+            assert (len(first.files), len(second.files)) == (2, 4)
+            assert balancer.pending == 4
+
+    def test_failed_endpoint_hands_back_its_requests(self):
+        first, second = StubEndpoint(), StubEndpoint()
+        with ClamdBalancer({"a": first, "b": second}) as balancer:
+            lost_id = balancer.submit_file(self._file())
+            balancer.submit_file(self._file())
+            first.fail()
+
+            request_id, verdict = balancer.read_reply()
+            balancer.submit_file(self._file())
+
+            assert request_id == lost_id
+            assert verdict.is_lost
+            assert balancer.failed_endpoints == ["a"]
+            assert balancer.live_endpoints == 1
+            assert len(second.files) == 2
+
+    def test_raises_once_every_endpoint_failed(self):
+        endpoint = StubEndpoint()
+        balancer = ClamdBalancer({"a": endpoint})
+        endpoint.fail()
+
+        with pytest.raises(ClamdError, match="Every clamd endpoint failed"):
+            balancer.read_reply()
+        f = self._file()
+        with pytest.raises(ClamdError, match="No clamd endpoint"):
+            balancer.submit_file(f)
+        assert f.closed
+
+    def test_failed_stream_endpoint_leaves_file_to_the_next(self, fake_clamd, clean_test_file):
+        refusing = ClamdClient(fake_clamd.address).stream_pool(connections=1)
+        refusing.close()
+        fdpass = FdpassEndpoint()
+        f = open(clean_test_file, "rb")  # noqa: SIM115 - the balancer closes it
+        try:
+            with ClamdBalancer({"a": refusing, "b": fdpass}) as balancer:
+                request_id = balancer.submit_file(f)
+
+                assert balancer.failed_endpoints == ["a"]
+                assert fdpass.sizes == [os.path.getsize(clean_test_file)]
+                fdpass.answer(1)
+                assert balancer.read_reply()[0] == request_id
+        finally:
+            # Wake up the balancer's reader of the closed pool
+            refusing.abort()
+        assert f.closed
+
+    def test_spreads_files_over_unix_and_tcp_endpoints(self, fake_clamd, tmp_path):
+        remote = FakeClamd(tcp=True)
+        files = []
+        for index in range(8):
+            path = tmp_path / f"file{index}.txt"
+            path.write_text(EICAR_STRING if index == 5 else f"clean {index}")
+            files.append(path.open("rb"))
+        try:
+            endpoints = {
+                fake_clamd.address: ClamdClient(fake_clamd.address).session(),
+                remote.address: ClamdClient(remote.address).stream_pool(connections=2),
+            }
+            with ClamdBalancer(endpoints) as balancer:
+                request_ids = [balancer.submit_file(f) for f in files]
+                replies = dict(balancer.read_reply() for _ in files)
+        finally:
+            remote.close()
+
+        assert sorted(replies) == request_ids
+        assert [replies[request_id].is_infected for request_id in request_ids] == [
+            index == 5 for index in range(8)
+        ]
+        # Local files go by descriptor, remote ones as streams
+        assert fake_clamd.commands.count("FILDES") + remote.commands.count("INSTREAM") == 8
+        assert "INSTREAM" not in fake_clamd.commands
+        assert all(f.closed for f in files)
+
+
+class TestOpenForScan:
+    """Tests for open_for_scan."""
+
+    def test_opens_regular_file(self, clean_test_file):
+        fd = open_for_scan(str(clean_test_file))
+        assert fd is not None
+        os.close(fd)
+
+    def test_refuses_symlink(self, clean_test_file, tmp_path):
+        link = tmp_path / "link.txt"
+        link.symlink_to(clean_test_file)
+        with pytest.raises(OSError):
+            open_for_scan(str(link))
+
+    def test_skips_fifo(self, tmp_path):
+        fifo = tmp_path / "pipe"
+        os.mkfifo(fifo)
+        assert open_for_scan(str(fifo)) is None
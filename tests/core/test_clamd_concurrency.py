@@ -0,0 +1,43 @@
+# ClamUI clamd Concurrency Tests
+"""Unit tests for the request window of native clamd scans."""
+
+from src.core.clamd_concurrency import ClamdLimits, get_clamd_limits, get_request_window
+
+
+class TestGetClamdLimits:
+    """Tests for get_clamd_limits."""
+
+    def test_reads_clamd_conf(self, tmp_path):
+        conf = tmp_path / "clamd.conf"
+        conf.write_text("LocalSocket /run/clamav/clamd.ctl\nMaxThreads 4\nMaxQueue 30\n")
+
+        assert get_clamd_limits([str(tmp_path / "missing.conf"), str(conf)]) == ClamdLimits(4, 30)
+
+    def test_missing_or_invalid_options_keep_defaults(self, tmp_path):
+        conf = tmp_path / "clamd.conf"
+        conf.write_text("MaxThreads many\nMaxQueue 0\n")
+
+        assert get_clamd_limits([str(conf)]) == ClamdLimits(10, 100)
+        assert get_clamd_limits([]) == ClamdLimits(10, 100)
+
+
+class TestGetRequestWindow:
+    """Tests for get_request_window."""
+
+    def test_interactive_scan_queues_one_request_per_thread(self):
+        assert get_request_window(ClamdLimits(max_threads=10, max_queue=100)) == 20
+
+    def test_background_scan_takes_half_the_threads(self):
+        limits = ClamdLimits(max_threads=10, max_queue=100)
+
+        assert get_request_window(limits, interactive=False) == 5
+        assert get_request_window(ClamdLimits(max_threads=1), interactive=False) == 1
+
+    def test_window_takes_at_most_half_the_queue(self):
+        assert get_request_window(ClamdLimits(max_threads=32, max_queue=40)) == 20
+
+    def test_configured_window_replaces_the_limits(self):
+        limits = ClamdLimits(max_threads=2, max_queue=4)
+
+        assert get_request_window(limits, configured=12) == 12
+        assert get_request_window(limits, interactive=False, configured=12) == 6
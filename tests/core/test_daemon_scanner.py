@@ -1,6 +1,7 @@
 # ClamUI Daemon Scanner Tests
 """Unit tests for the daemon scanner module."""
 
+import os
 import subprocess
 from unittest.mock import MagicMock, patch
 
@@ -9,8 +10,17 @@ import pytest
 # Import directly - daemon_scanner uses GLib only for idle_add in async methods,
 # and those methods are not tested here (unit tests mock the async behavior)
 from src.core.daemon_scanner import DaemonScanner
+from src.core.scan_progress import ScanProgress
 from src.core.scanner import ScanStatus
 from src.core.threat_classifier import categorize_threat, classify_threat_severity_str
+from tests.conftest import attach_process_output
+
+
+@pytest.fixture(autouse=True)
+def no_local_clamd_socket():
+    """Keep tests independent of a clamd socket on the machine running them."""
+    with patch("src.core.daemon_scanner.get_clamd_socket_path", return_value=None):
+        yield
 
 
 @pytest.fixture
@@ -130,6 +140,19 @@ class TestDaemonScannerBuildCommand:
         assert "--exclude" not in cmd
         assert "--exclude-dir" not in cmd
 
+    def test_build_command_with_file_list(self, tmp_path, daemon_scanner_class):
+        """Test _build_command scans a file list instead of the path."""
+        scanner = daemon_scanner_class()
+
+        with patch("src.core.daemon_scanner.which_host_command", return_value="/usr/bin/clamdscan"):
+            with patch("src.core.daemon_scanner.wrap_host_command", side_effect=lambda x: x):
+                cmd = scanner._build_command(
+                    str(tmp_path), recursive=True, file_list="/tmp/scan.lst"
+                )
+
+        assert "--file-list=/tmp/scan.lst" in cmd
+        assert str(tmp_path) not in cmd
+
 
 class TestDaemonScannerParseResults:
     """Tests for DaemonScanner._parse_results method."""
@@ -454,7 +477,7 @@ class TestDaemonScannerCountTargets:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -490,7 +513,7 @@ class TestDaemonScannerCountTargets:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -521,7 +544,7 @@ class TestDaemonScannerCountTargets:
 
             mock_process = MagicMock()
             infected_output = f"{test_dir}/malware.exe: Win.Trojan.Test FOUND\n"
-            mock_process.communicate.return_value = (infected_output, "")
+            attach_process_output(mock_process, infected_output, "")
             mock_process.returncode = 1
             mock_popen.return_value = mock_process
 
@@ -550,22 +573,61 @@ class TestDaemonScannerCountTargets:
             patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
             patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
             patch("subprocess.Popen") as mock_popen,
-            patch.object(scanner, "_count_scan_targets") as mock_count,
         ):
             mock_installed.return_value = (True, "ClamAV 1.0.0")
             mock_connection.return_value = (True, "PONG")
-            mock_count.return_value = (1, 1)
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
             # Call without count_targets parameter (should default to True)
-            scanner.scan_sync(str(test_dir))
+            result = scanner.scan_sync(str(test_dir))
+
+        # The counting walk also produced the file list clamdscan scanned
+        cmd = mock_popen.call_args[0][0]
+        assert any(arg.startswith("--file-list=") for arg in cmd)
+        assert str(test_dir) not in cmd
+        assert (result.scanned_files, result.scanned_dirs) == (1, 1)
 
-        # _count_scan_targets should have been called
-        mock_count.assert_called_once()
+    def test_scan_sync_walks_target_once(self, tmp_path, daemon_scanner_class):
+        """Test that counting and file listing share a single walk."""
+        from src.core import scan_walker
+
+        test_dir = tmp_path / "scan_test"
+        test_dir.mkdir()
+        (test_dir / "file.txt").write_text("content")
+        (test_dir / "debug.log").write_text("log")
+
+        mock_settings = MagicMock()
+        mock_settings.get.side_effect = lambda key, default=None: (
+            [{"pattern": "*.log", "type": "file", "enabled": True}]
+            if key == "exclusion_patterns"
+            else default
+        )
+        scanner = daemon_scanner_class(settings_manager=mock_settings)
+
+        with (
+            patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
+            patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
+            patch("subprocess.Popen") as mock_popen,
+            patch(
+                "src.core.daemon_scanner.iter_scan_files", wraps=scan_walker.iter_scan_files
+            ) as mock_walk,
+        ):
+            mock_installed.return_value = (True, "ClamAV 1.0.0")
+            mock_connection.return_value = (True, "PONG")
+
+            mock_process = MagicMock()
+            attach_process_output(mock_process, "", "")
+            mock_process.returncode = 0
+            mock_popen.return_value = mock_process
+
+            result = scanner.scan_sync(str(test_dir))
+
+        mock_walk.assert_called_once()
+        assert (result.scanned_files, result.scanned_dirs) == (1, 1)
 
     def test_scan_async_passes_count_targets_to_sync(self, tmp_path, daemon_scanner_class):
         """Test that scan_async passes count_targets to scan_sync."""
@@ -873,7 +935,7 @@ class TestDaemonScannerProcessLockThreadSafety:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -904,12 +966,9 @@ class TestDaemonScannerProcessLockThreadSafety:
                     mock_installed.return_value = (True, "ClamAV 1.0.0")
                     mock_connection.return_value = (True, "PONG")
 
-                    mock_process = MagicMock()
                     # Simulate slow scan
-                    mock_process.communicate.side_effect = lambda: (
-                        time.sleep(0.1),
-                        ("", ""),
-                    )[-1]
+                    mock_process = attach_process_output(MagicMock(), running=True)
+                    threading.Timer(0.1, mock_process.terminate).start()
                     mock_process.returncode = 0
                     mock_popen.return_value = mock_process
 
@@ -955,7 +1014,7 @@ class TestDaemonScannerProcessLockThreadSafety:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -998,7 +1057,7 @@ class TestDaemonScannerCancelFlagReset:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -1028,16 +1087,19 @@ class TestDaemonScannerCancelFlagReset:
         scanner = daemon_scanner_class()
 
         # Simulate scan A being cancelled during counting phase
-        # This is what happens when user cancels during _count_scan_targets
+        # This is what happens when user cancels while the target is walked
         def counting_that_gets_cancelled(*args, **kwargs):
             # Simulate cancel during counting
             scanner._cancel_event.set()
-            return (0, 0)
+            return iter(())
 
         with (
             patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
             patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
-            patch.object(scanner, "_count_scan_targets", side_effect=counting_that_gets_cancelled),
+            patch(
+                "src.core.daemon_scanner.iter_scan_files",
+                side_effect=counting_that_gets_cancelled,
+            ),
         ):
             mock_installed.return_value = (True, "ClamAV 1.0.0")
             mock_connection.return_value = (True, "PONG")
@@ -1061,7 +1123,7 @@ class TestDaemonScannerCancelFlagReset:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -1095,7 +1157,7 @@ class TestDaemonScannerCancelFlagReset:
             mock_connection.return_value = (True, "PONG")
 
             mock_process = MagicMock()
-            mock_process.communicate.return_value = ("", "")
+            attach_process_output(mock_process, "", "")
             mock_process.returncode = 0
             mock_popen.return_value = mock_process
 
@@ -1104,202 +1166,719 @@ class TestDaemonScannerCancelFlagReset:
         assert result.status == scan_status_class.CLEAN
 
 
-class TestDaemonScannerExclusionHelpers:
-    """Tests for DaemonScanner exclusion helper methods."""
+class TestDaemonScannerScanTargets:
+    """Tests for scanning several targets through clamdscan."""
 
-    def test_collect_exclusion_patterns_from_settings(self, daemon_scanner_class):
-        """Test collecting patterns from global settings."""
-        mock_settings = MagicMock()
-        mock_settings.get.return_value = [
-            {"pattern": "*.log", "type": "file", "enabled": True},
-            {"pattern": "*.tmp", "type": "file", "enabled": True},
-            {"pattern": "*.bak", "type": "file", "enabled": False},  # disabled
-        ]
-        scanner = daemon_scanner_class(settings_manager=mock_settings)
+    def test_targets_share_one_clamdscan_run(self, tmp_path, daemon_scanner_class):
+        """One clamdscan process scans a file list covering every target."""
+        first = tmp_path / "first"
+        first.mkdir()
+        (first / "clean.txt").write_text("clean")
+        second = tmp_path / "second"
+        second.mkdir()
+        infected = second / "eicar.txt"
+        infected.write_text("eicar")
+        scanner = daemon_scanner_class(log_manager=MagicMock())
 
-        patterns = scanner._collect_exclusion_patterns()
+        with (
+            patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
+            patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
+            patch("subprocess.Popen") as mock_popen,
+        ):
+            mock_installed.return_value = (True, "ClamAV 1.0.0")
+            mock_connection.return_value = (True, "PONG")
+            mock_process = MagicMock()
+            attach_process_output(mock_process, f"{infected}: Eicar-Signature FOUND\n")
+            mock_process.returncode = 1
+            mock_popen.return_value = mock_process
 
-        assert len(patterns) == 2
-        assert "*.log" in patterns
-        assert "*.tmp" in patterns
-        assert "*.bak" not in patterns
+            results = scanner.scan_targets([str(first), str(second)])
 
-    def test_collect_exclusion_patterns_from_profile(self, daemon_scanner_class):
-        """Test collecting patterns from profile exclusions."""
-        mock_settings = MagicMock()
-        mock_settings.get.return_value = []
-        scanner = daemon_scanner_class(settings_manager=mock_settings)
+        mock_popen.assert_called_once()
+        assert any(arg.startswith("--file-list=") for arg in mock_popen.call_args[0][0])
+        assert [r.status for r in results] == [ScanStatus.CLEAN, ScanStatus.INFECTED]
+        assert results[1].infected_files == [str(infected)]
+        assert (results[1].scanned_files, results[1].scanned_dirs) == (1, 1)
 
-        profile_exclusions = {"patterns": ["*.cache", "*.swp", ""], "paths": []}
-        patterns = scanner._collect_exclusion_patterns(profile_exclusions)
+    def test_fallback_to_single_targets_keeps_progress_and_drops_checkpoint(
+        self, tmp_path, daemon_scanner_class
+    ):
+        """Targets that can't share a file list are scanned one by one, without resume."""
+        scanner = daemon_scanner_class(log_manager=MagicMock())
+        checkpoint = MagicMock()
+        on_progress = MagicMock()
+        paths = [str(tmp_path / "a"), str(tmp_path / "b")]
+        for path in paths:
+            os.mkdir(path)
 
-        assert len(patterns) == 2
-        assert "*.cache" in patterns
-        assert "*.swp" in patterns
+        with (
+            patch.object(scanner, "_scan_targets", return_value=None),
+            patch.object(scanner, "scan_sync") as mock_scan,
+        ):
+            mock_scan.side_effect = lambda *args, **kwargs: kwargs["on_progress"](
+                ScanProgress(3, 30, 3, 30, 1.0)
+            )
+            scanner.scan_targets(paths, checkpoint=checkpoint, on_progress=on_progress)
+
+        checkpoint.discard.assert_called_once()
+        assert [c.args[0] for c in mock_scan.call_args_list] == paths
+        assert all("checkpoint" not in c.kwargs for c in mock_scan.call_args_list)
+        # Each target's progress continues from the targets before it
+        reported = [c.args[0] for c in on_progress.call_args_list]
+        assert [(p.files_done, p.bytes_done) for p in reported] == [(3, 30), (6, 60)]
+        assert all(p.files_total is None and p.bytes_total is None for p in reported)
+
+    def test_unavailable_daemon_fails_every_target(self, tmp_path, daemon_scanner_class):
+        scanner = daemon_scanner_class(log_manager=MagicMock())
+
+        with patch(
+            "src.core.daemon_scanner.check_clamdscan_installed",
+            return_value=(False, "clamdscan not found"),
+        ):
+            results = scanner.scan_targets([str(tmp_path), str(tmp_path), "/nonexistent/x"])
 
-    def test_collect_exclusion_patterns_combines_sources(self, daemon_scanner_class):
-        """Test that patterns from settings and profile are combined."""
-        mock_settings = MagicMock()
-        mock_settings.get.return_value = [
-            {"pattern": "*.log", "type": "file", "enabled": True},
-        ]
-        scanner = daemon_scanner_class(settings_manager=mock_settings)
+        assert [r.status for r in results] == [ScanStatus.ERROR] * 3
+        assert results[0].error_message == "clamdscan not found"
+        assert results[0] is results[1]
 
-        profile_exclusions = {"patterns": ["*.cache"], "paths": []}
-        patterns = scanner._collect_exclusion_patterns(profile_exclusions)
 
-        assert len(patterns) == 2
-        assert "*.log" in patterns
-        assert "*.cache" in patterns
+class TestDaemonScannerNativeClient:
+    """Tests for scanning through the native clamd socket client."""
 
-    def test_collect_exclusion_patterns_empty_when_no_settings(self, daemon_scanner_class):
-        """Test that empty list is returned when no settings manager."""
-        scanner = daemon_scanner_class()
+    @pytest.fixture
+    def native_scanner(self, fake_clamd):
+        """DaemonScanner configured to talk to the fake clamd."""
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            fake_clamd.address if key == "daemon_socket_path" else default
+        )
+        return DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
 
-        patterns = scanner._collect_exclusion_patterns()
+    def test_check_available_without_clamdscan(self, native_scanner):
+        """A native PING is enough; clamdscan is not required."""
+        with patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed:
+            available, msg = native_scanner.check_available()
 
-        assert patterns == []
+        assert available is True
+        assert msg == "clamd is available"
+        mock_installed.assert_not_called()
 
-    def test_collect_exclusion_paths_from_profile(self, daemon_scanner_class, tmp_path):
-        """Test collecting paths from profile exclusions."""
-        mock_settings = MagicMock()
-        mock_settings.get.return_value = []
-        scanner = daemon_scanner_class(settings_manager=mock_settings)
+    def test_repeated_checks_reuse_cached_ping(self, native_scanner, fake_clamd):
+        """The health probe answers repeated checks without reconnecting."""
+        for _ in range(3):
+            assert native_scanner.check_available()[0] is True
 
-        excluded_dir = tmp_path / "excluded"
-        excluded_dir.mkdir()
+        assert fake_clamd.commands.count("PING") == 1
 
-        profile_exclusions = {"patterns": [], "paths": [str(excluded_dir), ""]}
-        paths = scanner._collect_exclusion_paths(profile_exclusions)
+    def test_failed_scan_invalidates_cached_ping(self, native_scanner, fake_clamd, clean_test_file):
+        """A scan that can't reach clamd makes the next check probe again."""
+        assert native_scanner.check_available()[0] is True
+        fake_clamd.close()
 
-        assert len(paths) == 1
-        assert paths[0] == excluded_dir.resolve()
+        result = native_scanner.scan_sync(str(clean_test_file))
+        with patch(
+            "src.core.daemon_scanner.check_clamdscan_installed",
+            return_value=(False, "clamdscan not found"),
+        ):
+            available, _ = native_scanner.check_available()
 
-    def test_collect_exclusion_paths_expands_tilde(
-        self, daemon_scanner_class, monkeypatch, tmp_path
-    ):
-        """Test that tilde paths are expanded."""
-        mock_settings = MagicMock()
-        mock_settings.get.return_value = []
-        scanner = daemon_scanner_class(settings_manager=mock_settings)
+        assert result.status == ScanStatus.ERROR
+        assert available is False
 
-        fake_home = tmp_path / "fakehome"
-        cache_dir = fake_home / ".cache"
-        cache_dir.mkdir(parents=True)
-        monkeypatch.setenv("HOME", str(fake_home))
+    def test_scan_targets_share_one_session(self, native_scanner, fake_clamd, tmp_path):
+        """Several targets are scanned in one IDSESSION and split back."""
+        from tests.conftest import EICAR_STRING
+
+        first = tmp_path / "first"
+        first.mkdir()
+        (first / "clean.txt").write_text("clean")
+        second = tmp_path / "second"
+        second.mkdir()
+        (second / "eicar.txt").write_text(EICAR_STRING)
+
+        results = native_scanner.scan_targets([str(first), str(second)])
+
+        assert fake_clamd.commands.count("IDSESSION") == 1
+        assert [r.status for r in results] == [ScanStatus.CLEAN, ScanStatus.INFECTED]
+        assert [r.path for r in results] == [str(first), str(second)]
+        assert results[1].infected_files == [str(second / "eicar.txt")]
+        assert (results[0].scanned_files, results[0].scanned_dirs) == (1, 1)
+
+    def test_scan_directory_does_not_spawn_clamdscan(self, native_scanner, eicar_directory):
+        """Directory scans pass file descriptors instead of running clamdscan."""
+        with patch("subprocess.Popen") as mock_popen, patch("subprocess.run") as mock_run:
+            result = native_scanner.scan_sync(str(eicar_directory))
+
+        mock_popen.assert_not_called()
+        mock_run.assert_not_called()
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_count == 1
+        assert result.infected_files == [str(eicar_directory / "eicar_test_file.txt")]
+        assert result.threat_details[0].threat_name == "Eicar-Test-Signature"
+        assert result.threat_details[0].category == "Test"
+        assert result.scanned_files == 2
+
+    def test_hardlinks_are_submitted_once(self, native_scanner, fake_clamd, tmp_path):
+        """A hardlinked file is scanned once and its threat reported for every link."""
+        from tests.conftest import EICAR_STRING
+
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "eicar.txt").write_text(EICAR_STRING)
+        os.link(target / "eicar.txt", target / "eicar-link.txt")
+        reported = []
+
+        result = native_scanner.scan_sync(str(target), on_threat=reported.append)
+
+        assert fake_clamd.commands.count("FILDES") == 1
+        assert result.infected_count == 2
+        assert sorted(result.infected_files) == sorted(str(p) for p in target.iterdir())
+        assert len(reported) == 2
+        assert result.scanned_files == 2
+
+    def test_resumed_scan_skips_completed_files(self, native_scanner, fake_clamd, tmp_path):
+        """Files completed before the interruption are not submitted again."""
+        from src.core.scan_checkpoint import ScanCheckpoint
+        from src.core.scanner_types import ThreatDetail
+        from tests.conftest import EICAR_STRING
+
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "eicar.txt").write_text(EICAR_STRING)
+        (target / "clean.txt").write_text("clean")
+        checkpoint_dir = str(tmp_path / "checkpoints")
+        interrupted = ScanCheckpoint([str(target)], checkpoint_dir=checkpoint_dir)
+        interrupted.start()
+        threat = ThreatDetail(str(target / "eicar.txt"), "Eicar-Test-Signature", "Test", "low")
+        interrupted.record_threat(threat, (target / "eicar.txt").stat())
+        interrupted.close()
+
+        checkpoint = ScanCheckpoint([str(target)], checkpoint_dir=checkpoint_dir)
+        checkpoint.start(resume=True)
+        reported = []
+        result = native_scanner.scan_sync(
+            str(target), on_threat=reported.append, checkpoint=checkpoint
+        )
+        checkpoint.close()
+
+        assert fake_clamd.commands.count("FILDES") == 1
+        assert result.status == ScanStatus.INFECTED
+        assert result.threat_details == [threat]
+        assert reported == [threat]
+        assert result.scanned_files == 2
+
+        # The clean file completed during this run is journaled too
+        resumed = ScanCheckpoint([str(target)], checkpoint_dir=checkpoint_dir)
+        resumed.start(resume=True)
+        assert resumed.resumed_files == 2
+        resumed.discard()
+
+    def test_scan_uses_fildes_in_session(self, native_scanner, fake_clamd, clean_test_file):
+        """Files are submitted with FILDES inside an IDSESSION."""
+        result = native_scanner.scan_sync(str(clean_test_file))
+
+        assert result.status == ScanStatus.CLEAN
+        assert result.exit_code == 0
+        assert "IDSESSION" in fake_clamd.commands
+        assert "FILDES" in fake_clamd.commands
+
+    def test_scan_over_tcp_uses_instream(self, eicar_file):
+        """TCP connections can't pass descriptors, so content is streamed."""
+        from tests.conftest import FakeClamd
+
+        server = FakeClamd(tcp=True)
+        try:
+            settings = MagicMock()
+            settings.get.side_effect = lambda key, default=None: (
+                server.address if key == "daemon_socket_path" else default
+            )
+            scanner = DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
+            result = scanner.scan_sync(str(eicar_file))
+        finally:
+            server.close()
+
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_files == [str(eicar_file)]
+        assert "INSTREAM" in server.commands
+        assert "FILDES" not in server.commands
+
+    def test_tcp_scan_streams_directory_over_several_connections(self, tmp_path):
+        """Files of a TCP scan are streamed over a pool of sessions."""
+        from src.core.clamd_client import STREAM_CONNECTIONS
+        from tests.conftest import EICAR_STRING, FakeClamd
+
+        scan_dir = tmp_path / "scan"
+        scan_dir.mkdir()
+        (scan_dir / "eicar_test_file.txt").write_text(EICAR_STRING)
+        for index in range(5):
+            (scan_dir / f"clean{index}.txt").write_text("clean")
+        server = FakeClamd(tcp=True)
+        try:
+            settings = MagicMock()
+            settings.get.side_effect = lambda key, default=None: (
+                server.address if key == "daemon_socket_path" else default
+            )
+            scanner = DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
+            with patch("src.core.daemon_scanner.find_clamd_config", return_value=None):
+                result = scanner.scan_sync(str(scan_dir))
+        finally:
+            server.close()
 
-        profile_exclusions = {"patterns": [], "paths": ["~/.cache"]}
-        paths = scanner._collect_exclusion_paths(profile_exclusions)
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_count == 1
+        assert result.infected_files[0].endswith("eicar_test_file.txt")
+        assert server.commands.count("IDSESSION") == STREAM_CONNECTIONS
+        assert server.commands.count("INSTREAM") == result.scanned_files
+
+    def test_file_over_stream_max_length_is_not_reported_clean(self, tmp_path):
+        """A file cut off at StreamMaxLength is an error, and never cached or completed."""
+        from src.core.scan_cache import ScanCache
+        from tests.conftest import FakeClamd
+
+        large = tmp_path / "large.bin"
+        large.write_bytes(b"x" * 2048)
+        small = tmp_path / "small.bin"
+        small.write_bytes(b"x" * 512)
+        server = FakeClamd(tcp=True)
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        checkpoint = MagicMock()
+        checkpoint.is_completed.return_value = False
+        checkpoint.resumed_threats = []
+        try:
+            settings = MagicMock()
+            settings.get.side_effect = lambda key, default=None: (
+                server.address if key == "daemon_socket_path" else default
+            )
+            scanner = DaemonScanner(
+                log_manager=MagicMock(), settings_manager=settings, scan_cache=cache
+            )
+            with patch.object(DaemonScanner, "_get_stream_max_length", return_value=1024):
+                large_result, small_result = scanner.scan_targets(
+                    [str(large), str(small)], checkpoint=checkpoint
+                )
+                cached = [cache.is_clean(large.stat()), cache.is_clean(small.stat())]
+        finally:
+            server.close()
+            cache.close()
+
+        assert large_result.status == ScanStatus.ERROR
+        assert f"{large}: Exceeds StreamMaxLength, not fully scanned ERROR" in large_result.stdout
+        assert small_result.status == ScanStatus.CLEAN
+        assert cached == [False, True]
+        checkpoint.mark_completed.assert_called_once()
+        assert checkpoint.mark_completed.call_args.args[0] == str(small)
+
+    def test_request_window_follows_settings_and_scan_kind(self):
+        """Background scans keep half the configured requests in flight."""
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            8 if key == "clamd_max_inflight" else default
+        )
 
-        assert len(paths) == 1
-        assert str(paths[0]).endswith(".cache")
+        assert DaemonScanner(settings_manager=settings)._get_request_window() == 8
+        background = DaemonScanner(settings_manager=settings, interactive=False)
+        assert background._get_request_window() == 4
+
+    def test_private_clamd_window_ignores_system_clamd_conf(self, tmp_path):
+        """The private clamd runs with clamd's default limits."""
+        with patch("src.core.daemon_scanner.get_clamd_limits") as mock_limits:
+            mock_limits.return_value.max_threads = 10
+            mock_limits.return_value.max_queue = 100
+            DaemonScanner(clamd_address=str(tmp_path / "clamd.sock"))._get_request_window()
+
+        mock_limits.assert_called_once_with(())
+
+    def test_small_window_streams_over_fewer_connections(self, tmp_path):
+        """A TCP scan opens no more connections than requests it keeps in flight."""
+        from tests.conftest import FakeClamd
+
+        scan_dir = tmp_path / "scan"
+        scan_dir.mkdir()
+        for index in range(5):
+            (scan_dir / f"clean{index}.txt").write_text("clean")
+        server = FakeClamd(tcp=True)
+        try:
+            settings = MagicMock()
+            values = {"daemon_socket_path": server.address, "clamd_max_inflight": 2}
+            settings.get.side_effect = lambda key, default=None: values.get(key, default)
+            scanner = DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
+            with patch("src.core.daemon_scanner.find_clamd_config", return_value=None):
+                result = scanner.scan_sync(str(scan_dir))
+        finally:
+            server.close()
+
+        assert result.status == ScanStatus.CLEAN
+        assert server.commands.count("IDSESSION") == 2
+        assert server.commands.count("INSTREAM") == 5
+
+    def test_paused_scan_reconnects_on_resume(self, fake_clamd, eicar_directory):
+        """A paused scan hangs up on clamd and opens a new session when resumed."""
+        import threading
 
-    def test_collect_exclusion_paths_empty_when_no_profile(self, daemon_scanner_class):
-        """Test that empty list is returned when no profile exclusions."""
-        scanner = daemon_scanner_class()
+        from src.core.scan_governor import ScanGovernor
 
-        paths = scanner._collect_exclusion_paths()
+        governor = ScanGovernor(battery_manager=MagicMock())
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            fake_clamd.address if key == "daemon_socket_path" else default
+        )
+        scanner = DaemonScanner(
+            log_manager=MagicMock(), settings_manager=settings, governor=governor
+        )
+        governor.pause()
+        threading.Timer(0.2, governor.resume).start()
 
-        assert paths == []
+        result = scanner.scan_sync(str(eicar_directory))
 
-    def test_matches_exclusion_pattern_exact_match(self, daemon_scanner_class):
-        """Test exact path matching."""
-        scanner = daemon_scanner_class()
+        assert result.status == ScanStatus.INFECTED
+        assert fake_clamd.commands.count("IDSESSION") == 2
 
-        patterns = ["/home/user/eicar.txt"]
-        assert scanner._matches_exclusion_pattern("/home/user/eicar.txt", patterns) is True
-        assert scanner._matches_exclusion_pattern("/home/user/other.txt", patterns) is False
+    def test_cancel_ends_a_paused_scan(self, fake_clamd, clean_test_file):
+        """Cancelling doesn't wait for a paused scan to be resumed."""
+        import threading
 
-    def test_matches_exclusion_pattern_glob_pattern(self, daemon_scanner_class):
-        """Test glob pattern matching."""
-        scanner = daemon_scanner_class()
+        from src.core.scan_governor import ScanGovernor
 
-        patterns = ["*.log", "*.tmp"]
-        assert scanner._matches_exclusion_pattern("/var/log/test.log", patterns) is True
-        assert scanner._matches_exclusion_pattern("/tmp/file.tmp", patterns) is True
-        assert scanner._matches_exclusion_pattern("/home/user/file.txt", patterns) is False
+        governor = ScanGovernor(battery_manager=MagicMock())
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            fake_clamd.address if key == "daemon_socket_path" else default
+        )
+        scanner = DaemonScanner(
+            log_manager=MagicMock(), settings_manager=settings, governor=governor
+        )
+        governor.pause()
+        threading.Timer(0.2, scanner.cancel).start()
 
-    def test_matches_exclusion_pattern_with_tilde(
-        self, daemon_scanner_class, monkeypatch, tmp_path
-    ):
-        """Test pattern matching with tilde expansion."""
-        fake_home = tmp_path / "fakehome"
-        fake_home.mkdir()
-        monkeypatch.setenv("HOME", str(fake_home))
+        result = scanner.scan_sync(str(clean_test_file))
 
-        scanner = daemon_scanner_class()
+        assert result.status == ScanStatus.CANCELLED
+        assert "FILDES" not in fake_clamd.commands
 
-        patterns = ["~/.cache/*"]
-        # After tilde expansion, the pattern becomes the full path
-        assert scanner._matches_exclusion_pattern(str(fake_home / ".cache/file"), patterns) is True
+    def test_throttled_scan_keeps_one_request_per_clamd(self):
+        """The governor's throttle shrinks the request window."""
+        from src.core.scan_governor import ScanGovernor, SystemReadings
 
-    def test_matches_exclusion_pattern_empty_patterns(self, daemon_scanner_class):
-        """Test that empty patterns list returns False."""
-        scanner = daemon_scanner_class()
+        governor = ScanGovernor(battery_manager=MagicMock())
+        scanner = DaemonScanner(governor=governor)
+        assert scanner._throttle(20, 1) == 20
 
-        assert scanner._matches_exclusion_pattern("/some/file.txt", []) is False
+        with patch(
+            "src.core.scan_governor.read_system",
+            return_value=SystemReadings(on_battery=True, battery_percent=80),
+        ):
+            governor.poll()
+
+        assert scanner._throttle(20, 1) == 1
+        assert scanner._throttle(20, 3) == 3
+
+    def test_scan_archive_reports_members(self, native_scanner, fake_clamd, tmp_path):
+        """Archive members are streamed to clamd and threats named by member."""
+        import io
+        import tarfile
+
+        from tests.conftest import EICAR_STRING
+
+        archive = tmp_path / "image.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            for name, data in (("etc/hosts", b"localhost"), ("tmp/x.com", EICAR_STRING.encode())):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        threats = []
+
+        result = native_scanner.scan_archive(str(archive), on_threat=threats.append)
+
+        assert result.status == ScanStatus.INFECTED
+        assert result.scanned_files == 2
+        assert result.infected_files == [f"{archive}!tmp/x.com"]
+        assert [threat.file_path for threat in threats] == [f"{archive}!tmp/x.com"]
+        assert fake_clamd.commands.count("INSTREAM") == 2
+        assert not list(tmp_path.glob("tmp*"))
+
+    def test_scan_archive_reports_oversize_members(self, native_scanner, tmp_path):
+        """A member cut off at StreamMaxLength makes the archive an error, not clean."""
+        import io
+        import tarfile
+
+        archive = tmp_path / "image.tar"
+        with tarfile.open(archive, "w") as tar:
+            for name, data in (("etc/hosts", b"localhost"), ("var/big.img", b"x" * 2048)):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        with patch.object(DaemonScanner, "_get_stream_max_length", return_value=1024):
+            result = native_scanner.scan_archive(str(archive))
+
+        assert result.status == ScanStatus.ERROR
+        assert result.scanned_files == 2
+        assert result.stdout == (
+            f"{archive}!var/big.img: Exceeds StreamMaxLength, not fully scanned ERROR"
+        )
 
-    def test_matches_exclusion_path_direct_match(self, daemon_scanner_class, tmp_path):
-        """Test direct path matching."""
-        scanner = daemon_scanner_class()
+    def test_scan_archive_rejects_other_files(self, native_scanner, clean_test_file):
+        """Files that aren't tar or zip archives are not scanned."""
+        result = native_scanner.scan_archive(str(clean_test_file))
 
-        excluded_dir = tmp_path / "excluded"
-        excluded_dir.mkdir()
-        exclude_paths = [excluded_dir.resolve()]
+        assert result.status == ScanStatus.ERROR
+        assert result.error_message == "Not a tar or zip archive"
 
-        # File is exactly the excluded path (edge case, but valid)
-        assert scanner._matches_exclusion_path(str(excluded_dir), exclude_paths) is True
+    def test_native_scan_applies_exclusions(self, native_scanner, eicar_directory):
+        """Threats matching profile exclusions are dropped."""
+        result = native_scanner.scan_sync(
+            str(eicar_directory), profile_exclusions={"patterns": ["*eicar*"]}
+        )
 
-    def test_matches_exclusion_path_subdirectory(self, daemon_scanner_class, tmp_path):
-        """Test subdirectory path matching."""
-        scanner = daemon_scanner_class()
+        assert result.status == ScanStatus.CLEAN
+        assert result.infected_count == 0
 
-        excluded_dir = tmp_path / "excluded"
-        excluded_dir.mkdir()
-        subdir = excluded_dir / "subdir"
-        subdir.mkdir()
-        file_in_subdir = subdir / "file.txt"
-        file_in_subdir.touch()
+    def test_excluded_directories_are_not_submitted(self, native_scanner, fake_clamd, tmp_path):
+        """Excluded trees are pruned while walking and never reach clamd."""
+        from tests.conftest import EICAR_STRING
 
-        exclude_paths = [excluded_dir.resolve()]
+        (tmp_path / "eicar.txt").write_text(EICAR_STRING)
+        excluded = tmp_path / "node_modules"
+        excluded.mkdir()
+        for index in range(5):
+            (excluded / f"module{index}.js").write_text("clean")
 
-        assert scanner._matches_exclusion_path(str(file_in_subdir), exclude_paths) is True
+        result = native_scanner.scan_sync(
+            str(tmp_path), profile_exclusions={"paths": [str(excluded)]}
+        )
 
-    def test_matches_exclusion_path_outside_excluded(self, daemon_scanner_class, tmp_path):
-        """Test that files outside excluded paths don't match."""
-        scanner = daemon_scanner_class()
+        assert fake_clamd.commands.count("FILDES") == 1
+        assert result.status == ScanStatus.INFECTED
 
-        excluded_dir = tmp_path / "excluded"
-        excluded_dir.mkdir()
-        other_dir = tmp_path / "other"
-        other_dir.mkdir()
-        file_in_other = other_dir / "file.txt"
-        file_in_other.touch()
+    def test_unreachable_socket_falls_back_to_clamdscan(self, tmp_path, clean_test_file):
+        """If the native PING fails, clamdscan is spawned as before."""
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            str(tmp_path / "missing.sock") if key == "daemon_socket_path" else default
+        )
+        scanner = DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
 
-        exclude_paths = [excluded_dir.resolve()]
+        with (
+            patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
+            patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
+            patch("subprocess.Popen") as mock_popen,
+        ):
+            mock_installed.return_value = (True, "ClamAV 1.0.0")
+            mock_connection.return_value = (True, "PONG")
+            mock_process = MagicMock()
+            attach_process_output(mock_process, "", "")
+            mock_process.returncode = 0
+            mock_popen.return_value = mock_process
 
-        assert scanner._matches_exclusion_path(str(file_in_other), exclude_paths) is False
+            result = scanner.scan_sync(str(clean_test_file))
 
-    def test_matches_exclusion_path_empty_paths(self, daemon_scanner_class):
-        """Test that empty paths list returns False."""
-        scanner = daemon_scanner_class()
+        mock_popen.assert_called_once()
+        assert result.status == ScanStatus.CLEAN
+
+    def test_clamdscan_fallback_scans_file_list(self, tmp_path, eicar_directory):
+        """Without a native socket, exclusions are applied through --file-list."""
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            str(tmp_path / "missing.sock") if key == "daemon_socket_path" else default
+        )
+        scanner = DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
+        listed = []
+
+        def fake_popen(cmd, **kwargs):
+            file_list = next(arg for arg in cmd if arg.startswith("--file-list="))
+            with open(file_list.split("=", 1)[1]) as f:
+                listed.extend(f.read().splitlines())
+            process = attach_process_output(MagicMock())
+            process.returncode = 0
+            return process
+
+        with (
+            patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed,
+            patch("src.core.daemon_scanner.check_clamd_connection") as mock_connection,
+            patch("src.core.daemon_scanner.wrap_host_command", side_effect=lambda x: x),
+            patch("subprocess.Popen", side_effect=fake_popen),
+        ):
+            mock_installed.return_value = (True, "ClamAV 1.0.0")
+            mock_connection.return_value = (True, "PONG")
+            result = scanner.scan_sync(
+                str(eicar_directory), profile_exclusions={"patterns": ["*/eicar_test_*"]}
+            )
 
-        assert scanner._matches_exclusion_path("/some/file.txt", []) is False
+        assert listed == [str(eicar_directory / "clean_file.txt")]
+        assert result.status == ScanStatus.CLEAN
+        assert list(tmp_path.glob("**/scan-*.lst")) == []
 
-    def test_matches_exclusion_path_similar_prefix_not_matched(
-        self, daemon_scanner_class, tmp_path
+    def test_cancel_aborts_active_session(self, native_scanner):
+        """cancel() tears down the clamd session."""
+        session = MagicMock()
+        native_scanner._current_session = session
+
+        native_scanner.cancel()
+
+        session.abort.assert_called_once()
+        assert native_scanner._cancel_event.is_set()
+
+    def test_scan_cache_skips_unchanged_files(self, fake_clamd, eicar_directory, tmp_path):
+        """Clean verdicts are cached; infected files are submitted every time."""
+        from src.core.scan_cache import ScanCache
+
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            fake_clamd.address if key == "daemon_socket_path" else default
+        )
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        scanner = DaemonScanner(
+            log_manager=MagicMock(), settings_manager=settings, scan_cache=cache
+        )
+
+        scanner.scan_sync(str(eicar_directory))
+        submitted_first = fake_clamd.commands.count("FILDES")
+        result = scanner.scan_sync(str(eicar_directory))
+        cache.close()
+
+        assert submitted_first == 2
+        assert fake_clamd.commands.count("FILDES") == 3
+        assert result.status == ScanStatus.INFECTED
+        assert result.scanned_files == 2
+
+    def test_local_verdicts_are_keyed_on_loaded_signatures(
+        self, fake_clamd, eicar_directory, tmp_path
     ):
-        """Test that paths with similar prefixes are not incorrectly matched."""
-        scanner = daemon_scanner_class()
+        """freshclam updating the databases doesn't vouch for clamd's old verdicts."""
+        from src.core.scan_cache import ScanCache
 
-        excluded_dir = tmp_path / "excluded"
-        excluded_dir.mkdir()
-        similar_dir = tmp_path / "excluded_other"
-        similar_dir.mkdir()
-        file_in_similar = similar_dir / "file.txt"
-        file_in_similar.touch()
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            fake_clamd.address if key == "daemon_socket_path" else default
+        )
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        scanner = DaemonScanner(
+            log_manager=MagicMock(), settings_manager=settings, scan_cache=cache
+        )
+
+        with patch("src.core.scan_cache.get_signature_version", return_value="sig-1"):
+            scanner.scan_sync(str(eicar_directory))
+        with patch("src.core.scan_cache.get_signature_version", return_value="sig-2"):
+            # New databases are installed, but clamd hasn't reloaded them
+            scanner.scan_sync(str(eicar_directory))
+            submitted_unchanged = fake_clamd.commands.count("FILDES")
+            fake_clamd.VERSION = "ClamAV 1.0.0/27001/Tue Jan  2 00:00:00 2024"
+            scanner.scan_sync(str(eicar_directory))
+        cache.close()
+
+        assert submitted_unchanged == 3
+        assert fake_clamd.commands.count("FILDES") == 5
+
+    def test_remote_verdicts_are_keyed_on_clamd_version(self, eicar_directory, tmp_path):
+        """A TCP clamd's verdicts follow its own databases, not the local ones."""
+        from src.core.scan_cache import ScanCache
+        from tests.conftest import FakeClamd
+
+        server = FakeClamd(tcp=True)
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            server.address if key == "daemon_socket_path" else default
+        )
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        scanner = DaemonScanner(
+            log_manager=MagicMock(), settings_manager=settings, scan_cache=cache
+        )
+        try:
+            scanner.scan_sync(str(eicar_directory))
+            scanner.scan_sync(str(eicar_directory))
+            submitted_unchanged = server.commands.count("INSTREAM")
+            server.VERSION = "ClamAV 1.0.0/27001/Tue Jan  2 00:00:00 2024"
+            scanner.scan_sync(str(eicar_directory))
+        finally:
+            server.close()
+            cache.close()
+
+        # The clean file is only submitted again once the server's databases change
+        assert submitted_unchanged == 3
+        assert server.commands.count("INSTREAM") == 5
+
+
+class TestDaemonScannerEndpoints:
+    """Tests for spreading scans over several clamd endpoints."""
+
+    @staticmethod
+    def _scanner(endpoints):
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            endpoints if key == "daemon_endpoints" else default
+        )
+        return DaemonScanner(log_manager=MagicMock(), settings_manager=settings)
+
+    @pytest.fixture
+    def scan_dir(self, tmp_path):
+        """Directory with one infected and several clean files."""
+        from tests.conftest import EICAR_STRING
+
+        scan_dir = tmp_path / "scan"
+        scan_dir.mkdir()
+        (scan_dir / "eicar_test_file.txt").write_text(EICAR_STRING)
+        for index in range(11):
+            (scan_dir / f"clean{index}.txt").write_text(f"clean {index}")
+        return scan_dir
+
+    def test_scan_spreads_over_local_and_remote_endpoints(self, fake_clamd, scan_dir):
+        """Local files go by descriptor and remote ones over INSTREAM."""
+        from tests.conftest import FakeClamd
+
+        remote = FakeClamd(tcp=True)
+        try:
+            scanner = self._scanner([fake_clamd.address, remote.address])
+            with patch("src.core.daemon_scanner.find_clamd_config", return_value=None):
+                result = scanner.scan_sync(str(scan_dir))
+        finally:
+            remote.close()
+
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_files == [str(scan_dir / "eicar_test_file.txt")]
+        assert result.scanned_files == 12
+        assert "IDSESSION" in fake_clamd.commands
+        assert "IDSESSION" in remote.commands
+        assert fake_clamd.commands.count("FILDES") + remote.commands.count("INSTREAM") == 12
+
+    def test_endpoint_that_is_down_is_left_out(self, fake_clamd, scan_dir, tmp_path):
+        """An endpoint failing its health check doesn't stop the scan."""
+        scanner = self._scanner([str(tmp_path / "missing.sock"), fake_clamd.address])
+
+        result = scanner.scan_sync(str(scan_dir))
+
+        assert result.status == ScanStatus.INFECTED
+        assert fake_clamd.commands.count("FILDES") == 12
+
+    def test_files_of_failing_endpoint_go_to_the_others(self, fake_clamd, scan_dir, tmp_path):
+        """Requests an endpoint drops are scanned by another endpoint."""
+        from tests.conftest import FakeClamd
+
+        class BrokenClamd(FakeClamd):
+            """Answers PING but drops the connection on the first scan."""
+
+            def _verdict(self, name, data):
+                raise ConnectionResetError
+
+        broken = BrokenClamd(socket_path=tmp_path / "broken.sock")
+        try:
+            scanner = self._scanner([broken.address, fake_clamd.address])
+            result = scanner.scan_sync(str(scan_dir))
+        finally:
+            broken.close()
+
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_files == [str(scan_dir / "eicar_test_file.txt")]
+        assert result.error_message is None
+        assert "FILDES" in broken.commands
+        assert fake_clamd.commands.count("FILDES") == 12
+
+    def test_no_reachable_endpoint_does_not_spawn_clamdscan(self, tmp_path):
+        """clamdscan talks to the local clamd, not to the configured endpoints."""
+        scanner = self._scanner([str(tmp_path / "missing.sock")])
 
-        exclude_paths = [excluded_dir.resolve()]
+        with patch("src.core.daemon_scanner.check_clamdscan_installed") as mock_installed:
+            available, message = scanner.check_available()
 
-        # Should NOT match because "excluded_other" is not under "excluded"
-        assert scanner._matches_exclusion_path(str(file_in_similar), exclude_paths) is False
+        assert available is False
+        assert message == "No clamd endpoint is reachable"
+        mock_installed.assert_not_called()
@@ -0,0 +1,130 @@
+# ClamUI Exclusion Matcher Tests
+"""Unit tests for the compiled exclusion matcher."""
+
+from unittest.mock import MagicMock
+
+from src.core.exclusion_matcher import ExclusionMatcher, get_exclusion_matcher
+
+
+def _setting(pattern, exclusion_type="pattern", enabled=True):
+    """Build an entry of the exclusion_patterns setting."""
+    return {"pattern": pattern, "type": exclusion_type, "enabled": enabled}
+
+
+class TestExclusionMatcherPatterns:
+    """Tests for glob and literal path patterns."""
+
+    def test_glob_matches_name_and_full_path(self):
+        matcher = ExclusionMatcher([_setting("*.log"), _setting("/tmp/*")])
+
+        assert matcher.is_excluded("/var/log/test.log", is_dir=False) is True
+        assert matcher.is_excluded("/tmp/file.txt", is_dir=False) is True
+        assert matcher.is_excluded("/home/user/file.txt", is_dir=False) is False
+
+    def test_exact_path_match(self):
+        matcher = ExclusionMatcher([_setting("/home/user/eicar.txt")])
+
+        assert matcher.is_excluded("/home/user/eicar.txt", is_dir=False) is True
+        assert matcher.is_excluded("/home/user/other.txt", is_dir=False) is False
+
+    def test_disabled_and_empty_patterns_are_ignored(self):
+        matcher = ExclusionMatcher([_setting("*.bak", enabled=False), _setting("")])
+
+        assert matcher.is_empty is True
+        assert matcher.is_excluded("/home/user/file.bak", is_dir=False) is False
+
+    def test_tilde_is_expanded(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        matcher = ExclusionMatcher([_setting("~/.cache/*")])
+
+        assert matcher.is_excluded(str(tmp_path / ".cache" / "file"), is_dir=False) is True
+
+    def test_directory_patterns_only_prune_directories(self):
+        matcher = ExclusionMatcher([_setting("node_modules", "directory")])
+
+        assert matcher.is_excluded("/src/app/node_modules", is_dir=True) is True
+        assert matcher.is_excluded("/src/app/node_modules", is_dir=False) is False
+        assert matcher.is_excluded("/src/app/lib", is_dir=True) is False
+
+    def test_combines_settings_and_profile(self):
+        matcher = ExclusionMatcher([_setting("*.log")], {"patterns": ["*.cache", ""]})
+
+        assert matcher.is_excluded("/a/b.log", is_dir=False) is True
+        assert matcher.is_excluded("/a/b.cache", is_dir=False) is True
+        assert matcher.is_excluded("/a/b.txt", is_dir=False) is False
+
+
+class TestExclusionMatcherPaths:
+    """Tests for profile paths and the path-prefix trie."""
+
+    def test_path_and_everything_below(self, tmp_path):
+        excluded = tmp_path / "excluded"
+        matcher = ExclusionMatcher(profile_exclusions={"paths": [str(excluded), ""]})
+
+        assert matcher.is_excluded(str(excluded), is_dir=True) is True
+        assert matcher.is_excluded(str(excluded / "sub" / "file.txt"), is_dir=False) is True
+        assert matcher.is_excluded(str(tmp_path / "other" / "file.txt"), is_dir=False) is False
+
+    def test_similar_prefix_not_matched(self, tmp_path):
+        matcher = ExclusionMatcher(profile_exclusions={"paths": [str(tmp_path / "excluded")]})
+
+        assert matcher.is_excluded(str(tmp_path / "excluded_other" / "f"), is_dir=False) is False
+
+    def test_tilde_paths_are_expanded(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        matcher = ExclusionMatcher(profile_exclusions={"paths": ["~/.cache"]})
+
+        assert matcher.is_excluded(str(tmp_path / ".cache" / "f"), is_dir=False) is True
+
+    def test_symlinked_path_is_resolved(self, tmp_path):
+        real = tmp_path / "real"
+        real.mkdir()
+        (tmp_path / "link").symlink_to(real)
+        matcher = ExclusionMatcher(profile_exclusions={"paths": [str(tmp_path / "link")]})
+
+        assert matcher.is_excluded(str(real / "file.txt"), is_dir=False) is True
+
+    def test_matches_checks_parent_directories(self):
+        matcher = ExclusionMatcher([_setting("node_modules", "directory")])
+
+        assert matcher.matches("/src/node_modules/pkg/index.js") is True
+        assert matcher.matches("/src/lib/index.js") is False
+
+
+class TestExclusionMatcherClamscanArgs:
+    """Tests for the clamscan command-line arguments."""
+
+    def test_arguments_in_settings_then_profile_order(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        matcher = ExclusionMatcher(
+            [_setting("*.log", "file"), _setting("build", "directory")],
+            {"paths": ["~/vm"], "patterns": ["*.tmp"]},
+        )
+
+        assert matcher.clamscan_args == [
+            "--exclude",
+            r"^.*\.log$",
+            "--exclude-dir",
+            "^build$",
+            "--exclude-dir",
+            str(tmp_path / "vm"),
+            "--exclude",
+            r"^.*\.tmp$",
+        ]
+
+
+class TestGetExclusionMatcher:
+    """Tests for get_exclusion_matcher."""
+
+    def test_without_settings(self):
+        assert get_exclusion_matcher().is_empty is True
+
+    def test_reads_settings_from_any_manager(self):
+        settings = MagicMock()
+        settings.get.return_value = [_setting("*.log")]
+
+        matcher = get_exclusion_matcher(settings, {"patterns": ["*.tmp"]})
+
+        settings.get.assert_called_once_with("exclusion_patterns", [])
+        assert matcher.is_excluded("/a.log", is_dir=False) is True
+        assert matcher.is_excluded("/a.tmp", is_dir=False) is True
@@ -0,0 +1,130 @@
+# ClamUI Health Probe Tests
+"""Unit tests for the cached backend availability checks."""
+
+import threading
+
+from src.core.health_probe import HealthProbe
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingProbe:
+    """Probe function returning a configurable result and counting calls."""
+
+    def __init__(self, result=(True, "ClamAV 1.0.0")):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+class TestHealthProbe:
+    """Tests for HealthProbe caching."""
+
+    def test_positive_result_is_reused_within_ttl(self):
+        clock = FakeClock()
+        health = HealthProbe(ttl=60, clock=clock)
+        probe = CountingProbe()
+
+        assert health.check("clamscan", probe) == (True, "ClamAV 1.0.0")
+        clock.now = 59
+        assert health.check("clamscan", probe) == (True, "ClamAV 1.0.0")
+
+        assert probe.calls == 1
+
+    def test_negative_result_expires_quickly(self):
+        clock = FakeClock()
+        health = HealthProbe(ttl=60, negative_ttl=5, clock=clock)
+        probe = CountingProbe((False, "ClamAV is not installed"))
+
+        health.check("clamscan", probe)
+        clock.now = 4
+        health.check("clamscan", probe)
+        assert probe.calls == 1
+
+        probe.result = (True, "ClamAV 1.0.0")
+        clock.now = 6
+        assert health.check("clamscan", probe) == (True, "ClamAV 1.0.0")
+        assert probe.calls == 2
+
+    def test_expired_positive_result_is_served_while_reprobing(self):
+        clock = FakeClock()
+        health = HealthProbe(ttl=60, stale_ttl=600, clock=clock)
+        probed = threading.Event()
+
+        def probe():
+            probed.set()
+            return (True, "ClamAV 1.0.1")
+
+        health.check("clamscan", lambda: (True, "ClamAV 1.0.0"))
+        clock.now = 61
+
+        assert health.check("clamscan", probe) == (True, "ClamAV 1.0.0")
+        assert probed.wait(5)
+        for _ in range(100):
+            if health.check("clamscan", probe) == (True, "ClamAV 1.0.1"):
+                break
+            threading.Event().wait(0.01)
+        assert health.check("clamscan", probe) == (True, "ClamAV 1.0.1")
+
+    def test_result_older_than_stale_ttl_is_probed_synchronously(self):
+        clock = FakeClock()
+        health = HealthProbe(ttl=60, stale_ttl=600, clock=clock)
+        health.check("clamscan", CountingProbe())
+
+        clock.now = 601
+        probe = CountingProbe((False, "gone"))
+
+        assert health.check("clamscan", probe) == (False, "gone")
+        assert probe.calls == 1
+
+    def test_invalidate_forces_a_new_probe(self):
+        health = HealthProbe()
+        probe = CountingProbe()
+        health.check("clamscan", probe)
+        health.check("clamd", probe)
+
+        health.invalidate("clamscan")
+        health.check("clamscan", probe)
+        health.check("clamd", probe)
+        assert probe.calls == 3
+
+        health.invalidate()
+        health.check("clamscan", probe)
+        health.check("clamd", probe)
+        assert probe.calls == 5
+
+    def test_probe_exception_is_reported_as_unavailable(self):
+        health = HealthProbe()
+
+        def probe():
+            raise OSError("boom")
+
+        is_available, message = health.check("clamscan", probe)
+
+        assert is_available is False
+        assert "boom" in message
+
+    def test_result_of_invalidated_probe_is_not_cached(self):
+        health = HealthProbe()
+        probe = CountingProbe()
+
+        def racing_probe():
+            # A scan failure invalidates the check while it is being probed
+            health.invalidate("clamd")
+            return (True, "PONG")
+
+        assert health.check("clamd", racing_probe) == (True, "PONG")
+        health.check("clamd", probe)
+
+        assert probe.calls == 1
@@ -341,6 +341,28 @@ class TestLogEntry:
         assert "\u202e" not in entry.details
         assert "\x07" not in entry.details
 
+    def test_from_scan_result_data_caps_threat_lines(self, monkeypatch):
+        """Test from_scan_result_data lists the first threats and counts the rest."""
+        monkeypatch.setattr("src.core.log_manager.MAX_LOGGED_THREATS", 3)
+        threat_details = (
+            {"file_path": f"/tmp/file{index}", "threat_name": "Eicar"} for index in range(10)
+        )
+        entry = LogEntry.from_scan_result_data(
+            scan_status="infected",
+            path="/tmp",
+            duration=15.0,
+            infected_count=10,
+            threat_details=threat_details,
+        )
+
+        assert entry.details.split("\n") == [
+            "Threats found: 10",
+            "  - /tmp/file0: Eicar",
+            "  - /tmp/file1: Eicar",
+            "  - /tmp/file2: Eicar",
+            "  ... and 7 more",
+        ]
+
     def test_from_scan_result_data_sanitizes_error_message(self):
         """Test from_scan_result_data sanitizes error message."""
         entry = LogEntry.from_scan_result_data(
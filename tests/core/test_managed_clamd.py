@@ -0,0 +1,206 @@
+# ClamUI Managed clamd Tests
+"""Unit tests for the private clamd started by the "managed" scan backend."""
+
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core import managed_clamd
+from src.core.managed_clamd import ManagedClamd, get_runtime_dir
+from tests.conftest import FakeClamd
+
+
+def wait_for_command(server: FakeClamd, command: str, timeout: float = 2.0) -> bool:
+    """Wait until the fake clamd received a command it doesn't reply to."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if command in server.commands:
+            return True
+        time.sleep(0.01)
+    return command in server.commands
+
+
+@pytest.fixture
+def clamd_environment(tmp_path):
+    """Pretend clamd and a signature database are installed."""
+    database_dir = tmp_path / "db"
+    database_dir.mkdir()
+    with (
+        patch("src.core.managed_clamd.which_host_command", return_value="/usr/sbin/clamd"),
+        patch("src.core.managed_clamd.wrap_host_command", side_effect=lambda cmd: cmd),
+        patch("src.core.managed_clamd.is_flatpak", return_value=False),
+        patch("src.core.managed_clamd.get_signature_database_dir", return_value=database_dir),
+    ):
+        yield database_dir
+
+
+@pytest.fixture
+def started_clamd(tmp_path, clamd_environment):
+    """
+    Make Popen "start" clamd by running a FakeClamd on the private socket.
+
+    Yields:
+        Tuple of (ManagedClamd, Popen mock, list receiving the FakeClamd)
+    """
+    servers = []
+    process = MagicMock()
+    process.poll.return_value = None
+
+    def popen(cmd, **kwargs):
+        servers.append(FakeClamd(socket_path=tmp_path / "run" / "clamd.sock"))
+        return process
+
+    with patch("src.core.managed_clamd.subprocess.Popen", side_effect=popen) as mock_popen:
+        managed = ManagedClamd(runtime_dir=tmp_path / "run")
+        try:
+            yield managed, mock_popen, servers
+        finally:
+            for server in servers:
+                server.close()
+
+
+class TestGetRuntimeDir:
+    """Tests for get_runtime_dir."""
+
+    def test_uses_xdg_runtime_dir(self, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert get_runtime_dir() == Path("/run/user/1000/clamui")
+
+    def test_falls_back_to_per_user_temp_dir(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+        assert get_runtime_dir().parent == tmp_path
+        assert get_runtime_dir().name.startswith("clamui-")
+
+
+class TestManagedClamdAvailability:
+    """Tests for ManagedClamd.check_available."""
+
+    def test_available_with_clamd_and_database(self, tmp_path, clamd_environment):
+        assert ManagedClamd(runtime_dir=tmp_path).check_available() == (True, "/usr/sbin/clamd")
+
+    def test_unavailable_without_clamd(self, tmp_path):
+        with patch("src.core.managed_clamd.which_host_command", return_value=None):
+            is_available, error = ManagedClamd(runtime_dir=tmp_path).check_available()
+        assert is_available is False
+        assert "not installed" in error
+
+    def test_flatpak_needs_bundled_clamd(self, tmp_path, clamd_environment):
+        with patch("src.core.managed_clamd.is_flatpak", return_value=True):
+            is_available, error = ManagedClamd(runtime_dir=tmp_path).check_available()
+        assert is_available is False
+        assert "bundled" in error
+
+    def test_unavailable_without_database(self, tmp_path, clamd_environment):
+        with patch("src.core.managed_clamd.get_signature_database_dir", return_value=None):
+            is_available, error = ManagedClamd(runtime_dir=tmp_path).check_available()
+        assert is_available is False
+        assert "database" in error
+
+
+class TestManagedClamdLifecycle:
+    """Tests for starting, reloading and stopping the private clamd."""
+
+    def test_starts_clamd_with_private_config(self, started_clamd, clamd_environment):
+        managed, mock_popen, servers = started_clamd
+
+        assert managed.ensure_running() == (True, managed.socket_path)
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd == ["/usr/sbin/clamd", f"--config-file={managed.config_path}"]
+        config = managed.config_path.read_text()
+        assert f"LocalSocket {managed.socket_path}" in config
+        assert f"DatabaseDirectory {clamd_environment}" in config
+        assert "Foreground yes" in config
+        assert managed.config_path.parent.stat().st_mode & 0o777 == 0o700
+
+    def test_running_clamd_is_started_once(self, started_clamd):
+        managed, mock_popen, _ = started_clamd
+
+        managed.ensure_running()
+        managed.ensure_running()
+
+        mock_popen.assert_called_once()
+
+    def test_adopts_clamd_already_answering(self, fake_clamd, tmp_path):
+        managed = ManagedClamd(runtime_dir=tmp_path)
+        with patch("src.core.managed_clamd.subprocess.Popen") as mock_popen:
+            assert managed.ensure_running() == (True, fake_clamd.address)
+            managed.stop()
+
+        mock_popen.assert_not_called()
+        # Only a clamd started by this process is shut down
+        assert "SHUTDOWN" not in fake_clamd.commands
+
+    def test_clamd_exiting_during_startup(self, tmp_path, clamd_environment):
+        process = MagicMock()
+        process.poll.return_value = 1
+        managed = ManagedClamd(runtime_dir=tmp_path)
+        with patch("src.core.managed_clamd.subprocess.Popen", return_value=process):
+            is_running, error = managed.ensure_running()
+
+        assert is_running is False
+        assert "exited" in error
+
+    def test_reports_missing_clamd(self, tmp_path):
+        managed = ManagedClamd(runtime_dir=tmp_path)
+        with patch("src.core.managed_clamd.which_host_command", return_value=None):
+            is_running, error = managed.ensure_running()
+        assert is_running is False
+        assert "not installed" in error
+
+    def test_stop_shuts_down_started_clamd(self, started_clamd):
+        managed, _, servers = started_clamd
+        managed.ensure_running()
+
+        managed.stop()
+
+        assert wait_for_command(servers[0], "SHUTDOWN")
+        assert managed.is_running() is False
+
+    def test_reload(self, fake_clamd, tmp_path):
+        managed = ManagedClamd(runtime_dir=tmp_path)
+        assert managed.reload() is True
+        assert fake_clamd.commands == ["RELOAD"]
+
+    def test_reload_without_clamd(self, tmp_path):
+        assert ManagedClamd(runtime_dir=tmp_path).reload() is False
+
+    def test_idle_clamd_is_stopped(self, started_clamd):
+        managed, _, servers = started_clamd
+        managed.idle_timeout = 0
+        with patch("src.core.managed_clamd.IDLE_CHECK_INTERVAL", 0.01):
+            managed.ensure_running()
+            assert wait_for_command(servers[0], "SHUTDOWN")
+
+    def test_clamd_in_use_is_not_stopped(self, started_clamd):
+        managed, _, servers = started_clamd
+        managed.idle_timeout = 0
+        with patch("src.core.managed_clamd.IDLE_CHECK_INTERVAL", 0.01):
+            with managed.in_use():
+                managed.ensure_running()
+                assert not wait_for_command(servers[0], "SHUTDOWN", timeout=0.2)
+            assert wait_for_command(servers[0], "SHUTDOWN")
+
+
+class TestSharedManagedClamd:
+    """Tests for the process-wide private clamd helpers."""
+
+    def test_helpers_do_nothing_without_instance(self, monkeypatch):
+        monkeypatch.setattr(managed_clamd, "_managed_clamd", None)
+        managed_clamd.reload_managed_clamd()
+        managed_clamd.shutdown_managed_clamd()
+        assert managed_clamd._managed_clamd is None
+
+    def test_helpers_use_shared_instance(self, monkeypatch):
+        shared = MagicMock()
+        monkeypatch.setattr(managed_clamd, "_managed_clamd", shared)
+
+        assert managed_clamd.get_managed_clamd() is shared
+        managed_clamd.reload_managed_clamd()
+        managed_clamd.shutdown_managed_clamd()
+
+        shared.reload.assert_called_once()
+        shared.stop.assert_called_once()
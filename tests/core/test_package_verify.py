@@ -0,0 +1,148 @@
+# ClamUI Package Verification Tests
+"""Unit tests for skipping files that match their packaged digest."""
+
+import hashlib
+import os
+import subprocess
+from unittest import mock
+
+import pytest
+
+from src.core import package_verify
+from src.core.package_verify import (
+    PackageVerifier,
+    create_package_verifier,
+    touches_system_roots,
+)
+from src.core.scan_cache import ScanCache
+
+
+@pytest.fixture
+def dpkg(tmp_path, monkeypatch):
+    """A dpkg database in tmp_path and a packaged tree it describes."""
+    info_dir = tmp_path / "dpkg" / "info"
+    info_dir.mkdir(parents=True)
+    status = tmp_path / "dpkg" / "status"
+    status.write_text("Package: tool\n")
+    monkeypatch.setattr(package_verify, "DPKG_INFO_DIR", str(info_dir))
+    monkeypatch.setattr(package_verify, "DPKG_STATUS", str(status))
+
+    root = tmp_path / "usr"
+    (root / "bin").mkdir(parents=True)
+    files = {}
+    md5sums = ""
+    for name, content in (("tool", b"packaged tool"), ("helper", b"packaged helper")):
+        path = root / "bin" / name
+        path.write_bytes(content)
+        files[name] = str(path)
+        md5sums += f"{hashlib.md5(content).hexdigest()}  {str(path).lstrip('/')}\n"
+    (info_dir / "tool.md5sums").write_text(md5sums)
+    return {"root": str(root), "files": files, "cache_path": str(tmp_path / "verified.db")}
+
+
+def make_verifier(dpkg) -> PackageVerifier:
+    """Create a prepared verifier for the packaged tree."""
+    verifier = PackageVerifier([dpkg["root"]], cache=ScanCache(dpkg["cache_path"]))
+    assert verifier.prepare() is True
+    return verifier
+
+
+class TestTouchesSystemRoots:
+    """Tests for touches_system_roots."""
+
+    def test_full_system_scan(self):
+        assert touches_system_roots(["/"]) is True
+
+    def test_system_subdirectory(self):
+        assert touches_system_roots(["/usr/share/doc"]) is True
+
+    def test_home_scan(self):
+        assert touches_system_roots(["/home/user", "/usrdata"]) is False
+
+
+class TestPackageVerifier:
+    """Tests for PackageVerifier."""
+
+    def test_unchanged_packaged_file_is_verified(self, dpkg):
+        verifier = make_verifier(dpkg)
+        tool = dpkg["files"]["tool"]
+
+        assert verifier.is_verified(tool, os.stat(tool)) is True
+
+    def test_modified_packaged_file_is_scanned(self, dpkg):
+        tool = dpkg["files"]["tool"]
+        with open(tool, "ab") as f:
+            f.write(b"injected")
+        verifier = make_verifier(dpkg)
+
+        assert verifier.is_verified(tool, os.stat(tool)) is False
+
+    def test_unpackaged_file_is_scanned(self, dpkg):
+        verifier = make_verifier(dpkg)
+        extra = os.path.join(dpkg["root"], "bin", "extra")
+        with open(extra, "wb") as f:
+            f.write(b"local")
+
+        assert verifier.is_verified(extra, os.stat(extra)) is False
+
+    def test_verified_files_are_not_hashed_again(self, dpkg):
+        tool = dpkg["files"]["tool"]
+        verifier = make_verifier(dpkg)
+        verifier.is_verified(tool, os.stat(tool))
+        verifier.close()
+
+        verifier = make_verifier(dpkg)
+        with mock.patch.object(PackageVerifier, "_hash_file") as hash_file:
+            assert verifier.is_verified(tool, os.stat(tool)) is True
+        hash_file.assert_not_called()
+
+    def test_package_update_forgets_verified_files(self, dpkg, tmp_path):
+        tool = dpkg["files"]["tool"]
+        verifier = make_verifier(dpkg)
+        verifier.is_verified(tool, os.stat(tool))
+        verifier.close()
+        (tmp_path / "dpkg" / "status").write_text("Package: tool\nVersion: 2\n")
+
+        verifier = make_verifier(dpkg)
+        with mock.patch.object(PackageVerifier, "_hash_file", return_value=None) as hash_file:
+            assert verifier.is_verified(tool, os.stat(tool)) is False
+        hash_file.assert_called_once()
+
+    def test_only_files_within_targets_are_loaded(self, dpkg):
+        verifier = PackageVerifier(["/nonexistent"], cache=ScanCache(dpkg["cache_path"]))
+
+        assert verifier.prepare() is False
+
+    def test_rpm_digests(self, monkeypatch):
+        monkeypatch.setattr(package_verify, "DPKG_STATUS", "/nonexistent/status")
+        output = "8\t/usr/bin/tool\tabc\n8\t/usr/share/tool\t\n(none)\t/usr/bin/old\tdef\n"
+        completed = subprocess.CompletedProcess([], 0, stdout=output, stderr="")
+
+        with mock.patch("src.core.package_verify.subprocess.run", return_value=completed):
+            entries = list(PackageVerifier._read_rpm_digests())
+
+        assert entries == [("/usr/bin/tool", "sha256", "abc"), ("/usr/bin/old", "md5", "def")]
+
+
+class TestCreatePackageVerifier:
+    """Tests for create_package_verifier."""
+
+    def test_off_by_default(self):
+        settings = mock.MagicMock()
+        settings.get.return_value = False
+
+        assert create_package_verifier(settings, ["/"]) is None
+
+    def test_not_used_for_home_scans(self):
+        settings = mock.MagicMock()
+        settings.get.return_value = True
+
+        with mock.patch("src.core.package_verify.is_flatpak", return_value=False):
+            assert create_package_verifier(settings, ["/home/user"]) is None
+
+    def test_not_used_in_flatpak(self):
+        settings = mock.MagicMock()
+        settings.get.return_value = True
+
+        with mock.patch("src.core.package_verify.is_flatpak", return_value=True):
+            assert create_package_verifier(settings, ["/"]) is None
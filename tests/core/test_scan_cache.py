@@ -0,0 +1,275 @@
+# ClamUI Scan Cache Tests
+"""Unit tests for the scan-verdict cache and the scan walker."""
+
+import os
+import sqlite3
+import stat
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.core.scan_cache import ScanCache, get_clamd_signature_version, get_signature_version
+from src.core.scan_walker import WalkStats, iter_scan_files, iter_target_files, write_file_list
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A ScanCache stored in tmp_path."""
+    cache = ScanCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+class TestGetSignatureVersion:
+    """Tests for get_signature_version."""
+
+    def test_changes_when_database_is_updated(self, tmp_path):
+        (tmp_path / "main.cvd").write_bytes(b"main")
+        (tmp_path / "daily.cld").write_bytes(b"daily")
+        before = get_signature_version(tmp_path)
+
+        (tmp_path / "daily.cld").write_bytes(b"daily-update")
+        after = get_signature_version(tmp_path)
+
+        assert before is not None
+        assert before != after
+
+    def test_ignores_freshclam_state_files(self, tmp_path):
+        (tmp_path / "main.cvd").write_bytes(b"main")
+        before = get_signature_version(tmp_path)
+
+        (tmp_path / "freshclam.dat").write_bytes(b"state")
+        (tmp_path / ".lock").write_bytes(b"")
+
+        assert get_signature_version(tmp_path) == before
+
+    def test_empty_directory(self, tmp_path):
+        assert get_signature_version(tmp_path) is None
+
+
+class TestGetClamdSignatureVersion:
+    """Tests for fingerprinting the databases of clamd servers."""
+
+    def test_follows_database_version_not_server_order(self):
+        old = "ClamAV 1.0.3/27100/Mon Nov 20 09:23:41 2023"
+        new = "ClamAV 1.0.3/27101/Tue Nov 21 09:23:41 2023"
+
+        assert get_clamd_signature_version([old, new]) == get_clamd_signature_version([new, old])
+        assert get_clamd_signature_version([old]) != get_clamd_signature_version([new])
+
+
+class TestScanCache:
+    """Tests for ScanCache."""
+
+    def test_unprepared_cache_reports_nothing_clean(self, cache, clean_test_file):
+        st = os.lstat(clean_test_file)
+        cache.mark_clean(st)
+        assert cache.is_clean(st) is False
+
+    def test_mark_and_lookup(self, cache, clean_test_file):
+        assert cache.prepare("sig-1") is True
+        st = os.lstat(clean_test_file)
+        assert cache.is_clean(st) is False
+
+        cache.mark_clean(st)
+        cache.flush()
+
+        assert cache.is_clean(st) is True
+
+    def test_modified_file_is_not_clean(self, cache, clean_test_file):
+        cache.prepare("sig-1")
+        cache.mark_clean(os.lstat(clean_test_file))
+        cache.flush()
+
+        clean_test_file.write_text("modified content")
+
+        assert cache.is_clean(os.lstat(clean_test_file)) is False
+
+    def test_verdicts_are_kept_per_signature(self, cache, clean_test_file):
+        st = os.lstat(clean_test_file)
+        cache.prepare("sig-1")
+        cache.mark_clean(st)
+        cache.flush()
+
+        cache.prepare("sig-2")
+        assert cache.is_clean(st) is False
+
+        # Another backend scanning with other signatures keeps these verdicts
+        cache.prepare("sig-1")
+        assert cache.is_clean(st) is True
+
+    def test_least_recently_used_signatures_expire(self, cache, clean_test_file):
+        st = os.lstat(clean_test_file)
+        cache.prepare("sig-1")
+        cache.mark_clean(st)
+        cache.flush()
+
+        for index in range(2, ScanCache.KEPT_SIGNATURES + 2):
+            cache.prepare(f"sig-{index}")
+        cache.prepare("sig-1")
+
+        assert cache.is_clean(st) is False
+
+    def test_cache_keyed_on_inode_only_is_replaced(self, tmp_path, clean_test_file):
+        db_path = tmp_path / "old.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE verdicts (dev INTEGER NOT NULL, ino INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, ctime_ns INTEGER NOT NULL, "
+            "signature TEXT NOT NULL, PRIMARY KEY (dev, ino)) WITHOUT ROWID"
+        )
+        conn.commit()
+        conn.close()
+        st = os.lstat(clean_test_file)
+
+        cache = ScanCache(str(db_path))
+        try:
+            assert cache.prepare("sig-1") is True
+            cache.mark_clean(st)
+            cache.flush()
+            cache.prepare("sig-2")
+            cache.mark_clean(st)
+            cache.flush()
+            cache.prepare("sig-1")
+            assert cache.is_clean(st) is True
+        finally:
+            cache.close()
+
+    def test_verdicts_persist_across_instances(self, tmp_path, clean_test_file):
+        st = os.lstat(clean_test_file)
+        first = ScanCache(str(tmp_path / "shared.db"))
+        first.prepare("sig-1")
+        first.mark_clean(st)
+        first.close()
+
+        second = ScanCache(str(tmp_path / "shared.db"))
+        try:
+            second.prepare("sig-1")
+            assert second.is_clean(st) is True
+        finally:
+            second.close()
+
+    def test_invalidate(self, cache, clean_test_file):
+        st = os.lstat(clean_test_file)
+        cache.prepare("sig-1")
+        cache.mark_clean(st)
+        cache.flush()
+
+        cache.invalidate()
+
+        assert cache.is_clean(st) is False
+
+    def test_prepare_without_signatures(self, cache, clean_test_file):
+        with patch("src.core.scan_cache.get_signature_version", return_value=None):
+            assert cache.prepare() is False
+        cache.mark_clean(os.lstat(clean_test_file))
+        assert cache.is_clean(os.lstat(clean_test_file)) is False
+
+    def test_database_permissions(self, cache):
+        cache.prepare("sig-1")
+        assert stat.S_IMODE(os.stat(cache.db_path).st_mode) == ScanCache.DB_FILE_PERMISSIONS
+
+    def test_default_path_uses_xdg_data_home(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+        assert ScanCache().db_path == tmp_path / "clamui" / "scan_cache.db"
+
+
+class TestIterScanFiles:
+    """Tests for the shared scan walker."""
+
+    def test_walks_regular_files_and_counts(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.txt").write_text("b")
+        (tmp_path / "link").symlink_to(tmp_path / "a.txt")
+        (tmp_path / "dirlink").symlink_to(tmp_path / "sub")
+        stats = WalkStats()
+
+        files = sorted(p for p, _ in iter_scan_files(str(tmp_path), stats=stats))
+
+        assert files == [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.txt")]
+        assert (stats.files, stats.dirs) == (2, 2)
+
+    def test_excluded_directories_are_pruned(self, tmp_path):
+        (tmp_path / "skip").mkdir()
+        (tmp_path / "skip" / "c.txt").write_text("c")
+        (tmp_path / "keep.txt").write_text("k")
+
+        files = [
+            p
+            for p, _ in iter_scan_files(
+                str(tmp_path), is_excluded=lambda path, is_dir: path.endswith("skip")
+            )
+        ]
+
+        assert files == [str(tmp_path / "keep.txt")]
+
+    def test_non_recursive(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.txt").write_text("b")
+        (tmp_path / "a.txt").write_text("a")
+
+        files = [p for p, _ in iter_scan_files(str(tmp_path), recursive=False)]
+
+        assert files == [str(tmp_path / "a.txt")]
+
+    def test_single_file(self, clean_test_file):
+        files = [p for p, _ in iter_scan_files(str(clean_test_file))]
+        assert files == [str(clean_test_file)]
+
+
+class TestIterTargetFiles:
+    """Tests for walking several scan targets."""
+
+    def test_nested_target_is_walked_once_for_itself(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.txt").write_text("b")
+        (tmp_path / "other.txt").write_text("o")
+        targets = [str(tmp_path), str(tmp_path / "sub"), str(tmp_path / "other.txt")]
+        stats = [WalkStats() for _ in targets]
+
+        files = sorted(p for p, _ in iter_target_files(targets, stats=stats))
+
+        assert files == sorted(
+            [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.txt"), str(tmp_path / "other.txt")]
+        )
+        assert [(st.files, st.dirs) for st in stats] == [(1, 1), (1, 1), (1, 0)]
+
+    def test_exclusions_still_apply(self, tmp_path):
+        (tmp_path / "one").mkdir()
+        (tmp_path / "one" / "skip.log").write_text("s")
+        (tmp_path / "two").mkdir()
+        (tmp_path / "two" / "keep.txt").write_text("k")
+
+        files = [
+            p
+            for p, _ in iter_target_files(
+                [str(tmp_path / "one"), str(tmp_path / "two")],
+                is_excluded=lambda path, is_dir: path.endswith(".log"),
+            )
+        ]
+
+        assert files == [str(tmp_path / "two" / "keep.txt")]
+
+
+class TestWriteFileList:
+    """Tests for write_file_list."""
+
+    def test_writes_one_path_per_line(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        list_file, count = write_file_list(["/a/b.txt", "/c d/e.txt"])
+
+        assert count == 2
+        assert Path(list_file).parent == tmp_path / "clamui"
+        assert Path(list_file).read_text() == "/a/b.txt\n/c d/e.txt\n"
+
+    def test_rejects_newlines(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        with pytest.raises(ValueError):
+            write_file_list(["/a/b.txt", "/a/bad\nname"])
+
+        assert list((tmp_path / "clamui").iterdir()) == []
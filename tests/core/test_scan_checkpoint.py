@@ -0,0 +1,201 @@
+# ClamUI Scan Checkpoint Tests
+"""Unit tests for the checkpoint journal of resumable scans."""
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+from src.core.scan_checkpoint import ScanCheckpoint, find_interrupted_scan, get_job_id
+from src.core.scanner_types import ThreatDetail
+
+
+@pytest.fixture
+def checkpoint_dir(tmp_path):
+    """Directory for the journals."""
+    return str(tmp_path / "checkpoints")
+
+
+@pytest.fixture
+def home(tmp_path):
+    """A scanned directory with a clean and an infected file."""
+    home = tmp_path / "home"
+    home.mkdir()
+    (home / "clean.txt").write_text("clean")
+    (home / "eicar.txt").write_text("infected")
+    (home / "other.txt").write_text("other")
+    return home
+
+
+@pytest.fixture(autouse=True)
+def signatures(monkeypatch):
+    """Fixed fingerprint of the signature databases."""
+    monkeypatch.setattr("src.core.scan_checkpoint.get_signature_version", lambda: "sig-1")
+
+
+def make_checkpoint(checkpoint_dir, targets=("/home/user",), **kwargs) -> ScanCheckpoint:
+    """Create a checkpoint of a job stored in checkpoint_dir."""
+    return ScanCheckpoint(list(targets), checkpoint_dir=checkpoint_dir, **kwargs)
+
+
+def interrupt_scan(checkpoint_dir, home, targets=None, **kwargs) -> ScanCheckpoint:
+    """Record some progress of a job and leave its journal behind."""
+    checkpoint = make_checkpoint(checkpoint_dir, targets or [str(home)], **kwargs)
+    checkpoint.start()
+    checkpoint.mark_completed(str(home / "clean.txt"), os.lstat(home / "clean.txt"))
+    checkpoint.record_threat(
+        ThreatDetail(str(home / "eicar.txt"), "Eicar-Test-Signature", "Test", "low"),
+        os.lstat(home / "eicar.txt"),
+    )
+    checkpoint.close()
+    return checkpoint
+
+
+def is_completed(checkpoint, path) -> bool:
+    """Check a file of the walk against the checkpoint."""
+    return checkpoint.is_completed(str(path), os.lstat(path))
+
+
+class TestGetJobId:
+    """Tests for get_job_id."""
+
+    def test_same_job_same_id(self):
+        assert get_job_id(["/a", "/b"]) == get_job_id(["/a", "/b"], True, None)
+
+    def test_options_change_the_id(self):
+        job = get_job_id(["/a"])
+
+        assert get_job_id(["/b"]) != job
+        assert get_job_id(["/a"], recursive=False) != job
+        assert get_job_id(["/a"], profile_exclusions={"paths": ["/a/tmp"]}) != job
+        assert get_job_id(["/a"], profile_options={"scan_archive": False}) != job
+
+
+class TestScanCheckpoint:
+    """Tests for ScanCheckpoint."""
+
+    def test_fresh_start_creates_nothing(self, checkpoint_dir):
+        checkpoint = make_checkpoint(checkpoint_dir)
+
+        assert checkpoint.start(resume=True) is False
+        checkpoint.close()
+
+        assert not checkpoint.db_path.exists()
+
+    def test_resume_skips_recorded_progress(self, checkpoint_dir, home):
+        interrupt_scan(checkpoint_dir, home)
+        checkpoint = make_checkpoint(checkpoint_dir, [str(home)])
+
+        assert checkpoint.start(resume=True) is True
+        assert checkpoint.resumed_files == 2
+        assert is_completed(checkpoint, home / "clean.txt")
+        assert is_completed(checkpoint, home / "eicar.txt")
+        assert not is_completed(checkpoint, home / "other.txt")
+        assert [t.file_path for t in checkpoint.resumed_threats] == [str(home / "eicar.txt")]
+        checkpoint.close()
+
+    def test_replaced_files_are_scanned_again(self, checkpoint_dir, home):
+        interrupt_scan(checkpoint_dir, home)
+        (home / "clean.txt").unlink()
+        (home / "clean.txt").write_text("replaced")
+        (home / "eicar.txt").write_text("cleaned up")
+        checkpoint = make_checkpoint(checkpoint_dir, [str(home)])
+
+        assert checkpoint.start(resume=True) is True
+        assert not is_completed(checkpoint, home / "clean.txt")
+        assert not is_completed(checkpoint, home / "eicar.txt")
+        # The threat is reported again only if the rescan finds it
+        assert list(checkpoint.resumed_threats) == []
+        checkpoint.close()
+
+    def test_old_journal_is_not_resumed(self, checkpoint_dir, home, monkeypatch):
+        interrupt_scan(checkpoint_dir, home)
+        checkpoint = make_checkpoint(checkpoint_dir, [str(home)])
+        later = time.time() + 2 * 86400
+        monkeypatch.setattr("src.core.scan_checkpoint.time.time", lambda: later)
+
+        assert checkpoint.start(resume=True, max_age=86400) is False
+        assert not checkpoint.db_path.exists()
+
+    def test_journal_of_other_signatures_is_not_resumed(self, checkpoint_dir, home, monkeypatch):
+        interrupt_scan(checkpoint_dir, home)
+        monkeypatch.setattr("src.core.scan_checkpoint.get_signature_version", lambda: "sig-2")
+        checkpoint = make_checkpoint(checkpoint_dir, [str(home)])
+
+        assert find_interrupted_scan(checkpoint_dir) is None
+        assert checkpoint.start(resume=True) is False
+        assert not is_completed(checkpoint, home / "clean.txt")
+
+    def test_profile_options_are_part_of_the_job(self, checkpoint_dir, home):
+        interrupt_scan(checkpoint_dir, home, profile_options={"scan_archive": False})
+
+        full = make_checkpoint(checkpoint_dir, [str(home)])
+        assert full.start(resume=True) is False
+        interrupted = find_interrupted_scan(checkpoint_dir)
+        assert interrupted.profile_options == {"scan_archive": False}
+        assert interrupted.start(resume=True) is True
+        interrupted.close()
+
+    def test_start_without_resume_forgets_progress(self, checkpoint_dir, home):
+        interrupt_scan(checkpoint_dir, home)
+        checkpoint = make_checkpoint(checkpoint_dir, [str(home)])
+
+        assert checkpoint.start() is False
+        assert not is_completed(checkpoint, home / "clean.txt")
+        assert not checkpoint.db_path.exists()
+
+    def test_discard_deletes_journal(self, checkpoint_dir, home):
+        checkpoint = interrupt_scan(checkpoint_dir, home)
+        assert checkpoint.db_path.exists()
+
+        checkpoint.discard()
+
+        assert list(checkpoint.db_path.parent.iterdir()) == []
+
+    def test_progress_is_committed_periodically(self, checkpoint_dir, home, monkeypatch):
+        monkeypatch.setattr("src.core.scan_checkpoint.CHECKPOINT_INTERVAL", 0)
+        checkpoint = make_checkpoint(checkpoint_dir)
+        checkpoint.start()
+
+        checkpoint.mark_completed(str(home / "clean.txt"), os.lstat(home / "clean.txt"))
+
+        # Visible to another connection before the checkpoint is closed
+        conn = sqlite3.connect(checkpoint.db_path)
+        try:
+            assert conn.execute("SELECT path FROM completed").fetchall() == [
+                (str(home / "clean.txt"),)
+            ]
+        finally:
+            conn.close()
+        checkpoint.discard()
+
+    def test_journal_is_private(self, checkpoint_dir, home):
+        checkpoint = interrupt_scan(checkpoint_dir, home)
+
+        assert checkpoint.db_path.stat().st_mode & 0o777 == 0o600
+
+
+class TestFindInterruptedScan:
+    """Tests for find_interrupted_scan."""
+
+    def test_no_journal(self, checkpoint_dir):
+        assert find_interrupted_scan(checkpoint_dir) is None
+
+    def test_finds_latest_job(self, checkpoint_dir, home, monkeypatch):
+        interrupt_scan(checkpoint_dir, home, ["/older"])
+        monkeypatch.setattr("src.core.scan_checkpoint.time.time", lambda: 4102444800.0)
+        interrupt_scan(checkpoint_dir, home, ["/newer"])
+
+        checkpoint = find_interrupted_scan(checkpoint_dir)
+
+        assert checkpoint is not None
+        assert checkpoint.targets == ["/newer"]
+        assert checkpoint.start(resume=True) is True
+        checkpoint.close()
+
+    def test_ignores_unreadable_journal(self, checkpoint_dir, tmp_path):
+        (tmp_path / "checkpoints").mkdir()
+        (tmp_path / "checkpoints" / "broken.db").write_text("not a database")
+
+        assert find_interrupted_scan(checkpoint_dir) is None
@@ -0,0 +1,158 @@
+# ClamUI Scan D-Bus Service Tests
+"""Unit tests for the org.clamui.Scanner D-Bus service."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.scan_dbus import MAX_SIGNALED_INFECTED_FILES, ScanDBusService, summarize_results
+from src.core.scan_queue import JobPriority
+from src.core.scanner_types import ScanResult, ScanStatus
+
+
+def make_result(status, infected_files=()) -> ScanResult:
+    """Create a ScanResult with a status."""
+    return ScanResult(
+        status=status,
+        path="/home/user",
+        stdout="",
+        stderr="",
+        exit_code=0,
+        infected_files=list(infected_files),
+        scanned_files=3,
+        scanned_dirs=1,
+        infected_count=len(infected_files),
+        error_message=None,
+        threat_details=[],
+    )
+
+
+@pytest.fixture
+def service():
+    """Service with a mocked job queue."""
+    with patch("src.core.scan_dbus.ScanJobQueue") as mock_queue_class:
+        service = ScanDBusService(MagicMock())
+    service.mock_queue = mock_queue_class.return_value
+    return service
+
+
+def call(service, method_name, args):
+    """Call a D-Bus method of the service and return the invocation."""
+    parameters = MagicMock()
+    parameters.unpack.return_value = args
+    invocation = MagicMock()
+    with patch("src.core.scan_dbus.GLib") as mock_glib:
+        service._handle_method_call(
+            None,
+            ":1.42",
+            "/org/clamui/Scanner",
+            "org.clamui.Scanner",
+            method_name,
+            parameters,
+            invocation,
+        )
+    invocation.variant_calls = mock_glib.Variant.call_args_list
+    return invocation
+
+
+class TestSummarizeResults:
+    """Tests for summarize_results."""
+
+    def test_clean(self):
+        results = [make_result(ScanStatus.CLEAN), make_result(ScanStatus.CLEAN)]
+
+        assert summarize_results(results) == ("clean", 6, 0, [])
+
+    def test_infected_wins(self):
+        results = [make_result(ScanStatus.ERROR), make_result(ScanStatus.INFECTED, ["/x"])]
+
+        assert summarize_results(results) == ("infected", 6, 1, ["/x"])
+
+    def test_infected_files_are_capped(self):
+        results = [
+            make_result(
+                ScanStatus.INFECTED, [f"/a/{i}" for i in range(MAX_SIGNALED_INFECTED_FILES)]
+            ),
+            make_result(ScanStatus.INFECTED, ["/b/x"]),
+        ]
+
+        _, _, infected_count, infected_files = summarize_results(results)
+
+        assert infected_count == MAX_SIGNALED_INFECTED_FILES + 1
+        assert len(infected_files) == MAX_SIGNALED_INFECTED_FILES
+        assert infected_files[-1] == f"/a/{MAX_SIGNALED_INFECTED_FILES - 1}"
+
+    def test_unknown_count_is_not_summed(self):
+        narrowed = make_result(ScanStatus.CLEAN)
+        narrowed.scanned_files = -1
+
+        assert summarize_results([make_result(ScanStatus.CLEAN), narrowed])[1] == -1
+
+    def test_cancelled_job_has_no_results(self):
+        assert summarize_results([])[0] == "cancelled"
+
+
+class TestScanDBusService:
+    """Tests for the org.clamui.Scanner method calls."""
+
+    def test_lost_name_unexports_the_interface(self, service):
+        connection = MagicMock()
+        connection.register_object.return_value = 5
+
+        with patch("src.core.scan_dbus.Gio") as mock_gio:
+            assert service.register(connection) is True
+        on_name_lost = mock_gio.bus_own_name_on_connection.call_args.args[4]
+        on_name_lost(connection, "org.clamui.Scanner")
+
+        connection.unregister_object.assert_called_once_with(5)
+
+    def test_scan_submits_job(self, service):
+        service.mock_queue.submit.return_value = 7
+
+        invocation = call(service, "Scan", (["/home/user"], "scheduled"))
+
+        service.mock_queue.submit.assert_called_once_with(["/home/user"], JobPriority.SCHEDULED)
+        assert invocation.variant_calls[0].args == ("(t)", (7,))
+        invocation.return_value.assert_called_once()
+
+    def test_scan_rejects_unknown_priority(self, service):
+        invocation = call(service, "Scan", (["/home/user"], "urgent"))
+
+        service.mock_queue.submit.assert_not_called()
+        invocation.return_dbus_error.assert_called_once()
+
+    def test_scan_reports_queue_errors(self, service):
+        service.mock_queue.submit.side_effect = ValueError("No paths to scan")
+
+        invocation = call(service, "Scan", ([], "interactive"))
+
+        invocation.return_dbus_error.assert_called_once_with(
+            "org.freedesktop.DBus.Error.Failed", "No paths to scan"
+        )
+
+    def test_cancel(self, service):
+        service.mock_queue.cancel.return_value = True
+
+        invocation = call(service, "Cancel", (7,))
+
+        service.mock_queue.cancel.assert_called_once_with(7)
+        assert invocation.variant_calls[0].args == ("(b)", (True,))
+
+    def test_unknown_method(self, service):
+        invocation = call(service, "Explode", ())
+
+        invocation.return_dbus_error.assert_called_once()
+
+    def test_finished_job_emits_signal_from_main_loop(self, service):
+        connection = MagicMock()
+        service._connection = connection
+
+        with patch("src.core.scan_dbus.GLib") as mock_glib:
+            service._on_job_finished(7, [make_result(ScanStatus.CLEAN)])
+            emit = mock_glib.idle_add.call_args.args[0]
+            connection.emit_signal.assert_not_called()
+            assert emit() is False
+
+        signal = connection.emit_signal.call_args.args
+        assert signal[1:4] == ("/org/clamui/Scanner", "org.clamui.Scanner", "JobFinished")
+        assert mock_glib.Variant.call_args.args == ("(tsxtas)", (7, "clean", 3, 0, []))
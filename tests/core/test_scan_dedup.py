@@ -0,0 +1,118 @@
+# ClamUI Scan Deduplication Tests
+"""Unit tests for skipping hardlinks and identical copies during scans."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+from src.core.scan_dedup import ScanDeduplicator, create_deduplicator
+from src.core.scanner_types import ThreatDetail
+
+
+def add(dedup: ScanDeduplicator, path) -> bool:
+    """Register a file with its lstat result, like the walker does."""
+    return dedup.add(str(path), os.lstat(path))
+
+
+class TestScanDeduplicator:
+    """Tests for ScanDeduplicator."""
+
+    def test_hardlinks_are_scanned_once(self, tmp_path):
+        original = tmp_path / "original.txt"
+        original.write_text("content")
+        link = tmp_path / "link.txt"
+        os.link(original, link)
+        dedup = ScanDeduplicator()
+
+        assert add(dedup, original) is True
+        assert add(dedup, link) is False
+        assert dedup.duplicates_of(str(original)) == [str(link)]
+        assert dedup.duplicate_count == 1
+
+    def test_copies_are_scanned_without_content_hashing(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+        dedup = ScanDeduplicator()
+
+        assert add(dedup, tmp_path / "a.txt") is True
+        assert add(dedup, tmp_path / "b.txt") is True
+
+    def test_identical_copies_are_scanned_once(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+        (tmp_path / "c.txt").write_text("diff")
+        dedup = ScanDeduplicator(hash_content=True)
+
+        assert add(dedup, tmp_path / "a.txt") is True
+        assert add(dedup, tmp_path / "b.txt") is False
+        assert add(dedup, tmp_path / "c.txt") is True
+        assert dedup.duplicates_of(str(tmp_path / "a.txt")) == [str(tmp_path / "b.txt")]
+
+    def test_only_size_collisions_are_hashed(self, tmp_path):
+        (tmp_path / "a.txt").write_text("short")
+        (tmp_path / "b.txt").write_text("much longer")
+        (tmp_path / "c.txt").write_text("other")
+        dedup = ScanDeduplicator(hash_content=True)
+
+        with patch(
+            "src.core.scan_dedup.SecureFileHandler.calculate_hash",
+            return_value=("hash", None),
+        ) as mock_hash:
+            add(dedup, tmp_path / "a.txt")
+            add(dedup, tmp_path / "b.txt")
+            assert mock_hash.call_count == 0
+            add(dedup, tmp_path / "c.txt")
+
+        # The first file of the size is hashed once another one shows up
+        assert mock_hash.call_count == 2
+
+    def test_unreadable_file_is_scanned(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+        dedup = ScanDeduplicator(hash_content=True)
+
+        with patch(
+            "src.core.scan_dedup.SecureFileHandler.calculate_hash",
+            return_value=(None, "Permission denied"),
+        ):
+            assert add(dedup, tmp_path / "a.txt") is True
+            assert add(dedup, tmp_path / "b.txt") is True
+
+    def test_expand_threats_reports_duplicates(self, tmp_path):
+        original = tmp_path / "original.txt"
+        original.write_text("content")
+        link = tmp_path / "link.txt"
+        os.link(original, link)
+        dedup = ScanDeduplicator()
+        add(dedup, original)
+        add(dedup, link)
+        threat = ThreatDetail(str(original), "Eicar-Test-Signature", "Test", "low")
+
+        assert dedup.expand_threats([threat]) == [
+            ThreatDetail(str(link), "Eicar-Test-Signature", "Test", "low")
+        ]
+
+
+class TestCreateDeduplicator:
+    """Tests for create_deduplicator."""
+
+    def test_content_hashing_follows_setting(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+        settings = MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            True if key == "scan_dedup_content" else default
+        )
+
+        dedup = create_deduplicator(settings)
+        add(dedup, tmp_path / "a.txt")
+
+        assert add(dedup, tmp_path / "b.txt") is False
+
+    def test_defaults_to_hardlinks_only(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+
+        dedup = create_deduplicator()
+        add(dedup, tmp_path / "a.txt")
+
+        assert add(dedup, tmp_path / "b.txt") is True
@@ -0,0 +1,285 @@
+# ClamUI Scan Governor Tests
+"""Unit tests for the throttling and pausing of running scans."""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from src.core.battery_manager import BatteryStatus
+from src.core.scan_governor import (
+    GovernorState,
+    ScanGovernor,
+    SystemReadings,
+    decide,
+    read_system,
+    read_temperature,
+)
+
+
+def _process_state(pid: int) -> str:
+    """Get the state letter of a process from /proc (T when stopped)."""
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().rsplit(")", 1)[1].split()[0]
+
+
+def _is_stopped(pid: int, timeout: float = 2.0) -> bool:
+    """Wait for a signal to stop a process, which is delivered asynchronously."""
+    deadline = time.monotonic() + timeout
+    while _process_state(pid) != "T":
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _is_running(pid: int, timeout: float = 2.0) -> bool:
+    """Wait for a signal to continue a stopped process."""
+    deadline = time.monotonic() + timeout
+    while _process_state(pid) == "T":
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _battery(has_battery=False, is_plugged=True, percent=None):
+    manager = mock.MagicMock()
+    manager.get_status.return_value = BatteryStatus(
+        has_battery=has_battery, is_plugged=is_plugged, percent=percent
+    )
+    return manager
+
+
+@pytest.fixture
+def make_governor(monkeypatch):
+    """Build a governor seeing the given readings of the system."""
+
+    def make(readings: SystemReadings, enabled: bool = True) -> ScanGovernor:
+        monkeypatch.setattr("src.core.scan_governor.read_system", lambda *args: readings)
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: {
+            "scan_governor_enabled": enabled,
+            "scan_governor_battery_percent": 20,
+        }.get(key, default)
+        return ScanGovernor(settings, battery_manager=_battery(), poll_interval=0.05)
+
+    return make
+
+
+@pytest.fixture
+def sleeper():
+    """A process for the governor to stop, continue and renice."""
+    process = subprocess.Popen(["sleep", "30"])
+    yield process
+    process.kill()
+    process.send_signal(signal.SIGCONT)
+    process.wait()
+
+
+class TestReadSystem:
+    """Tests for the readings of the system."""
+
+    def test_read_temperature_takes_the_hottest_zone(self, tmp_path):
+        for index, value in enumerate(["45000", "71500", "garbage"]):
+            zone = tmp_path / f"thermal_zone{index}"
+            zone.mkdir()
+            (zone / "temp").write_text(value + "\n")
+        (tmp_path / "thermal_zone3").mkdir()
+
+        assert read_temperature(str(tmp_path)) == 71.5
+
+    def test_read_temperature_without_zones(self, tmp_path):
+        assert read_temperature(str(tmp_path)) is None
+
+    def test_read_system_combines_battery_load_and_temperature(self, tmp_path):
+        zone = tmp_path / "thermal_zone0"
+        zone.mkdir()
+        (zone / "temp").write_text("60000\n")
+
+        with mock.patch("os.getloadavg", return_value=(3.0, 2.0, 1.0)):
+            with mock.patch("os.cpu_count", return_value=2):
+                readings = read_system(
+                    _battery(has_battery=True, is_plugged=False, percent=55), str(tmp_path)
+                )
+
+        assert readings == SystemReadings(
+            on_battery=True, battery_percent=55, load_per_cpu=1.5, temperature=60.0
+        )
+
+
+class TestDecide:
+    """Tests for the state a scan may run in."""
+
+    def test_idle_system_runs_at_full_speed(self):
+        readings = SystemReadings(load_per_cpu=0.3, temperature=50.0)
+
+        assert decide(readings, GovernorState.RUNNING, 20) == (GovernorState.RUNNING, "")
+
+    def test_battery_power_throttles(self):
+        readings = SystemReadings(on_battery=True, battery_percent=80)
+
+        assert decide(readings, GovernorState.RUNNING, 20) == (
+            GovernorState.THROTTLED,
+            "On battery power",
+        )
+
+    def test_low_battery_pauses(self):
+        readings = SystemReadings(on_battery=True, battery_percent=15)
+
+        assert decide(readings, GovernorState.RUNNING, 20) == (
+            GovernorState.PAUSED,
+            "Battery at 15%",
+        )
+        # Charging on AC power is no reason to wait
+        plugged = SystemReadings(on_battery=False, battery_percent=15)
+        assert decide(plugged, GovernorState.PAUSED, 20)[0] is GovernorState.RUNNING
+
+    def test_heat_throttles_then_pauses(self):
+        assert decide(SystemReadings(temperature=82.0), GovernorState.RUNNING, 20)[0] is (
+            GovernorState.THROTTLED
+        )
+        assert decide(SystemReadings(temperature=93.0), GovernorState.RUNNING, 20) == (
+            GovernorState.PAUSED,
+            "Temperature at 93 °C",
+        )
+
+    def test_high_load_throttles(self):
+        readings = SystemReadings(load_per_cpu=2.0)
+
+        state, reason = decide(readings, GovernorState.RUNNING, 20)
+
+        assert state is GovernorState.THROTTLED
+        assert reason == "System load at 2.0 per CPU"
+
+    def test_conditions_clear_with_hysteresis(self):
+        # Below the thresholds, but not clearly enough to speed up again
+        assert decide(SystemReadings(temperature=87.0), GovernorState.PAUSED, 20)[0] is (
+            GovernorState.PAUSED
+        )
+        assert decide(SystemReadings(temperature=77.0), GovernorState.THROTTLED, 20)[0] is (
+            GovernorState.THROTTLED
+        )
+        assert decide(SystemReadings(load_per_cpu=1.2), GovernorState.THROTTLED, 20)[0] is (
+            GovernorState.THROTTLED
+        )
+        battery = SystemReadings(on_battery=True, battery_percent=23)
+        assert decide(battery, GovernorState.PAUSED, 20)[0] is GovernorState.PAUSED
+        # The same readings don't slow down a scan running at full speed
+        assert decide(SystemReadings(load_per_cpu=1.2), GovernorState.RUNNING, 20)[0] is (
+            GovernorState.RUNNING
+        )
+        assert decide(battery, GovernorState.RUNNING, 20)[0] is GovernorState.THROTTLED
+
+
+class TestScanGovernor:
+    """Tests for ScanGovernor."""
+
+    def test_user_pause_and_resume_notify_listeners(self, make_governor):
+        governor = make_governor(SystemReadings())
+        changes = []
+        governor.add_listener(lambda state, reason: changes.append((state, reason)))
+
+        with governor.watching():
+            governor.pause()
+            assert governor.is_paused
+            governor.resume()
+
+        assert changes == [
+            (GovernorState.PAUSED, "Paused by user"),
+            (GovernorState.RUNNING, ""),
+        ]
+
+    def test_watching_polls_the_system_and_resets_when_scans_end(self, make_governor):
+        governor = make_governor(SystemReadings(on_battery=True, battery_percent=90))
+
+        with governor.watching():
+            assert governor.state is GovernorState.THROTTLED
+            assert governor.reason == "On battery power"
+            governor.pause()
+
+        assert governor.state is GovernorState.RUNNING
+        with governor.watching():
+            # The user's pause ended with the previous scan
+            assert governor.state is GovernorState.THROTTLED
+
+    def test_back_to_back_scans_share_one_polling_thread(self, make_governor, monkeypatch):
+        governor = make_governor(SystemReadings())
+
+        def slow_read_system(*args):
+            time.sleep(0.05)
+            return SystemReadings()
+
+        monkeypatch.setattr("src.core.scan_governor.read_system", slow_read_system)
+        for _ in range(3):
+            with governor.watching():
+                # Let the polling thread start a slow poll before the scan ends
+                time.sleep(0.08)
+        with governor.watching():
+            pollers = [t for t in threading.enumerate() if t.name == "scan-governor"]
+            assert len(pollers) == 1
+
+    def test_disabled_governor_only_follows_the_user(self, make_governor):
+        governor = make_governor(SystemReadings(temperature=99.0), enabled=False)
+
+        with governor.watching():
+            assert governor.state is GovernorState.RUNNING
+            governor.pause()
+            assert governor.is_paused
+
+    def test_user_resume_overrides_a_system_pause(self, make_governor):
+        governor = make_governor(SystemReadings(on_battery=True, battery_percent=5))
+
+        with governor.watching():
+            assert governor.is_paused
+            governor.resume()
+            assert governor.state is GovernorState.THROTTLED
+            governor.poll()
+            assert governor.state is GovernorState.THROTTLED
+
+    def test_wait_while_paused_returns_on_resume_or_cancel(self, make_governor):
+        governor = make_governor(SystemReadings())
+
+        with governor.watching():
+            governor.pause()
+            threading.Timer(0.1, governor.resume).start()
+            start = time.monotonic()
+            governor.wait_while_paused(lambda: False)
+            assert 0.05 < time.monotonic() - start < 2
+
+            governor.pause()
+            governor.wait_while_paused(lambda: True)
+            assert governor.is_paused
+
+    def test_paused_processes_are_stopped_and_continued(self, make_governor, sleeper):
+        governor = make_governor(SystemReadings())
+
+        with governor.watching():
+            governor.track(sleeper)
+            governor.pause()
+            assert _is_stopped(sleeper.pid)
+
+            governor.resume()
+            assert _is_running(sleeper.pid)
+            governor.untrack(sleeper)
+
+    def test_processes_started_while_paused_are_stopped(self, make_governor, sleeper):
+        governor = make_governor(SystemReadings())
+
+        with governor.watching():
+            governor.pause()
+            governor.track(sleeper)
+
+            assert _is_stopped(sleeper.pid)
+
+    def test_throttled_processes_get_the_lowest_priority(self, make_governor, sleeper):
+        governor = make_governor(SystemReadings(load_per_cpu=4.0))
+
+        with governor.watching():
+            governor.track(sleeper)
+
+            assert os.getpriority(os.PRIO_PROCESS, sleeper.pid) == 19
@@ -0,0 +1,108 @@
+# ClamUI Scan Limits Tests
+"""Unit tests for the engine limits of scan profiles."""
+
+import os
+
+from src.core.scan_limits import SKIP_FILE_TYPE, SKIP_MAX_FILESIZE, ScanLimits
+from src.core.scan_walker import WalkStats, iter_target_files, merge_skipped
+
+MB = 1024 * 1024
+
+
+class TestScanLimits:
+    """Tests for ScanLimits."""
+
+    def test_no_options(self):
+        limits = ScanLimits.from_options(None)
+
+        assert limits.clamscan_args == []
+        assert limits.get_file_filter() is None
+
+    def test_clamscan_args(self):
+        limits = ScanLimits.from_options(
+            {
+                "max_filesize": 25,
+                "max_scansize": 100,
+                "max_files": 1000,
+                "max_recursion": 8,
+                "max_scantime": 30,
+                "scan_archive": False,
+                "scan_pdf": True,
+            }
+        )
+
+        assert limits.clamscan_args == [
+            f"--max-filesize={25 * MB}",
+            f"--max-scansize={100 * MB}",
+            "--max-files=1000",
+            "--max-recursion=8",
+            "--max-scantime=30000",
+            "--scan-archive=no",
+            "--scan-pdf=yes",
+        ]
+
+    def test_skip_extensions_are_excluded_by_clamscan(self):
+        limits = ScanLimits.from_options({"skip_extensions": [".ISO", "mkv"]})
+
+        assert limits.clamscan_args == ["--exclude=\\.(iso|mkv)$"]
+
+    def test_invalid_values_are_ignored(self):
+        limits = ScanLimits.from_options(
+            {"max_filesize": "big", "max_files": -1, "scan_pdf": "no", "skip_extensions": "iso"}
+        )
+
+        assert limits == ScanLimits()
+
+    def test_narrows_scan(self):
+        assert not ScanLimits.from_options(None).narrows_scan
+        assert not ScanLimits.from_options(
+            {"scan_pdf": True, "skip_extensions": ["iso"]}
+        ).narrows_scan
+        assert ScanLimits.from_options({"scan_archive": False}).narrows_scan
+        assert ScanLimits.from_options({"max_recursion": 4}).narrows_scan
+
+    def test_file_filter(self):
+        skip = ScanLimits.from_options({"max_filesize": 1, "skip_extensions": ["iso"]})
+        skip_file = skip.get_file_filter()
+
+        assert skip_file("/a/big.bin", os.stat_result((0,) * 6 + (2 * MB, 0, 0, 0))) == (
+            SKIP_MAX_FILESIZE
+        )
+        assert skip_file("/a/disk.ISO", os.stat_result((0,) * 10)) == SKIP_FILE_TYPE
+        assert skip_file("/a/small.bin", os.stat_result((0,) * 10)) is None
+
+    def test_turned_off_types_are_left_out_for_clamd_only(self):
+        limits = ScanLimits.from_options({"scan_archive": False})
+        empty = os.stat_result((0,) * 10)
+
+        assert limits.get_file_filter() is None
+        assert limits.get_file_filter(engine_types=False)("/a/b.zip", empty) == SKIP_FILE_TYPE
+
+
+class TestWalkerFileFilter:
+    """Tests for the file filter of the walker."""
+
+    def test_skipped_files_are_counted_per_target(self, tmp_path):
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        for target in (first, second):
+            target.mkdir()
+            (target / "small.txt").write_bytes(b"x")
+            (target / "disk.iso").write_bytes(b"x")
+        (first / "big.bin").write_bytes(b"x" * (MB + 1))
+        skip_file = ScanLimits.from_options(
+            {"max_filesize": 1, "skip_extensions": ["iso"]}
+        ).get_file_filter()
+        stats = [WalkStats(), WalkStats()]
+
+        files = [
+            path
+            for path, _ in iter_target_files(
+                [str(first), str(second)], stats=stats, skip_file=skip_file
+            )
+        ]
+
+        assert sorted(os.path.basename(path) for path in files) == ["small.txt", "small.txt"]
+        assert stats[0].files == 1
+        assert stats[0].skipped == {SKIP_MAX_FILESIZE: 1, SKIP_FILE_TYPE: 1}
+        assert merge_skipped(stats) == {SKIP_MAX_FILESIZE: 1, SKIP_FILE_TYPE: 2}
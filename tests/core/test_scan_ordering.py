@@ -0,0 +1,131 @@
+# ClamUI Scan Ordering Tests
+"""Unit tests for risk-ordered scanning."""
+
+import os
+import time
+from unittest import mock
+
+from src.core.scan_ordering import (
+    is_risk_ordering_enabled,
+    order_by_risk,
+    score_file,
+    sort_by_risk,
+)
+
+OLD = time.time() - 365 * 86400
+
+
+def make_file(directory, name, content=b"data", mode=0o644, mtime=OLD) -> str:
+    """Create a file with a mode and modification time."""
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    os.chmod(path, mode)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def walk(paths):
+    """Stat paths like the walker does."""
+    return [(path, os.stat(path)) for path in paths]
+
+
+class TestScoreFile:
+    """Tests for score_file."""
+
+    def test_executables_outrank_media(self, tmp_path):
+        exe = make_file(tmp_path, "setup.exe")
+        photo = make_file(tmp_path, "holiday.jpg")
+
+        assert score_file(exe, os.stat(exe)) > score_file(photo, os.stat(photo))
+
+    def test_unknown_extension_is_sniffed(self, tmp_path):
+        elf = make_file(tmp_path, "payload", b"\x7fELF\x02\x01")
+        plain = make_file(tmp_path, "notes", b"hello")
+
+        assert score_file(elf, os.stat(elf)) > score_file(plain, os.stat(plain))
+
+    def test_known_extension_is_not_read(self, tmp_path):
+        photo = make_file(tmp_path, "photo.png", b"MZ")
+
+        with mock.patch("src.core.scan_ordering._read_magic") as read_magic:
+            score_file(photo, os.stat(photo))
+
+        read_magic.assert_not_called()
+
+    def test_exec_bit_raises_score(self, tmp_path):
+        plain = make_file(tmp_path, "a.txt")
+        executable = make_file(tmp_path, "b.txt", mode=0o755)
+
+        assert score_file(executable, os.stat(executable)) > score_file(plain, os.stat(plain))
+
+    def test_recent_files_score_higher(self, tmp_path):
+        old = make_file(tmp_path, "old.txt")
+        new = make_file(tmp_path, "new.txt", mtime=time.time())
+
+        assert score_file(new, os.stat(new)) > score_file(old, os.stat(old))
+
+    def test_risky_locations_score_higher(self, tmp_path):
+        st = os.stat(make_file(tmp_path, "a.txt"))
+        elsewhere = score_file("/home/user/Music/a.txt", st)
+
+        assert score_file("/home/user/Downloads/a.txt", st) > elsewhere
+        assert score_file("/var/tmp/a.txt", st) > elsewhere
+
+
+class TestOrdering:
+    """Tests for sort_by_risk and order_by_risk."""
+
+    def test_sort_by_risk(self, tmp_path):
+        paths = [
+            make_file(tmp_path, "a.mp4"),
+            make_file(tmp_path, "b.pdf"),
+            make_file(tmp_path, "c.mp4"),
+            make_file(tmp_path, "d.exe"),
+        ]
+        stats = dict(walk(paths))
+
+        order = [os.path.basename(path) for path in sort_by_risk(paths, stats)]
+
+        assert order == ["d.exe", "b.pdf", "a.mp4", "c.mp4"]
+
+    def test_order_by_risk_sorts_trees_smaller_than_window(self, tmp_path):
+        paths = [make_file(tmp_path, "a.mp4"), make_file(tmp_path, "b.exe")]
+
+        order = [path for path, _ in order_by_risk(walk(paths), window=10)]
+
+        assert order == [paths[1], paths[0]]
+
+    def test_order_by_risk_holds_back_at_most_window(self, tmp_path):
+        paths = [
+            make_file(tmp_path, "a.mp4"),
+            make_file(tmp_path, "b.mp4"),
+            make_file(tmp_path, "c.mp4"),
+            make_file(tmp_path, "d.exe"),
+        ]
+        consumed = []
+
+        def files():
+            for entry in walk(paths):
+                consumed.append(entry[0])
+                yield entry
+
+        ordered = order_by_risk(files(), window=2)
+        first = next(ordered)
+
+        assert first[0] == paths[0]
+        assert len(consumed) == 3
+        assert [path for path, _ in ordered] == [paths[3], paths[1], paths[2]]
+
+
+class TestIsRiskOrderingEnabled:
+    """Tests for is_risk_ordering_enabled."""
+
+    def test_enabled_by_default(self):
+        assert is_risk_ordering_enabled() is True
+
+    def test_setting_turns_it_off(self):
+        settings = mock.MagicMock()
+        settings.get.return_value = False
+
+        assert is_risk_ordering_enabled(settings) is False
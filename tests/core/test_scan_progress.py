@@ -0,0 +1,140 @@
+# ClamUI Scan Progress Tests
+"""Unit tests for the scan progress model."""
+
+import json
+from unittest import mock
+
+import pytest
+
+from src.core.scan_progress import ProgressTracker, ScanProgress, SequentialProgress
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    """File for the remembered totals."""
+    return tmp_path / "scan_totals.json"
+
+
+def make_tracker(history_path, targets=("/home/user",), interval=0.0):
+    """Create a tracker collecting its snapshots in tracker.reports."""
+    reports = []
+    tracker = ProgressTracker(
+        reports.append, list(targets), interval=interval, history_path=history_path
+    )
+    tracker.reports = reports
+    return tracker
+
+
+class TestScanProgress:
+    """Tests for ScanProgress."""
+
+    def test_rates_and_eta(self):
+        progress = ScanProgress(25, 250, 100, 1000, elapsed=5.0)
+
+        assert progress.fraction == 0.25
+        assert progress.files_per_second == 5.0
+        assert progress.bytes_per_second == 50.0
+        assert progress.eta == 15.0
+
+    def test_fraction_falls_back_to_files(self):
+        progress = ScanProgress(3, 0, 4, 0, elapsed=1.0)
+
+        assert progress.fraction == 0.75
+
+    def test_unknown_total(self):
+        progress = ScanProgress(10, 100, None, None, elapsed=0.0)
+
+        assert progress.fraction is None
+        assert progress.eta is None
+        assert progress.files_per_second == 0.0
+
+
+class TestProgressTracker:
+    """Tests for ProgressTracker."""
+
+    def test_set_total_reports_exact_total(self, history_path):
+        tracker = make_tracker(history_path)
+
+        tracker.set_total(4, 400)
+        tracker.file_done(100)
+
+        last = tracker.reports[-1]
+        assert (last.files_done, last.files_total) == (1, 4)
+        assert last.fraction == 0.25
+
+    def test_reports_are_coalesced(self, history_path):
+        tracker = make_tracker(history_path, interval=60.0)
+        tracker.set_total(10, 1000)
+
+        for _ in range(5):
+            tracker.file_done(100)
+        tracker.finish()
+
+        # One report from set_total, none while throttled, one from finish
+        assert len(tracker.reports) == 2
+        assert tracker.reports[-1].files_done == 5
+
+    def test_total_unknown_without_history(self, history_path):
+        tracker = make_tracker(history_path)
+
+        tracker.add_pending(100)
+        tracker.file_done(100)
+
+        assert tracker.snapshot().files_total is None
+
+    def test_previous_totals_are_the_estimate(self, history_path):
+        first = make_tracker(history_path)
+        first.set_total(10, 1000)
+        first.finish()
+
+        second = make_tracker(history_path)
+        second.add_pending(100)
+
+        snapshot = second.snapshot()
+        assert (snapshot.files_total, snapshot.bytes_total) == (10, 1000)
+
+        second.finish_walk()
+        assert second.snapshot().files_total == 1
+
+    def test_cancelled_scan_is_not_remembered(self, history_path):
+        tracker = make_tracker(history_path)
+        tracker.set_total(10, 1000)
+
+        tracker.finish(completed=False)
+
+        assert not history_path.exists()
+
+    def test_history_is_bounded(self, history_path):
+        with mock.patch("src.core.scan_progress._MAX_HISTORY_ENTRIES", 2):
+            for name in ("/a", "/b", "/c"):
+                tracker = make_tracker(history_path, targets=[name])
+                tracker.set_total(1, 1)
+                tracker.finish()
+
+        history = json.loads(history_path.read_text())
+        assert list(history) == ["/b", "/c"]
+
+
+class TestSequentialProgress:
+    def test_counts_continue_across_scans(self):
+        on_progress = mock.MagicMock()
+        progress = SequentialProgress(on_progress)
+
+        first = progress.next_scan()
+        first(ScanProgress(1, 10, 4, 40, 1.0))
+        first(ScanProgress(4, 40, 4, 40, 2.0))
+        second = progress.next_scan()
+        second(ScanProgress(2, 5, 2, 5, 1.0))
+
+        reported = [c.args[0] for c in on_progress.call_args_list]
+        assert [(p.files_done, p.bytes_done) for p in reported] == [(1, 10), (4, 40), (6, 45)]
+        assert all(p.files_total is None and p.fraction is None for p in reported)
+
+    def test_scan_without_progress_adds_nothing(self):
+        on_progress = mock.MagicMock()
+        progress = SequentialProgress(on_progress)
+
+        progress.next_scan()
+        progress.next_scan()(ScanProgress(2, 20, None, None, 1.0))
+
+        assert on_progress.call_args.args[0].files_done == 2
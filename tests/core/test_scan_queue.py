@@ -0,0 +1,291 @@
+# ClamUI Scan Queue Tests
+"""Unit tests for the coalescing scan job queue."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.scan_queue import (
+    JobPriority,
+    JobState,
+    ScanJobQueue,
+    merge_paths,
+    select_results,
+)
+from src.core.scanner_types import ScanResult, ScanStatus, ThreatDetail
+
+
+def make_result(path) -> ScanResult:
+    """Create a clean ScanResult."""
+    return ScanResult(
+        status=ScanStatus.CLEAN,
+        path=path,
+        stdout="",
+        stderr="",
+        exit_code=0,
+        infected_files=[],
+        scanned_files=1,
+        scanned_dirs=0,
+        infected_count=0,
+        error_message=None,
+        threat_details=[],
+    )
+
+
+class BlockingScanner:
+    """Fake scanner whose scans wait until released."""
+
+    def __init__(self, scans: list):
+        self.scans = scans
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.cancelled = False
+
+    def scan_targets(self, paths, on_progress=None):
+        self.scans.append(paths)
+        self.started.set()
+        self.release.wait(5)
+        return [make_result(path) for path in paths]
+
+    def cancel(self):
+        self.cancelled = True
+        self.release.set()
+
+
+@pytest.fixture
+def scan_queue():
+    """Queue with one worker whose scanners block until released."""
+    scans = []
+    scanners = []
+    finished = {}
+    done = threading.Event()
+
+    def factory():
+        scanners.append(BlockingScanner(scans))
+        return scanners[-1]
+
+    def on_finished(job_id, results):
+        finished[job_id] = results
+        done.set()
+
+    queue = ScanJobQueue(factory, max_concurrent=1, on_job_finished=on_finished)
+    queue.scans = scans
+    queue.scanners = scanners
+    queue.finished = finished
+    queue.done = done
+    yield queue
+    for scanner in scanners:
+        scanner.release.set()
+    queue.shutdown()
+
+
+def wait_until_finished(queue, *job_ids, timeout=5.0):
+    """Wait until every job id got its results."""
+    while not all(job_id in queue.finished for job_id in job_ids):
+        assert queue.done.wait(timeout)
+        queue.done.clear()
+
+
+def wait_for_start(queue):
+    """Wait until the worker started scanning."""
+    for _ in range(500):
+        if queue.scanners and queue.scanners[0].started.is_set():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("No scan started")
+
+
+def release_all(queue):
+    """Let the current and later scans of the worker finish."""
+    for scanner in queue.scanners:
+        scanner.release.set()
+
+
+class TestMergePaths:
+    """Tests for merge_paths."""
+
+    def test_nested_paths_are_dropped(self):
+        assert merge_paths(["/home/a/Downloads", "/home/a", "/tmp"]) == ["/home/a", "/tmp"]
+
+    def test_prefix_without_separator_is_not_nested(self):
+        assert merge_paths(["/home/a", "/home/ab"]) == ["/home/a", "/home/ab"]
+
+    def test_duplicates_are_merged(self):
+        assert merge_paths(["/a", "/a"]) == ["/a"]
+
+
+class TestScanJobQueue:
+    """Tests for ScanJobQueue."""
+
+    def test_job_is_scanned_and_reported(self, scan_queue):
+        job_id = scan_queue.submit(["/home/a"])
+        wait_for_start(scan_queue)
+        release_all(scan_queue)
+
+        wait_until_finished(scan_queue, job_id)
+        assert [r.path for r in scan_queue.finished[job_id]] == ["/home/a"]
+
+    def test_overlapping_waiting_requests_are_merged(self, scan_queue):
+        first = scan_queue.submit(["/busy"])
+        wait_for_start(scan_queue)
+
+        second = scan_queue.submit(["/home/a/Downloads"])
+        third = scan_queue.submit(["/home/a"])
+        jobs = scan_queue.get_jobs()
+
+        assert [job.paths for job in jobs] == [["/busy"], ["/home/a"]]
+        assert jobs[1].ids == [second, third]
+
+        release_all(scan_queue)
+        wait_until_finished(scan_queue, first, second, third)
+        assert scan_queue.scans == [["/busy"], ["/home/a"]]
+        # Each request gets the results of its own paths
+        assert [r.path for r in scan_queue.finished[second]] == ["/home/a/Downloads"]
+        assert [r.path for r in scan_queue.finished[third]] == ["/home/a"]
+
+    def test_request_covered_by_running_job_joins_it(self, scan_queue):
+        first = scan_queue.submit(["/home/a"])
+        wait_for_start(scan_queue)
+
+        second = scan_queue.submit(["/home/a/Downloads/file.pdf"])
+
+        release_all(scan_queue)
+        wait_until_finished(scan_queue, first, second)
+        assert scan_queue.scans == [["/home/a"]]
+
+    def test_interactive_jobs_run_before_scheduled(self, scan_queue):
+        scan_queue.submit(["/busy"])
+        wait_for_start(scan_queue)
+
+        scan_queue.submit(["/scheduled"], JobPriority.SCHEDULED)
+        interactive = scan_queue.submit(["/interactive"], JobPriority.INTERACTIVE)
+
+        assert [job.paths for job in scan_queue.get_jobs()][1:] == [
+            ["/interactive"],
+            ["/scheduled"],
+        ]
+        release_all(scan_queue)
+        wait_until_finished(scan_queue, interactive)
+        assert scan_queue.scans[1] == ["/interactive"]
+
+    def test_merge_keeps_higher_priority(self, scan_queue):
+        scan_queue.submit(["/busy"])
+        wait_for_start(scan_queue)
+
+        scan_queue.submit(["/home/a"], JobPriority.SCHEDULED)
+        scan_queue.submit(["/home/a"], JobPriority.INTERACTIVE)
+
+        assert scan_queue.get_jobs()[1].priority == JobPriority.INTERACTIVE
+
+    def test_cancel_waiting_job(self, scan_queue):
+        scan_queue.submit(["/busy"])
+        wait_for_start(scan_queue)
+        job_id = scan_queue.submit(["/home/a"])
+
+        assert scan_queue.cancel(job_id) is True
+
+        assert scan_queue.finished[job_id] == []
+        assert [job.paths for job in scan_queue.get_jobs()] == [["/busy"]]
+
+    def test_cancel_running_job(self, scan_queue):
+        job_id = scan_queue.submit(["/home/a"])
+        wait_for_start(scan_queue)
+
+        assert scan_queue.cancel(job_id) is True
+
+        wait_until_finished(scan_queue, job_id)
+        assert scan_queue.scanners[0].cancelled
+        assert scan_queue.finished[job_id] == []
+
+    def test_cancel_merged_request_keeps_the_others(self, scan_queue):
+        scan_queue.submit(["/busy"])
+        wait_for_start(scan_queue)
+        first = scan_queue.submit(["/home/a"])
+        second = scan_queue.submit(["/home/a/Downloads", "/tmp"])
+
+        assert scan_queue.cancel(first) is True
+
+        assert scan_queue.finished[first] == []
+        jobs = scan_queue.get_jobs()
+        assert jobs[1].ids == [second]
+        assert jobs[1].paths == ["/home/a/Downloads", "/tmp"]
+
+    def test_cancel_joined_request_keeps_scanning(self, scan_queue):
+        first = scan_queue.submit(["/home/a"])
+        wait_for_start(scan_queue)
+        second = scan_queue.submit(["/home/a/Downloads"])
+
+        assert scan_queue.cancel(first) is True
+
+        assert scan_queue.finished[first] == []
+        assert not scan_queue.scanners[0].cancelled
+        release_all(scan_queue)
+        wait_until_finished(scan_queue, second)
+        assert [r.path for r in scan_queue.finished[second]] == ["/home/a/Downloads"]
+
+    def test_cancel_unknown_job(self, scan_queue):
+        assert scan_queue.cancel(42) is False
+
+    def test_concurrency_is_bounded(self):
+        scans = []
+        scanners = []
+
+        def factory():
+            scanners.append(BlockingScanner(scans))
+            return scanners[-1]
+
+        queue = ScanJobQueue(factory, max_concurrent=2)
+        for path in ("/a", "/b", "/c"):
+            queue.submit([path])
+        for _ in range(500):
+            if len(scans) == 2:
+                break
+            threading.Event().wait(0.01)
+
+        states = [job.state for job in queue.get_jobs()]
+        assert states.count(JobState.RUNNING) == 2
+        assert states.count(JobState.QUEUED) == 1
+        assert len(scanners) == 2
+
+        for scanner in scanners:
+            scanner.release.set()
+        queue.shutdown()
+
+    def test_submit_after_shutdown_fails(self):
+        queue = ScanJobQueue(MagicMock())
+        queue.shutdown()
+
+        with pytest.raises(RuntimeError):
+            queue.submit(["/a"])
+
+    def test_submit_without_paths_fails(self, scan_queue):
+        with pytest.raises(ValueError):
+            scan_queue.submit([])
+
+
+class TestSelectResults:
+    """Tests for select_results."""
+
+    def test_broader_result_is_narrowed_to_the_request(self):
+        result = make_result("/home/a")
+        result.status = ScanStatus.INFECTED
+        result.exit_code = 1
+        result.threat_details = [
+            ThreatDetail("/home/a/Downloads/eicar.com", "Eicar-Test-Signature", "Test", "low"),
+            ThreatDetail("/home/a/other.exe", "Win.Trojan.Agent", "Trojan", "high"),
+        ]
+        result.infected_count = 2
+
+        (selected,) = select_results([result, make_result("/tmp")], ["/home/a/Downloads"])
+
+        assert selected.path == "/home/a/Downloads"
+        assert selected.status == ScanStatus.INFECTED
+        # Only the whole of /home/a was counted
+        assert (selected.scanned_files, selected.scanned_dirs) == (-1, -1)
+        assert [t.file_path for t in selected.threat_details] == ["/home/a/Downloads/eicar.com"]
+
+    def test_same_path_keeps_the_job_result(self):
+        results = [make_result("/home/a"), make_result("/tmp")]
+
+        assert select_results(results, ["/tmp"]) == [results[1]]
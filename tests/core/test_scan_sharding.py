@@ -0,0 +1,110 @@
+# ClamUI Scan Sharding Tests
+"""Unit tests for splitting clamscan runs across workers."""
+
+import os
+from unittest.mock import patch
+
+from src.core.scan_sharding import (
+    MIN_FILES_PER_WORKER,
+    WORKER_MEMORY_BYTES,
+    get_max_workers,
+    get_worker_count,
+    merge_clamscan_output,
+    merge_exit_codes,
+    partition_files,
+)
+
+
+def _stat(size):
+    """Build a stat result with the given size."""
+    return os.stat_result((0o100644, 1, 1, 1, 0, 0, size, 0, 0, 0))
+
+
+class TestWorkerCount:
+    """Tests for sizing the worker pool."""
+
+    def test_configured_count_wins(self):
+        assert get_max_workers(3) == 3
+
+    def test_limited_by_memory(self):
+        with (
+            patch("src.core.scan_sharding.os.sched_getaffinity", return_value=set(range(16))),
+            patch(
+                "src.core.scan_sharding.get_available_memory",
+                return_value=WORKER_MEMORY_BYTES * 2 + 1,
+            ),
+        ):
+            assert get_max_workers() == 2
+
+    def test_never_below_one(self):
+        with patch("src.core.scan_sharding.get_available_memory", return_value=0):
+            assert get_max_workers() == 1
+
+    def test_small_trees_use_one_worker(self):
+        assert get_worker_count(MIN_FILES_PER_WORKER, 8) == 1
+        assert get_worker_count(MIN_FILES_PER_WORKER * 3, 8) == 3
+        assert get_worker_count(MIN_FILES_PER_WORKER * 100, 8) == 8
+
+
+class TestPartitionFiles:
+    """Tests for partition_files."""
+
+    def test_balances_by_size(self):
+        files = {"big": _stat(100), "a": _stat(40), "b": _stat(35), "c": _stat(30)}
+
+        shards = partition_files(files, 2)
+
+        sizes = sorted(sum(files[p].st_size for p in shard) for shard in shards)
+        assert sizes == [100, 105]
+        assert sorted(p for shard in shards for p in shard) == sorted(files)
+
+    def test_drops_empty_shards(self):
+        assert partition_files({"only": _stat(1)}, 4) == [["only"]]
+
+
+class TestMergeOutput:
+    """Tests for merging worker output."""
+
+    SUMMARY = "----------- SCAN SUMMARY -----------"
+
+    def test_sums_summary_counters(self):
+        first = "\n".join(
+            [
+                "/a: Eicar-Test-Signature FOUND",
+                "",
+                self.SUMMARY,
+                "Known viruses: 8700000",
+                "Engine version: 1.0.0",
+                "Scanned directories: 0",
+                "Scanned files: 3",
+                "Infected files: 1",
+                "Data scanned: 0.01 MB",
+            ]
+        )
+        second = "\n".join(
+            [
+                "",
+                self.SUMMARY,
+                "Known viruses: 8700000",
+                "Engine version: 1.0.0",
+                "Scanned directories: 0",
+                "Scanned files: 4",
+                "Infected files: 0",
+            ]
+        )
+
+        merged = merge_clamscan_output([first, second])
+
+        lines = merged.splitlines()
+        assert lines[0] == "/a: Eicar-Test-Signature FOUND"
+        assert lines.count(self.SUMMARY) == 1
+        assert "Scanned files: 7" in lines
+        assert "Infected files: 1" in lines
+        assert "Known viruses: 8700000" in lines
+        assert not any(line.startswith("Total errors") for line in lines)
+
+    def test_exit_codes(self):
+        assert merge_exit_codes([0, 0]) == 0
+        assert merge_exit_codes([0, 2]) == 2
+        assert merge_exit_codes([2, 1]) == 1
+        assert merge_exit_codes([0, None]) == 2
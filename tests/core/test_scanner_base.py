@@ -0,0 +1,217 @@
+# ClamUI Scanner Base Tests
+"""Unit tests for streaming scanner output and the incremental output parser."""
+
+import signal
+import subprocess
+import sys
+
+from src.core.scan_walker import WalkStats
+from src.core.scanner_base import (
+    ScanOutputParser,
+    create_error_result,
+    find_target,
+    keep_tail,
+    split_result_by_target,
+    stream_with_cancel_check,
+)
+from src.core.scanner_types import ScanResult, ScanStatus, ThreatDetail
+
+
+def _spawn(script):
+    """Run a Python snippet with piped stdout and stderr."""
+    return subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+class TestScanOutputParser:
+    """Tests for ScanOutputParser."""
+
+    def test_parses_threats_and_summary(self):
+        threats = []
+        parser = ScanOutputParser(on_threat=threats.append)
+
+        parser.feed(
+            "/home/user/eicar.txt: Win.Test.EICAR_HDB-1 FOUND\n"
+            "/home/user/clean.txt: OK\n"
+            "\n"
+            "----------- SCAN SUMMARY -----------\n"
+            "Scanned directories: 1\n"
+            "Scanned files: 2\n"
+            "Infected files: 1\n"
+        )
+
+        assert parser.infected_files == ["/home/user/eicar.txt"]
+        assert parser.threat_details[0].threat_name == "Win.Test.EICAR_HDB-1"
+        assert threats == parser.threat_details
+        assert (parser.scanned_files, parser.scanned_dirs) == (2, 1)
+
+    def test_reports_clean_files(self):
+        clean = []
+        parser = ScanOutputParser(on_clean=clean.append)
+
+        parser.feed_line("/path/with: colon/file.txt: OK\n")
+
+        assert clean == ["/path/with: colon/file.txt"]
+        assert parser.threat_details == []
+
+
+class TestStreamWithCancelCheck:
+    """Tests for stream_with_cancel_check."""
+
+    def test_lines_are_delivered_as_printed(self):
+        process = _spawn(
+            "import sys\n"
+            "for i in range(3):\n"
+            "    print(f'line {i}', flush=True)\n"
+            "print('oops', file=sys.stderr)\n"
+        )
+        lines = []
+
+        stdout, stderr, cancelled = stream_with_cancel_check(
+            process, lambda: False, on_stdout_line=lines.append
+        )
+
+        assert lines == ["line 0", "line 1", "line 2"]
+        assert stdout == "line 0\nline 1\nline 2"
+        assert stderr == "oops"
+        assert cancelled is False
+
+    def test_output_is_limited_to_tail(self):
+        process = _spawn("for i in range(100):\n    print(i)\n")
+        count = []
+
+        stdout, _, _ = stream_with_cancel_check(
+            process, lambda: False, on_stdout_line=count.append, tail_lines=5
+        )
+
+        assert len(count) == 100
+        assert stdout == "95\n96\n97\n98\n99"
+
+    def test_cancel_terminates_process(self):
+        process = _spawn("import time\nprint('started', flush=True)\ntime.sleep(60)\n")
+        lines = []
+
+        _, _, cancelled = stream_with_cancel_check(
+            process, lambda: bool(lines), on_stdout_line=lines.append
+        )
+
+        assert cancelled is True
+        assert lines == ["started"]
+        assert process.returncode is not None
+
+    def test_cancel_terminates_stopped_process(self):
+        """A process stopped by a paused scan acts on SIGTERM without a SIGKILL."""
+        process = _spawn("import time\nprint('started', flush=True)\ntime.sleep(60)\n")
+        lines = []
+
+        def stop_and_cancel(line):
+            lines.append(line)
+            process.send_signal(signal.SIGSTOP)
+
+        _, _, cancelled = stream_with_cancel_check(
+            process, lambda: bool(lines), on_stdout_line=stop_and_cancel
+        )
+
+        assert cancelled is True
+        assert process.returncode == -signal.SIGTERM
+
+
+class TestKeepTail:
+    """Tests for keep_tail."""
+
+    def test_short_output_is_unchanged(self):
+        assert keep_tail("a\nb\nc", max_lines=3) == "a\nb\nc"
+
+    def test_keeps_last_lines(self):
+        text = "\n".join(str(i) for i in range(10))
+
+        assert keep_tail(text, max_lines=3) == "7\n8\n9"
+
+
+class TestFindTarget:
+    """Tests for attributing paths to scan targets."""
+
+    def test_most_specific_target_wins(self):
+        targets = ["/home/user", "/home/user/docs", "/tmp/file.txt"]
+
+        assert find_target("/home/user/a.txt", targets) == 0
+        assert find_target("/home/user/docs/b.txt: Eicar FOUND", targets) == 1
+        assert find_target("/tmp/file.txt: OK", targets) == 2
+
+    def test_sibling_with_common_prefix_is_not_matched(self):
+        assert find_target("/home/user2/a.txt", ["/home/user"]) is None
+
+    def test_root_target(self):
+        assert find_target("/etc/passwd", ["/", "/home"]) == 0
+
+
+class TestSplitResultByTarget:
+    """Tests for splitting a multi-target result."""
+
+    def _result(self, status, threats=(), stdout="", stderr="", error_message=None):
+        threats = list(threats)
+        return ScanResult(
+            status=status,
+            path="/a, /b",
+            stdout=stdout,
+            stderr=stderr,
+            exit_code={ScanStatus.CLEAN: 0, ScanStatus.INFECTED: 1}.get(status, 2),
+            infected_files=[t.file_path for t in threats],
+            scanned_files=3,
+            scanned_dirs=2,
+            infected_count=len(threats),
+            error_message=error_message,
+            threat_details=threats,
+        )
+
+    def test_threats_and_counts_go_to_their_target(self):
+        threat = ThreatDetail("/b/x.exe", "Eicar", "Test", "low")
+        result = self._result(ScanStatus.INFECTED, [threat], stdout="/b/x.exe: Eicar FOUND")
+        stats = [WalkStats(files=2, dirs=1), WalkStats(files=1, dirs=1)]
+
+        clean, infected = split_result_by_target(result, ["/a", "/b"], stats)
+
+        assert (clean.status, clean.scanned_files, clean.exit_code) == (ScanStatus.CLEAN, 2, 0)
+        assert clean.threat_details == []
+        assert infected.status == ScanStatus.INFECTED
+        assert infected.threat_details == [threat]
+        assert infected.stdout == "/b/x.exe: Eicar FOUND"
+
+    def test_error_is_attributed_when_possible(self):
+        result = self._result(
+            ScanStatus.ERROR,
+            stdout="/a/locked: Access denied. ERROR",
+            stderr="/a/locked: Access denied",
+        )
+
+        failed, clean = split_result_by_target(result, ["/a", "/b"], [WalkStats(), WalkStats()])
+
+        assert failed.status == ScanStatus.ERROR
+        assert failed.error_message == "/a/locked: Access denied"
+        assert clean.status == ScanStatus.CLEAN
+
+    def test_error_next_to_an_infected_target_is_kept(self):
+        threat = ThreatDetail("/a/x.exe", "Eicar", "Test", "low")
+        result = self._result(
+            ScanStatus.INFECTED,
+            [threat],
+            stdout="/a/x.exe: Eicar FOUND\n/b/locked: Permission denied. ERROR",
+        )
+
+        infected, failed = split_result_by_target(result, ["/a", "/b"], [WalkStats(), WalkStats()])
+
+        assert infected.status == ScanStatus.INFECTED
+        assert (failed.status, failed.exit_code) == (ScanStatus.ERROR, 2)
+        assert failed.error_message == "/b/locked: Permission denied. ERROR"
+
+    def test_unattributed_failure_fails_every_target(self):
+        result = create_error_result("/a, /b", "ClamAV executable not found")
+
+        results = split_result_by_target(result, ["/a", "/b"], [WalkStats(), WalkStats()])
+
+        assert [r.status for r in results] == [ScanStatus.ERROR, ScanStatus.ERROR]
+        assert [r.path for r in results] == ["/a", "/b"]
+        assert results[1].error_message == "ClamAV executable not found"
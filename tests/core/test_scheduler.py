@@ -15,9 +15,23 @@ from src.core.scheduler import (
     SchedulerBackend,
     _check_cron_available,
     _check_systemd_available,
+    get_schedule_interval,
 )
 
 
+class TestGetScheduleInterval:
+    """Tests for get_schedule_interval."""
+
+    def test_known_frequencies(self):
+        """Test each frequency maps to the time between two runs."""
+        assert get_schedule_interval("daily") == 86400
+        assert get_schedule_interval("Weekly") == 7 * 86400
+
+    def test_unknown_frequency(self):
+        """Test an unknown frequency has no interval."""
+        assert get_schedule_interval("yearly") is None
+
+
 class TestScheduleConfig:
     """Tests for ScheduleConfig dataclass."""
 
@@ -354,7 +368,7 @@ class TestSchedulerServiceFiles:
         assert "[Service]" in service
         assert "[Install]" in service
         assert "Type=oneshot" in service
-        assert "ExecStart=/usr/bin/clamui-scheduled-scan" in service
+        assert "ExecStart=/usr/bin/clamui-scheduled-scan --resume" in service
         assert "--skip-on-battery" in service
         # shlex.quote() doesn't add quotes for paths without special chars
         assert "--target /home/user/Documents" in service
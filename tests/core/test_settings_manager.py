@@ -1488,3 +1488,44 @@ class TestSettingsManagerConcurrencyEdgeCases:
             t.join()
 
         assert len(errors) == 0
+
+
+class TestSettingsManagerExclusionMatcher:
+    """Tests for the cached exclusion matcher."""
+
+    @pytest.fixture
+    def settings_manager(self, tmp_path):
+        """Create a SettingsManager with one exclusion pattern."""
+        manager = SettingsManager(config_dir=tmp_path)
+        manager.set("exclusion_patterns", [{"pattern": "*.log", "type": "file", "enabled": True}])
+        return manager
+
+    def test_matcher_is_cached(self, settings_manager):
+        """Test that the compiled matcher is reused."""
+        profile = {"paths": ["/mnt/backup"], "patterns": []}
+
+        assert settings_manager.get_exclusion_matcher() is settings_manager.get_exclusion_matcher()
+        assert settings_manager.get_exclusion_matcher(
+            profile
+        ) is settings_manager.get_exclusion_matcher(dict(profile))
+        assert (
+            settings_manager.get_exclusion_matcher(profile)
+            is not settings_manager.get_exclusion_matcher()
+        )
+
+    def test_setting_exclusions_invalidates_matcher(self, settings_manager):
+        """Test that changing exclusion_patterns rebuilds the matcher."""
+        before = settings_manager.get_exclusion_matcher()
+        assert before.is_excluded("/var/app.log", is_dir=False) is True
+
+        settings_manager.set("exclusion_patterns", [])
+        after = settings_manager.get_exclusion_matcher()
+
+        assert after is not before
+        assert after.is_excluded("/var/app.log", is_dir=False) is False
+
+    def test_other_settings_keep_matcher(self, settings_manager):
+        """Test that unrelated settings don't invalidate the matcher."""
+        before = settings_manager.get_exclusion_matcher()
+        settings_manager.set("notifications_enabled", False)
+        assert settings_manager.get_exclusion_matcher() is before
@@ -0,0 +1,91 @@
+# ClamUI Threat Store Tests
+"""Unit tests for the bounded-memory threat list."""
+
+import sys
+import threading
+
+import pytest
+
+from src.core.scanner_types import ThreatDetail
+from src.core.threat_store import ThreatList
+
+
+def make_threats(count: int) -> list[ThreatDetail]:
+    """Create distinct threats."""
+    return [
+        ThreatDetail(f"/tmp/file{i}", "Eicar-Test-Signature", "Test", "low") for i in range(count)
+    ]
+
+
+class TestThreatDetail:
+    """Tests for the memory layout of ThreatDetail."""
+
+    def test_uses_slots(self):
+        assert not hasattr(make_threats(1)[0], "__dict__")
+
+    def test_repeated_strings_are_interned(self):
+        first = ThreatDetail("/a", "".join(["Eicar-", "Test"]), "Test", "low")
+        second = ThreatDetail("/b", "".join(["Eicar-", "Test"]), "Test", "low")
+
+        assert first.threat_name is second.threat_name
+        assert first.threat_name is sys.intern("Eicar-Test")
+
+
+class TestThreatList:
+    """Tests for ThreatList."""
+
+    def test_small_list_stays_in_memory(self):
+        threats = ThreatList(make_threats(3), spill_threshold=5)
+
+        assert not threats.is_spilled
+        assert threats == make_threats(3)
+
+    def test_spills_past_threshold(self):
+        expected = make_threats(25)
+        threats = ThreatList(spill_threshold=10)
+        for threat in expected:
+            threats.append(threat)
+
+        assert threats.is_spilled
+        assert len(threats) == 25
+        assert list(threats) == expected
+
+    def test_indexing_and_slicing_across_spill(self):
+        expected = make_threats(25)
+        threats = ThreatList(expected, spill_threshold=10)
+
+        assert threats[0] == expected[0]
+        assert threats[15] == expected[15]
+        assert threats[-1] == expected[-1]
+        assert threats[8:13] == expected[8:13]
+        assert threats[::5] == expected[::5]
+
+    def test_index_out_of_range(self):
+        threats = ThreatList(make_threats(2))
+
+        with pytest.raises(IndexError):
+            threats[2]
+
+    def test_file_paths_view(self):
+        expected = make_threats(15)
+        threats = ThreatList(expected, spill_threshold=10)
+
+        assert threats.file_paths == [threat.file_path for threat in expected]
+        assert "/tmp/file12" in threats.file_paths
+        assert threats.file_paths[11] == "/tmp/file11"
+
+    def test_concurrent_appends(self):
+        threats = ThreatList(spill_threshold=50)
+
+        def add(offset: int) -> None:
+            for i in range(100):
+                threats.append(ThreatDetail(f"/t{offset}/{i}", "X", "Test", "low"))
+
+        workers = [threading.Thread(target=add, args=(n,)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert len(threats) == 400
+        assert len(set(threats.file_paths)) == 400
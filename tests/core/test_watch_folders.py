@@ -0,0 +1,163 @@
+# ClamUI Watch Folders Tests
+"""Unit tests for the inotify watch folder service."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.scanner_types import ScanResult, ScanStatus, ThreatDetail
+from src.core.settings_manager import SettingsManager
+from src.core.watch_folders import (
+    WatchFolderService,
+    create_batch_log_entry,
+    is_inotify_available,
+)
+
+pytestmark = pytest.mark.skipif(not is_inotify_available(), reason="inotify not available")
+
+
+def make_result(path, threats=()) -> ScanResult:
+    """Create the ScanResult of one scanned file."""
+    return ScanResult(
+        status=ScanStatus.INFECTED if threats else ScanStatus.CLEAN,
+        path=path,
+        stdout="",
+        stderr="",
+        exit_code=1 if threats else 0,
+        infected_files=[t.file_path for t in threats],
+        scanned_files=1,
+        scanned_dirs=0,
+        infected_count=len(threats),
+        error_message=None,
+        threat_details=list(threats),
+    )
+
+
+@pytest.fixture
+def watched_dir(tmp_path):
+    """Directory configured as a watch folder."""
+    directory = tmp_path / "Downloads"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def settings(tmp_path, watched_dir):
+    """Settings watching watched_dir with a short debounce."""
+    settings = SettingsManager(config_dir=tmp_path / "config")
+    settings.set("watch_folders", [str(watched_dir)])
+    settings.set("watch_debounce_seconds", 0.2)
+    return settings
+
+
+@pytest.fixture
+def service(settings):
+    """Running service with a mock scanner recording its batches."""
+    batches = []
+    scanner = MagicMock()
+
+    def scan_targets(paths, recursive=True):
+        batches.append(list(paths))
+        return [make_result(path) for path in paths]
+
+    scanner.scan_targets.side_effect = scan_targets
+    log_manager = MagicMock()
+    service = WatchFolderService(settings, log_manager=log_manager, scanner=scanner)
+    service.batches = batches
+    service.log_manager = log_manager
+    assert service.start()
+    yield service
+    service.stop()
+
+
+def wait_for_batches(service, count=1, timeout=5.0) -> list[list[str]]:
+    """Wait until the service scanned count batches."""
+    deadline = time.monotonic() + timeout
+    while len(service.batches) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return service.batches
+
+
+class TestCreateBatchLogEntry:
+    """Tests for create_batch_log_entry."""
+
+    def test_clean_batch(self):
+        files = ["/home/user/Downloads/a.pdf", "/home/user/Downloads/b.zip"]
+
+        entry = create_batch_log_entry(files, [make_result(f) for f in files], 1.5)
+
+        assert entry.status == "clean"
+        assert entry.path == "/home/user/Downloads"
+        assert "2 new file(s)" in entry.summary
+        assert "/home/user/Downloads/b.zip" in entry.details
+
+    def test_infected_batch(self):
+        files = ["/home/user/Downloads/a.pdf", "/home/user/Downloads/eicar.com"]
+        threat = ThreatDetail(files[1], "Eicar-Test-Signature", "Test", "low")
+
+        entry = create_batch_log_entry(
+            files, [make_result(files[0]), make_result(files[1], [threat])], 1.0
+        )
+
+        assert entry.status == "infected"
+        assert "Found 1 threat(s)" in entry.summary
+        assert "eicar.com: Eicar-Test-Signature" in entry.details
+
+
+class TestWatchFolderService:
+    """Tests for WatchFolderService."""
+
+    def test_new_file_is_scanned_and_logged(self, service, watched_dir):
+        new_file = watched_dir / "report.pdf"
+        new_file.write_bytes(b"data")
+
+        assert wait_for_batches(service) == [[str(new_file)]]
+        entry = service.log_manager.save_log.call_args.args[0]
+        assert entry.status == "clean"
+
+    def test_burst_of_writes_is_scanned_once(self, service, watched_dir):
+        new_file = watched_dir / "download.iso"
+        for _ in range(5):
+            with open(new_file, "ab") as f:
+                f.write(b"chunk")
+
+        wait_for_batches(service)
+        time.sleep(0.4)
+        assert service.batches == [[str(new_file)]]
+
+    def test_files_of_a_burst_share_a_batch(self, service, watched_dir):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (watched_dir / name).write_text(name)
+
+        batches = wait_for_batches(service)
+        assert sorted(batches[0]) == [str(watched_dir / n) for n in ("a.txt", "b.txt", "c.txt")]
+
+    def test_excluded_files_are_dropped(self, settings, service, watched_dir):
+        settings.set("exclusion_patterns", [{"pattern": "*.part", "type": "pattern"}])
+        (watched_dir / "movie.mkv.part").write_bytes(b"partial")
+        (watched_dir / "movie.mkv").write_bytes(b"done")
+
+        assert wait_for_batches(service) == [[str(watched_dir / "movie.mkv")]]
+
+    def test_new_subdirectory_is_watched(self, service, watched_dir):
+        subdir = watched_dir / "attachments"
+        subdir.mkdir()
+        time.sleep(0.1)
+        (subdir / "invoice.doc").write_bytes(b"doc")
+
+        batches = wait_for_batches(service)
+        assert [str(subdir / "invoice.doc")] in batches
+
+    def test_no_folders_does_not_start(self, settings):
+        settings.set("watch_folders", [])
+        service = WatchFolderService(settings, log_manager=MagicMock(), scanner=MagicMock())
+
+        assert service.start() is False
+        assert not service.is_running
+
+    def test_inotify_failure_does_not_start(self, settings):
+        service = WatchFolderService(settings, log_manager=MagicMock(), scanner=MagicMock())
+
+        with patch("src.core.watch_folders.Inotify", side_effect=OSError(24, "Too many")):
+            assert service.start() is False
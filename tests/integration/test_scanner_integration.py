@@ -11,7 +11,6 @@ These tests verify the scanner's end-to-end behavior including:
 All tests mock ClamAV subprocess execution to run without requiring ClamAV installed.
 """
 
-import subprocess
 from unittest import mock
 
 import pytest
@@ -19,6 +18,7 @@ import pytest
 # Import directly - scanner module uses GLib only for idle_add in async methods,
 # and those async methods are tested with proper subprocess mocking
 from src.core.scanner import Scanner, ScanResult, ScanStatus, ThreatDetail
+from tests.conftest import attach_process_output
 
 
 @pytest.mark.integration
@@ -63,7 +63,7 @@ Time: 0.100 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -123,7 +123,7 @@ Time: 0.100 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1  # ClamAV exit code 1 = virus found
                         mock_popen.return_value = mock_process
 
@@ -186,7 +186,7 @@ Time: 0.200 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -224,7 +224,7 @@ Time: 0.200 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", mock_stderr)
+                        attach_process_output(mock_process, "", mock_stderr)
                         mock_process.returncode = 2  # ClamAV exit code 2 = error
                         mock_popen.return_value = mock_process
 
@@ -279,7 +279,7 @@ Time: 0.200 sec (0 m 0 s)
                     ):
                         with mock.patch("subprocess.Popen") as mock_popen:
                             mock_process = mock.MagicMock()
-                            mock_process.communicate.return_value = ("", "")
+                            attach_process_output(mock_process, "", "")
                             mock_process.returncode = 0
                             mock_popen.return_value = mock_process
 
@@ -330,7 +330,7 @@ Infected files: 4
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -400,7 +400,7 @@ Time: 0.100 sec (0 m 0 s)
             ):
                 with mock.patch("subprocess.Popen") as mock_popen:
                     mock_process = mock.MagicMock()
-                    mock_process.communicate.return_value = (mock_stdout, "")
+                    attach_process_output(mock_process, mock_stdout, "")
                     mock_process.returncode = 1  # ClamAV exit code 1 = virus found
                     mock_popen.return_value = mock_process
 
@@ -495,7 +495,7 @@ Time: 0.100 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -582,7 +582,7 @@ Time: 0.100 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1  # ClamAV exit code 1 = virus found
                         mock_popen.return_value = mock_process
 
@@ -640,7 +640,7 @@ Time: 0.100 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", mock_stderr)
+                        attach_process_output(mock_process, "", mock_stderr)
                         mock_process.returncode = 2  # ClamAV exit code 2 = error
                         mock_popen.return_value = mock_process
 
@@ -685,22 +685,20 @@ Time: 0.100 sec (0 m 0 s)
         def mock_glib_idle_add(callback_func, *args):
             return callback_func(*args)
 
-        def mock_communicate(timeout=None):
+        mock_process = attach_process_output(mock.MagicMock(), mock_stdout)
+        mock_process.returncode = 0
+
+        def mock_popen_start(*args, **kwargs):
             # Record the thread ID where scan executes
             scan_thread_ids.append(threading.current_thread().ident)
-            return (mock_stdout, "")
+            return mock_process
 
         with mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"):
             with mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x):
                 with mock.patch(
                     "src.core.scanner.check_clamav_installed", return_value=(True, "1.2.3")
                 ):
-                    with mock.patch("subprocess.Popen") as mock_popen:
-                        mock_process = mock.MagicMock()
-                        mock_process.communicate.side_effect = mock_communicate
-                        mock_process.returncode = 0
-                        mock_popen.return_value = mock_process
-
+                    with mock.patch("subprocess.Popen", side_effect=mock_popen_start):
                         with mock.patch(
                             "src.core.scanner.GLib.idle_add", side_effect=mock_glib_idle_add
                         ):
@@ -770,7 +768,7 @@ Time: 0.200 sec (0 m 0 s)
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -832,7 +830,7 @@ Infected files: 4
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -895,36 +893,21 @@ def test_scan_cancellation(tmp_path):
         """Mock GLib.idle_add to capture and immediately invoke callback."""
         return callback_func(*args)
 
-    # Track communicate call count for proper cancellation simulation
-    call_count = [0]
+    # The process keeps running (its output pipes stay open) until terminated
+    mock_process = attach_process_output(mock.MagicMock(), running=True)
+    mock_process.returncode = -15  # SIGTERM exit code
 
-    def mock_communicate(timeout=None):
-        """
-        Mock communicate that simulates a long-running scan with cancellation.
-
-        The _communicate_with_cancel_check method polls with timeout=0.5:
-        1. First call: Set cancel event and raise TimeoutExpired to force loop iteration
-        2. Second call: Return empty output for cleanup after termination
-        """
-        call_count[0] += 1
-        if call_count[0] == 1:
-            # First call: simulate process still running, set cancel event
-            scanner._cancel_event.set()
-            raise subprocess.TimeoutExpired(cmd="clamscan", timeout=0.5)
-        # Second call: return output after termination
-        return ("", "")
+    def mock_popen_start(*args, **kwargs):
+        """Start the long-running process and set the cancel event while it runs."""
+        scanner._cancel_event.set()
+        return mock_process
 
     with mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"):
         with mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x):
             with mock.patch(
                 "src.core.scanner.check_clamav_installed", return_value=(True, "1.2.3")
             ):
-                with mock.patch("subprocess.Popen") as mock_popen:
-                    mock_process = mock.MagicMock()
-                    mock_process.communicate.side_effect = mock_communicate
-                    mock_process.returncode = -15  # SIGTERM exit code
-                    mock_popen.return_value = mock_process
-
+                with mock.patch("subprocess.Popen", side_effect=mock_popen_start):
                     with mock.patch(
                         "src.core.scanner.GLib.idle_add", side_effect=mock_glib_idle_add
                     ):
@@ -977,7 +960,6 @@ def test_scan_cancellation_via_cancel_method(tmp_path):
     This tests the explicit cancel() API rather than internal flag setting.
     """
     import threading
-    import time
 
     # Create test file to scan
     test_file = tmp_path / "test_cancel_method.txt"
@@ -999,41 +981,21 @@ def test_scan_cancellation_via_cancel_method(tmp_path):
         """Mock GLib.idle_add to capture and immediately invoke callback."""
         return callback_func(*args)
 
-    # Track communicate call count for proper cancellation simulation
-    call_count = [0]
-
-    def mock_communicate(timeout=None):
-        """
-        Mock communicate that signals when process starts and allows cancel().
+    # The process keeps running (its output pipes stay open) until terminated
+    mock_process = attach_process_output(mock.MagicMock(), running=True)
+    mock_process.returncode = -15  # SIGTERM exit code
 
-        The _communicate_with_cancel_check method polls with timeout=0.5:
-        1. First call: Signal process started, raise TimeoutExpired to keep loop running
-        2. Main test calls scanner.cancel() which sets _cancel_event
-        3. Loop detects cancellation, calls terminate() then communicate(timeout=2.0)
-        4. Second call: Return empty output for cleanup
-        """
-        call_count[0] += 1
-        if call_count[0] == 1:
-            # First call: signal process started
-            process_started_event.set()
-            # Wait a bit to allow cancel() to be called
-            time.sleep(0.2)
-            # Raise TimeoutExpired to force loop to check cancel flag
-            raise subprocess.TimeoutExpired(cmd="clamscan", timeout=0.5)
-        # Second call: return output after termination
-        return ("", "")
+    def mock_popen_start(*args, **kwargs):
+        """Signal that the process started so the test can call cancel()."""
+        process_started_event.set()
+        return mock_process
 
     with mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"):
         with mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x):
             with mock.patch(
                 "src.core.scanner.check_clamav_installed", return_value=(True, "1.2.3")
             ):
-                with mock.patch("subprocess.Popen") as mock_popen:
-                    mock_process = mock.MagicMock()
-                    mock_process.communicate.side_effect = mock_communicate
-                    mock_process.returncode = -15  # SIGTERM exit code
-                    mock_popen.return_value = mock_process
-
+                with mock.patch("subprocess.Popen", side_effect=mock_popen_start):
                     with mock.patch(
                         "src.core.scanner.GLib.idle_add", side_effect=mock_glib_idle_add
                     ):
@@ -1066,7 +1028,7 @@ def test_scan_cancellation_via_cancel_method(tmp_path):
 
     # Verify terminate was called on the process
     # Note: terminate() may be called twice - once by cancel() and once by
-    # _communicate_with_cancel_check() when it detects the cancellation flag
+    # stream_with_cancel_check() when it detects the cancellation flag
     mock_process.terminate.assert_called()
 
     # Verify result properties
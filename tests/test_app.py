@@ -959,3 +959,94 @@ class TestClamUIAppQuickScanFallback:
 
             # Verify the expanded path is passed to _set_selected_path
             mock_scan_view._set_selected_path.assert_called_once_with("/home/specific_user")
+
+
+class TestClamUIAppScanProgress:
+    """Tests for the scan percentage shown in the tray."""
+
+    def test_progress_updates_tray_percentage(self, app):
+        """Test that the tray gets the percentage of the running scan."""
+        app._tray_indicator = mock.MagicMock()
+
+        app._on_scan_progress(mock.MagicMock(fraction=0.425))
+
+        app._tray_indicator.update_scan_progress.assert_called_once_with(42)
+
+    def test_unchanged_percentage_is_not_resent(self, app):
+        """Test that the tray only gets a command when the percentage changes."""
+        app._tray_indicator = mock.MagicMock()
+
+        app._on_scan_progress(mock.MagicMock(fraction=0.421))
+        app._on_scan_progress(mock.MagicMock(fraction=0.428))
+        app._on_scan_progress(mock.MagicMock(fraction=0.43))
+
+        assert app._tray_indicator.update_scan_progress.call_args_list == [
+            mock.call(42),
+            mock.call(43),
+        ]
+
+    def test_paused_scan_offers_resume_in_tray(self, app):
+        """Test that the tray menu follows the scan being paused and resumed."""
+        app._tray_indicator = mock.MagicMock()
+
+        app._on_scan_paused_changed(True)
+        app._on_scan_paused_changed(False)
+
+        assert app._tray_indicator.update_scan_paused.call_args_list == [
+            mock.call(True),
+            mock.call(False),
+        ]
+
+    def test_tray_pause_and_resume_control_the_scan_view(self, app):
+        """Test that Pause Scan and Resume Scan in the tray reach the scan view."""
+        app._scan_view = mock.MagicMock()
+
+        app._on_tray_pause_scan()
+        app._on_tray_resume_scan()
+
+        app._scan_view.pause_scan.assert_called_once()
+        app._scan_view.resume_scan.assert_called_once()
+
+    def test_unknown_fraction_is_ignored(self, app):
+        """Test that a scan without a known total leaves the tray alone."""
+        app._tray_indicator = mock.MagicMock()
+
+        app._on_scan_progress(mock.MagicMock(fraction=None))
+
+        app._tray_indicator.update_scan_progress.assert_not_called()
+
+    def test_scan_start_resets_percentage(self, app):
+        """Test that a new scan reports its percentage from zero again."""
+        app._tray_indicator = mock.MagicMock()
+        app._on_scan_progress(mock.MagicMock(fraction=0.5))
+        app._on_scan_state_changed(True)
+        app._tray_indicator.reset_mock()
+
+        app._on_scan_progress(mock.MagicMock(fraction=0.5))
+
+        app._tray_indicator.update_scan_progress.assert_called_once_with(50)
+
+
+class TestClamUIAppWatchFolders:
+    """Tests for the watch folder integration."""
+
+    def test_threats_in_batch_are_notified(self, app):
+        """Test that threats found in watch folders raise a notification."""
+        app._notification_manager = mock.MagicMock()
+        results = [mock.MagicMock(infected_count=0), mock.MagicMock(infected_count=2)]
+
+        with mock.patch("src.app.GLib") as mock_glib:
+            app._on_watch_batch_scanned(["/a", "/b"], results)
+            notify = mock_glib.idle_add.call_args.args[0]
+
+        assert notify() is False
+        app._notification_manager.notify_scan_complete.assert_called_once_with(
+            is_clean=False, infected_count=2, scanned_count=2
+        )
+
+    def test_clean_batch_is_not_notified(self, app):
+        """Test that clean watch folder scans stay silent."""
+        with mock.patch("src.app.GLib") as mock_glib:
+            app._on_watch_batch_scanned(["/a"], [mock.MagicMock(infected_count=0)])
+
+        mock_glib.idle_add.assert_not_called()
@@ -3,10 +3,14 @@
 
 import subprocess
 import sys
+import threading
+import time
 from unittest import mock
 
 import pytest
 
+from tests.conftest import attach_process_output
+
 
 def _clear_src_modules():
     """Clear all cached src.* modules to ensure clean imports."""
@@ -69,6 +73,15 @@ def ensure_fresh_scanner_import():
     _clear_src_modules()
 
 
+@pytest.fixture(autouse=True)
+def idle_system(ensure_fresh_scanner_import):
+    """Keep scans at full speed whatever the load of the machine running the tests."""
+    from src.core.scan_governor import SystemReadings
+
+    with mock.patch("src.core.scan_governor.read_system", return_value=SystemReadings()):
+        yield
+
+
 # Declare globals for type checkers
 Scanner = None
 ScanResult = None
@@ -204,6 +217,20 @@ class TestScannerBuildCommand:
         assert cmd[0] == "/usr/bin/clamscan"
         assert "flatpak-spawn" not in cmd
 
+    def test_build_command_with_profile_options(self, tmp_path, scanner_class):
+        """Test _build_command passes the engine limits of a scan profile."""
+        scanner = scanner_class()
+        options = {"max_filesize": 25, "max_recursion": 8, "scan_archive": False}
+
+        with mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"):
+            with mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x):
+                cmd = scanner._build_command(str(tmp_path), True, profile_options=options)
+
+        assert f"--max-filesize={25 * 1024 * 1024}" in cmd
+        assert "--max-recursion=8" in cmd
+        assert "--scan-archive=no" in cmd
+        assert cmd[-1] == str(tmp_path)
+
     def test_build_command_with_exclusions(self, tmp_path):
         """Test _build_command includes exclusion patterns from settings."""
         test_dir = tmp_path / "test_dir"
@@ -667,7 +694,7 @@ Infected files: 1
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -708,7 +735,7 @@ Infected files: 4
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -756,7 +783,7 @@ Infected files: 0
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -792,7 +819,7 @@ Infected files: 1
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -806,40 +833,27 @@ Infected files: 1
 
     def test_threat_details_with_cancelled_scan(self, tmp_path):
         """Integration test: cancelled scan produces empty threat_details."""
-        import subprocess
 
         test_file = tmp_path / "test.txt"
         test_file.write_text("test content")
 
         scanner = Scanner()
 
-        # Set up mock to simulate cancellation during polling loop:
-        # First call raises TimeoutExpired (process still running),
-        # then we set _cancel_event, and the loop detects cancellation
-        call_count = 0
-
-        def simulate_timeout_then_cancel(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                # First call: simulate process still running
-                scanner._cancel_event.set()  # Simulate cancel() being called
-                raise subprocess.TimeoutExpired(cmd="clamscan", timeout=0.5)
-            # Second call: return output after termination
-            return ("", "")
+        # Simulate cancel() being called while the process is still running
+        mock_process = attach_process_output(mock.MagicMock(), running=True)
+        mock_process.returncode = 0
+        mock_process.poll.return_value = None
+
+        def start_then_cancel(*args, **kwargs):
+            scanner._cancel_event.set()
+            return mock_process
 
         with mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"):
             with mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x):
                 with mock.patch(
                     "src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")
                 ):
-                    with mock.patch("subprocess.Popen") as mock_popen:
-                        mock_process = mock.MagicMock()
-                        mock_process.communicate.side_effect = simulate_timeout_then_cancel
-                        mock_process.returncode = 0
-                        mock_process.poll.return_value = None  # Process still running
-                        mock_popen.return_value = mock_process
-
+                    with mock.patch("subprocess.Popen", side_effect=start_then_cancel):
                         result = scanner.scan_sync(str(test_file))
 
         # Verify cancelled scan has empty threat_details
@@ -943,7 +957,7 @@ Infected files: 1
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = (mock_stdout, "")
+                        attach_process_output(mock_process, mock_stdout, "")
                         mock_process.returncode = 1
                         mock_popen.return_value = mock_process
 
@@ -1261,8 +1275,8 @@ class TestScannerErrorHandling:
         )
         assert len(result.threat_details) == 0
 
-    def test_scan_sync_communicate_raises_exception(self, tmp_path):
-        """Test scan_sync handles exception during communicate()."""
+    def test_scan_sync_output_read_raises_exception(self, tmp_path):
+        """Test scan_sync handles exception while reading process output."""
         test_file = tmp_path / "test.txt"
         test_file.write_text("test content")
 
@@ -1275,7 +1289,7 @@ class TestScannerErrorHandling:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.side_effect = OSError(
+                        mock_process.stdout.fileno.side_effect = OSError(
                             "Process communication failed"
                         )
                         mock_popen.return_value = mock_process
@@ -1286,6 +1300,380 @@ class TestScannerErrorHandling:
         assert len(result.threat_details) == 0
 
 
+class TestScannerHealthProbe:
+    """Tests for caching clamscan availability between scans."""
+
+    def test_consecutive_scans_check_clamscan_once(self, tmp_path):
+        """The clamscan --version probe is not repeated for every scan."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        scanner = Scanner(log_manager=mock.MagicMock())
+
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch(
+                "src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")
+            ) as mock_installed,
+            mock.patch("src.core.scanner.is_flatpak", return_value=True),
+            mock.patch("subprocess.Popen") as mock_popen,
+        ):
+            for _ in range(3):
+                mock_process = mock.MagicMock()
+                attach_process_output(mock_process, f"{test_file}: OK\n")
+                mock_process.returncode = 0
+                mock_popen.return_value = mock_process
+                assert scanner.scan_sync(str(test_file)).status == ScanStatus.CLEAN
+            assert scanner.check_available() == (True, "1.0.0")
+
+        mock_installed.assert_called_once()
+
+    def test_failed_launch_invalidates_cached_check(self, tmp_path):
+        """If clamscan can't be started, the next scan checks for it again."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        scanner = Scanner(log_manager=mock.MagicMock())
+
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch(
+                "src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")
+            ) as mock_installed,
+            mock.patch("src.core.scanner.is_flatpak", return_value=True),
+            mock.patch("subprocess.Popen", side_effect=FileNotFoundError("clamscan")),
+        ):
+            scanner.scan_sync(str(test_file))
+            mock_installed.return_value = (False, "ClamAV is not installed")
+            result = scanner.scan_sync(str(test_file))
+
+        assert mock_installed.call_count == 2
+        assert result.status == ScanStatus.ERROR
+        assert result.error_message == "ClamAV is not installed"
+
+
+class TestScannerManagedBackend:
+    """Tests for the "managed" backend using ClamUI's private clamd."""
+
+    @staticmethod
+    def _managed_settings():
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            "managed" if key == "scan_backend" else default
+        )
+        return settings
+
+    def test_scans_through_private_clamd(self, fake_clamd, tmp_path, eicar_file):
+        """A private clamd already answering on its socket is used for the scan."""
+        from src.core.managed_clamd import ManagedClamd
+
+        managed = ManagedClamd(runtime_dir=tmp_path)
+        scanner = Scanner(
+            log_manager=mock.MagicMock(),
+            settings_manager=self._managed_settings(),
+            managed_clamd=managed,
+        )
+
+        with mock.patch("src.core.scanner.is_flatpak", return_value=False):
+            result = scanner.scan_sync(str(eicar_file))
+
+        assert result.status == ScanStatus.INFECTED
+        assert "IDSESSION" in fake_clamd.commands
+
+    def test_falls_back_to_clamscan_when_clamd_cannot_start(self, tmp_path):
+        """Scans still run with clamscan if the private clamd can't be started."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        managed = mock.MagicMock()
+        managed.ensure_running.return_value = (False, "clamd is not installed")
+        scanner = Scanner(
+            log_manager=mock.MagicMock(),
+            settings_manager=self._managed_settings(),
+            managed_clamd=managed,
+        )
+
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch("src.core.scanner.is_flatpak", return_value=False),
+            mock.patch("subprocess.Popen") as mock_popen,
+        ):
+            mock_process = mock.MagicMock()
+            attach_process_output(mock_process, f"{test_file}: OK\n")
+            mock_process.returncode = 0
+            mock_popen.return_value = mock_process
+            result = scanner.scan_sync(str(test_file))
+
+        assert result.status == ScanStatus.CLEAN
+        managed.ensure_running.assert_called_once()
+
+    def test_scan_archive_through_private_clamd(self, tmp_path):
+        """Archive members are scanned by the private clamd."""
+        managed = mock.MagicMock()
+        managed.ensure_running.return_value = (True, None)
+        scanner = Scanner(
+            log_manager=mock.MagicMock(),
+            settings_manager=self._managed_settings(),
+            managed_clamd=managed,
+        )
+        managed_scanner = mock.MagicMock()
+        scanner._managed_scanner = managed_scanner
+
+        with mock.patch("src.core.scanner.is_flatpak", return_value=False):
+            result = scanner.scan_archive(str(tmp_path / "backup.tar"))
+
+        assert result is managed_scanner.scan_archive.return_value
+
+    def test_scan_targets_keeps_private_clamd_in_use_while_starting(self, tmp_path):
+        """The idle timer can't stop the private clamd between starting and scanning."""
+        managed = mock.MagicMock()
+        managed.ensure_running.return_value = (True, None)
+        scanner = Scanner(
+            log_manager=mock.MagicMock(),
+            settings_manager=self._managed_settings(),
+            managed_clamd=managed,
+        )
+        managed_scanner = mock.MagicMock()
+        managed_scanner.scan_targets.return_value = ["a", "b"]
+        scanner._managed_scanner = managed_scanner
+
+        with mock.patch("src.core.scanner.is_flatpak", return_value=False):
+            results = scanner.scan_targets([str(tmp_path), str(tmp_path.parent)])
+
+        assert results == ["a", "b"]
+        calls = [name for name, _args, _kwargs in managed.mock_calls]
+        assert calls.index("in_use().__enter__") < calls.index("ensure_running")
+        assert calls.index("ensure_running") < calls.index("in_use().__exit__")
+
+    def test_scan_archive_needs_clamd(self, tmp_path):
+        """The clamscan backend can't stream archive members."""
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            "clamscan" if key == "scan_backend" else default
+        )
+        scanner = Scanner(log_manager=mock.MagicMock(), settings_manager=settings)
+
+        with mock.patch("src.core.scanner.is_flatpak", return_value=False):
+            result = scanner.scan_archive(str(tmp_path / "backup.tar"))
+
+        assert result.status == ScanStatus.ERROR
+
+    def test_flatpak_keeps_managed_backend(self):
+        """The private clamd is the one daemon backend usable inside Flatpak."""
+        scanner = Scanner(log_manager=mock.MagicMock(), settings_manager=self._managed_settings())
+        with mock.patch("src.core.scanner.is_flatpak", return_value=True):
+            assert scanner._get_backend() == "managed"
+
+
+class TestScannerAutoBackend:
+    """Tests for the adaptive backend choice of the "auto" backend."""
+
+    @staticmethod
+    def _scanner(adaptive=True, managed_running=False):
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            adaptive if key == "auto_backend_adaptive" else default
+        )
+        managed = mock.MagicMock()
+        managed.is_running.return_value = managed_running
+        return Scanner(
+            log_manager=mock.MagicMock(), settings_manager=settings, managed_clamd=managed
+        )
+
+    def test_large_tree_uses_clamscan_when_clamd_has_few_threads(self):
+        """Sharded clamscan wins a huge scan against a one-thread clamd."""
+        from src.core.backend_selection import Workload
+
+        scanner = self._scanner()
+        with (
+            mock.patch.object(scanner, "_is_daemon_reachable", return_value=True),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch(
+                "src.core.scanner.estimate_workload",
+                return_value=Workload(files=10000, bytes=10**9, source="partial walk"),
+            ),
+            mock.patch("src.core.scanner.get_max_workers", return_value=8),
+            mock.patch("src.core.scanner.get_clamd_max_threads", return_value=1),
+        ):
+            assert scanner._choose_auto_backend(["/home/user"], True) == "clamscan"
+
+    def test_small_scan_uses_warm_private_clamd(self, tmp_path):
+        """A running private clamd is used when no system clamd answers."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        scanner = self._scanner(managed_running=True)
+
+        with (
+            mock.patch.object(scanner, "_is_daemon_reachable", return_value=False),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+        ):
+            assert scanner._choose_auto_backend([str(test_file)], True) == "managed"
+
+    def test_without_adaptive_setting_prefers_daemon(self):
+        """With the setting off, the daemon is used whenever it answers."""
+        scanner = self._scanner(adaptive=False)
+        with (
+            mock.patch.object(scanner, "_is_daemon_reachable", return_value=True),
+            mock.patch("src.core.scanner.estimate_workload") as mock_estimate,
+        ):
+            assert scanner._choose_auto_backend(["/home/user"], True) == "daemon"
+        mock_estimate.assert_not_called()
+
+    def test_scan_sync_uses_chosen_daemon(self, tmp_path):
+        """scan_sync delegates to the daemon scanner when it is the cheapest."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        scanner = self._scanner()
+        daemon_scanner = mock.MagicMock()
+        scanner._daemon_scanner = daemon_scanner
+
+        with (
+            mock.patch("src.core.scanner.is_flatpak", return_value=False),
+            mock.patch.object(scanner, "_choose_auto_backend", return_value="daemon"),
+        ):
+            result = scanner.scan_sync(str(test_file))
+
+        assert result is daemon_scanner.scan_sync.return_value
+
+
+class TestScannerDaemonEndpoints:
+    """Tests for the clamscan failover of the "daemon" backend with endpoints."""
+
+    @staticmethod
+    def _scanner(endpoints):
+        settings = mock.MagicMock()
+        values = {"scan_backend": "daemon", "daemon_endpoints": endpoints}
+        settings.get.side_effect = lambda key, default=None: values.get(key, default)
+        return Scanner(log_manager=mock.MagicMock(), settings_manager=settings)
+
+    def test_unreachable_endpoints_fail_over_to_clamscan(self, tmp_path):
+        """With every endpoint down, the scan runs on local clamscan."""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        scanner = self._scanner([str(tmp_path / "missing.sock"), "tcp://127.0.0.1:1"])
+        clamscan_result = ScanResult(
+            status=ScanStatus.CLEAN,
+            path=str(test_file),
+            stdout="",
+            stderr="",
+            exit_code=0,
+            infected_files=[],
+            scanned_files=1,
+            scanned_dirs=0,
+            infected_count=0,
+            error_message=None,
+            threat_details=[],
+        )
+
+        with (
+            mock.patch("src.core.scanner.is_flatpak", return_value=False),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch.object(
+                scanner, "_scan_with_file_lists", return_value=clamscan_result
+            ) as mock_clamscan,
+        ):
+            assert scanner.get_active_backend() == "clamscan"
+            result = scanner.scan_sync(str(test_file))
+
+        assert result is clamscan_result
+        mock_clamscan.assert_called_once()
+
+    def test_reachable_endpoint_scans_on_daemon(self, fake_clamd, eicar_file):
+        """An answering endpoint keeps the scan on clamd."""
+        scanner = self._scanner([fake_clamd.address])
+
+        with mock.patch("src.core.scanner.is_flatpak", return_value=False):
+            result = scanner.scan_sync(str(eicar_file))
+
+        assert result.status == ScanStatus.INFECTED
+        assert "FILDES" in fake_clamd.commands
+
+
+class TestScannerScanTargets:
+    """Tests for scanning several targets in one clamscan invocation."""
+
+    def test_targets_share_one_clamscan_run(self, tmp_path):
+        """One clamscan process scans every target and results are split back."""
+        first = tmp_path / "first"
+        first.mkdir()
+        (first / "clean.txt").write_text("clean")
+        second = tmp_path / "second"
+        second.mkdir()
+        infected = second / "eicar.com"
+        infected.write_text("eicar")
+        scanner = Scanner(log_manager=mock.MagicMock())
+
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch("src.core.scanner.is_flatpak", return_value=True),
+            mock.patch("src.core.scanner.get_max_workers", return_value=1),
+            mock.patch("subprocess.Popen") as mock_popen,
+        ):
+            mock_process = mock.MagicMock()
+            attach_process_output(mock_process, f"{infected}: Eicar-Signature FOUND\n")
+            mock_process.returncode = 1
+            mock_popen.return_value = mock_process
+
+            results = scanner.scan_targets([str(first), str(second), str(tmp_path / "missing")])
+
+        mock_popen.assert_called_once()
+        assert any(arg.startswith("--file-list=") for arg in mock_popen.call_args[0][0])
+        assert [r.status for r in results] == [
+            ScanStatus.CLEAN,
+            ScanStatus.INFECTED,
+            ScanStatus.ERROR,
+        ]
+        assert results[0].scanned_files == 1
+        assert results[1].infected_files == [str(infected)]
+        assert results[1].threat_details[0].threat_name == "Eicar-Signature"
+        assert scanner._log_manager.save_log.call_count == 3
+
+    def test_fallback_to_single_targets_keeps_progress_and_drops_checkpoint(self, tmp_path):
+        """Targets that can't share a file list are scanned one by one, without resume."""
+        from src.core.scan_progress import ScanProgress
+
+        scanner = Scanner(log_manager=mock.MagicMock())
+        checkpoint = mock.MagicMock()
+        on_progress = mock.MagicMock()
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        paths = [str(tmp_path / "a"), str(tmp_path / "b")]
+
+        with (
+            mock.patch.object(scanner, "_get_backend", return_value="clamscan"),
+            mock.patch.object(scanner, "_scan_targets_with_clamscan", return_value=None),
+            mock.patch.object(scanner, "scan_sync") as mock_scan,
+        ):
+            mock_scan.side_effect = lambda *args, **kwargs: kwargs["on_progress"](
+                ScanProgress(3, 30, 3, 30, 1.0)
+            )
+            scanner.scan_targets(paths, checkpoint=checkpoint, on_progress=on_progress)
+
+        checkpoint.discard.assert_called_once()
+        assert [c.args[0] for c in mock_scan.call_args_list] == paths
+        assert all(len(c.args) == 4 for c in mock_scan.call_args_list)
+        # Each target's progress continues from the targets before it
+        reported = [c.args[0] for c in on_progress.call_args_list]
+        assert [(p.files_done, p.bytes_done) for p in reported] == [(3, 30), (6, 60)]
+        assert all(p.files_total is None and p.bytes_total is None for p in reported)
+
+    def test_single_target_uses_scan_sync(self, tmp_path):
+        """A single target is scanned exactly like scan_sync() would."""
+        scanner = Scanner(log_manager=mock.MagicMock())
+        expected = mock.MagicMock()
+
+        with mock.patch.object(scanner, "scan_sync", return_value=expected) as mock_scan:
+            results = scanner.scan_targets([str(tmp_path)])
+
+        mock_scan.assert_called_once_with(
+            str(tmp_path), True, None, None, None, None, profile_options=None
+        )
+        assert results == [expected]
+
+
 class TestScannerCancelEdgeCases:
     """Tests for Scanner.cancel() edge cases."""
 
@@ -1761,7 +2149,7 @@ class TestScannerProcessLockThreadSafety:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", "")
+                        attach_process_output(mock_process, "", "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -1792,12 +2180,9 @@ class TestScannerProcessLockThreadSafety:
                             "src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")
                         ):
                             with mock.patch("subprocess.Popen") as mock_popen:
-                                mock_process = mock.MagicMock()
                                 # Simulate slow scan
-                                mock_process.communicate.side_effect = lambda: (
-                                    time.sleep(0.1),
-                                    ("", ""),
-                                )[-1]
+                                mock_process = attach_process_output(mock.MagicMock(), running=True)
+                                threading.Timer(0.1, mock_process.terminate).start()
                                 mock_process.returncode = 0
                                 mock_popen.return_value = mock_process
 
@@ -1841,7 +2226,7 @@ class TestScannerProcessLockThreadSafety:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", "")
+                        attach_process_output(mock_process, "", "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -1880,7 +2265,7 @@ class TestScannerCancelFlagReset:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", "")
+                        attach_process_output(mock_process, "", "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -1913,7 +2298,7 @@ class TestScannerCancelFlagReset:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", "")
+                        attach_process_output(mock_process, "", "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
@@ -1942,10 +2327,447 @@ class TestScannerCancelFlagReset:
                 ):
                     with mock.patch("subprocess.Popen") as mock_popen:
                         mock_process = mock.MagicMock()
-                        mock_process.communicate.return_value = ("", "")
+                        attach_process_output(mock_process, "", "")
                         mock_process.returncode = 0
                         mock_popen.return_value = mock_process
 
                         result = scanner.scan_sync(str(test_file))
 
         assert result.status == ScanStatus.CLEAN
+
+
+class TestScannerScanCache:
+    """Tests for skipping unchanged files through the scan-verdict cache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """A ScanCache stored in tmp_path with a fixed signature version."""
+        from src.core.scan_cache import ScanCache
+
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        with mock.patch("src.core.scan_cache.get_signature_version", return_value="sig-1"):
+            yield cache
+        cache.close()
+
+    @pytest.fixture
+    def target(self, tmp_path):
+        """A directory with two clean files."""
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "a.txt").write_text("a")
+        (target / "b.txt").write_text("b")
+        return target
+
+    def _run_scan(self, scanner, path, infected=(), profile_exclusions=None, profile_options=None):
+        """Run scan_sync against a fake clamscan that reads --file-list."""
+        listed: list[list[str]] = []
+
+        def fake_popen(cmd, **kwargs):
+            file_list = next(arg for arg in cmd if arg.startswith("--file-list="))
+            with open(file_list.split("=", 1)[1]) as f:
+                files = f.read().splitlines()
+            listed.append(files)
+            lines = [
+                f"{p}: Eicar-Test-Signature FOUND" if p in infected else f"{p}: OK" for p in files
+            ]
+            lines += ["", f"Scanned files: {len(files)}", "Scanned directories: 0"]
+            process = mock.MagicMock()
+            attach_process_output(process, "\n".join(lines), "")
+            process.returncode = 1 if infected else 0
+            return process
+
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch.object(Scanner, "_get_backend", return_value="clamscan"),
+            mock.patch("subprocess.Popen", side_effect=fake_popen) as mock_popen,
+        ):
+            result = scanner.scan_sync(
+                str(path),
+                profile_exclusions=profile_exclusions,
+                profile_options=profile_options,
+            )
+        return result, listed, mock_popen
+
+    def test_second_scan_skips_clamscan(self, cache, target, tmp_path, monkeypatch):
+        """Unchanged files are served from the cache without running clamscan."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+
+        first, listed, _ = self._run_scan(scanner, target)
+        assert first.status == ScanStatus.CLEAN
+        assert sorted(listed[0]) == [str(target / "a.txt"), str(target / "b.txt")]
+
+        second, _, mock_popen = self._run_scan(scanner, target)
+        mock_popen.assert_not_called()
+        assert second.status == ScanStatus.CLEAN
+        assert second.scanned_files == 2
+        assert second.scanned_dirs == 1
+        # The temporary file list is removed after the scan
+        assert list((tmp_path / "xdg-cache" / "clamui").iterdir()) == []
+
+    def test_modified_file_is_rescanned(self, cache, target, tmp_path, monkeypatch):
+        """Only the file that changed is handed to clamscan again."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+        self._run_scan(scanner, target)
+
+        (target / "b.txt").write_text("changed content")
+        result, listed, _ = self._run_scan(scanner, target)
+
+        assert listed == [[str(target / "b.txt")]]
+        assert result.scanned_files == 2
+
+    def test_infected_files_are_not_cached(self, cache, target, tmp_path, monkeypatch):
+        """Infected files are reported on every scan."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+        infected = {str(target / "a.txt")}
+
+        self._run_scan(scanner, target, infected)
+        result, listed, _ = self._run_scan(scanner, target, infected)
+
+        assert listed == [[str(target / "a.txt")]]
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_files == [str(target / "a.txt")]
+        assert ": OK" not in result.stdout
+
+    def test_limited_scan_does_not_record_verdicts(self, cache, target, tmp_path, monkeypatch):
+        """Files a profile-limited run reported as OK are scanned again in full."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+
+        limited, _, _ = self._run_scan(
+            scanner, target, profile_options={"scan_archive": False, "max_scansize": 50}
+        )
+        assert limited.status == ScanStatus.CLEAN
+        result, listed, _ = self._run_scan(scanner, target)
+
+        assert sorted(listed[0]) == [str(target / "a.txt"), str(target / "b.txt")]
+        assert result.scanned_files == 2
+
+    def test_limited_scan_uses_full_verdicts(self, cache, target, tmp_path, monkeypatch):
+        """Verdicts of a full scan cover every limited scan too."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+        self._run_scan(scanner, target)
+
+        _, _, mock_popen = self._run_scan(scanner, target, profile_options={"scan_pdf": False})
+
+        mock_popen.assert_not_called()
+
+    def test_excluded_directories_are_not_listed(self, cache, target, tmp_path, monkeypatch):
+        """Profile path exclusions prune the walk like --exclude-dir does."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        (target / "skip").mkdir()
+        (target / "skip" / "c.txt").write_text("c")
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+
+        exclusions = {"paths": [str(target / "skip")], "patterns": ["*/b.txt"]}
+        _, listed, _ = self._run_scan(scanner, target, profile_exclusions=exclusions)
+
+        assert listed == [[str(target / "a.txt")]]
+
+    def test_cache_unused_without_signatures(self, tmp_path, target):
+        """Scans fall back to a plain clamscan run when no signatures are found."""
+        from src.core.scan_cache import ScanCache
+
+        cache = ScanCache(str(tmp_path / "cache.db"))
+        scanner = Scanner(log_manager=mock.MagicMock(), scan_cache=cache)
+        with (
+            mock.patch("src.core.scan_cache.get_signature_version", return_value=None),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0")),
+            mock.patch.object(Scanner, "_get_backend", return_value="clamscan"),
+            mock.patch.object(
+                scanner, "_run_clamscan", return_value=("", "", 0, False)
+            ) as mock_run,
+        ):
+            scanner.scan_sync(str(target))
+
+        cmd = mock_run.call_args[0][0]
+        assert "-i" in cmd
+        assert str(target) in cmd
+
+
+class TestScannerCheckpoint:
+    """Tests for recording and resuming scan progress."""
+
+    @pytest.fixture
+    def target(self, tmp_path, monkeypatch):
+        """A directory with three files."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        target = tmp_path / "target"
+        target.mkdir()
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (target / name).write_text(name)
+        return target
+
+    def _checkpoint(self, tmp_path, target):
+        from src.core.scan_checkpoint import ScanCheckpoint
+
+        return ScanCheckpoint([str(target)], checkpoint_dir=str(tmp_path / "checkpoints"))
+
+    def _scan(self, target, checkpoint, on_threat=None):
+        """Scan with a fake clamscan that reports every listed file as OK."""
+        listed: list[str] = []
+        commands: list[list[str]] = []
+
+        def fake_popen(cmd, **kwargs):
+            commands.append(cmd)
+            file_list = next(arg for arg in cmd if arg.startswith("--file-list="))
+            with open(file_list.split("=", 1)[1]) as f:
+                files = f.read().splitlines()
+            listed.extend(files)
+            process = mock.MagicMock()
+            lines = [f"{p}: OK" for p in files]
+            lines += ["", f"Scanned files: {len(files)}", "Scanned directories: 0"]
+            attach_process_output(process, "\n".join(lines), "")
+            process.returncode = 0
+            return process
+
+        scanner = Scanner(log_manager=mock.MagicMock())
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch.object(Scanner, "_get_backend", return_value="clamscan"),
+            mock.patch("subprocess.Popen", side_effect=fake_popen),
+        ):
+            result = scanner.scan_sync(str(target), on_threat=on_threat, checkpoint=checkpoint)
+        return result, listed, commands
+
+    def test_scan_records_completed_files(self, tmp_path, target):
+        """Clean verdicts stream into the checkpoint, so -i is not passed."""
+        checkpoint = self._checkpoint(tmp_path, target)
+        checkpoint.start()
+
+        result, _, commands = self._scan(target, checkpoint)
+        checkpoint.close()
+
+        assert result.status == ScanStatus.CLEAN
+        assert "-i" not in commands[0]
+        resumed = self._checkpoint(tmp_path, target)
+        assert resumed.start(resume=True) is True
+        assert resumed.resumed_files == 3
+        resumed.discard()
+
+    def test_resumed_scan_skips_completed_files(self, tmp_path, target):
+        """Only files without a recorded verdict are scanned; old threats are kept."""
+        from src.core.scanner_types import ThreatDetail
+
+        interrupted = self._checkpoint(tmp_path, target)
+        interrupted.start()
+        interrupted.mark_completed(str(target / "a.txt"), (target / "a.txt").stat())
+        threat = ThreatDetail(str(target / "b.txt"), "Eicar-Test-Signature", "Test", "low")
+        interrupted.record_threat(threat, (target / "b.txt").stat())
+        interrupted.close()
+
+        checkpoint = self._checkpoint(tmp_path, target)
+        assert checkpoint.start(resume=True) is True
+        reported = []
+        result, listed, _ = self._scan(target, checkpoint, on_threat=reported.append)
+        checkpoint.discard()
+
+        assert listed == [str(target / "c.txt")]
+        assert result.status == ScanStatus.INFECTED
+        assert result.exit_code == 1
+        assert result.threat_details == [threat]
+        assert reported == [threat]
+        assert result.scanned_files == 3
+        assert f"{target / 'b.txt'}: Eicar-Test-Signature FOUND" in result.stdout
+
+
+class TestScannerSharding:
+    """Tests for running clamscan as several parallel workers."""
+
+    @pytest.fixture
+    def sharded_scanner(self):
+        """Scanner configured for two clamscan workers."""
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: (
+            2 if key == "clamscan_workers" else default
+        )
+        return Scanner(log_manager=mock.MagicMock(), settings_manager=settings)
+
+    @pytest.fixture
+    def target(self, tmp_path, monkeypatch):
+        """A directory with four files, sharded one file per worker minimum."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+        monkeypatch.setattr(
+            "src.core.scanner.get_worker_count", lambda count, limit: min(count, limit)
+        )
+        target = tmp_path / "target"
+        target.mkdir()
+        for name in ("a.txt", "b.txt", "c.txt", "d.txt"):
+            (target / name).write_text(name * 10)
+        return target
+
+    def _scan(self, scanner, target, popen):
+        """Run scan_sync with clamscan replaced by the given Popen fake."""
+        with (
+            mock.patch("src.core.scanner.get_clamav_path", return_value="/usr/bin/clamscan"),
+            mock.patch("src.core.scanner.wrap_host_command", side_effect=lambda x: x),
+            mock.patch("src.core.scanner.check_clamav_installed", return_value=(True, "1.0.0")),
+            mock.patch.object(Scanner, "_get_backend", return_value="clamscan"),
+            mock.patch("subprocess.Popen", side_effect=popen),
+        ):
+            return scanner.scan_sync(str(target))
+
+    def test_workers_scan_disjoint_lists_and_merge(self, sharded_scanner, target):
+        """Each worker gets its own file list and the summaries are added up."""
+        listed: list[list[str]] = []
+        infected = str(target / "a.txt")
+
+        def fake_popen(cmd, **kwargs):
+            assert "-i" in cmd and "-r" not in cmd
+            file_list = next(arg for arg in cmd if arg.startswith("--file-list="))
+            with open(file_list.split("=", 1)[1]) as f:
+                files = f.read().splitlines()
+            listed.append(files)
+            lines = [f"{infected}: Eicar-Test-Signature FOUND"] if infected in files else []
+            lines += [
+                "",
+                "----------- SCAN SUMMARY -----------",
+                "Scanned directories: 0",
+                f"Scanned files: {len(files)}",
+                f"Infected files: {len(lines) - 1}",
+            ]
+            process = mock.MagicMock()
+            attach_process_output(process, "\n".join(lines), "")
+            process.returncode = 1 if infected in files else 0
+            return process
+
+        result = self._scan(sharded_scanner, target, fake_popen)
+
+        assert len(listed) == 2
+        assert sorted(p for shard in listed for p in shard) == sorted(
+            str(p) for p in target.iterdir()
+        )
+        assert result.status == ScanStatus.INFECTED
+        assert result.infected_files == [infected]
+        assert result.scanned_files == 4
+        assert result.scanned_dirs == 1
+        assert result.stdout.count("SCAN SUMMARY") == 1
+
+    def test_identical_copies_are_listed_once(self, target):
+        """With content deduplication, copies are skipped and share the verdict."""
+        import shutil
+
+        shutil.copy(target / "a.txt", target / "a-copy.txt")
+        settings = mock.MagicMock()
+        settings.get.side_effect = lambda key, default=None: {
+            "clamscan_workers": 2,
+            "scan_dedup_content": True,
+        }.get(key, default)
+        scanner = Scanner(log_manager=mock.MagicMock(), settings_manager=settings)
+        listed: list[str] = []
+        copies = {str(target / "a.txt"), str(target / "a-copy.txt")}
+
+        def fake_popen(cmd, **kwargs):
+            file_list = next(arg for arg in cmd if arg.startswith("--file-list="))
+            with open(file_list.split("=", 1)[1]) as f:
+                files = f.read().splitlines()
+            listed.extend(files)
+            found = [p for p in files if p in copies]
+            process = mock.MagicMock()
+            attach_process_output(
+                process, "".join(f"{p}: Eicar-Test-Signature FOUND\n" for p in found), ""
+            )
+            process.returncode = 1 if found else 0
+            return process
+
+        result = self._scan(scanner, target, fake_popen)
+
+        # Whichever copy is walked first is scanned; the other gets its verdict
+        assert len(listed) == 4
+        assert len(copies.intersection(listed)) == 1
+        assert sorted(result.infected_files) == sorted(copies)
+        skipped = copies.difference(listed).pop()
+        assert f"{skipped}: Eicar-Test-Signature FOUND" in result.stdout
+
+    def test_cancel_stops_every_worker(self, sharded_scanner, target):
+        """cancel() terminates all running workers."""
+        processes = []
+
+        def fake_popen(cmd, **kwargs):
+            process = attach_process_output(mock.MagicMock(), running=True)
+            process.wait.return_value = 0
+            process.poll.return_value = 0
+            process.returncode = -15
+            processes.append(process)
+            return process
+
+        def cancel_when_started():
+            deadline = time.monotonic() + 5
+            while len(sharded_scanner._worker_processes) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            sharded_scanner.cancel()
+
+        canceller = threading.Thread(target=cancel_when_started)
+        canceller.start()
+        result = self._scan(sharded_scanner, target, fake_popen)
+        canceller.join(timeout=5)
+
+        assert result.status == ScanStatus.CANCELLED
+        assert len(processes) == 2
+        assert all(process.terminate.called for process in processes)
+        assert sharded_scanner._worker_processes == []
+
+
+class TestScannerGovernor:
+    """Tests for throttling and pausing the scans of a Scanner."""
+
+    def test_scans_run_while_the_governor_watches(self, tmp_path):
+        """Every scan method runs inside the governor's watching()."""
+        governor = mock.MagicMock()
+        scanner = Scanner(log_manager=mock.MagicMock(), governor=governor)
+
+        scanner.scan_sync(str(tmp_path / "missing"))
+        scanner.scan_targets([str(tmp_path / "missing"), str(tmp_path / "other")])
+
+        assert governor.watching.call_count == 2
+        assert scanner.governor is governor
+
+    def test_pause_and_resume_go_to_the_governor(self):
+        governor = mock.MagicMock()
+        scanner = Scanner(log_manager=mock.MagicMock(), governor=governor)
+
+        scanner.pause()
+        scanner.resume()
+
+        governor.pause.assert_called_once_with()
+        governor.resume.assert_called_once_with()
+
+    def test_daemon_scanners_share_the_governor(self):
+        """Daemon scans read the same governor as clamscan workers."""
+        scanner = Scanner(log_manager=mock.MagicMock())
+
+        assert scanner._get_daemon_scanner()._governor is scanner.governor
+        assert scanner._get_managed_scanner()._governor is scanner.governor
+
+    def test_clamscan_processes_are_tracked_while_they_run(self):
+        """A paused scan stops its clamscan processes as they start."""
+        scanner = Scanner(log_manager=mock.MagicMock())
+        parser = mock.MagicMock()
+        states = []
+
+        scanner.pause()
+        original_track = scanner.governor.track
+
+        def track(process):
+            original_track(process)
+            with open(f"/proc/{process.pid}/stat") as f:
+                states.append(f.read().rsplit(")", 1)[1].split()[0])
+            scanner.resume()
+
+        with mock.patch.object(scanner.governor, "track", side_effect=track):
+            _, _, exit_code, cancelled = scanner._run_clamscan(
+                [sys.executable, "-c", "print('done')"], parser
+            )
+
+        # Stopped as soon as it started, then continued by resume()
+        assert states == ["T"]
+        assert exit_code == 0
+        assert cancelled is False
+        assert scanner.governor._processes == []
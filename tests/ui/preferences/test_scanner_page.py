@@ -492,6 +492,19 @@ class TestScannerPageBackendSelection:
         # Should save "clamscan" to settings
         mock_settings_manager.set.assert_called_with("scan_backend", "clamscan")
 
+    def test_on_backend_changed_saves_to_settings_managed(self, mock_gi_modules):
+        """Test _on_backend_changed saves 'managed' to settings."""
+        mock_row = mock.MagicMock()
+        mock_row.get_selected.return_value = 3
+        mock_settings_manager = mock.MagicMock()
+
+        from src.ui.preferences.scanner_page import ScannerPage
+
+        ScannerPage._on_backend_changed(mock_row, mock_settings_manager)
+
+        # Should save "managed" to settings
+        mock_settings_manager.set.assert_called_with("scan_backend", "managed")
+
     def test_on_backend_changed_updates_subtitle(self, mock_gi_modules):
         """Test _on_backend_changed updates subtitle."""
         mock_row = mock.MagicMock()
@@ -80,6 +80,13 @@ def mock_scan_view(scan_view_class):
     view._normalized_paths = set()
     view._is_scanning = False
     view._cancel_all_requested = False
+    view._interrupted_scan = None
+    view._resume_requested = False
+    view._latest_progress = None
+    view._progress_update_pending = False
+    view._on_scan_progress = None
+    view._on_scan_paused_changed = None
+    view._governor_status = ""
 
     # Mock UI elements
     view._path_label = mock.MagicMock()
@@ -87,7 +94,9 @@ def mock_scan_view(scan_view_class):
     view._status_banner = mock.MagicMock()
     view._scan_button = mock.MagicMock()
     view._cancel_button = mock.MagicMock()
+    view._pause_button = mock.MagicMock()
     view._eicar_button = mock.MagicMock()
+    view._resume_button = mock.MagicMock()
     view._progress_section = mock.MagicMock()
     view._progress_bar = mock.MagicMock()
     view._progress_label = mock.MagicMock()
@@ -785,7 +794,7 @@ class TestScanWorker:
         mock_result.stderr = ""
         mock_result.error_message = None
 
-        mock_scan_view._scanner.scan_sync.return_value = mock_result
+        mock_scan_view._scanner.scan_targets.return_value = [mock_result]
         mock_scan_view._selected_paths = ["/home/user/test.txt"]
 
         # Mock GLib.idle_add to call the callback directly
@@ -802,11 +811,47 @@ class TestScanWorker:
             mock_scan_view._scan_worker()
 
             # Verify scanner was called with the correct path
-            mock_scan_view._scanner.scan_sync.assert_called_once_with("/home/user/test.txt")
+            mock_scan_view._scanner.scan_targets.assert_called_once_with(
+                ["/home/user/test.txt"],
+                checkpoint=mock.ANY,
+                on_progress=mock.ANY,
+                profile_options=None,
+            )
 
             # Verify _on_scan_complete was scheduled
             assert len(captured_callbacks) >= 1
 
+    def test_scan_worker_passes_profile_options(self, mock_scan_view):
+        """Test scan worker hands the selected profile's options to the scanner."""
+        self._setup_scan_mocks(mock_scan_view)
+        mock_scan_view._selected_profile = mock.MagicMock(options={"max_filesize": 25})
+        mock_scan_view._scanner.scan_targets.return_value = []
+        mock_scan_view._selected_paths = ["/home/user"]
+
+        with mock.patch("src.ui.scan_view.GLib"):
+            mock_scan_view._scan_worker()
+
+        kwargs = mock_scan_view._scanner.scan_targets.call_args.kwargs
+        assert kwargs["profile_options"] == {"max_filesize": 25}
+
+    def test_resumed_scan_keeps_the_interrupted_options(self, mock_scan_view):
+        """Test a resumed scan runs with the options of the scan it continues."""
+        self._setup_scan_mocks(mock_scan_view)
+        mock_scan_view._selected_profile = mock.MagicMock(options={"max_filesize": 25})
+        mock_scan_view._interrupted_scan = mock.MagicMock(profile_options={"scan_pdf": False})
+        mock_scan_view._resume_requested = True
+        mock_scan_view._scanner.scan_targets.return_value = []
+        mock_scan_view._selected_paths = ["/home/user"]
+
+        with mock.patch("src.ui.scan_view.GLib"):
+            with mock.patch("src.ui.scan_view.ScanCheckpoint") as mock_checkpoint:
+                mock_scan_view._scan_worker()
+
+        kwargs = mock_scan_view._scanner.scan_targets.call_args.kwargs
+        assert kwargs["profile_options"] == {"scan_pdf": False}
+        mock_checkpoint.assert_called_once_with(["/home/user"], profile_options={"scan_pdf": False})
+        mock_checkpoint.return_value.start.assert_called_once_with(resume=True)
+
     def test_scan_worker_no_paths_returns_error(self, mock_scan_view):
         """Test scan worker with no paths returns an error result."""
         self._setup_scan_mocks(mock_scan_view)
@@ -829,7 +874,7 @@ class TestScanWorker:
                     mock_scan_view._scan_worker()
 
                     # Scanner should not be called
-                    mock_scan_view._scanner.scan_sync.assert_not_called()
+                    mock_scan_view._scanner.scan_targets.assert_not_called()
 
                     # ScanResult should be constructed with error message
                     mock_scan_result.assert_called_once()
@@ -840,7 +885,7 @@ class TestScanWorker:
         """Test scan worker handles exceptions properly."""
         self._setup_scan_mocks(mock_scan_view)
         mock_scan_view._selected_paths = ["/home/user/test.txt"]
-        mock_scan_view._scanner.scan_sync.side_effect = RuntimeError("Scan failed")
+        mock_scan_view._scanner.scan_targets.side_effect = RuntimeError("Scan failed")
 
         with mock.patch("src.ui.scan_view.GLib") as mock_glib:
             captured_errors = []
@@ -874,8 +919,8 @@ class TestMultiTargetScanning:
         mock_scan_view._on_scan_state_changed = None
         mock_scan_view._current_result = None
 
-    def test_multi_target_scan_iterates_all_paths(self, mock_scan_view):
-        """Test that multi-target scan processes all paths."""
+    def test_multi_target_scan_uses_one_invocation(self, mock_scan_view):
+        """Test that multi-target scan passes all paths to the scanner at once."""
         self._setup_multi_scan_mocks(mock_scan_view)
 
         # Create mock results
@@ -894,7 +939,7 @@ class TestMultiTargetScanning:
         # Make status comparisons work (return False so status != CANCELLED)
         mock_result.status.__eq__ = mock.MagicMock(return_value=False)
 
-        mock_scan_view._scanner.scan_sync.return_value = mock_result
+        mock_scan_view._scanner.scan_targets.return_value = [mock_result] * 3
         mock_scan_view._selected_paths = ["/path1", "/path2", "/path3"]
         mock_scan_view._cancel_all_requested = False
 
@@ -910,12 +955,14 @@ class TestMultiTargetScanning:
 
                 mock_scan_view._scan_worker()
 
-            # Scanner should be called for each path
-            assert mock_scan_view._scanner.scan_sync.call_count == 3
-            calls = mock_scan_view._scanner.scan_sync.call_args_list
-            assert calls[0][0][0] == "/path1"
-            assert calls[1][0][0] == "/path2"
-            assert calls[2][0][0] == "/path3"
+            # Scanner should be called once with every path
+            mock_scan_view._scanner.scan_targets.assert_called_once_with(
+                ["/path1", "/path2", "/path3"],
+                checkpoint=mock.ANY,
+                on_progress=mock.ANY,
+                profile_options=None,
+            )
+            mock_scan_view._scanner.scan_sync.assert_not_called()
 
     def test_multi_target_scan_aggregates_results(self, mock_scan_view):
         """Test that multi-target scan aggregates results correctly."""
@@ -937,7 +984,7 @@ class TestMultiTargetScanning:
 
         results = [create_result(10, 0), create_result(20, 1), create_result(5, 0)]
 
-        mock_scan_view._scanner.scan_sync.side_effect = results
+        mock_scan_view._scanner.scan_targets.return_value = results
         mock_scan_view._selected_paths = ["/path1", "/path2", "/path3"]
         mock_scan_view._cancel_all_requested = False
 
@@ -964,6 +1011,47 @@ class TestMultiTargetScanning:
                 assert call_kwargs["infected_count"] == 1
 
 
+class TestResumeInterruptedScan:
+    """Tests for resuming an interrupted scan."""
+
+    def test_resume_button_hidden_without_checkpoint(self, mock_scan_view):
+        """Test the resume button stays hidden when nothing was interrupted."""
+        with mock.patch("src.ui.scan_view.find_interrupted_scan", return_value=None):
+            mock_scan_view._update_resume_button()
+
+        mock_scan_view._resume_button.set_visible.assert_called_with(False)
+
+    def test_resume_button_shown_for_interrupted_scan(self, mock_scan_view):
+        """Test the resume button is offered for an interrupted scan."""
+        checkpoint = mock.MagicMock()
+        checkpoint.targets = ["/home/user/Documents"]
+
+        with mock.patch("src.ui.scan_view.find_interrupted_scan", return_value=checkpoint):
+            mock_scan_view._update_resume_button()
+
+        mock_scan_view._resume_button.set_visible.assert_called_with(True)
+        assert mock_scan_view._interrupted_scan is checkpoint
+
+    def test_resume_selects_targets_and_resumes(self, mock_scan_view):
+        """Test resuming selects the interrupted targets and starts a resumed scan."""
+        mock_scan_view._paths_placeholder = mock.MagicMock()
+        mock_scan_view._paths_listbox = mock.MagicMock()
+        mock_scan_view._paths_listbox.get_first_child.return_value = None
+        mock_scan_view._create_path_row = mock.MagicMock()
+        mock_scan_view._update_selection_header = mock.MagicMock()
+        mock_scan_view._start_scanning = mock.MagicMock()
+        mock_scan_view._add_path("/old/selection")
+        checkpoint = mock.MagicMock()
+        checkpoint.targets = ["/data", "/home/user"]
+        mock_scan_view._interrupted_scan = checkpoint
+
+        mock_scan_view._on_resume_clicked(None)
+
+        assert mock_scan_view._selected_paths == ["/data", "/home/user"]
+        assert mock_scan_view._resume_requested is True
+        mock_scan_view._start_scanning.assert_called_once()
+
+
 class TestCancelScan:
     """Tests for scan cancellation functionality."""
 
@@ -1005,7 +1093,7 @@ class TestCancelScan:
         mock_result.stderr = ""
         mock_result.error_message = None
 
-        mock_scan_view._scanner.scan_sync.return_value = mock_result
+        mock_scan_view._scanner.scan_targets.return_value = [mock_result] * 3
         mock_scan_view._selected_paths = ["/path1", "/path2", "/path3"]
         mock_scan_view._cancel_all_requested = True  # Already cancelled
 
@@ -1020,48 +1108,57 @@ class TestCancelScan:
 
                 mock_scan_view._scan_worker()
 
-            # Scanner should not be called at all (cancel was set before first scan)
-            mock_scan_view._scanner.scan_sync.assert_not_called()
+            # Scanner should not be called at all (cancel was set before the scan)
+            mock_scan_view._scanner.scan_targets.assert_not_called()
+            scheduled = [call[0][0] for call in mock_glib.idle_add.call_args_list]
+            assert mock_scan_view._on_scan_complete in scheduled
 
-    def test_cancel_during_scan_stops_at_current_target(self, mock_scan_view):
-        """Test that cancelling during scan stops after current target."""
+    def test_cancel_during_scan_reports_cancelled(self, mock_scan_view):
+        """Test that cancelling during the scan reports the scan as cancelled."""
         self._setup_cancel_mocks(mock_scan_view)
 
         # Mock ScanStatus
         mock_cancelled_status = mock.MagicMock()
 
-        def create_result_and_cancel(path):
-            """Create result and set cancel flag after first scan."""
+        def create_results_and_cancel(
+            paths, checkpoint=None, on_progress=None, profile_options=None
+        ):
+            """Create cancelled results and set the cancel flag."""
             mock_scan_view._cancel_all_requested = True
-            result = mock.MagicMock()
-            result.status = mock_cancelled_status
-            result.scanned_files = 5
-            result.scanned_dirs = 1
-            result.infected_count = 0
-            result.infected_files = []
-            result.threat_details = []
-            result.stdout = ""
-            result.stderr = ""
-            result.error_message = None
-            return result
-
-        mock_scan_view._scanner.scan_sync.side_effect = create_result_and_cancel
+            results = []
+            for _ in paths:
+                result = mock.MagicMock()
+                result.status = mock_cancelled_status
+                result.scanned_files = 5
+                result.scanned_dirs = 1
+                result.infected_count = 0
+                result.infected_files = []
+                result.threat_details = []
+                result.stdout = ""
+                result.stderr = ""
+                result.error_message = None
+                results.append(result)
+            return results
+
+        mock_scan_view._scanner.scan_targets.side_effect = create_results_and_cancel
         mock_scan_view._selected_paths = ["/path1", "/path2", "/path3"]
         mock_scan_view._cancel_all_requested = False
 
         with mock.patch("src.ui.scan_view.GLib") as mock_glib:
-            mock_glib.idle_add.side_effect = lambda callback, *args: True
+            with mock.patch("src.ui.scan_view.ScanResult") as mock_scan_result_class:
+                mock_glib.idle_add.side_effect = lambda callback, *args: True
 
-            with mock.patch("src.ui.scan_view.ScanStatus") as mock_scan_status:
-                mock_scan_status.CLEAN = "clean"
-                mock_scan_status.INFECTED = "infected"
-                mock_scan_status.ERROR = "error"
-                mock_scan_status.CANCELLED = mock_cancelled_status
+                with mock.patch("src.ui.scan_view.ScanStatus") as mock_scan_status:
+                    mock_scan_status.CLEAN = "clean"
+                    mock_scan_status.INFECTED = "infected"
+                    mock_scan_status.ERROR = "error"
+                    mock_scan_status.CANCELLED = mock_cancelled_status
 
-                mock_scan_view._scan_worker()
+                    mock_scan_view._scan_worker()
 
-            # Should only scan first target before cancel takes effect
-            assert mock_scan_view._scanner.scan_sync.call_count == 1
+                assert mock_scan_view._scanner.scan_targets.call_count == 1
+                call_kwargs = mock_scan_result_class.call_args[1]
+                assert call_kwargs["status"] is mock_cancelled_status
 
 
 class TestScanComplete:
@@ -1343,6 +1440,15 @@ class TestProgressUpdates:
         label = mock_scan_view._progress_label.set_label.call_args[0][0]
         assert "2/5" in label
 
+    def test_update_multi_target_progress(self, mock_scan_view):
+        """Test progress update for a scan of several targets at once."""
+        self._setup_progress_mocks(mock_scan_view)
+
+        mock_scan_view._update_multi_target_progress(5)
+
+        label = mock_scan_view._progress_label.set_label.call_args[0][0]
+        assert label == "Scanning 5 targets"
+
     def test_update_scan_progress_truncates_long_path(self, mock_scan_view):
         """Test that progress update truncates very long paths."""
         self._setup_progress_mocks(mock_scan_view)
@@ -1356,6 +1462,81 @@ class TestProgressUpdates:
         assert "..." in label or len(label) < len(long_path) + 20
 
 
+class TestLiveProgress:
+    """Tests for the throughput and ETA reported by the scanner."""
+
+    @staticmethod
+    def _progress(files_done=50, bytes_done=50 * 1024 * 1024, total=100, elapsed=10.0):
+        from src.core.scan_progress import ScanProgress
+
+        return ScanProgress(
+            files_done=files_done,
+            bytes_done=bytes_done,
+            files_total=total,
+            bytes_total=total * 1024 * 1024 if total is not None else None,
+            elapsed=elapsed,
+        )
+
+    def test_reports_are_coalesced_into_one_idle_update(self, mock_scan_view):
+        """Test that snapshots arriving before the UI update schedule it once."""
+        first, latest = self._progress(files_done=10), self._progress(files_done=20)
+
+        with mock.patch("src.ui.scan_view.GLib") as mock_glib:
+            mock_scan_view._report_progress(first)
+            mock_scan_view._report_progress(latest)
+
+        mock_glib.idle_add.assert_called_once_with(mock_scan_view._apply_progress)
+        assert mock_scan_view._latest_progress is latest
+
+    def test_apply_progress_sets_fraction_and_stops_pulse(self, mock_scan_view):
+        """Test that a known total replaces the pulse with a real fraction."""
+        mock_scan_view._is_scanning = True
+        mock_scan_view._pulse_timeout_id = 42
+        mock_scan_view._progress_update_pending = True
+        mock_scan_view._latest_progress = self._progress()
+        callback = mock.MagicMock()
+        mock_scan_view.set_on_scan_progress(callback)
+
+        with mock.patch("src.ui.scan_view.GLib") as mock_glib:
+            assert mock_scan_view._apply_progress() is False
+
+        mock_glib.source_remove.assert_called_once_with(42)
+        assert mock_scan_view._pulse_timeout_id is None
+        mock_scan_view._progress_bar.set_fraction.assert_called_once_with(0.5)
+        callback.assert_called_once_with(mock_scan_view._latest_progress)
+        assert mock_scan_view._progress_update_pending is False
+
+    def test_apply_progress_keeps_pulse_without_total(self, mock_scan_view):
+        """Test that the bar keeps pulsing while the total is unknown."""
+        mock_scan_view._is_scanning = True
+        mock_scan_view._pulse_timeout_id = 42
+        mock_scan_view._latest_progress = self._progress(total=None)
+
+        with mock.patch("src.ui.scan_view.GLib") as mock_glib:
+            mock_scan_view._apply_progress()
+
+        mock_glib.source_remove.assert_not_called()
+        mock_scan_view._progress_bar.set_fraction.assert_not_called()
+        label = mock_scan_view._progress_label.set_label.call_args[0][0]
+        assert label.startswith("Scanned 50 files")
+
+    def test_apply_progress_ignored_after_scan_ended(self, mock_scan_view):
+        """Test that a late snapshot doesn't touch the finished scan's UI."""
+        mock_scan_view._is_scanning = False
+        mock_scan_view._latest_progress = self._progress()
+
+        mock_scan_view._apply_progress()
+
+        mock_scan_view._progress_bar.set_fraction.assert_not_called()
+        mock_scan_view._progress_label.set_label.assert_not_called()
+
+    def test_format_progress_shows_throughput_and_eta(self, mock_scan_view):
+        """Test the progress label text."""
+        label = mock_scan_view._format_progress(self._progress(elapsed=80.0))
+
+        assert label == "Scanned 50 of 100 files · 1 files/s · 0.6 MB/s · 1m 20s left"
+
+
 class TestStartScanning:
     """Tests for the _start_scanning method that initiates scans."""
 
@@ -1658,6 +1839,14 @@ class TestScanStateCallbacks:
 
         assert mock_scan_view._on_scan_state_changed == callback
 
+    def test_set_on_scan_progress(self, mock_scan_view):
+        """Test setting the scan progress callback."""
+        callback = mock.MagicMock()
+
+        mock_scan_view.set_on_scan_progress(callback)
+
+        assert mock_scan_view._on_scan_progress == callback
+
 
 class TestSelectedProfile:
     """Tests for profile selection getters and setters."""
@@ -2349,3 +2538,75 @@ class TestScanErrorNotifiesCallback:
             mock_scan_view._on_scan_error("Error")
 
         callback.assert_called_once_with(False)
+
+
+class TestScanPause:
+    """Tests for pausing and resuming the running scan."""
+
+    def test_pause_click_pauses_running_scan(self, mock_scan_view):
+        """Test that the pause button pauses the scan."""
+        mock_scan_view._is_scanning = True
+        mock_scan_view._scanner.governor.is_paused = False
+
+        mock_scan_view._on_pause_clicked(mock.MagicMock())
+
+        mock_scan_view._scanner.pause.assert_called_once()
+        mock_scan_view._scanner.resume.assert_not_called()
+
+    def test_pause_click_resumes_paused_scan(self, mock_scan_view):
+        """Test that the button resumes a scan paused by the user or the governor."""
+        mock_scan_view._is_scanning = True
+        mock_scan_view._scanner.governor.is_paused = True
+
+        mock_scan_view._on_pause_clicked(mock.MagicMock())
+
+        mock_scan_view._scanner.resume.assert_called_once()
+
+    def test_pause_without_scan_does_nothing(self, mock_scan_view):
+        """Test that the tray can't pause a scan that isn't running."""
+        mock_scan_view.pause_scan()
+        mock_scan_view.resume_scan()
+
+        mock_scan_view._scanner.pause.assert_not_called()
+        mock_scan_view._scanner.resume.assert_not_called()
+
+    def test_paused_state_updates_button_label_and_callback(self, mock_scan_view):
+        """Test that a paused scan offers Resume and tells the tray."""
+        from src.ui.scan_view import GovernorState
+
+        mock_scan_view._is_scanning = True
+        callback = mock.MagicMock()
+        mock_scan_view.set_on_scan_paused_changed(callback)
+
+        mock_scan_view._apply_governor_state(GovernorState.PAUSED, "Battery at 15%")
+
+        mock_scan_view._pause_button.set_label.assert_called_with("Resume")
+        mock_scan_view._progress_label.set_label.assert_called_with("Paused: Battery at 15%")
+        callback.assert_called_once_with(True)
+
+    def test_throttled_state_is_shown_with_progress(self, mock_scan_view):
+        """Test that the progress label says why the scan is slowed down."""
+        from src.core.scan_progress import ScanProgress
+        from src.ui.scan_view import GovernorState
+
+        mock_scan_view._is_scanning = True
+        mock_scan_view._latest_progress = ScanProgress(
+            files_done=5, files_total=10, bytes_done=0, bytes_total=0, elapsed=1.0
+        )
+
+        mock_scan_view._apply_governor_state(GovernorState.THROTTLED, "On battery power")
+
+        label = mock_scan_view._progress_label.set_label.call_args[0][0]
+        assert label.startswith("Scanned 5 of 10 files")
+        assert label.endswith(" · Slowed down: On battery power")
+        mock_scan_view._pause_button.set_label.assert_called_with("Pause")
+
+    def test_scan_end_hides_pause_button(self, mock_scan_view):
+        """Test that the pause button goes away with the scan."""
+        mock_scan_view._is_scanning = True
+        mock_scan_view._selection_group = mock.MagicMock()
+
+        with mock.patch("src.ui.scan_view.set_status_class"):
+            mock_scan_view._on_scan_error("Error")
+
+        mock_scan_view._pause_button.set_visible.assert_called_with(False)
@@ -193,6 +193,23 @@ class TestTrayManagerHandleMenuAction:
 
         callback.assert_called_once()
 
+    def test_handle_pause_and_resume_scan_actions(self, mock_gtk_modules):
+        """Test handling pause_scan and resume_scan actions invokes callbacks."""
+        from src.ui.tray_manager import TrayManager
+
+        manager = TrayManager()
+
+        on_pause = mock.Mock()
+        on_resume = mock.Mock()
+        manager.set_scan_pause_callbacks(on_pause=on_pause, on_resume=on_resume)
+
+        manager._handle_menu_action("pause_scan", {})
+        on_pause.assert_called_once()
+        on_resume.assert_not_called()
+
+        manager._handle_menu_action("resume_scan", {})
+        on_resume.assert_called_once()
+
     def test_handle_select_profile_action(self, mock_gtk_modules):
         """Test handling select_profile action invokes callback with profile_id."""
         from src.ui.tray_manager import TrayManager
@@ -365,6 +382,17 @@ class TestTrayManagerUpdateMethods:
 
             mock_send.assert_called_once_with({"action": "update_progress", "percentage": 75})
 
+    def test_update_scan_paused_sends_command(self, mock_gtk_modules):
+        """Test update_scan_paused sends correct command."""
+        from src.ui.tray_manager import TrayManager
+
+        manager = TrayManager()
+
+        with mock.patch.object(manager, "_send_command") as mock_send:
+            manager.update_scan_paused(True)
+
+            mock_send.assert_called_once_with({"action": "update_scan_paused", "paused": True})
+
     def test_update_window_menu_label_sends_command(self, mock_gtk_modules):
         """Test update_window_menu_label sends correct command."""
         from src.ui.tray_manager import TrayManager